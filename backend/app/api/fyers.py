@@ -2,15 +2,20 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import asyncio
 import httpx
 import os
 import hashlib
+import math
 import secrets
 import time
 from datetime import datetime, timedelta
 import logging
 from urllib.parse import urlencode
 
+from app.services.quote_batcher import QuoteBatcher
+from app.utils.rate_limiter import TokenBucketLimiter
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/fyers", tags=["fyers"])
@@ -19,18 +24,42 @@ router = APIRouter(prefix="/fyers", tags=["fyers"])
 FYERS_CLIENT_ID = os.getenv("FYERS_CLIENT_ID", "")
 FYERS_SECRET_KEY = os.getenv("FYERS_SECRET_KEY", "")
 FYERS_REDIRECT_URI = os.getenv("FYERS_REDIRECT_URI", "http://localhost:8000/api/fyers/callback")
-FYERS_BASE_URL = "https://api.fyers.in/api/v2"
+FYERS_BASE_URL = os.getenv("FYERS_BASE_URL", "https://api.fyers.in/api/v2")
 FYERS_AUTH_URL = "https://api.fyers.in/api/v2/generate-authcode"
 
+# Shared HTTP client configuration
+FYERS_MAX_CONNECTIONS = int(os.getenv("FYERS_MAX_CONNECTIONS", "20"))
+FYERS_MAX_KEEPALIVE = int(os.getenv("FYERS_MAX_KEEPALIVE", "10"))
+FYERS_KEEPALIVE_EXPIRY = float(os.getenv("FYERS_KEEPALIVE_EXPIRY", "60"))
+FYERS_CONNECT_TIMEOUT = float(os.getenv("FYERS_CONNECT_TIMEOUT", "5"))
+FYERS_DEFAULT_TIMEOUT = 30.0
+# Read timeouts per endpoint; quotes are latency-sensitive, account data is not
+FYERS_ENDPOINT_TIMEOUTS = {
+    "quotes": 5.0,
+    "data/quotes": 5.0,
+    "market-status": 5.0,
+    "profile": 10.0,
+    "positions": 10.0,
+    "holdings": 15.0,
+}
+
 # Rate limiting configuration
 RATE_LIMIT_REQUESTS = 60  # 60 requests per minute
 RATE_LIMIT_WINDOW = 60    # 60 seconds window
 
+# Budget for our own calls to the Fyers API, shared by all inbound clients
+FYERS_UPSTREAM_REQUESTS = int(os.getenv("FYERS_UPSTREAM_REQUESTS", "200"))  # per minute
+FYERS_UPSTREAM_BURST = int(os.getenv("FYERS_UPSTREAM_BURST", "10"))
+FYERS_UPSTREAM_MAX_WAIT = float(os.getenv("FYERS_UPSTREAM_MAX_WAIT", "2"))
+
 # In-memory storage for demo (use Redis in production)
 fyers_tokens = {}
-rate_limit_store = {}
 auth_states = {}
 
+# Inbound budget per client, and the upstream Fyers budget
+inbound_limiter = TokenBucketLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)
+upstream_limiter = TokenBucketLimiter(FYERS_UPSTREAM_REQUESTS, 60, burst=FYERS_UPSTREAM_BURST)
+
 
 class FyersManager:
     """Centralized Fyers API management class"""
@@ -61,12 +90,8 @@ class FyersManager:
         # Format symbols for Fyers API
         formatted_symbols = [sym if ":" in sym else f"NSE:{sym}-EQ" for sym in symbols]
         
-        return await make_fyers_request(
-            endpoint="data/quotes",
-            method="POST",
-            data={"symbols": formatted_symbols},
-            access_token=access_token
-        )
+        # Concurrent callers share deduplicated, 50-symbol upstream batches
+        return await quote_batcher.get_quotes(formatted_symbols, user_id)
     
     def get_chart_url(self, symbol: str, exchange: str = "NSE") -> str:
         """Generate Fyers chart URL for symbol"""
@@ -83,8 +108,22 @@ class FyersManager:
         return check_rate_limit(client_ip)
 
 
+async def _fetch_quote_batch(symbols: list, user_id: str) -> dict:
+    """Single upstream quotes call used by the quote batcher"""
+    access_token = get_fyers_access_token(user_id)
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated with Fyers")
+    return await make_fyers_request(
+        endpoint="data/quotes",
+        method="POST",
+        data={"symbols": symbols},
+        access_token=access_token
+    )
+
+
 # Global FyersManager instance
 fyers_manager = FyersManager()
+quote_batcher = QuoteBatcher(_fetch_quote_batch)
 
 
 class FyersTokenRequest(BaseModel):
@@ -105,27 +144,58 @@ class FyersOrderRequest(BaseModel):
     product_type: str = "CNC"  # "CNC", "INTRADAY", "MARGIN"
 
 
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+FYERS_HTTP2 = os.getenv("FYERS_HTTP2", "true").lower() == "true" and _http2_available()
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_fyers_client() -> httpx.AsyncClient:
+    """Process-wide Fyers HTTP client, reusing keep-alive (and HTTP/2 when available) connections"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=FYERS_HTTP2,
+            timeout=httpx.Timeout(FYERS_DEFAULT_TIMEOUT, connect=FYERS_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=FYERS_MAX_CONNECTIONS,
+                max_keepalive_connections=FYERS_MAX_KEEPALIVE,
+                keepalive_expiry=FYERS_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _http_client
+
+
+async def start_fyers_client() -> None:
+    """Open the shared client at application startup"""
+    get_fyers_client()
+    logger.info(f"Fyers HTTP client ready (http2={FYERS_HTTP2}, max_connections={FYERS_MAX_CONNECTIONS})")
+
+
+async def close_fyers_client() -> None:
+    """Close the shared client and its pooled connections at shutdown"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _endpoint_timeout(endpoint: str) -> httpx.Timeout:
+    read = FYERS_ENDPOINT_TIMEOUTS.get(endpoint, FYERS_DEFAULT_TIMEOUT)
+    return httpx.Timeout(read, connect=FYERS_CONNECT_TIMEOUT)
+
+
 # Rate limiter middleware
 def check_rate_limit(client_ip: str = "default") -> bool:
     """Check if request is within rate limits"""
-    current_time = time.time()
-    
-    if client_ip not in rate_limit_store:
-        rate_limit_store[client_ip] = []
-    
-    # Clean old requests outside the window
-    rate_limit_store[client_ip] = [
-        req_time for req_time in rate_limit_store[client_ip]
-        if current_time - req_time < RATE_LIMIT_WINDOW
-    ]
-    
-    # Check if under limit
-    if len(rate_limit_store[client_ip]) >= RATE_LIMIT_REQUESTS:
-        return False
-    
-    # Add current request
-    rate_limit_store[client_ip].append(current_time)
-    return True
+    return inbound_limiter.allow(client_ip)
 
 
 def get_fyers_access_token(user_id: str = "default") -> Optional[str]:
@@ -153,16 +223,26 @@ async def make_fyers_request(endpoint: str, method: str = "GET", data: dict = No
     
     url = f"{FYERS_BASE_URL}/{endpoint}"
     
+    # Our budget with Fyers is shared by every inbound client: wait briefly for it, else shed the call
+    if not await upstream_limiter.acquire("fyers", max_wait=FYERS_UPSTREAM_MAX_WAIT):
+        raise HTTPException(
+            status_code=503,
+            detail="Fyers API request budget exhausted, retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(FYERS_UPSTREAM_MAX_WAIT)))}
+        )
+    
+    client = get_fyers_client()
+    timeout = _endpoint_timeout(endpoint)
+    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            if method == "GET":
-                response = await client.get(url, headers=headers, params=data)
-            else:
-                response = await client.post(url, headers=headers, json=data)
-            
-            response.raise_for_status()
-            return response.json()
-            
+        if method == "GET":
+            response = await client.get(url, headers=headers, params=data, timeout=timeout)
+        else:
+            response = await client.post(url, headers=headers, json=data, timeout=timeout)
+        
+        response.raise_for_status()
+        return response.json()
+        
     except httpx.TimeoutException:
         raise HTTPException(status_code=408, detail="Fyers API request timed out")
     except httpx.RequestError:
@@ -258,13 +338,12 @@ async def exchange_code_for_token(auth_code: str) -> dict:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.fyers.in/api/v2/validate-authcode",
-                json=token_data
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await get_fyers_client().post(
+            "https://api.fyers.in/api/v2/validate-authcode",
+            json=token_data
+        )
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"Token exchange error: {str(e)}")
         raise HTTPException(status_code=400, detail="Failed to exchange auth code for token")
@@ -313,22 +392,9 @@ async def get_quotes(symbols: str, user_id: str = "default"):
     
     try:
         # Parse symbols (comma-separated)
-        symbol_list = [s.strip() for s in symbols.split(",")]
-        
-        # Fyers API expects symbols in specific format: NSE:SBIN-EQ
-        formatted_symbols = []
-        for symbol in symbol_list:
-            if ":" not in symbol:
-                formatted_symbols.append(f"NSE:{symbol}-EQ")  # Default to NSE equity
-            else:
-                formatted_symbols.append(symbol)
+        symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
         
-        response = await make_fyers_request(
-            "quotes",
-            method="GET",
-            data={"symbols": ",".join(formatted_symbols)},
-            access_token=access_token
-        )
+        response = await fyers_manager.get_quotes(symbol_list, user_id)
         
         return {
             "success": True,
@@ -457,25 +523,11 @@ async def get_positions(user_id: str = "default"):
 @router.get("/rate-limit-status")
 async def get_rate_limit_status(user_id: str = "default"):
     """Get current rate limit status"""
-    current_time = time.time()
-    user_requests = rate_limit_store.get(user_id, [])
-    
-    # Count requests in current window
-    recent_requests = [
-        req_time for req_time in user_requests
-        if current_time - req_time < RATE_LIMIT_WINDOW
-    ]
-    
-    remaining = max(0, RATE_LIMIT_REQUESTS - len(recent_requests))
-    
     return {
         "success": True,
         "data": {
-            "requests_made": len(recent_requests),
-            "requests_remaining": remaining,
-            "rate_limit": RATE_LIMIT_REQUESTS,
-            "window_seconds": RATE_LIMIT_WINDOW,
-            "reset_time": current_time + RATE_LIMIT_WINDOW
+            **inbound_limiter.status(user_id),
+            "upstream": upstream_limiter.status("fyers"),
         }
     }
 
@@ -518,29 +570,13 @@ async def fetch_watchlist_prices(symbols: list, user_id: str):
             logger.warning(f"No Fyers token for user {user_id}, skipping price update")
             return
         
-        # Batch symbols into groups of 50 (Fyers API limit)
-        batch_size = 50
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i:i + batch_size]
-            
-            try:
-                response = await make_fyers_request(
-                    "quotes",
-                    method="GET",
-                    data={"symbols": ",".join(batch)},
-                    access_token=access_token
-                )
-                
-                # Process response and update watchlist prices
-                # This would integrate with WatchlistService.update_stock_prices()
-                logger.info(f"Updated prices for {len(batch)} symbols")
-                
-            except Exception as e:
-                logger.error(f"Failed to fetch prices for batch: {str(e)}")
-                
-            # Rate limiting - wait between batches
-            await asyncio.sleep(1)
-            
+        # The quote batcher splits into 50-symbol batches (Fyers API limit)
+        response = await fyers_manager.get_quotes(symbols, user_id)
+        
+        # Process response and update watchlist prices
+        # This would integrate with WatchlistService.update_stock_prices()
+        logger.info(f"Updated prices for {len(response.get('d', []))} symbols")
+        
     except Exception as e:
         logger.error(f"Background price fetch failed: {str(e)}")
 
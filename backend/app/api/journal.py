@@ -1,12 +1,23 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator
 from app.db.connection import get_engine, db_session
 from app.db.models import TradingJournal
+from app.services.journal_import import journal_importer
+from app.utils.pagination import EXPORT_MEDIA_TYPES, approximate_count, export_lines, keyset_page, stream_query
 
 router = APIRouter(prefix="/journal", tags=["journal"]) 
 
+JOURNAL_IMPORT_MAX_BYTES = int(os.getenv("JOURNAL_IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+JOURNAL_IMPORT_WRITE_BYTES = 1024 * 1024
+
 # Choose service backend dynamically
 USE_DB = get_engine() is not None
 if USE_DB:
@@ -43,11 +54,11 @@ def add_log(payload: JournalLogIn):
         if USE_DB:
             return journal.add_log(
                 user_id=payload.userId,
+                trade_id=uuid.uuid4().hex,
                 symbol=payload.symbol,
                 side=payload.side.value,  # Get string value from enum
-                qty=payload.qty,
-                price=payload.price,
-                gross_profit=payload.grossProfit,
+                entry_price=payload.price,
+                profit=payload.grossProfit,
                 stt=payload.stt,
                 gst=payload.gst,
                 stamp_duty=payload.stampDuty,
@@ -75,9 +86,24 @@ def summary(userId: int):
     return journal.summary(userId) if USE_DB else journal.JournalStore.summary(userId)
 
 
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Trade timestamps are stored as naive UTC; bring offset-aware query values in line"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 @router.get("/chart", response_model=Dict[str, Any])
-def chart(userId: int):
-    return journal.chart(userId) if USE_DB else journal.JournalStore.chart(userId)
+def chart(
+    userId: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    maxPoints: int = Query(500, ge=1, le=5000),
+):
+    start, end = _naive_utc(start), _naive_utc(end)
+    if USE_DB:
+        return journal.chart(userId, start=start, end=end, max_points=maxPoints)
+    return journal.JournalStore.chart(userId, start=start, end=end, max_points=maxPoints)
 
 
 # Global journal endpoints using TradingJournal (no user scoping)
@@ -117,6 +143,7 @@ def add_global_log(payload: GlobalJournalIn):
                 brokerage=payload.brokerage,
                 net_profit=payload.netProfit,
                 notes=payload.notes,
+                traded_at=datetime.utcnow(),
             )
             db.add(row)
             db.flush()
@@ -130,25 +157,94 @@ def add_global_log(payload: GlobalJournalIn):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+GLOBAL_EXPORT_FIELDS = ("id", "tradeId", "symbol", "side", "entryPrice", "exitPrice", "profit", "netProfit", "tradedAt")
+
+
+def _global_item(r: TradingJournal) -> Dict[str, Any]:
+    return {
+        "id": r.id,
+        "tradeId": r.trade_id,
+        "symbol": r.symbol,
+        "side": r.side,
+        "entryPrice": float(r.entry_price) if r.entry_price is not None else None,
+        "exitPrice": float(r.exit_price) if r.exit_price is not None else None,
+        "profit": float(r.profit) if r.profit is not None else None,
+        "netProfit": float(r.net_profit) if r.net_profit is not None else None,
+        "tradedAt": r.traded_at.isoformat() if r.traded_at else None,
+    }
+
+
 @router.get("/global", response_model=Dict[str, Any])
-def list_global_logs():
+def list_global_logs(
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    includeTotal: bool = False,
+):
+    """Newest first, one keyset page on (traded_at, id) at a time; pass nextCursor to continue"""
     try:
         with db_session() as db:
-            rows = db.query(TradingJournal).order_by(TradingJournal.traded_at.desc().nullslast()).all()
-            items = [
-                {
-                    "id": r.id,
-                    "tradeId": r.trade_id,
-                    "symbol": r.symbol,
-                    "side": r.side,
-                    "entryPrice": float(r.entry_price) if r.entry_price is not None else None,
-                    "exitPrice": float(r.exit_price) if r.exit_price is not None else None,
-                    "profit": float(r.profit) if r.profit is not None else None,
-                    "netProfit": float(r.net_profit) if r.net_profit is not None else None,
-                    "tradedAt": r.traded_at.isoformat() if r.traded_at else None,
-                }
-                for r in rows
-            ]
-            return {"items": items, "total": len(items)}
+            query = db.query(TradingJournal)
+            rows, next_cursor = keyset_page(query, TradingJournal.traded_at, TradingJournal.id, limit, cursor)
+            page = {"items": [_global_item(r) for r in rows], "nextCursor": next_cursor, "hasMore": next_cursor is not None}
+            if includeTotal:
+                page["total"] = approximate_count(query)
+            return page
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/global/export")
+def export_global_logs(format: str = Query("ndjson", regex="^(ndjson|csv)$")):
+    """Every global journal row as NDJSON or CSV, streamed from a server-side cursor"""
+    rows = stream_query(lambda db: db.query(TradingJournal).order_by(
+        TradingJournal.traded_at.desc().nullslast(), TradingJournal.id.desc()
+    ))
+    return StreamingResponse(
+        export_lines((_global_item(r) for r in rows), format, GLOBAL_EXPORT_FIELDS),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="journal.{format}"'},
+    )
+
+
+@router.post("/import", response_model=Dict[str, Any], status_code=202)
+async def import_tradebook(request: Request, userId: int = Query(..., ge=1), filename: Optional[str] = None):
+    """
+    Import a broker tradebook CSV sent as the request body (Content-Type: text/csv).
+
+    The body is spooled to a temporary file and imported in the background;
+    poll GET /journal/import/{jobId} for progress. Re-importing a tradebook
+    only adds trades whose trade id is not stored for the user yet.
+    """
+    if not USE_DB:
+        raise HTTPException(status_code=503, detail="Journal import needs the database")
+    fd, path = tempfile.mkstemp(prefix="tradebook-", suffix=".csv")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            # Disk writes go to a worker thread in ~1 MB blocks, off the event loop
+            pending = bytearray()
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > JOURNAL_IMPORT_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Tradebook is too large")
+                pending += chunk
+                if len(pending) >= JOURNAL_IMPORT_WRITE_BYTES:
+                    await asyncio.to_thread(out.write, bytes(pending))
+                    pending.clear()
+            if pending:
+                await asyncio.to_thread(out.write, bytes(pending))
+    except BaseException:
+        os.remove(path)
+        raise
+    if size == 0:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Empty tradebook")
+    return journal_importer.submit(path, userId, filename=filename).to_dict()
+
+
+@router.get("/import/{job_id}", response_model=Dict[str, Any])
+def import_status(job_id: str, userId: int = Query(..., ge=1)):
+    job = journal_importer.get(job_id)
+    if job is None or job.user_id != userId:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
@@ -1,26 +1,26 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-import httpx
-import os
 import asyncio
 import logging
 
+# Configuration lives with the gateway; OLLAMA_* names are re-exported for existing imports
+from ..services.ollama_gateway import DEFAULT_MODEL, OLLAMA_BASE_URL, OLLAMA_TIMEOUT, ollama_gateway
+from ..services.analysis_jobs import STOCK_ANALYST_SYSTEM, analysis_jobs, build_stock_prompt
+from ..services.push_hub import encode_event
+from ..services.watchlist_service import WatchlistService
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ollama", tags=["ollama"])
 
-# Configuration
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT_MS", "30000")) / 1000  # Convert to seconds
-DEFAULT_MODEL = os.getenv("OLLAMA_DEFAULT_MODEL", "llama2")
-
-
 class OllamaGenerateRequest(BaseModel):
     prompt: str
     model: Optional[str] = DEFAULT_MODEL
     system: Optional[str] = None
     context: Optional[Dict[str, Any]] = None
+    use_cache: bool = True
 
 
 class OllamaResponse(BaseModel):
@@ -51,28 +51,10 @@ class TradeRationaleRequest(BaseModel):
 
 
 async def check_ollama_health() -> bool:
-    """Check if Ollama server is running"""
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
-            return response.status_code == 200
-    except:
-        return False
-
-
-async def call_ollama_api(endpoint: str, data: dict) -> dict:
-    """Make a call to Ollama API"""
-    try:
-        async with httpx.AsyncClient(timeout=OLLAMA_TIMEOUT) as client:
-            response = await client.post(f"{OLLAMA_BASE_URL}/api/{endpoint}", json=data)
-            response.raise_for_status()
-            return response.json()
-    except httpx.TimeoutException:
-        raise HTTPException(status_code=408, detail="Ollama request timed out")
-    except httpx.RequestError:
-        raise HTTPException(status_code=503, detail="Ollama service unavailable")
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=e.response.status_code, detail=f"Ollama API error: {e.response.text}")
+    """Latest health state from the gateway's background probe"""
+    if ollama_gateway.healthy is None:
+        return await ollama_gateway.check_health()
+    return bool(ollama_gateway.healthy)
 
 
 @router.get("/health")
@@ -83,7 +65,8 @@ async def ollama_health_check():
         "success": is_healthy,
         "service": "ollama",
         "endpoint": OLLAMA_BASE_URL,
-        "status": "healthy" if is_healthy else "unavailable"
+        "status": "healthy" if is_healthy else "unavailable",
+        "gateway": ollama_gateway.stats()
     }
 
 
@@ -91,29 +74,13 @@ async def ollama_health_check():
 async def generate_text(request: OllamaGenerateRequest):
     """Generate text using Ollama"""
     try:
-        # Check if Ollama is available
-        if not await check_ollama_health():
-            raise HTTPException(status_code=503, detail="Ollama service is not available")
-        
-        ollama_data = {
-            "model": request.model,
-            "prompt": request.prompt,
-            "stream": False
-        }
-        
-        if request.system:
-            ollama_data["system"] = request.system
-        
-        response = await call_ollama_api("generate", ollama_data)
+        response = await ollama_gateway.generate(
+            request.prompt, model=request.model, system=request.system, use_cache=request.use_cache
+        )
         
         return {
             "success": True,
-            "data": {
-                "response": response.get("response", ""),
-                "model": response.get("model", request.model),
-                "created_at": response.get("created_at", ""),
-                "done": response.get("done", True)
-            }
+            "data": response
         }
     except HTTPException:
         raise
@@ -122,69 +89,66 @@ async def generate_text(request: OllamaGenerateRequest):
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+@router.post("/generate/stream")
+async def generate_text_stream(request: OllamaGenerateRequest):
+    """Stream generated tokens as Server-Sent Events: ``token`` frames, then ``done`` (or ``error``)"""
+    chunks = ollama_gateway.stream(
+        request.prompt, model=request.model, system=request.system, use_cache=request.use_cache
+    )
+    try:
+        # Fail before the response starts when Ollama is down or the queue is full
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    
+    async def event_source():
+        try:
+            chunk = first
+            while chunk is not None:
+                if chunk.get("done"):
+                    yield encode_event("done", {
+                        "response": chunk.get("response", "") if chunk.get("cached") else "",
+                        "model": chunk.get("model", request.model),
+                        "created_at": chunk.get("created_at", ""),
+                        "cached": bool(chunk.get("cached")),
+                    })
+                    break
+                yield encode_event("token", {"response": chunk.get("response", "")})
+                chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            pass
+        except HTTPException as e:
+            yield encode_event("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Ollama stream error: {str(e)}")
+            yield encode_event("error", {"status": 500, "detail": str(e)})
+        finally:
+            await chunks.aclose()
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/stock-analysis")
 async def analyze_stock(request: StockAnalysisRequest):
     """Generate stock analysis using Ollama"""
     try:
-        # Build context-aware prompt
-        if request.analysis_type == "summary":
-            prompt = f"""Provide a concise stock analysis summary for {request.symbol}.
-
-Current Information:
-- Symbol: {request.symbol}
-- Current Price: ₹{request.current_price} INR
-- Price Change: {request.price_change_percent}%
-- Volume: {request.volume:,} shares
-- Notes: {request.notes or 'No additional notes'}
-
-Please provide:
-1. Brief market sentiment analysis
-2. Key technical indicators observation
-3. Risk factors to consider
-4. Short-term outlook (1-2 sentences)
-
-Keep the response under 150 words and focus on actionable insights."""
-
-        elif request.analysis_type == "trade_rationale":
-            prompt = f"""Generate a trade rationale for {request.symbol}.
-
-Current Market Data:
-- Price: ₹{request.current_price} INR
-- Change: {request.price_change_percent}%
-- Volume: {request.volume:,}
-- Context: {request.notes or 'Standard market conditions'}
-
-Provide a structured analysis covering:
-1. Entry justification
-2. Risk assessment
-3. Potential targets
-4. Exit strategy
-
-Limit to 100 words, focus on practical trading insights."""
-
-        elif request.analysis_type == "risk_analysis":
-            prompt = f"""Analyze risks for {request.symbol} investment.
-
-Current Position:
-- Symbol: {request.symbol}
-- Price: ₹{request.current_price} INR
-- Recent Performance: {request.price_change_percent}%
-
-Identify:
-1. Market risks
-2. Sector-specific risks
-3. Technical risks
-4. Risk mitigation strategies
-
-Keep response concise (100 words max)."""
-
-        else:
-            prompt = f"Analyze {request.symbol} stock with current price ₹{request.current_price} INR."
+        prompt = build_stock_prompt(
+            request.symbol,
+            current_price=request.current_price,
+            price_change_percent=request.price_change_percent,
+            volume=request.volume,
+            notes=request.notes,
+            analysis_type=request.analysis_type
+        )
 
         ollama_request = OllamaGenerateRequest(
             prompt=prompt,
             model=DEFAULT_MODEL,
-            system="You are a professional stock analyst. Provide concise, actionable insights based on the given data. Use Indian stock market context and INR currency."
+            system=STOCK_ANALYST_SYSTEM
         )
         
         return await generate_text(ollama_request)
@@ -319,13 +283,8 @@ Keep response under 150 words, focus on actionable portfolio management insights
 async def list_available_models():
     """List available Ollama models"""
     try:
-        if not await check_ollama_health():
-            raise HTTPException(status_code=503, detail="Ollama service is not available")
-        
-        response = await call_ollama_api("tags", {})
-        
         models = []
-        for model in response.get("models", []):
+        for model in await ollama_gateway.list_models():
             models.append({
                 "name": model.get("name"),
                 "size": model.get("size"),
@@ -347,32 +306,88 @@ async def list_available_models():
         raise HTTPException(status_code=500, detail=f"Failed to retrieve models: {str(e)}")
 
 
-# Background task for async processing
-async def process_bulk_analysis(watchlist_id: str, user_id: str):
-    """Background task to process bulk stock analysis"""
-    try:
-        # This would integrate with WatchlistService to get stocks and generate analysis
-        # For now, just log the task
-        logger.info(f"Processing bulk analysis for watchlist {watchlist_id}, user {user_id}")
-        await asyncio.sleep(1)  # Simulate processing
-        logger.info(f"Completed bulk analysis for watchlist {watchlist_id}")
-    except Exception as e:
-        logger.error(f"Bulk analysis failed for watchlist {watchlist_id}: {str(e)}")
-
-
 @router.post("/bulk-analysis/{watchlist_id}")
-async def start_bulk_analysis(watchlist_id: str, background_tasks: BackgroundTasks, user_id: str = "demo"):
-    """Start bulk analysis for entire watchlist (async)"""
+async def start_bulk_analysis(watchlist_id: str, user_id: str = "demo", analysis_type: str = "summary"):
+    """Start bulk analysis for entire watchlist (async); follow it via the job endpoints"""
     try:
-        background_tasks.add_task(process_bulk_analysis, watchlist_id, user_id)
+        watchlist = await asyncio.to_thread(WatchlistService.get_watchlist_details, watchlist_id, user_id)
+        job = analysis_jobs.submit(
+            watchlist["stocks"], analysis_type=analysis_type, user_id=user_id, watchlist_id=watchlist_id
+        )
         
         return {
             "success": True,
             "message": "Bulk analysis started",
             "watchlist_id": watchlist_id,
-            "status": "processing"
+            "job_id": job.id,
+            "status": job.status,
+            "total": job.total
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Bulk analysis start error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to start bulk analysis: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to start bulk analysis: {str(e)}")
+
+
+@router.get("/bulk-analysis/jobs/{job_id}")
+async def get_bulk_analysis_job(job_id: str, user_id: str = "demo", include_results: bool = True):
+    """Status, progress and (optionally) results of one of the user's bulk analysis jobs"""
+    job = await analysis_jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return {
+        "success": True,
+        "data": job.to_dict(include_results=include_results)
+    }
+
+
+@router.get("/bulk-analysis/jobs/{job_id}/stream")
+async def stream_bulk_analysis_job(job_id: str, request: Request, user_id: str = "demo"):
+    """Server-Sent Events: results so far, then ``result``/``progress`` events as they arrive and a final ``done``"""
+    job = await analysis_jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    
+    async def event_source():
+        queue = job.listen()
+        try:
+            for result in list(job.results):
+                yield encode_event("result", result)
+            yield encode_event("progress", job.progress())
+            if job.done:
+                yield encode_event("done", job.progress())
+                return
+            if job.task is None:
+                # Read back from the database: not running in this process, so nothing more arrives here
+                return
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield encode_event(event, data)
+                if event == "done":
+                    break
+        finally:
+            job.unlisten(queue)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/bulk-analysis/jobs/{job_id}")
+async def cancel_bulk_analysis_job(job_id: str, user_id: str = "demo"):
+    """Cancel one of the user's running bulk analysis jobs"""
+    job = await analysis_jobs.cancel(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return {
+        "success": True,
+        "data": job.progress()
+    }
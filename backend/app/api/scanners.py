@@ -1,15 +1,82 @@
-from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi import APIRouter, Query, HTTPException
 from typing import List, Dict, Optional, Literal
 from datetime import datetime, timedelta
-import random
 import logging
-from sqlalchemy.orm import Session
-from app.models.response_models import TableData, TableResponse, MultiTableResponse
-from app.core.dependencies import get_db
+from app.models.response_models import TableData, MultiTableResponse
+from app.services.scanner_engine import FEATURES, SCANNERS, scanner_engine, table_row
 
 router = APIRouter(prefix="/scanners", tags=["Scanners"])
 logger = logging.getLogger(__name__)
 
+def scanner_response(matches: List[Dict], title: str, exchange: str, message: str) -> MultiTableResponse:
+    """Scanner result and sector summary tables for rows from the scanner engine"""
+    scanner_results = [table_row(match) for match in matches]
+    
+    # Define columns for the scanner results
+    scanner_columns = [
+        {"key": "Symbol", "label": "Symbol", "type": "text"},
+        {"key": "LTP", "label": "LTP", "type": "number", "format": ",.2f"},
+        {"key": "Change %", "label": "Change %", "type": "percentage", "format": ",.2f"},
+        {"key": "Volume", "label": "Volume", "type": "number", "format": ",.0f"},
+        {"key": "RSI(14)", "label": "RSI(14)", "type": "number", "format": ",.2f"},
+        {"key": "Sector", "label": "Sector", "type": "text"},
+        {"key": "52W High %", "label": "52W High %", "type": "percentage", "format": ",.2f"},
+        {"key": "52W Low %", "label": "52W Low %", "type": "percentage", "format": ",.2f"}
+    ]
+    
+    # Create tables for different scanner types
+    tables = {}
+    
+    # Main scanner results, already ranked by the scanner
+    tables["scanner_results"] = TableData(
+        columns=scanner_columns,
+        rows=scanner_results,
+        title=f"{title} Scanner Results",
+        description=f"{title} scanner results for {exchange} stocks"
+    )
+    
+    # Add sector-wise summary if we have enough data
+    if len(scanner_results) > 5:
+        sector_summary = {}
+        for result in scanner_results:
+            sector = result["Sector"]
+            if sector not in sector_summary:
+                sector_summary[sector] = {"stocks": 0, "avg_change": 0, "total_volume": 0}
+            sector_summary[sector]["stocks"] += 1
+            sector_summary[sector]["avg_change"] += result["Change %"] or 0
+            sector_summary[sector]["total_volume"] += result["Volume"] or 0
+        
+        # Calculate averages
+        all_volume = sum(s["total_volume"] for s in sector_summary.values()) or 1
+        sector_data = [{
+            "Sector": sector,
+            "Stocks": data["stocks"],
+            "Avg. Change %": (data["avg_change"] / data["stocks"]) if data["stocks"] > 0 else 0,
+            "Total Volume": data["total_volume"],
+            "Volume %": round((data["total_volume"] / all_volume) * 100, 2)
+        } for sector, data in sector_summary.items()]
+        
+        sector_columns = [
+            {"key": "Sector", "label": "Sector", "type": "text"},
+            {"key": "Stocks", "label": "# Stocks", "type": "number", "format": ",.0f"},
+            {"key": "Avg. Change %", "label": "Avg. Change %", "type": "percentage", "format": ",.2f"},
+            {"key": "Total Volume", "label": "Total Volume", "type": "number", "format": ",.0f"},
+            {"key": "Volume %", "label": "Volume %", "type": "percentage", "format": ",.2f"}
+        ]
+        
+        tables["sector_summary"] = TableData(
+            columns=sector_columns,
+            rows=sorted(sector_data, key=lambda x: x["Avg. Change %"], reverse=True),
+            title="Sector-wise Summary",
+            description="Performance summary by sector"
+        )
+    
+    return MultiTableResponse(
+        success=True,
+        message=message,
+        tables=tables
+    )
+
 def generate_scanner_data(
     scanner_type: str = "momentum",
     exchange: str = "NSE",
@@ -18,10 +85,11 @@ def generate_scanner_data(
     min_volume: int = 100000,
     min_rsi: float = 0.0,
     max_rsi: float = 100.0,
-    limit: int = 20
+    limit: int = 20,
+    **params: float
 ) -> MultiTableResponse:
     """
-    Generate scanner data based on specified criteria.
+    Run a scanner over the live feature columns of the whole universe.
     
     Args:
         scanner_type: Type of scanner ('momentum', 'volume', 'breakout', 'oversold', 'overbought')
@@ -32,119 +100,25 @@ def generate_scanner_data(
         min_rsi: Minimum RSI filter
         max_rsi: Maximum RSI filter
         limit: Maximum number of results to return
+        params: Scanner thresholds overriding the defaults in scanner_engine.SCANNERS
         
     Returns:
         MultiTableResponse with scanner results
     """
     try:
-        # Generate sample stocks
-        stocks = [
-            "RELIANCE", "TATAMOTORS", "INFY", "HDFCBANK", "ICICIBANK", 
-            "TATASTEEL", "BHARTIARTL", "LT", "HINDUNILVR", "ITC",
-            "KOTAKBANK", "ASIANPAINT", "TITAN", "BAJFINANCE", "HCLTECH",
-            "WIPRO", "TCS", "ULTRACEMCO", "SUNPHARMA", "NTPC"
-        ]
-        
-        # Generate sectors for scanning
-        sectors = ["BANK", "AUTO", "IT", "FMCG", "PHARMA", "METAL", "ENERGY", "REALTY"]
-        
-        # Generate scanner results based on type
-        scanner_results = []
-        
-        for i, stock in enumerate(stocks[:limit]):
-            price = round(random.uniform(min_price, max_price), 2)
-            change_pct = round(random.uniform(-10, 20), 2)
-            volume = random.randint(min_volume, min_volume * 10)
-            rsi = round(random.uniform(min_rsi, max_rsi), 2)
-            
-            # Adjust values based on scanner type
-            if scanner_type == "momentum" and i % 2 == 0:
-                change_pct = round(random.uniform(5, 20), 2)  # Higher positive change
-                rsi = round(random.uniform(60, 90), 2)  # Strong momentum
-            elif scanner_type == "oversold":
-                change_pct = round(random.uniform(-15, 0), 2)
-                rsi = round(random.uniform(10, 30), 2)  # Oversold
-            elif scanner_type == "overbought":
-                change_pct = round(random.uniform(0, 15), 2)
-                rsi = round(random.uniform(70, 90), 2)  # Overbought
-            elif scanner_type == "breakout" and i % 3 == 0:
-                volume = random.randint(min_volume * 2, min_volume * 20)  # High volume
-                change_pct = round(random.uniform(3, 15), 2)
-            
-            scanner_results.append({
-                "Symbol": stock,
-                "LTP": price,
-                "Change %": change_pct / 100,  # Convert to decimal for percentage
-                "Volume": volume,
-                "RSI(14)": rsi,
-                "Sector": sectors[i % len(sectors)],
-                "52W High %": round(random.uniform(-5, 20), 2),
-                "52W Low %": round(random.uniform(-20, 5), 2)
-            })
-        
-        # Define columns for the scanner results
-        scanner_columns = [
-            {"key": "Symbol", "label": "Symbol", "type": "text"},
-            {"key": "LTP", "label": "LTP", "type": "number", "format": ",.2f"},
-            {"key": "Change %", "label": "Change %", "type": "percentage", "format": ",.2f"},
-            {"key": "Volume", "label": "Volume", "type": "number", "format": ",.0f"},
-            {"key": "RSI(14)", "label": "RSI(14)", "type": "number", "format": ",.2f"},
-            {"key": "Sector", "label": "Sector", "type": "text"},
-            {"key": "52W High %", "label": "52W High %", "type": "percentage", "format": ",.2f"},
-            {"key": "52W Low %", "label": "52W Low %", "type": "percentage", "format": ",.2f"}
-        ]
-        
-        # Create tables for different scanner types
-        tables = {}
-        
-        # Main scanner results
-        tables["scanner_results"] = TableData(
-            columns=scanner_columns,
-            rows=sorted(scanner_results, key=lambda x: x["Change %"], reverse=True)[:limit],
-            title=f"{scanner_type.capitalize()} Scanner Results",
-            description=f"{scanner_type.capitalize()} scanner results for {exchange} stocks"
+        matches = scanner_engine.scan(
+            scanner_type,
+            min_price=min_price,
+            max_price=max_price,
+            min_volume=min_volume,
+            min_rsi=min_rsi,
+            max_rsi=max_rsi,
+            limit=limit,
+            **params
         )
         
-        # Add sector-wise summary if we have enough data
-        if len(scanner_results) > 5:
-            sector_summary = {}
-            for result in scanner_results:
-                sector = result["Sector"]
-                if sector not in sector_summary:
-                    sector_summary[sector] = {"stocks": 0, "avg_change": 0, "total_volume": 0}
-                sector_summary[sector]["stocks"] += 1
-                sector_summary[sector]["avg_change"] += result["Change %"]
-                sector_summary[sector]["total_volume"] += result["Volume"]
-            
-            # Calculate averages
-            sector_data = [{
-                "Sector": sector,
-                "Stocks": data["stocks"],
-                "Avg. Change %": (data["avg_change"] / data["stocks"]) if data["stocks"] > 0 else 0,
-                "Total Volume": data["total_volume"],
-                "Volume %": round((data["total_volume"] / sum(s["total_volume"] for s in sector_summary.values())) * 100, 2)
-            } for sector, data in sector_summary.items()]
-            
-            sector_columns = [
-                {"key": "Sector", "label": "Sector", "type": "text"},
-                {"key": "Stocks", "label": "# Stocks", "type": "number", "format": ",.0f"},
-                {"key": "Avg. Change %", "label": "Avg. Change %", "type": "percentage", "format": ",.2f"},
-                {"key": "Total Volume", "label": "Total Volume", "type": "number", "format": ",.0f"},
-                {"key": "Volume %", "label": "Volume %", "type": "percentage", "format": ",.2f"}
-            ]
-            
-            tables["sector_summary"] = TableData(
-                columns=sector_columns,
-                rows=sorted(sector_data, key=lambda x: x["Avg. Change %"], reverse=True),
-                title="Sector-wise Summary",
-                description="Performance summary by sector"
-            )
-        
-        return MultiTableResponse(
-            success=True,
-            message=f"Successfully retrieved {scanner_type} scanner results",
-            tables=tables
-        )
+        return scanner_response(matches, SCANNERS[scanner_type].title, exchange,
+                                f"Successfully retrieved {scanner_type} scanner results")
         
     except Exception as e:
         logger.error(f"Error in generate_scanner_data: {str(e)}", exc_info=True)
@@ -198,8 +172,7 @@ async def get_scanner_results(
         description="Maximum number of results to return",
         ge=1,
         le=100
-    ),
-    db: Session = Depends(get_db)
+    )
 ):
     """
     Run a market scanner with the specified criteria.
@@ -268,20 +241,17 @@ async def volume_spike_scanner(
     Identifies stocks with volume significantly higher than their average,
     which may indicate institutional activity or news events.
     """
-    # For demo, we'll adjust the min_volume based on the multiplier
-    min_volume = int(100000 * min_volume_multiplier)
-    
     return generate_scanner_data(
         scanner_type="volume",
         min_price=min_price,
-        min_volume=min_volume,
-        limit=limit
+        limit=limit,
+        volume_multiplier=min_volume_multiplier
     )
 
 @router.get("/breakouts", response_model=MultiTableResponse)
 async def breakout_scanner(
     min_volume: int = Query(200000, description="Minimum volume threshold"),
-    days_low_high: int = Query(20, description="Number of days for high/low calculation"),
+    days_low_high: int = Query(20, description="Number of days for high/low calculation (only 20 is supported)", ge=20, le=20),
     limit: int = Query(20, description="Maximum number of results to return")
 ):
     """
@@ -290,8 +260,6 @@ async def breakout_scanner(
     Identifies stocks breaking above resistance or below support levels
     with significant volume, indicating potential trend continuation.
     """
-    # In a real implementation, we would use the days_low_high parameter
-    # For the demo, we'll just use the standard scanner with volume focus
     return generate_scanner_data(
         scanner_type="breakout",
         min_volume=min_volume,
@@ -314,8 +282,8 @@ async def oversold_scanner(
         scanner_type="oversold",
         min_price=min_price,
         min_rsi=10.0,
-        max_rsi=max_rsi,
-        limit=limit
+        limit=limit,
+        rsi_below=max_rsi
     )
 
 @router.get("/overbought", response_model=MultiTableResponse)
@@ -333,7 +301,75 @@ async def overbought_scanner(
     return generate_scanner_data(
         scanner_type="overbought",
         min_price=min_price,
-        min_rsi=min_rsi,
         max_rsi=90.0,
-        limit=limit
+        limit=limit,
+        rsi_above=min_rsi
     )
+
+@router.get("/custom", response_model=MultiTableResponse)
+async def custom_scanner(
+    condition: str = Query(
+        ...,
+        description="Scan condition, e.g. 'rsi14 < 30 and volume > 2 * vol_avg20 and close > sma50'",
+        max_length=500
+    ),
+    rank_by: str = Query("change_pct", description="Field or expression to rank matches by", max_length=200),
+    order: str = Query("desc", description="Ranking order", regex="^(asc|desc)$"),
+    min_price: Optional[float] = Query(None, description="Minimum stock price"),
+    max_price: Optional[float] = Query(None, description="Maximum stock price"),
+    min_volume: Optional[int] = Query(None, description="Minimum volume threshold"),
+    group: Optional[str] = Query(None, description="Index, sector or segment to scan, e.g. NIFTY50"),
+    limit: int = Query(20, description="Maximum number of results to return", ge=1, le=100)
+):
+    """
+    Run a user-defined scan written in the scanner expression language.
+    
+    The condition may use any field listed by /scanners/fields, numbers,
+    + - * /, abs/min/max, comparisons and and/or/not.
+    """
+    try:
+        matches = scanner_engine.scan_expression(
+            condition,
+            rank_by=rank_by,
+            descending=order == "desc",
+            min_price=min_price,
+            max_price=max_price,
+            min_volume=min_volume,
+            group=group,
+            limit=limit
+        )
+    except ValueError as e:  # ScanExpressionError or an unknown group
+        raise HTTPException(status_code=400, detail=str(e))
+    return scanner_response(matches, "Custom", "NSE", f"Successfully ran custom scan: {condition}")
+
+@router.get("/fields")
+async def scanner_fields():
+    """Fields available to custom scan expressions and the built-in scanner definitions."""
+    return {
+        "fields": list(FEATURES),
+        "scanners": {
+            name: {"condition": spec.condition, "rankBy": spec.rank_by, "defaults": spec.defaults}
+            for name, spec in SCANNERS.items()
+        }
+    }
+
+@router.get("/events")
+async def scanner_events(
+    since: int = Query(0, description="Last event id already received; returns newer events", ge=0)
+):
+    """Recent enter/exit events of the watched scanners, oldest first (also streamed as scanner.{name})."""
+    events = scanner_engine.events_since(since)
+    return {
+        "success": True,
+        "data": events,
+        "lastId": events[-1]["id"] if events else since,
+        "watched": scanner_engine.watched()
+    }
+
+@router.get("/members/{name}")
+async def scanner_members(name: str):
+    """Symbols currently matching a watched scanner."""
+    try:
+        return {"success": True, "scanner": name, "data": scanner_engine.members(name)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
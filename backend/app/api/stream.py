@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import logging
+import time
+
+from app.services.push_hub import push_hub
+from app.services.snapshot_store import snapshot_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+HEARTBEAT_SECONDS = 15
+
+
+@router.get("")
+async def stream_topics(
+    request: Request,
+    topics: str = Query(..., description="Comma-separated topics, e.g. sector.heatmap,market_depth.gainers"),
+    mode: str = Query("full", description="full: every frame is the whole payload; diff: row deltas keyed by Symbol", regex="^(full|diff)$")
+):
+    """Server-Sent Events stream of live widget data for the requested topics"""
+    topic_list = [t.strip() for t in topics.split(",") if t.strip()]
+    if not topic_list:
+        raise HTTPException(status_code=400, detail="At least one topic is required")
+
+    try:
+        subscription = push_hub.subscribe(topic_list, mode=mode)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    async def event_source():
+        try:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(subscription.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    frame = b": ping\n\n"
+                yield frame
+        finally:
+            push_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/topics")
+async def list_topics():
+    """List registered topic patterns and the channels currently being streamed"""
+    return {
+        "success": True,
+        "data": {
+            "patterns": push_hub.patterns(),
+            "active": push_hub.stats(),
+        }
+    }
+
+
+@router.get("/snapshot/{topic}")
+async def topic_snapshot(
+    topic: str,
+    since_version: Optional[int] = Query(None, description="Version the client already holds; returns a diff when still available")
+):
+    """Polling counterpart of the stream: latest version of a topic, or a diff from since_version"""
+    resolved = push_hub.resolve(topic)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail=f"Unknown topic: {topic}")
+    producer, interval = resolved
+
+    latest = snapshot_store.latest(topic)
+    if latest is None or time.time() - latest.published_at >= interval:
+        data = await asyncio.to_thread(producer)
+        if latest is None or data != latest.payload:
+            snapshot_store.publish(topic, data)
+
+    return snapshot_store.diff(topic, since_version)
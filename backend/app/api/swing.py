@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Query, HTTPException
-from typing import Dict, Any, List
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
 import pandas as pd
 from datetime import datetime
 from app.services import swing_service
 from app.services.services.study_service import StudyService
 from app.services.param_normalizer import ParamNormalizer
 from app.config.global_params import ParamType
+from app.utils.pagination import EXPORT_MEDIA_TYPES
 from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/swing", tags=["swing"])
@@ -37,39 +39,61 @@ study_service = StudyService()
 @router.get("", response_model=PaginatedSwingResponse)
 async def list_swings(
     limit: int = Query(200, ge=1, le=500, description="Number of records per page"),
-    offset: int = Query(0, ge=0, description="Pagination offset")
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Include an approximate total")
 ) -> Dict[str, Any]:
     """
-    Get paginated list of all swing points.
+    Get list of all swing points, newest first, using cursor pagination.
     
     - **limit**: Number of records per page (1-500)
-    - **offset**: Number of records to skip for pagination
+    - **cursor**: `next_cursor` from the previous page; omit for the first page
+    - **include_total**: Add an approximate total (planner estimate on Postgres)
     """
-    return swing_service.get_swings(limit=limit, offset=offset)
+    return swing_service.get_swings(limit=limit, cursor=cursor, include_total=include_total)
+
+@router.get("/export")
+def export_swings(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$", description="ndjson or csv"),
+    symbol: Optional[str] = Query(None, description="Only swings of this symbol"),
+    start_date: datetime = Query(None, description="Filter by start date"),
+    end_date: datetime = Query(None, description="Filter by end date")
+) -> StreamingResponse:
+    """
+    Stream every matching swing point as NDJSON or CSV, newest first.
+    """
+    return StreamingResponse(
+        swing_service.export_swings(format, symbol=symbol, start_date=start_date, end_date=end_date),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="swings.{format}"'}
+    )
 
 @router.get("/{symbol}", response_model=PaginatedSwingResponse)
 async def swings_by_symbol(
     symbol: str,
     limit: int = Query(50, ge=1, le=500, description="Number of records per page"),
-    offset: int = Query(0, ge=0, description="Pagination offset"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     start_date: datetime = Query(None, description="Filter by start date"),
-    end_date: datetime = Query(None, description="Filter by end date")
+    end_date: datetime = Query(None, description="Filter by end date"),
+    include_total: bool = Query(False, description="Include an approximate total")
 ) -> Dict[str, Any]:
     """
-    Get swing points for a specific symbol with optional date filtering.
+    Get swing points for a specific symbol with optional date filtering,
+    newest first, using cursor pagination.
     
     - **symbol**: Stock symbol to filter by (case-insensitive)
     - **limit**: Number of records per page (1-500)
-    - **offset**: Number of records to skip for pagination
+    - **cursor**: `next_cursor` from the previous page; omit for the first page
     - **start_date**: Optional start date filter (inclusive)
     - **end_date**: Optional end date filter (inclusive)
+    - **include_total**: Add an approximate total (planner estimate on Postgres)
     """
     return swing_service.get_swings_by_symbol(
         symbol=symbol.upper(),
         limit=limit,
-        offset=offset,
+        cursor=cursor,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        include_total=include_total
     )
 
 @router.get("/summary", response_model=SwingSummaryResponse)
@@ -201,18 +201,12 @@ async def search_stocks(query: str = Query(..., min_length=2), limit: int = Quer
 async def update_stock_prices(ticker_prices: dict):
     """Internal endpoint to update stock prices (for background jobs)"""
     try:
-        updated_count = WatchlistService.update_stock_prices(ticker_prices)
-        
-        # Check for triggered alerts
-        triggered_alerts = []
-        for ticker, price in ticker_prices.items():
-            alerts = WatchlistService.check_price_alerts(ticker, price)
-            triggered_alerts.extend(alerts)
+        result = WatchlistService.apply_price_updates(ticker_prices)
         
         return {
             "success": True,
-            "updated_count": updated_count,
-            "triggered_alerts": triggered_alerts
+            "updated_count": result["updated_count"],
+            "triggered_alerts": result["triggered_alerts"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,75 @@
+"""
+Charge Schedule
+Versioned statutory and broker charges for NSE equity trades. Each version
+applies to trades on or after its effective date; earlier trades use the
+first version. Rates are fractions of turnover (price * quantity) unless
+noted. Add a new version instead of editing an old one, so re-imported
+history keeps the charges it was booked with.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ChargeRates:
+    stt_buy: float
+    stt_sell: float
+    exchange_txn: float  # NSE transaction charge
+    sebi_fee: float
+    stamp_duty_buy: float
+    brokerage_rate: float
+    brokerage_cap: float  # rupees per executed trade; 0 means no cap
+
+
+@dataclass(frozen=True)
+class ChargeScheduleVersion:
+    version: str
+    effective_from: date
+    # Keyed by product: "delivery" (CNC) or "intraday" (MIS)
+    rates: Dict[str, ChargeRates]
+    gst: float = 0.18  # on brokerage + exchange transaction charge + SEBI fee
+
+
+CHARGE_SCHEDULE: List[ChargeScheduleVersion] = [
+    ChargeScheduleVersion(
+        version="2023-04",
+        effective_from=date(2023, 4, 1),
+        rates={
+            "delivery": ChargeRates(stt_buy=0.001, stt_sell=0.001, exchange_txn=0.0000325, sebi_fee=0.000001,
+                                    stamp_duty_buy=0.00015, brokerage_rate=0.0, brokerage_cap=0.0),
+            "intraday": ChargeRates(stt_buy=0.0, stt_sell=0.00025, exchange_txn=0.0000325, sebi_fee=0.000001,
+                                    stamp_duty_buy=0.00003, brokerage_rate=0.0003, brokerage_cap=20.0),
+        },
+    ),
+    ChargeScheduleVersion(
+        version="2024-10",
+        effective_from=date(2024, 10, 1),
+        rates={
+            "delivery": ChargeRates(stt_buy=0.001, stt_sell=0.001, exchange_txn=0.0000297, sebi_fee=0.000001,
+                                    stamp_duty_buy=0.00015, brokerage_rate=0.0, brokerage_cap=0.0),
+            "intraday": ChargeRates(stt_buy=0.0, stt_sell=0.00025, exchange_txn=0.0000297, sebi_fee=0.000001,
+                                    stamp_duty_buy=0.00003, brokerage_rate=0.0003, brokerage_cap=20.0),
+        },
+    ),
+]
+
+PRODUCTS = ("delivery", "intraday")
+
+
+def schedule_index(trade_dates: np.ndarray) -> np.ndarray:
+    """Index into CHARGE_SCHEDULE of the version in force on each date (datetime64[D] array)"""
+    starts = np.array([v.effective_from for v in CHARGE_SCHEDULE], dtype="datetime64[D]")
+    return np.clip(np.searchsorted(starts, trade_dates, side="right") - 1, 0, None)
+
+
+def rate_table(field: str) -> np.ndarray:
+    """(versions x products) array of one rate, for fancy indexing by schedule and product index"""
+    return np.array([[getattr(v.rates[p], field) for p in PRODUCTS] for v in CHARGE_SCHEDULE])
+
+
+def gst_table() -> np.ndarray:
+    return np.array([v.gst for v in CHARGE_SCHEDULE])
@@ -0,0 +1,138 @@
+"""
+Symbol Universe
+Static definition of the tracked NSE symbols and their index, sector and
+segment memberships. Loaded once by the symbol registry; services should go
+through app.services.symbol_registry instead of keeping their own lists.
+"""
+
+# Sector indices used by the sectorial flow heatmaps
+SECTOR_CONSTITUENTS = {
+    "NIFTY50": [
+        "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
+        "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
+        "HCLTECH", "WIPRO", "ULTRACEMCO", "TITAN", "ADANIPORTS", "BAJAJFINSV", "DRREDDY",
+        "GRASIM", "HEROMOTOCO", "JSWSTEEL", "NTPC", "ONGC", "POWERGRID", "SUNPHARMA"
+    ],
+    "BANKNIFTY": [
+        "HDFCBANK", "ICICIBANK", "SBIN", "KOTAKBANK", "AXISBANK", "INDUSINDBK", "FEDERALBNK",
+        "BANKBARODA", "PNB", "IDFCFIRSTB", "AUBANK", "BANDHANBNK"
+    ],
+    "NIFTYAUTO": [
+        "MARUTI", "M&M", "TATAMOTORS", "BAJAJ-AUTO", "HEROMOTOCO", "TVSMOTORS", "EICHERMOT",
+        "MOTHERSUMI", "ASHOKLEY", "ESCORTS", "BALKRISIND", "APOLLOTYRE"
+    ],
+    "NIFTYFINSERVICE": [
+        "BAJFINANCE", "BAJAJFINSV", "HDFCLIFE", "SBILIFE", "ICICIGI", "ICICIPRULI", "HDFCAMC",
+        "LICHSGFIN", "MUTHOOTFIN", "PNBHOUSING", "M&MFIN", "CHOLAFIN"
+    ],
+    "NIFTYFMCG": [
+        "HINDUNILVR", "ITC", "NESTLEIND", "BRITANNIA", "DABUR", "MARICO", "GODREJCP", 
+        "COLPAL", "PGHH", "UBL", "TATACONSUM", "EMAMILTD"
+    ],
+    "CNXIT": [
+        "TCS", "INFY", "WIPRO", "HCLTECH", "TECHM", "LTI", "MINDTREE", "COFORGE", 
+        "MPHASIS", "LTTS", "PERSISTENT", "OFSS"
+    ],
+    "NIFTYMEDIA": [
+        "ZEEL", "SUNTV", "PVRINOX", "DISHTV", "NETWORK18", "JAGRAN", "SAREGAMA", "TIPS"
+    ],
+    "NIFTYMETAL": [
+        "TATASTEEL", "JSWSTEEL", "HINDALCO", "VEDL", "COALINDIA", "NMDC", "SAIL", 
+        "JINDALSTEL", "WELCORP", "MOIL", "RATNAMANI"
+    ],
+    "CNXPHARMA": [
+        "SUNPHARMA", "DRREDDY", "CIPLA", "DIVISLAB", "LUPIN", "BIOCON", "CADILAHC",
+        "TORNTPHARM", "AUROPHARMA", "GLENMARK", "IPCALAB", "NATCOPHAR"
+    ],
+    "NIFTYPSUBANK": [
+        "SBIN", "PNB", "BANKBARODA", "CANBK", "UNIONBANK", "INDIANB", "MAHABANK", "IOB"
+    ],
+    "NIFTYPVTBANK": [
+        "HDFCBANK", "ICICIBANK", "KOTAKBANK", "AXISBANK", "INDUSINDBK", "FEDERALBNK",
+        "RBLBANK", "SOUTHBANK", "DCBBANK", "KARURBANK"
+    ],
+    "CNXREALTY": [
+        "DLF", "GODREJPROP", "OBEROIRLTY", "PRESTIGE", "BRIGADE", "PHOENIXLTD", 
+        "SOBHA", "MAHLIFE", "KOLTEPATIL"
+    ],
+    "CNXENERGY": [
+        "RELIANCE", "ONGC", "BPCL", "IOC", "GAIL", "HINDPETRO", "OIL", "MGL", "IGL", "PETRONET"
+    ]
+}
+
+SECTOR_NAMES = {
+    "NIFTY50": "Nifty 50",
+    "BANKNIFTY": "Bank Nifty", 
+    "NIFTYAUTO": "Nifty Auto",
+    "NIFTYFINSERVICE": "Nifty Financial Services",
+    "NIFTYFMCG": "Nifty FMCG",
+    "CNXIT": "Nifty IT",
+    "NIFTYMEDIA": "Nifty Media",
+    "NIFTYMETAL": "Nifty Metal",
+    "CNXPHARMA": "Nifty Pharma",
+    "NIFTYPSUBANK": "Nifty PSU Bank",
+    "NIFTYPVTBANK": "Nifty Private Bank",
+    "CNXREALTY": "Nifty Realty",
+    "CNXENERGY": "Nifty Energy"
+}
+
+# Broad market indices used by the money flux heatmaps
+INDEX_CONSTITUENTS = {
+    "NIFTY50": [
+        "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
+        "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
+        "HCLTECH", "WIPRO", "ULTRACEMCO", "TITAN", "ADANIPORTS", "BAJAJFINSV", "DRREDDY",
+        "GRASIM", "HEROMOTOCO", "JSWSTEEL", "NTPC", "ONGC", "POWERGRID", "SUNPHARMA"
+    ],
+    "BANKNIFTY": [
+        "HDFCBANK", "ICICIBANK", "SBIN", "KOTAKBANK", "AXISBANK", "INDUSINDBK", "FEDERALBNK",
+        "BANKBARODA", "PNB", "IDFCFIRSTB", "AUBANK", "BANDHANBNK"
+    ],
+    "FINNIFTY": [
+        "BAJFINANCE", "BAJAJFINSV", "HDFCLIFE", "SBILIFE", "ICICIGI", "ICICIPRULI", "HDFCAMC",
+        "LICHSGFIN", "MUTHOOTFIN", "PNBHOUSING", "M&MFIN", "RECLTD", "CHOLAFIN", "PFC",
+        "MANAPPURAM", "SRTRANSFIN", "SHRIRAMFIN", "BAJAJHLDNG"
+    ],
+    "MIDCAP": [
+        "GODREJCP", "MCDOWELL-N", "PIDILITIND", "VOLTAS", "TORNTPHARM", "CONCOR", "LUPIN",
+        "GLENMARK", "CADILAHC", "IPCALAB", "FLUOROCHEM", "CUMMINSIND", "L&TFH", "MOTHERSUMI",
+        "ESCORTS", "ASHOKLEY", "BALKRISIND", "TVSMOTORS", "MARICO", "DABUR", "COLPAL"
+    ],
+    "SENSEX": [
+        "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
+        "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
+        "M&M", "SUNPHARMA", "NTPC", "POWERGRID", "ULTRACEMCO", "TITAN", "TATASTEEL", "TECHM"
+    ]
+}
+
+# Trading segments used by the scanners
+FNO_SYMBOLS = [
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
+    "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
+    "HCLTECH", "WIPRO", "ULTRACEMCO", "TITAN", "ADANIGREEN", "ADANITRANS", "APOLLOHOSP",
+    "BAJAJ-AUTO", "BRITANNIA", "DIVISLAB", "EICHERMOT", "GRASIM", "HINDALCO", "INDUSINDBK",
+    "JSWSTEEL", "M&M", "NTPC", "ONGC", "POWERGRID", "SHREECEM", "TATAMOTORS", "TATASTEEL",
+    "UPL", "VEDL",
+]
+
+N500_SYMBOLS = [
+    "ADANIPORTS", "BAJAJFINSV", "DRREDDY", "GRASIM", "HEROMOTOCO", "JSWSTEEL", "NTPC", "ONGC",
+    "POWERGRID", "SUNPHARMA", "TATAMOTORS", "TATASTEEL", "TECHM", "VEDL", "COALINDIA", "CIPLA",
+    "BPCL", "IOC", "GAIL", "HINDALCO", "ACC", "AMARAJABAT", "AMBUJACEM", "APOLLOTYRE",
+    "ASHOKLEY", "AUROPHARMA", "BAJAJHLDNG", "BALKRISIND", "BANDHANBNK", "BATAINDIA", "BEL",
+    "BERGEPAINT", "BIOCON", "BOSCHLTD", "CADILAHC", "CANBK", "CHOLAFIN", "COLPAL",
+]
+
+# Display name and sector label for symbols with known company details
+COMPANY_INFO = {
+    "RELIANCE": ("Reliance Industries Limited", "Energy"),
+    "TCS": ("Tata Consultancy Services Limited", "IT"),
+    "HDFCBANK": ("HDFC Bank Limited", "Banking"),
+    "INFY": ("Infosys Limited", "IT"),
+    "ICICIBANK": ("ICICI Bank Limited", "Banking"),
+    "HINDUNILVR": ("Hindustan Unilever Limited", "FMCG"),
+    "ITC": ("ITC Limited", "FMCG"),
+    "SBIN": ("State Bank of India", "Banking"),
+    "BHARTIARTL": ("Bharti Airtel Limited", "Telecom"),
+    "KOTAKBANK": ("Kotak Mahindra Bank Limited", "Banking"),
+}
@@ -27,3 +27,15 @@ CREATE INDEX IF NOT EXISTS idx_fno_option_chain_gin ON fno_data USING GIN ((opti
 
 -- Watchlist unique per symbol as per DDL
 CREATE UNIQUE INDEX IF NOT EXISTS ux_watchlist_symbol ON watchlist (symbol);
+
+-- Trading journal: per-user summary and chart read only this index
+ALTER TABLE trading_journal ADD COLUMN IF NOT EXISTS user_id INTEGER;
+CREATE INDEX IF NOT EXISTS idx_trading_journal_user_traded_at ON trading_journal (user_id, traded_at)
+    INCLUDE (net_profit, profit, stt, gst, stamp_duty, brokerage);
+
+-- Keyset pagination (newest first) for swing and global journal lists
+CREATE INDEX IF NOT EXISTS idx_swing_centre_detected_id ON swing_centre (detected_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trading_journal_traded_id ON trading_journal (traded_at DESC, id DESC);
+
+-- Tradebook imports are idempotent per user and broker trade id
+CREATE UNIQUE INDEX IF NOT EXISTS ux_trading_journal_user_trade ON trading_journal (user_id, trade_id);
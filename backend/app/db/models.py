@@ -150,6 +150,7 @@ class TradingJournal(Base):
     __tablename__ = "trading_journal"
 
     id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)  # indexed with traded_at in ddl_unique_indexes.sql
     trade_id = Column(Text, nullable=False, index=True)
     symbol = Column(Text, nullable=False, index=True)
     side = Column(Text)
@@ -240,7 +241,7 @@ class WatchlistItem(Base):
 class PriceHistory(Base):
     __tablename__ = "price_history"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
     ticker = Column(Text, nullable=False, index=True)
     exchange = Column(Text)
     price = Column(Numeric(18, 6), nullable=False)
@@ -258,3 +259,34 @@ class Alert(Base):
     is_active = Column(Boolean, default=True)
     last_triggered_at = Column(TIMESTAMP)
     created_at = Column(TIMESTAMP)
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(UUID, primary_key=True)
+    user_id = Column(Text, index=True)
+    watchlist_id = Column(Text, index=True)
+    analysis_type = Column(Text, nullable=False)
+    status = Column(Text, nullable=False)  # 'queued', 'running', 'completed', 'failed', 'cancelled'
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(TIMESTAMP)
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+
+
+class AnalysisResult(Base):
+    __tablename__ = "analysis_results"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    job_id = Column(UUID, ForeignKey("analysis_jobs.id", ondelete="CASCADE"), index=True)
+    symbol = Column(Text, nullable=False)
+    input_hash = Column(Text, nullable=False, index=True)  # content address of (model, system, prompt)
+    model = Column(Text)
+    response = Column(Text)
+    error = Column(Text)
+    cached = Column(Boolean, default=False)
+    created_at = Column(TIMESTAMP)
@@ -42,14 +42,23 @@ class ErrorResponse(BaseModel):
     error: str
     details: Optional[Dict[str, Any]] = None
 
+class TableData(BaseModel):
+    """One table of a multi-table response: column definitions plus rows."""
+    columns: List[Dict[str, Any]] = []
+    rows: List[Dict[str, Any]] = []
+    title: Optional[str] = None
+    description: Optional[str] = None
+
 # Generic response type for endpoints with multiple tables
 class MultiTableResponse(BaseModel):
     """Response format for endpoints returning multiple tables."""
-    status: Literal["success", "error"] = "success"
-    errors: Dict[str, str] = {}
+    success: bool = True
+    message: Optional[str] = None
+    tables: Dict[str, TableData] = {}
+    metadata: Optional[Dict[str, Any]] = None
     
-    def __getitem__(self, key: str) -> TableResponse:
-        return getattr(self, key)
+    def __getitem__(self, key: str) -> TableData:
+        return self.tables[key]
 
 # Example usage:
 # class MarketDepthResponse(MultiTableResponse):
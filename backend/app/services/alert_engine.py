@@ -0,0 +1,332 @@
+"""
+Alert Engine
+In-memory evaluation of active price alerts on every price update.
+
+Active alerts are grouped per ticker into two arrays sorted by threshold:
+``price_above`` (fires when price >= threshold) and ``price_below`` (fires
+when price <= threshold). Evaluating a price is then a bisection per ticker
+plus a walk over the alerts that actually fire, instead of a database query
+and a Python comparison per alert.
+
+The engine feeds the index from live ticks and price pushes and detects
+crossings: once a ticker has a price, every pending ``price_above`` alert
+sits above it and every pending ``price_below`` alert below it, so the
+alerts crossed by a move from the previous price to the current one are
+exactly one contiguous slice found in O(log n + k). Fired alerts are
+deactivated in the database asynchronously, in batches, or in the caller's
+transaction when a price push hands one in.
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import update
+
+from app.db.connection import db_session, get_engine
+from app.db.models import Alert, WatchlistItem
+
+logger = logging.getLogger(__name__)
+
+# Alerts can be created outside this process, so the index is reloaded periodically
+ALERT_INDEX_TTL_SECONDS = float(os.getenv("ALERT_INDEX_TTL_SECONDS", "60"))
+ALERT_FLUSH_INTERVAL = float(os.getenv("ALERT_FLUSH_INTERVAL", "0.5"))
+ALERT_FLUSH_BATCH_SIZE = int(os.getenv("ALERT_FLUSH_BATCH_SIZE", "500"))
+
+
+class _ThresholdBook:
+    """
+    Alerts of one direction for one ticker, sorted by threshold. Alerts are
+    one-shot, so the ones still pending always form a contiguous range
+    [lo, hi): ``price_above`` alerts fire from the low end and ``price_below``
+    alerts from the high end, and firing is a bisection plus a slice.
+    """
+
+    __slots__ = ("thresholds", "alerts", "lo", "hi")
+
+    def __init__(self, entries: List[Tuple[float, Dict[str, Any]]]):
+        entries.sort(key=lambda e: e[0])
+        self.thresholds = [t for t, _ in entries]
+        self.alerts = [a for _, a in entries]
+        self.lo = 0
+        self.hi = len(entries)
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    def fire_at_or_below(self, price: float) -> List[Dict[str, Any]]:
+        """Pending alerts with threshold <= price"""
+        end = bisect.bisect_right(self.thresholds, price, self.lo, self.hi)
+        fired = self.alerts[self.lo:end]
+        self.lo = end
+        return fired
+
+    def fire_at_or_above(self, price: float) -> List[Dict[str, Any]]:
+        """Pending alerts with threshold >= price"""
+        start = bisect.bisect_left(self.thresholds, price, self.lo, self.hi)
+        fired = self.alerts[start:self.hi]
+        self.hi = start
+        return fired
+
+
+class AlertIndex:
+    """Active alerts per ticker, in sorted threshold books for each direction"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._above: Dict[str, _ThresholdBook] = {}
+        self._below: Dict[str, _ThresholdBook] = {}
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._above.values()) + sum(len(b) for b in self._below.values())
+
+    def build(self, alerts: Iterable[Dict[str, Any]]) -> "AlertIndex":
+        """
+        Replace the index contents. Each alert is a dict with ``alert_id``,
+        ``ticker``, ``alert_type``, ``comparison`` and ``threshold``; alerts
+        whose type/comparison pair is not a price crossing are ignored.
+        """
+        above: Dict[str, List] = {}
+        below: Dict[str, List] = {}
+        for alert in alerts:
+            ticker = alert["ticker"].upper()
+            if alert["alert_type"] == "price_above" and alert["comparison"] == "gte":
+                above.setdefault(ticker, []).append((float(alert["threshold"]), alert))
+            elif alert["alert_type"] == "price_below" and alert["comparison"] == "lte":
+                below.setdefault(ticker, []).append((float(alert["threshold"]), alert))
+        with self._lock:
+            self._above = {t: _ThresholdBook(e) for t, e in above.items()}
+            self._below = {t: _ThresholdBook(e) for t, e in below.items()}
+        return self
+
+    def evaluate(self, prices: Dict[str, float]) -> List[Dict[str, Any]]:
+        """
+        Fire every active alert satisfied by the given prices. Fired alerts
+        are removed from the index (alerts are one-shot) and returned with the
+        triggering price; persisting them is up to the caller.
+        """
+        fired = []
+        with self._lock:
+            for ticker, price in prices.items():
+                ticker = ticker.upper()
+                price = float(price)
+                book = self._above.get(ticker)
+                if book is not None:
+                    fired.extend((a, price) for a in book.fire_at_or_below(price))
+                book = self._below.get(ticker)
+                if book is not None:
+                    fired.extend((a, price) for a in book.fire_at_or_above(price))
+        return [
+            {
+                "alert_id": alert["alert_id"],
+                "ticker": alert["ticker"],
+                "alert_type": alert["alert_type"],
+                "threshold": float(alert["threshold"]),
+                "current_price": price,
+            }
+            for alert, price in fired
+        ]
+
+
+def load_active_alerts() -> List[Dict[str, Any]]:
+    """Every active alert on an alert-enabled watchlist item"""
+    if get_engine() is None:
+        return []
+    with db_session() as db:
+        rows = db.query(
+            Alert.id, WatchlistItem.ticker, Alert.alert_type, Alert.comparison, Alert.threshold
+        ).join(WatchlistItem, Alert.watchlist_item_id == WatchlistItem.id).filter(
+            Alert.is_active == True,
+            WatchlistItem.alert_enabled == True
+        ).all()
+    return [
+        {"alert_id": str(r[0]), "ticker": r[1], "alert_type": r[2], "comparison": r[3], "threshold": r[4]}
+        for r in rows
+    ]
+
+
+def deactivate_fired_alerts(db, fired: List[Dict[str, Any]]) -> int:
+    """Deactivate fired alerts in ``db``'s transaction with one bulk UPDATE by primary key"""
+    if not fired:
+        return 0
+    db.execute(update(Alert), [
+        {"id": uuid.UUID(str(alert["alert_id"])), "is_active": False, "last_triggered_at": alert["triggered_at"]}
+        for alert in fired
+    ])
+    return len(fired)
+
+
+def persist_fired_alerts(fired: List[Dict[str, Any]]) -> int:
+    """Deactivate a batch of fired alerts in a transaction of its own"""
+    if get_engine() is None or not fired:
+        return 0
+    with db_session() as db:
+        return deactivate_fired_alerts(db, fired)
+
+
+class AlertEngine:
+    """
+    Evaluates alerts against every price update and queues fired alerts for
+    batched persistence. ``load`` and ``persist`` are injectable so the engine
+    can run without a database (tests, benchmarks).
+    """
+
+    def __init__(self, load=load_active_alerts, persist=persist_fired_alerts,
+                 reload_seconds: float = ALERT_INDEX_TTL_SECONDS,
+                 flush_interval: float = ALERT_FLUSH_INTERVAL, batch_size: int = ALERT_FLUSH_BATCH_SIZE):
+        self._load = load
+        self._persist = persist
+        self.reload_seconds = reload_seconds
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.index = AlertIndex()
+        self.last_prices: Dict[str, float] = {}
+        self._pending: deque = deque()
+        # Alerts fired since the current reload started; the database may still report them active
+        self._fired_ids: set = set()
+        # Alerts fired into a caller's transaction that has not committed or rolled back yet
+        self._in_transaction: set = set()
+        self._loaded_at: Optional[float] = None
+        self._stale = True
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+        self.persisted = 0
+        self.persist_errors = 0
+
+    def reload(self, alerts: Optional[Iterable[Dict[str, Any]]] = None) -> int:
+        """
+        Rebuild the index from the database (or the given alerts). Alerts
+        already satisfied by the last known price fire straight away, which
+        restores the invariant that crossings are contiguous slices.
+        """
+        self._stale = False
+        self._fired_ids = {a["alert_id"] for a in list(self._pending)} | set(self._in_transaction)
+        alerts = list(self._load() if alerts is None else alerts)
+        excluded = self._fired_ids
+        self.index.build(a for a in alerts if a["alert_id"] not in excluded)
+        self._loaded_at = time.monotonic()
+        if self.last_prices:
+            self._fire(dict(self.last_prices))
+        logger.info(f"Alert engine loaded {len(alerts)} active alerts")
+        return len(alerts)
+
+    def ensure_loaded(self) -> None:
+        """Load on first use, and on staleness when no background loop is running"""
+        if self._loaded_at is None or (self._stale and self._task is None):
+            self.reload()
+
+    def invalidate(self) -> None:
+        """Reload soon (alerts or watchlist items changed)"""
+        self._stale = True
+
+    def on_prices(self, prices: Dict[str, float], db=None) -> List[Dict[str, Any]]:
+        """
+        Fire the alerts crossed by these price updates and queue them for
+        persistence, or deactivate them in ``db`` so they commit or roll back
+        with the caller's transaction; the caller then passes them to settle().
+        """
+        if self._loaded_at is None:
+            return []
+        for ticker, price in prices.items():
+            self.last_prices[ticker.upper()] = float(price)
+        fired = self._fire(prices, queue=db is None)
+        if db is not None:
+            try:
+                deactivate_fired_alerts(db, fired)
+            except Exception:
+                # The transaction will not commit them, so the database keeps them active
+                self.settle(fired)
+                raise
+        return fired
+
+    def settle(self, fired: List[Dict[str, Any]]) -> None:
+        """
+        The transaction alerts were fired into has committed or rolled back.
+        Until then reloads keep them out of the index, since the database
+        still reports them active.
+        """
+        self._in_transaction.difference_update(alert["alert_id"] for alert in fired)
+
+    def on_ticks(self, symbols: Sequence[str], ltp: Sequence[float]) -> None:
+        """Tick ingestion listener: parallel symbol and price sequences"""
+        if self._loaded_at is not None:
+            self.on_prices(dict(zip(symbols, ltp)))
+
+    def _fire(self, prices: Dict[str, float], queue: bool = True) -> List[Dict[str, Any]]:
+        fired = self.index.evaluate(prices)
+        if fired:
+            triggered_at = datetime.utcnow()
+            for alert in fired:
+                alert["triggered_at"] = triggered_at
+                self._fired_ids.add(alert["alert_id"])
+            if queue:
+                self._pending.extend(fired)
+            else:
+                self._in_transaction.update(alert["alert_id"] for alert in fired)
+            self.fired += len(fired)
+        return fired
+
+    def flush(self) -> int:
+        """Persist queued fired alerts; on failure they are requeued for the next flush"""
+        persisted = 0
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+            try:
+                self._persist(batch)
+            except Exception as e:
+                self._pending.extendleft(reversed(batch))
+                self.persist_errors += 1
+                logger.error(f"Failed to persist {len(batch)} fired alerts: {str(e)}")
+                break
+            persisted += len(batch)
+        self.persisted += persisted
+        return persisted
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                if self._pending:
+                    await asyncio.to_thread(self.flush)
+                # Reload only once everything fired so far is persisted
+                due = self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_seconds
+                if (self._stale or due) and not self._pending:
+                    await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"Alert engine loop error: {str(e)}")
+
+    async def start(self) -> None:
+        if self._loaded_at is None:
+            await asyncio.to_thread(self.reload)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pending:
+            await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": len(self.index),
+            "tickers_priced": len(self.last_prices),
+            "fired": self.fired,
+            "persisted": self.persisted,
+            "pending": len(self._pending),
+            "persist_errors": self.persist_errors,
+            "loaded_seconds_ago": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+# Process-wide alert engine fed by tick ingestion and price pushes
+alert_engine = AlertEngine()
@@ -0,0 +1,384 @@
+"""
+Analysis Jobs
+Bulk LLM analysis of a watchlist as a tracked background job.
+
+A job fans out one prompt per stock through the Ollama gateway with bounded
+parallelism. Background generations only use the gateway's background slots,
+so interactive /ollama calls keep a free slot while a large job runs.
+Analyses whose inputs have not changed are reused (gateway cache in memory,
+``analysis_results`` by content hash in the database). Progress and results
+are persisted as they arrive and can be followed as a stream of events;
+jobs this process no longer holds are read back from the database.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.db.connection import db_session, get_engine
+from app.db.models import AnalysisJob, AnalysisResult
+from app.services.ollama_gateway import DEFAULT_MODEL, OllamaGateway, cache_key, ollama_gateway
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_JOB_CONCURRENCY = int(os.getenv("ANALYSIS_JOB_CONCURRENCY", "2"))
+ANALYSIS_JOBS_KEPT = int(os.getenv("ANALYSIS_JOBS_KEPT", "100"))
+ANALYSIS_PROGRESS_FLUSH_SECONDS = 1.0
+
+STOCK_ANALYST_SYSTEM = (
+    "You are a professional stock analyst. Provide concise, actionable insights based on the given data. "
+    "Use Indian stock market context and INR currency."
+)
+
+
+def build_stock_prompt(symbol: str, current_price: Optional[float] = None, price_change_percent: Optional[float] = None,
+                       volume: Optional[int] = None, notes: Optional[str] = None, analysis_type: str = "summary") -> str:
+    """Prompt for one stock; identical inputs give identical prompts, so analyses can be reused"""
+    volume_text = f"{volume:,}" if volume is not None else "N/A"
+    if analysis_type == "summary":
+        return f"""Provide a concise stock analysis summary for {symbol}.
+
+Current Information:
+- Symbol: {symbol}
+- Current Price: ₹{current_price} INR
+- Price Change: {price_change_percent}%
+- Volume: {volume_text} shares
+- Notes: {notes or 'No additional notes'}
+
+Please provide:
+1. Brief market sentiment analysis
+2. Key technical indicators observation
+3. Risk factors to consider
+4. Short-term outlook (1-2 sentences)
+
+Keep the response under 150 words and focus on actionable insights."""
+
+    if analysis_type == "trade_rationale":
+        return f"""Generate a trade rationale for {symbol}.
+
+Current Market Data:
+- Price: ₹{current_price} INR
+- Change: {price_change_percent}%
+- Volume: {volume_text}
+- Context: {notes or 'Standard market conditions'}
+
+Provide a structured analysis covering:
+1. Entry justification
+2. Risk assessment
+3. Potential targets
+4. Exit strategy
+
+Limit to 100 words, focus on practical trading insights."""
+
+    if analysis_type == "risk_analysis":
+        return f"""Analyze risks for {symbol} investment.
+
+Current Position:
+- Symbol: {symbol}
+- Price: ₹{current_price} INR
+- Recent Performance: {price_change_percent}%
+
+Identify:
+1. Market risks
+2. Sector-specific risks
+3. Technical risks
+4. Risk mitigation strategies
+
+Keep response concise (100 words max)."""
+
+    return f"Analyze {symbol} stock with current price ₹{current_price} INR."
+
+
+class Job:
+    """In-memory state of one bulk analysis job"""
+
+    def __init__(self, stocks: List[Dict[str, Any]], analysis_type: str, user_id: str,
+                 watchlist_id: Optional[str], model: str):
+        self.id = str(uuid.uuid4())
+        self.stocks = stocks
+        self.analysis_type = analysis_type
+        self.user_id = user_id
+        self.watchlist_id = watchlist_id
+        self.model = model
+        self.total = len(stocks)
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.results: List[Dict[str, Any]] = []
+        self.completed = 0
+        self.failed = 0
+        self.reused = 0
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        self._listeners: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    @classmethod
+    def from_record(cls, record: AnalysisJob, results: List[AnalysisResult]) -> "Job":
+        """A job rebuilt from its persisted row and result rows, for jobs this process no longer holds"""
+        job = cls([], record.analysis_type, record.user_id, record.watchlist_id,
+                  results[0].model if results else DEFAULT_MODEL)
+        job.id = str(record.id)
+        job.total = record.total
+        job.status = record.status
+        job.error = record.error
+        job.completed = record.completed
+        job.failed = record.failed
+        job.reused = sum(1 for r in results if r.cached)
+        job.created_at = record.created_at
+        job.started_at = record.started_at
+        job.finished_at = record.finished_at
+        job.results = [
+            {"symbol": r.symbol, "input_hash": r.input_hash, "response": r.response, "cached": bool(r.cached),
+             "error": r.error}
+            for r in results
+        ]
+        return job
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "reused": self.reused,
+            "percent": round((self.completed + self.failed) / self.total * 100, 1) if self.total else 100.0,
+            "error": self.error,
+        }
+
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        data = {
+            **self.progress(),
+            "watchlist_id": self.watchlist_id,
+            "analysis_type": self.analysis_type,
+            "model": self.model,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_results:
+            data["results"] = self.results
+        return data
+
+    def listen(self) -> asyncio.Queue:
+        """Events from now on; callers replay ``results`` for what came before"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.append(queue)
+        return queue
+
+    def unlisten(self, queue: asyncio.Queue) -> None:
+        if queue in self._listeners:
+            self._listeners.remove(queue)
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        for queue in self._listeners:
+            queue.put_nowait((event, data))
+
+
+class AnalysisJobEngine:
+    """Runs bulk analysis jobs on the gateway's background slots and tracks their progress"""
+
+    def __init__(self, gateway: OllamaGateway = ollama_gateway, concurrency: int = ANALYSIS_JOB_CONCURRENCY,
+                 jobs_kept: int = ANALYSIS_JOBS_KEPT):
+        self.gateway = gateway
+        self.concurrency = concurrency
+        self.jobs_kept = jobs_kept
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def submit(self, stocks: List[Dict[str, Any]], analysis_type: str = "summary", user_id: str = "demo",
+               watchlist_id: Optional[str] = None, model: str = DEFAULT_MODEL) -> Job:
+        """Create a job for the given stocks (dicts in watchlist item shape) and start it"""
+        job = Job(stocks, analysis_type, user_id, watchlist_id, model)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.jobs_kept:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.done:
+                break
+            del self._jobs[oldest_id]
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    async def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Job]:
+        """
+        A job by id: the live one if this process runs or still keeps it,
+        otherwise as persisted (after a restart or eviction). None when it is
+        unknown or, if ``user_id`` is given, belongs to another user.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = await asyncio.to_thread(_load_job, job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    async def cancel(self, job_id: str, user_id: Optional[str] = None) -> Optional[Job]:
+        job = await self.get(job_id, user_id)
+        if job is not None and job.task is not None and not job.done:
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs so their final state is persisted"""
+        for job in list(self._jobs.values()):
+            if not job.done:
+                await self.cancel(job.id)
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        await asyncio.to_thread(_persist_job, job)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        flusher = asyncio.create_task(self._flush_progress(job))
+
+        async def analyse(stock: Dict[str, Any]) -> None:
+            async with semaphore:
+                result = await self._analyse(job, stock)
+            job.results.append(result)
+            if result["error"]:
+                job.failed += 1
+            else:
+                job.completed += 1
+            job.emit("result", result)
+            job.emit("progress", job.progress())
+
+        try:
+            await asyncio.gather(*(analyse(stock) for stock in job.stocks))
+            job.status = "completed" if job.completed or not job.total else "failed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            flusher.cancel()
+            job.finished_at = datetime.utcnow()
+            await asyncio.to_thread(_persist_job, job)
+            job.emit("done", job.progress())
+            logger.info(f"Analysis job {job.id}: {job.completed}/{job.total} analysed, {job.reused} reused, {job.failed} failed")
+
+    async def _analyse(self, job: Job, stock: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = stock.get("symbol")
+        prompt = build_stock_prompt(
+            symbol,
+            current_price=stock.get("current_price"),
+            price_change_percent=stock.get("price_change_percent"),
+            volume=stock.get("volume"),
+            notes=stock.get("notes"),
+            analysis_type=job.analysis_type,
+        )
+        input_hash = cache_key(job.model, prompt, STOCK_ANALYST_SYSTEM)
+        result = {"symbol": symbol, "input_hash": input_hash, "response": None, "cached": False, "error": None}
+        try:
+            previous = await asyncio.to_thread(_find_result, input_hash)
+            if previous is not None:
+                result.update(response=previous, cached=True)
+            else:
+                generated = await self.gateway.generate(
+                    prompt, model=job.model, system=STOCK_ANALYST_SYSTEM, background=True
+                )
+                result.update(response=generated["response"], cached=generated["cached"])
+        except HTTPException as e:
+            result["error"] = e.detail
+        except Exception as e:
+            result["error"] = str(e)
+        if result["cached"]:
+            job.reused += 1
+        await asyncio.to_thread(_persist_result, job, result)
+        return result
+
+    async def _flush_progress(self, job: Job) -> None:
+        # Progress counters are written at most once per interval, not per result
+        persisted = None
+        while True:
+            await asyncio.sleep(ANALYSIS_PROGRESS_FLUSH_SECONDS)
+            state = (job.completed, job.failed)
+            if state != persisted:
+                await asyncio.to_thread(_persist_job, job)
+                persisted = state
+
+
+def _persist_job(job: Job) -> None:
+    if get_engine() is None:
+        return
+    try:
+        with db_session() as db:
+            db.merge(AnalysisJob(
+                id=uuid.UUID(job.id),
+                user_id=job.user_id,
+                watchlist_id=job.watchlist_id,
+                analysis_type=job.analysis_type,
+                status=job.status,
+                total=job.total,
+                completed=job.completed,
+                failed=job.failed,
+                error=job.error,
+                created_at=job.created_at,
+                started_at=job.started_at,
+                finished_at=job.finished_at,
+            ))
+    except Exception as e:
+        logger.error(f"Failed to persist analysis job {job.id}: {str(e)}")
+
+
+def _persist_result(job: Job, result: Dict[str, Any]) -> None:
+    if get_engine() is None:
+        return
+    try:
+        with db_session() as db:
+            db.add(AnalysisResult(
+                job_id=uuid.UUID(job.id),
+                symbol=result["symbol"],
+                input_hash=result["input_hash"],
+                model=job.model,
+                response=result["response"],
+                error=result["error"],
+                cached=result["cached"],
+                created_at=datetime.utcnow(),
+            ))
+    except Exception as e:
+        logger.error(f"Failed to persist analysis result for {result['symbol']}: {str(e)}")
+
+
+def _load_job(job_id: str) -> Optional[Job]:
+    if get_engine() is None:
+        return None
+    try:
+        key = uuid.UUID(job_id)
+    except ValueError:
+        return None
+    with db_session() as db:
+        record = db.get(AnalysisJob, key)
+        if record is None:
+            return None
+        results = db.query(AnalysisResult).filter(AnalysisResult.job_id == key).order_by(AnalysisResult.id).all()
+        return Job.from_record(record, results)
+
+
+def _find_result(input_hash: str) -> Optional[str]:
+    """Latest successful analysis with exactly these inputs, from any earlier job"""
+    if get_engine() is None:
+        return None
+    with db_session() as db:
+        row = db.query(AnalysisResult.response).filter(
+            AnalysisResult.input_hash == input_hash,
+            AnalysisResult.error.is_(None),
+            AnalysisResult.response.isnot(None)
+        ).order_by(AnalysisResult.created_at.desc()).first()
+        return row[0] if row else None
+
+
+# Process-wide job engine used by the /ollama bulk analysis endpoints
+analysis_jobs = AnalysisJobEngine()
@@ -7,41 +7,14 @@ from typing import Dict, List
 import random
 from datetime import datetime
 from app.services.param_normalizer import ParamNormalizer
+from app.services.symbol_registry import symbol_registry
 
 
 def get_enhanced_index_heatmap(index_name: str) -> Dict:
     """Generate enhanced heatmap data with constituent stocks for all supported indices"""
     
     # Index constituent mappings
-    index_constituents = {
-        "NIFTY50": [
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
-            "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
-            "HCLTECH", "WIPRO", "ULTRACEMCO", "TITAN", "ADANIPORTS", "BAJAJFINSV", "DRREDDY",
-            "GRASIM", "HEROMOTOCO", "JSWSTEEL", "NTPC", "ONGC", "POWERGRID", "SUNPHARMA"
-        ],
-        "BANKNIFTY": [
-            "HDFCBANK", "ICICIBANK", "SBIN", "KOTAKBANK", "AXISBANK", "INDUSINDBK", "FEDERALBNK",
-            "BANKBARODA", "PNB", "IDFCFIRSTB", "AUBANK", "BANDHANBNK"
-        ],
-        "FINNIFTY": [
-            "BAJFINANCE", "BAJAJFINSV", "HDFCLIFE", "SBILIFE", "ICICIGI", "ICICIPRULI", "HDFCAMC",
-            "LICHSGFIN", "MUTHOOTFIN", "PNBHOUSING", "M&MFIN", "RECLTD", "CHOLAFIN", "PFC",
-            "MANAPPURAM", "SRTRANSFIN", "SHRIRAMFIN", "BAJAJHLDNG"
-        ],
-        "MIDCAP": [
-            "GODREJCP", "MCDOWELL-N", "PIDILITIND", "VOLTAS", "TORNTPHARM", "CONCOR", "LUPIN",
-            "GLENMARK", "CADILAHC", "IPCALAB", "FLUOROCHEM", "CUMMINSIND", "L&TFH", "MOTHERSUMI",
-            "ESCORTS", "ASHOKLEY", "BALKRISIND", "TVSMOTORS", "MARICO", "DABUR", "COLPAL"
-        ],
-        "SENSEX": [
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
-            "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
-            "M&M", "SUNPHARMA", "NTPC", "POWERGRID", "ULTRACEMCO", "TITAN", "TATASTEEL", "TECHM"
-        ]
-    }
-    
-    constituents = index_constituents.get(index_name, ["SAMPLE1", "SAMPLE2", "SAMPLE3"])
+    constituents = symbol_registry.members(index_name) if symbol_registry.has_group(index_name) else ["SAMPLE1", "SAMPLE2", "SAMPLE3"]
     
     # Generate realistic stock data for each constituent
     raw_data = []
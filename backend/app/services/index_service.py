@@ -3,6 +3,7 @@ from sqlalchemy import text, desc
 from sqlalchemy.exc import SQLAlchemyError
 from app.db.connection import get_engine
 from app.utils.cache import cache
+from app.utils.concurrency import fan_out
 from datetime import datetime, timedelta
 import json
 
@@ -30,17 +31,22 @@ def get_index_expiry(name: str) -> Dict[str, Optional[str]]:
         return {"index": name, "expiryDate": None}
 
 
+_LATEST_ANALYSIS_COLUMNS = ("oi", "expiry_date", "pcr", "ce_contracts", "pe_contracts", "volume", "volume_change")
+
+
 @cache.cached(ttl_seconds=5)
-def get_index_oi(name: str) -> Dict:
+def _get_latest_analysis(name: str) -> Optional[Dict]:
+    """Latest index_analysis row shared by the OI, PCR, contracts and volume views"""
     engine = get_engine()
     if not engine:
-        return {"index": name, "oi": None, "expiryDate": None}
+        return None
     try:
         with engine.connect() as conn:
             row = conn.execute(
                 text(
                     """
-                    SELECT oi, expiry_date FROM index_analysis
+                    SELECT oi, expiry_date, pcr, ce_contracts, pe_contracts, volume, volume_change
+                    FROM index_analysis
                     WHERE index_name = :name
                     ORDER BY updated_at DESC
                     LIMIT 1
@@ -48,59 +54,53 @@ def get_index_oi(name: str) -> Dict:
                 ),
                 {"name": name},
             ).first()
-        oi = int(row[0]) if row and row[0] is not None else None
-        expiry = row[1].isoformat() if row and row[1] else None
-        return {"index": name, "oi": oi, "expiryDate": expiry}
+        return dict(zip(_LATEST_ANALYSIS_COLUMNS, row)) if row else None
     except SQLAlchemyError:
-        return {"index": name, "oi": None, "expiryDate": None}
+        return None
+
+
+def _format_oi(name: str, row: Optional[Dict]) -> Dict:
+    oi = int(row["oi"]) if row and row["oi"] is not None else None
+    expiry = row["expiry_date"].isoformat() if row and row["expiry_date"] else None
+    return {"index": name, "oi": oi, "expiryDate": expiry}
+
+
+def _format_pcr(name: str, row: Optional[Dict]) -> Dict:
+    return {"index": name, "pcr": float(row["pcr"]) if row and row["pcr"] is not None else None}
+
+
+def _format_contracts(name: str, row: Optional[Dict]) -> Dict:
+    ce = int(row["ce_contracts"]) if row and row["ce_contracts"] is not None else None
+    pe = int(row["pe_contracts"]) if row and row["pe_contracts"] is not None else None
+    return {"index": name, "ceContracts": ce, "peContracts": pe}
+
+
+def _format_volume_analysis(name: str, row: Optional[Dict], average_volume: Optional[int]) -> Dict:
+    current_volume = int(row["volume"]) if row and row["volume"] else None
+    volume_change = float(row["volume_change"]) if row and row["volume_change"] else None
+    volume_ratio = (current_volume / average_volume) if current_volume and average_volume else None
+    return {
+        "index": name,
+        "currentVolume": current_volume,
+        "averageVolume": average_volume,
+        "volumeChange": volume_change,
+        "volumeRatio": volume_ratio
+    }
+
+
+@cache.cached(ttl_seconds=5)
+def get_index_oi(name: str) -> Dict:
+    return _format_oi(name, _get_latest_analysis(name))
 
 
 @cache.cached(ttl_seconds=5)
 def get_index_pcr(name: str) -> Dict:
-    engine = get_engine()
-    if not engine:
-        return {"index": name, "pcr": None}
-    try:
-        with engine.connect() as conn:
-            row = conn.execute(
-                text(
-                    """
-                    SELECT pcr FROM index_analysis
-                    WHERE index_name = :name
-                    ORDER BY updated_at DESC
-                    LIMIT 1
-                    """
-                ),
-                {"name": name},
-            ).first()
-        return {"index": name, "pcr": float(row[0]) if row and row[0] is not None else None}
-    except SQLAlchemyError:
-        return {"index": name, "pcr": None}
+    return _format_pcr(name, _get_latest_analysis(name))
 
 
 @cache.cached(ttl_seconds=5)
 def get_index_contracts(name: str) -> Dict:
-    engine = get_engine()
-    if not engine:
-        return {"index": name, "ceContracts": None, "peContracts": None}
-    try:
-        with engine.connect() as conn:
-            row = conn.execute(
-                text(
-                    """
-                    SELECT ce_contracts, pe_contracts FROM index_analysis
-                    WHERE index_name = :name
-                    ORDER BY updated_at DESC
-                    LIMIT 1
-                    """
-                ),
-                {"name": name},
-            ).first()
-        ce = int(row[0]) if row and row[0] is not None else None
-        pe = int(row[1]) if row and row[1] is not None else None
-        return {"index": name, "ceContracts": ce, "peContracts": pe}
-    except SQLAlchemyError:
-        return {"index": name, "ceContracts": None, "peContracts": None}
+    return _format_contracts(name, _get_latest_analysis(name))
 
 
 @cache.cached(ttl_seconds=5)
@@ -166,35 +166,13 @@ def get_index_ohlc(name: str, timeframe: str = "1d", limit: int = 100) -> Dict:
         return {"index": name, "timeframe": timeframe, "data": []}
 
 
-@cache.cached(ttl_seconds=30)
-def get_index_volume_analysis(name: str) -> Dict:
-    """Get volume analysis for an index"""
+def _get_average_daily_volume(name: str) -> Optional[int]:
+    """Average daily volume over the last 20 days of OHLC data"""
     engine = get_engine()
     if not engine:
-        return {
-            "index": name,
-            "currentVolume": None,
-            "averageVolume": None,
-            "volumeChange": None,
-            "volumeRatio": None
-        }
-    
+        return None
     try:
         with engine.connect() as conn:
-            # Get current volume
-            current_row = conn.execute(
-                text(
-                    """
-                    SELECT volume, volume_change FROM index_analysis
-                    WHERE index_name = :name
-                    ORDER BY updated_at DESC
-                    LIMIT 1
-                    """
-                ),
-                {"name": name},
-            ).first()
-            
-            # Get average volume from OHLC data (last 20 days)
             avg_row = conn.execute(
                 text(
                     """
@@ -206,27 +184,19 @@ def get_index_volume_analysis(name: str) -> Dict:
                 ),
                 {"name": name, "start_date": datetime.now() - timedelta(days=20)},
             ).first()
-        
-        current_volume = int(current_row[0]) if current_row and current_row[0] else None
-        average_volume = int(avg_row[0]) if avg_row and avg_row[0] else None
-        volume_change = float(current_row[1]) if current_row and current_row[1] else None
-        volume_ratio = (current_volume / average_volume) if current_volume and average_volume else None
-        
-        return {
-            "index": name,
-            "currentVolume": current_volume,
-            "averageVolume": average_volume,
-            "volumeChange": volume_change,
-            "volumeRatio": volume_ratio
-        }
+        return int(avg_row[0]) if avg_row and avg_row[0] else None
     except SQLAlchemyError:
-        return {
-            "index": name,
-            "currentVolume": None,
-            "averageVolume": None,
-            "volumeChange": None,
-            "volumeRatio": None
-        }
+        return None
+
+
+@cache.cached(ttl_seconds=30)
+def get_index_volume_analysis(name: str) -> Dict:
+    """Get volume analysis for an index"""
+    results = fan_out({
+        "latest": lambda: _get_latest_analysis(name),
+        "averageVolume": lambda: _get_average_daily_volume(name),
+    })
+    return _format_volume_analysis(name, results["latest"], results["averageVolume"])
 
 
 @cache.cached(ttl_seconds=60)
@@ -289,14 +259,24 @@ def get_index_heatmap(name: str) -> Dict:
 
 @cache.cached(ttl_seconds=60)
 def get_comprehensive_analysis(name: str) -> Dict:
-    """Get comprehensive analysis for an index"""
-    # Combine all the analysis functions
-    basic_metrics = get_index_oi(name)
-    pcr = get_index_pcr(name)
-    contracts = get_index_contracts(name)
-    volume_analysis = get_index_volume_analysis(name)
-    recent_ohlc = get_index_ohlc(name, "1d", 10)
-    heatmap = get_index_heatmap(name)
+    """Get comprehensive analysis for an index
+
+    The shared index_analysis row is read once and the independent queries run
+    concurrently, so latency follows the slowest query instead of their sum.
+    """
+    results = fan_out({
+        "latest": lambda: _get_latest_analysis(name),
+        "averageVolume": lambda: _get_average_daily_volume(name),
+        "ohlc": lambda: get_index_ohlc(name, "1d", 10),
+        "heatmap": lambda: get_index_heatmap(name),
+    })
+    latest = results["latest"]
+    basic_metrics = _format_oi(name, latest)
+    pcr = _format_pcr(name, latest)
+    contracts = _format_contracts(name, latest)
+    volume_analysis = _format_volume_analysis(name, latest, results["averageVolume"])
+    recent_ohlc = results["ohlc"]
+    heatmap = results["heatmap"]
     
     # Extract top gainers and losers from constituents
     constituents = heatmap.get("constituents", [])
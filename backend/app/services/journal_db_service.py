@@ -1,12 +1,16 @@
 from __future__ import annotations
+import os
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 
 from app.db.connection import db_session
 from app.db.models import TradingJournal
 
+# Longest series chart() returns; longer histories are downsampled in SQL
+JOURNAL_CHART_MAX_POINTS = int(os.getenv("JOURNAL_CHART_MAX_POINTS", "500"))
+
 
 def add_log(
     trade_id: str,
@@ -21,9 +25,14 @@ def add_log(
     brokerage: float = 0.0,
     net_profit: float = None,
     notes: str = None,
+    user_id: Optional[int] = None,
+    traded_at: Optional[datetime] = None,
 ) -> Dict:
+    if net_profit is None:
+        net_profit = (profit or 0.0) - (stt + gst + stamp_duty + brokerage)
     with db_session() as db:
         row = TradingJournal(
+            user_id=user_id,
             trade_id=trade_id,
             symbol=symbol.upper(),
             side=side.upper(),
@@ -36,17 +45,27 @@ def add_log(
             brokerage=brokerage,
             net_profit=net_profit,
             notes=notes,
-            traded_at=datetime.utcnow(),
+            traded_at=traded_at or datetime.utcnow(),
         )
         db.add(row)
         db.flush()
         return _to_dict(row)
 
 
-def summary(user_id: int) -> Dict:
+def _user_rows(query, user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    # Served by idx_trading_journal_user_traded_at
+    query = query.filter(TradingJournal.user_id == user_id)
+    if start is not None:
+        query = query.filter(TradingJournal.traded_at >= start)
+    if end is not None:
+        query = query.filter(TradingJournal.traded_at <= end)
+    return query
+
+
+def summary(user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
     with db_session() as db:
         # Aggregate in DB for performance
-        totals = db.query(
+        totals = _user_rows(db.query(
             func.count(TradingJournal.id),
             func.coalesce(func.sum(TradingJournal.profit), 0),
             func.coalesce(func.sum(TradingJournal.stt), 0),
@@ -54,7 +73,7 @@ def summary(user_id: int) -> Dict:
             func.coalesce(func.sum(TradingJournal.stamp_duty), 0),
             func.coalesce(func.sum(TradingJournal.brokerage), 0),
             func.coalesce(func.sum(TradingJournal.net_profit), 0),
-        ).one()
+        ), user_id, start, end).one()
 
         total_trades, gross, stt, gst, stamp, brokerage, net_profit = totals
         return {
@@ -68,20 +87,45 @@ def summary(user_id: int) -> Dict:
         }
 
 
-def chart(user_id: int) -> Dict:
+def chart(
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = JOURNAL_CHART_MAX_POINTS,
+) -> Dict:
+    """
+    Cumulative net profit over time, computed in SQL with a window sum.
+
+    The series carries on from the user's total before ``start``. When there
+    are more than ``max_points`` trades, they are split into ``max_points``
+    equal buckets by position and the last point of each bucket is kept, so
+    the final value is always exact.
+    """
+    max_points = max(int(max_points), 1)
     with db_session() as db:
-        rows = (
-            db.query(TradingJournal)
-            .order_by(TradingJournal.traded_at.asc())
-            .all()
-        )
-        points = []
-        cum = 0.0
-        for r in rows:
-            net_profit = float(r.net_profit) if r.net_profit else 0.0
-            cum += net_profit
-            points.append({"ts": r.traded_at.isoformat() if r.traded_at else datetime.utcnow().isoformat(), "cumNet": round(cum, 2)})
-        return {"series": points}
+        opening = 0.0
+        if start is not None:
+            opening = float(_user_rows(
+                db.query(func.coalesce(func.sum(TradingJournal.net_profit), 0)), user_id
+            ).filter(TradingJournal.traded_at < start).scalar())
+
+        order = (TradingJournal.traded_at, TradingJournal.id)
+        ranked = _user_rows(db.query(
+            TradingJournal.traded_at.label("traded_at"),
+            func.sum(func.coalesce(TradingJournal.net_profit, 0)).over(order_by=order, rows=(None, 0)).label("cum_net"),
+            func.row_number().over(order_by=order).label("rn"),
+            func.count().over().label("n"),
+        ), user_id, start, end).filter(TradingJournal.traded_at.isnot(None)).subquery()
+
+        # Integer division: a row is kept when it is the last one of its bucket
+        rows = db.query(ranked.c.traded_at, ranked.c.cum_net).filter(
+            (ranked.c.rn * max_points) // ranked.c.n != ((ranked.c.rn - 1) * max_points) // ranked.c.n
+        ).order_by(ranked.c.rn).all()
+
+        return {"series": [
+            {"ts": traded_at.isoformat(), "cumNet": round(opening + float(cum_net), 2)}
+            for traded_at, cum_net in rows
+        ]}
 
 
 def _to_dict(r: TradingJournal) -> Dict:
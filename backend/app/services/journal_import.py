@@ -0,0 +1,393 @@
+"""
+Journal Import
+Bulk import of broker tradebook CSVs into trading_journal.
+
+The file is parsed in chunks with pandas into narrow typed columns. Charges
+come from the versioned schedule in app.config.charge_schedule and are
+computed for all rows at once with NumPy. Sells are matched to buys of the
+same symbol FIFO to derive gross profit. Rows are written in batches (COPY
+into a staging table on Postgres) and keyed by (user_id, trade_id), so
+importing the same tradebook again only adds trades that are not stored yet.
+"""
+
+import csv
+import io
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, text
+
+from app.config.charge_schedule import CHARGE_SCHEDULE, gst_table, rate_table, schedule_index
+from app.db.connection import db_session, get_engine
+from app.db.models import TradingJournal
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_IMPORT_CHUNK_ROWS = int(os.getenv("JOURNAL_IMPORT_CHUNK_ROWS", "50000"))
+JOURNAL_IMPORT_BATCH_ROWS = int(os.getenv("JOURNAL_IMPORT_BATCH_ROWS", "5000"))
+JOURNAL_IMPORT_WORKERS = int(os.getenv("JOURNAL_IMPORT_WORKERS", "1"))
+JOURNAL_IMPORTS_KEPT = 50
+
+# Tradebook header names seen across brokers, by the field they map to
+COLUMN_ALIASES = {
+    "symbol": ("symbol", "tradingsymbol", "scrip", "scrip_name"),
+    "side": ("trade_type", "side", "buy/sell", "transaction_type", "type"),
+    "qty": ("quantity", "qty", "traded_qty"),
+    "price": ("price", "trade_price", "rate", "average_price"),
+    "trade_id": ("trade_id", "tradeid", "trade_no", "trade_number"),
+    "traded_at": ("order_execution_time", "trade_time", "traded_at", "execution_time", "trade_date", "date"),
+    "product": ("product", "product_type"),
+}
+REQUIRED_COLUMNS = ("symbol", "side", "qty", "price", "trade_id", "traded_at")
+INTRADAY_PRODUCTS = ("MIS", "INTRADAY", "I")
+
+JOURNAL_COLUMNS = ("user_id", "trade_id", "symbol", "side", "entry_price", "exit_price", "profit", "stt", "gst",
+                   "stamp_duty", "brokerage", "net_profit", "traded_at", "notes")
+
+
+def _column_map(header: List[str]) -> Dict[str, str]:
+    normalised = {h.strip().lower().replace(" ", "_"): h for h in header}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalised:
+                mapping[normalised[alias]] = field
+                break
+    missing = [f for f in REQUIRED_COLUMNS if f not in mapping.values()]
+    if missing:
+        raise ValueError(f"Tradebook is missing columns: {', '.join(missing)}")
+    return mapping
+
+
+def read_tradebook(path: str, chunk_rows: int = JOURNAL_IMPORT_CHUNK_ROWS,
+                   on_chunk: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+    """
+    Parse a tradebook CSV chunk by chunk into typed columns.
+
+    Rows with an unknown side, a non-positive quantity or price, or an
+    unparseable time are dropped; ``on_chunk(read, rejected)`` is called after
+    each chunk. Duplicate trade ids keep their first row.
+    """
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    mapping = _column_map(header)
+    frames = []
+    for chunk in pd.read_csv(path, usecols=list(mapping), dtype=str, chunksize=chunk_rows):
+        chunk = chunk.rename(columns=mapping)
+        side = chunk["side"].str.strip().str.upper().str[0]
+        frame = pd.DataFrame({
+            "trade_id": chunk["trade_id"].str.strip(),
+            "symbol": chunk["symbol"].str.strip().str.upper(),
+            "is_buy": side == "B",
+            "qty": pd.to_numeric(chunk["qty"], errors="coerce"),
+            "price": pd.to_numeric(chunk["price"], errors="coerce"),
+            "traded_at": pd.to_datetime(chunk["traded_at"], errors="coerce"),
+            "intraday": (chunk["product"].str.strip().str.upper().isin(INTRADAY_PRODUCTS)
+                         if "product" in chunk else False),
+        })
+        valid = (side.isin(["B", "S"]) & (frame["qty"] > 0) & (frame["price"] > 0)
+                 & frame["traded_at"].notna() & frame["trade_id"].notna() & frame["symbol"].notna())
+        frames.append(frame[valid])
+        if on_chunk:
+            on_chunk(len(chunk), int((~valid).sum()))
+    if not frames:
+        raise ValueError("Tradebook has no rows")
+    trades = pd.concat(frames, ignore_index=True)
+    return trades.drop_duplicates("trade_id", keep="first").reset_index(drop=True)
+
+
+def compute_charges(trades: pd.DataFrame) -> pd.DataFrame:
+    """Add stt, stamp_duty, brokerage, gst and schedule columns from the charge schedule in force on each trade"""
+    turnover = (trades["qty"] * trades["price"]).to_numpy(dtype=float)
+    is_buy = trades["is_buy"].to_numpy(dtype=bool)
+    version = schedule_index(trades["traded_at"].to_numpy(dtype="datetime64[D]"))
+    product = trades["intraday"].to_numpy(dtype=bool).astype(int)
+
+    def rate(field: str) -> np.ndarray:
+        return rate_table(field)[version, product]
+
+    stt = turnover * np.where(is_buy, rate("stt_buy"), rate("stt_sell"))
+    stamp = np.where(is_buy, turnover * rate("stamp_duty_buy"), 0.0)
+    brokerage = turnover * rate("brokerage_rate")
+    cap = rate("brokerage_cap")
+    brokerage = np.where(cap > 0, np.minimum(brokerage, cap), brokerage)
+    turnover_fees = turnover * (rate("exchange_txn") + rate("sebi_fee"))
+    gst = (brokerage + turnover_fees) * gst_table()[version]
+
+    trades = trades.copy()
+    trades["stt"] = np.round(stt, 2)
+    trades["stamp_duty"] = np.round(stamp, 2)
+    # trading_journal has no column for exchange and SEBI turnover fees; they are booked with brokerage
+    trades["brokerage"] = np.round(brokerage + turnover_fees, 2)
+    trades["gst"] = np.round(gst, 2)
+    trades["schedule"] = np.array([v.version for v in CHARGE_SCHEDULE])[version]
+    return trades
+
+
+def match_fifo(trades: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add entry_price, exit_price, profit and unmatched_qty by matching each
+    symbol's sells to its buys in time order, first in first out.
+
+    Per symbol, the cost of the first q units bought is a piecewise linear
+    function of q (cumulative quantity -> cumulative cost), so the cost basis
+    of a sell covering units s0..s1 is cost(s1) - cost(s0). All symbols share
+    one np.interp call: each symbol's quantity axis is shifted into its own
+    disjoint range. A sell only matches units bought before it; quantity sold
+    beyond what had been bought by then has no cost basis, so it is reported
+    as unmatched and left out of profit.
+    """
+    code = pd.factorize(trades["symbol"], sort=True)[0]
+    order = np.lexsort((trades["traded_at"].to_numpy(dtype="datetime64[ns]"), code))
+    trades = trades.take(order).reset_index(drop=True)
+    code = code[order]
+    qty = trades["qty"].to_numpy(dtype=float)
+    price = trades["price"].to_numpy(dtype=float)
+    is_buy = trades["is_buy"].to_numpy(dtype=bool)
+
+    # Rows are grouped by symbol, so per-symbol running sums are global ones minus the group's opening value
+    starts = np.flatnonzero(np.r_[True, code[1:] != code[:-1]])
+    sizes = np.diff(np.r_[starts, len(trades)])
+
+    def running(values: np.ndarray) -> np.ndarray:
+        total = np.cumsum(values)
+        opening = np.r_[0.0, total][starts]
+        return total - np.repeat(opening, sizes)
+
+    bought = np.where(is_buy, qty, 0.0)
+    sold = qty - bought
+    cum_bought = running(bought)
+    cum_cost = running(bought * price)
+    cum_sold = running(sold)
+
+    stride = cum_bought.max() + 1.0 if len(trades) else 1.0
+    offset = code * stride
+    xs = np.r_[offset[starts], (offset + cum_bought)[is_buy]]
+    ys = np.r_[np.zeros(len(starts)), cum_cost[is_buy]]
+    order = np.argsort(xs, kind="stable")
+    xs, ys = xs[order], ys[order]
+
+    # Units matched so far can never exceed units bought so far: matched_k =
+    # min(matched_k-1 + sold_k, bought_k), which unrolls to sold_k plus the
+    # running minimum of (bought - sold), floored at zero for the empty prefix
+    shortfall = pd.Series(cum_bought - cum_sold).groupby(code).cummin().to_numpy()
+    hi = cum_sold + np.minimum(shortfall, 0.0)
+    lo = np.r_[0.0, hi[:-1]]
+    lo[starts] = 0.0
+    matched = np.where(is_buy, 0.0, hi - lo)
+    cost = np.interp(offset + hi, xs, ys) - np.interp(offset + lo, xs, ys)
+
+    profit = np.where(is_buy, 0.0, matched * price - cost)
+    unmatched = sold - matched
+    with np.errstate(invalid="ignore", divide="ignore"):
+        entry = np.where(is_buy, price, np.where(matched > 0, cost / matched, np.nan))
+    exit_ = np.where(is_buy, np.nan, price)
+
+    trades["entry_price"] = np.round(entry, 4)
+    trades["exit_price"] = exit_
+    trades["profit"] = np.round(profit, 2)
+    trades["unmatched_qty"] = unmatched
+    trades["net_profit"] = np.round(
+        profit - (trades["stt"] + trades["gst"] + trades["stamp_duty"] + trades["brokerage"]).to_numpy(), 2
+    )
+    return trades
+
+
+def _journal_rows(trades: pd.DataFrame, user_id: int) -> List[Dict[str, Any]]:
+    def values(column: str) -> List[Any]:
+        return [None if v != v else v for v in trades[column].tolist()]  # NaN -> NULL
+
+    columns = {
+        "user_id": [user_id] * len(trades),
+        "trade_id": trades["trade_id"].tolist(),
+        "symbol": trades["symbol"].tolist(),
+        "side": np.where(trades["is_buy"], "BUY", "SELL").tolist(),
+        "entry_price": values("entry_price"),
+        "exit_price": values("exit_price"),
+        "profit": trades["profit"].tolist(),
+        "stt": trades["stt"].tolist(),
+        "gst": trades["gst"].tolist(),
+        "stamp_duty": trades["stamp_duty"].tolist(),
+        "brokerage": trades["brokerage"].tolist(),
+        "net_profit": trades["net_profit"].tolist(),
+        "traded_at": list(trades["traded_at"].dt.to_pydatetime()),
+        "notes": ("charges " + trades["schedule"]).tolist(),
+    }
+    return [dict(zip(JOURNAL_COLUMNS, row)) for row in zip(*(columns[c] for c in JOURNAL_COLUMNS))]
+
+
+def _write_batch_copy(db, rows: List[Dict[str, Any]]) -> int:
+    """COPY into a staging table, then insert what is not stored yet"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[c] is None else row[c] for c in JOURNAL_COLUMNS])
+    buffer.seek(0)
+    columns = ", ".join(JOURNAL_COLUMNS)
+    db.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS journal_import_stage "
+        "(LIKE trading_journal INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    ))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY journal_import_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+    result = db.execute(text(
+        f"INSERT INTO trading_journal ({columns}) SELECT {columns} FROM journal_import_stage "
+        "ON CONFLICT (user_id, trade_id) DO NOTHING"
+    ))
+    return result.rowcount
+
+
+def _write_batch_insert(db, rows: List[Dict[str, Any]], user_id: int) -> int:
+    """Batched INSERT of the rows whose trade ids are not stored yet"""
+    stored = {
+        trade_id for (trade_id,) in db.query(TradingJournal.trade_id).filter(
+            TradingJournal.user_id == user_id,
+            TradingJournal.trade_id.in_([row["trade_id"] for row in rows])
+        )
+    }
+    fresh = [row for row in rows if row["trade_id"] not in stored]
+    if fresh:
+        # Core insert: every row has every column, so the whole batch is one executemany
+        db.execute(insert(TradingJournal.__table__), fresh)
+    return len(fresh)
+
+
+def write_trades(trades: pd.DataFrame, user_id: int, batch_rows: int = JOURNAL_IMPORT_BATCH_ROWS,
+                 on_batch: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """Write trades in batches, one transaction each; ``on_batch(written, inserted)`` reports progress"""
+    use_copy = get_engine().dialect.name == "postgresql"
+    inserted = 0
+    for start in range(0, len(trades), batch_rows):
+        rows = _journal_rows(trades.iloc[start:start + batch_rows], user_id)
+        with db_session() as db:
+            added = _write_batch_copy(db, rows) if use_copy else _write_batch_insert(db, rows, user_id)
+        inserted += added
+        if on_batch:
+            on_batch(len(rows), added)
+    return {"inserted": inserted, "skipped": len(trades) - inserted}
+
+
+class ImportJob:
+    """Progress of one tradebook import"""
+
+    def __init__(self, user_id: int, filename: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.filename = filename
+        self.status = "queued"
+        self.phase: Optional[str] = None
+        self.rows_read = 0
+        self.rows_rejected = 0
+        self.trades = 0
+        self.written = 0
+        self.inserted = 0
+        self.unmatched_sells = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "userId": self.user_id,
+            "filename": self.filename,
+            "status": self.status,
+            "phase": self.phase,
+            "rowsRead": self.rows_read,
+            "rowsRejected": self.rows_rejected,
+            "trades": self.trades,
+            "written": self.written,
+            "inserted": self.inserted,
+            "skipped": self.written - self.inserted,
+            "unmatchedSells": self.unmatched_sells,
+            "percent": round(self.written / self.trades * 100, 1) if self.trades else 0.0,
+            "error": self.error,
+            "createdAt": self.created_at.isoformat(),
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+def import_tradebook(path: str, user_id: int, job: Optional[ImportJob] = None) -> ImportJob:
+    """Parse, price, match and store one tradebook file, updating ``job`` as it goes"""
+    job = job or ImportJob(user_id)
+    job.status = "running"
+
+    def parsed(read: int, rejected: int) -> None:
+        job.rows_read += read
+        job.rows_rejected += rejected
+
+    def written(rows: int, added: int) -> None:
+        job.written += rows
+        job.inserted += added
+
+    try:
+        job.phase = "parsing"
+        trades = read_tradebook(path, on_chunk=parsed)
+        job.trades = len(trades)
+        job.phase = "matching"
+        trades = match_fifo(compute_charges(trades))
+        job.unmatched_sells = int((trades["unmatched_qty"] > 0).sum())
+        job.phase = "writing"
+        write_trades(trades, user_id, on_batch=written)
+        job.status = "completed"
+    except ValueError as e:
+        job.status, job.error = "failed", str(e)
+    except Exception as e:
+        logger.error(f"Journal import {job.id} failed: {str(e)}", exc_info=True)
+        job.status, job.error = "failed", str(e)
+    finally:
+        job.phase = None
+        job.finished_at = datetime.utcnow()
+    logger.info(f"Journal import {job.id}: {job.inserted} of {job.trades} trades inserted, "
+                f"{job.rows_rejected} rows rejected")
+    return job
+
+
+class JournalImporter:
+    """Runs imports on a small worker pool and keeps recent jobs for progress polling"""
+
+    def __init__(self, workers: int = JOURNAL_IMPORT_WORKERS, jobs_kept: int = JOURNAL_IMPORTS_KEPT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="journal-import")
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.jobs_kept = jobs_kept
+
+    def submit(self, path: str, user_id: int, filename: Optional[str] = None, remove_file: bool = True) -> ImportJob:
+        job = ImportJob(user_id, filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.jobs_kept:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.finished_at is None:
+                    break
+                del self._jobs[oldest_id]
+        self._executor.submit(self._run, path, job, remove_file)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get(job_id)
+
+    @staticmethod
+    def _run(path: str, job: ImportJob, remove_file: bool) -> None:
+        try:
+            import_tradebook(path, job.user_id, job)
+        finally:
+            if remove_file:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# Process-wide importer used by /journal/import
+journal_importer = JournalImporter()
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import bisect
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Dict, Optional
@@ -20,9 +22,70 @@ class TradeLog:
     brokerage: float = 0.0
 
 
+class _UserJournal:
+    """
+    One user's logs, kept sorted by ts, with running totals and a cumulative
+    net series maintained on every add. Logs normally arrive in time order
+    and are appended; a back-dated log is inserted and only the series after
+    it is rebuilt.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ts: List[datetime] = []
+        self.logs: List[TradeLog] = []
+        self.points: List[Dict] = []  # cumulative net series, parallel to logs
+        self.gross = 0.0
+        self.stt = 0.0
+        self.gst = 0.0
+        self.stamp = 0.0
+        self.brokerage = 0.0
+
+    def add(self, log: TradeLog) -> None:
+        self.gross += log.gross_profit
+        self.stt += log.stt
+        self.gst += log.gst
+        self.stamp += log.stamp_duty
+        self.brokerage += log.brokerage
+
+        if not self.ts or log.ts >= self.ts[-1]:
+            self.ts.append(log.ts)
+            self.logs.append(log)
+            cum = (self.points[-1]["_cum"] if self.points else 0.0) + _net(log)
+            self.points.append({"ts": log.ts.isoformat(), "cumNet": round(cum, 2), "_cum": cum})
+            return
+
+        pos = bisect.bisect_right(self.ts, log.ts)
+        self.ts.insert(pos, log.ts)
+        self.logs.insert(pos, log)
+        cum = self.points[pos - 1]["_cum"] if pos else 0.0
+        del self.points[pos:]
+        for l in self.logs[pos:]:
+            cum += _net(l)
+            self.points.append({"ts": l.ts.isoformat(), "cumNet": round(cum, 2), "_cum": cum})
+
+
+def _net(log: TradeLog) -> float:
+    return log.gross_profit - (log.stt + log.gst + log.stamp_duty + log.brokerage)
+
+
+# Read by summary/chart for users without logs, so reads never create a journal; never added to
+_NO_TRADES = _UserJournal()
+
+
 class JournalStore:
-    _logs: List[TradeLog] = []
+    _users: Dict[int, _UserJournal] = {}
     _next_id: int = 1
+    # Guards user creation and id assignment; each user's journal has its own lock for adds
+    _lock = threading.Lock()
+
+    @classmethod
+    def _journal(cls, user_id: int) -> _UserJournal:
+        journal = cls._users.get(user_id)
+        if journal is None:
+            with cls._lock:
+                journal = cls._users.setdefault(user_id, _UserJournal())
+        return journal
 
     @classmethod
     def add_log(
@@ -39,8 +102,11 @@ class JournalStore:
         brokerage: float = 0.0,
         ts: Optional[datetime] = None,
     ) -> Dict:
+        with cls._lock:
+            log_id = cls._next_id
+            cls._next_id += 1
         log = TradeLog(
-            id=cls._next_id,
+            id=log_id,
             user_id=user_id,
             ts=ts or datetime.utcnow(),
             symbol=symbol.upper(),
@@ -53,19 +119,18 @@ class JournalStore:
             stamp_duty=stamp_duty,
             brokerage=brokerage,
         )
-        cls._next_id += 1
-        cls._logs.append(log)
+        journal = cls._journal(user_id)
+        with journal.lock:
+            journal.add(log)
         return cls._to_dict(log)
 
     @classmethod
     def summary(cls, user_id: int) -> Dict:
-        logs = [l for l in cls._logs if l.user_id == user_id]
-        total_trades = len(logs)
-        gross = sum(l.gross_profit for l in logs)
-        stt = sum(l.stt for l in logs)
-        gst = sum(l.gst for l in logs)
-        stamp = sum(l.stamp_duty for l in logs)
-        brokerage = sum(l.brokerage for l in logs)
+        journal = cls._users.get(user_id, _NO_TRADES)
+        with journal.lock:
+            total_trades = len(journal.logs)
+            gross, stt, gst = journal.gross, journal.stt, journal.gst
+            stamp, brokerage = journal.stamp, journal.brokerage
         net = gross - (stt + gst + stamp + brokerage)
         return {
             "totalTrades": total_trades,
@@ -78,16 +143,25 @@ class JournalStore:
         }
 
     @classmethod
-    def chart(cls, user_id: int) -> Dict:
-        # simple cumulative net over time
-        logs = sorted([l for l in cls._logs if l.user_id == user_id], key=lambda x: x.ts)
-        points = []
-        cum = 0.0
-        for l in logs:
-            net = l.gross_profit - (l.stt + l.gst + l.stamp_duty + l.brokerage)
-            cum += net
-            points.append({"ts": l.ts.isoformat(), "cumNet": round(cum, 2)})
-        return {"series": points}
+    def chart(
+        cls,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        max_points: Optional[int] = None,
+    ) -> Dict:
+        # cumulative net over time, optionally limited to [start, end]; with max_points the
+        # series is downsampled like journal_db_service.chart (last point of each equal bucket)
+        journal = cls._users.get(user_id, _NO_TRADES)
+        with journal.lock:
+            lo = bisect.bisect_left(journal.ts, start) if start else 0
+            hi = bisect.bisect_right(journal.ts, end) if end else len(journal.ts)
+            points = journal.points[lo:hi]
+        n = len(points)
+        if max_points is not None and n > max_points:
+            m = max(int(max_points), 1)
+            points = [p for rn, p in enumerate(points, 1) if (rn * m) // n != ((rn - 1) * m) // n]
+        return {"series": [{"ts": p["ts"], "cumNet": p["cumNet"]} for p in points]}
 
     @staticmethod
     def _to_dict(l: TradeLog) -> Dict:
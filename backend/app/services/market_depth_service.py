@@ -6,6 +6,28 @@ from app.db.connection import get_engine
 from app.utils.cache import cache
 from app.utils.observability import observe
 from app.services.param_normalizer import ParamNormalizer
+from app.services.market_state import market_state
+
+
+def _live_movers(name: str, gainers: bool) -> Dict[str, List[Dict]]:
+    """Gainers/losers ranked straight from the live tick state"""
+    raw_data = []
+    for rank, r in enumerate(market_state.top_movers(200, gainers=gainers), start=1):
+        raw_data.append({
+            "Symbol": r["Symbol"],
+            "price": r["price"],
+            "prev_close": r["prev_close"],
+            "change": r["change"],
+            "volume": r["volume"] or 0,
+            "rank": rank,
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    normalized_data = ParamNormalizer.normalize(raw_data, module_name="market_depth")
+    return {
+        "data": normalized_data if isinstance(normalized_data, list) else [normalized_data],
+        "name": name,
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 @cache.cached(ttl_seconds=5)
@@ -223,6 +245,8 @@ def get_low_level() -> Dict[str, List[Dict]]:
 @cache.cached(ttl_seconds=5)
 @observe("MD.get_gainers")
 def get_gainers() -> Dict[str, List[Dict]]:
+    if market_state.is_live():
+        return _live_movers("Top Gainers", gainers=True)
     engine = get_engine()
     if not engine:
         return {
@@ -280,6 +304,8 @@ def get_gainers() -> Dict[str, List[Dict]]:
 @cache.cached(ttl_seconds=5)
 @observe("MD.get_losers")
 def get_losers() -> Dict[str, List[Dict]]:
+    if market_state.is_live():
+        return _live_movers("Top Losers", gainers=False)
     engine = get_engine()
     if not engine:
         return {
@@ -0,0 +1,160 @@
+"""
+Market State
+In-memory, array-backed view of the latest tick per symbol.
+
+Each field is a NumPy column indexed by a dense per-symbol slot (the symbol
+registry id for registered symbols), so applying a batch of ticks is a handful
+of fancy-index assignments and readers (heatmaps, market depth, watchlists,
+scanners) can work on whole columns at once.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.symbol_registry import symbol_registry
+
+MARKET_STATE_STALE_SECONDS = 10.0
+
+# Numeric columns kept per symbol
+FIELDS = ("ltp", "prev_close", "volume", "oi", "updated_at")
+
+
+class MarketState:
+    """Latest LTP, previous close, volume and open interest for every tracked symbol"""
+
+    def __init__(self, symbols: Iterable[str] = (), capacity: int = 512):
+        self._lock = threading.Lock()
+        self._slots: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self._capacity = 0
+        self.ltp = np.zeros(0)
+        self.prev_close = np.zeros(0)
+        self.volume = np.zeros(0)
+        self.oi = np.zeros(0)
+        self.updated_at = np.zeros(0)
+        self.version = 0
+        self.last_tick_at = 0.0
+        self._grow(capacity)
+        self.add_symbols(symbols)
+
+    def _grow(self, capacity: int) -> None:
+        for field in FIELDS:
+            column = np.full(capacity, np.nan) if field != "updated_at" else np.zeros(capacity)
+            column[:self._capacity] = getattr(self, field)[:self._capacity]
+            setattr(self, field, column)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._slots
+
+    def add_symbols(self, symbols: Iterable[str]) -> None:
+        with self._lock:
+            for symbol in symbols:
+                self._slot(symbol)
+
+    def _slot(self, symbol: str) -> int:
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot >= self._capacity:
+                self._grow(self._capacity * 2)
+            self._slots[symbol] = slot
+            self.symbols.append(symbol)
+        return slot
+
+    def slots(self, symbols: Sequence[str]) -> np.ndarray:
+        """Slot ids for symbols, adding unseen ones"""
+        with self._lock:
+            return np.fromiter((self._slot(s) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def apply(
+        self,
+        slots: np.ndarray,
+        ltp: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+        oi: Optional[np.ndarray] = None,
+        prev_close: Optional[np.ndarray] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Apply a batch of ticks given as parallel arrays. NaN entries in the
+        optional columns leave the stored value untouched; when a symbol occurs
+        more than once the last tick in the batch wins.
+        """
+        now = timestamp or time.time()
+        with self._lock:
+            self.ltp[slots] = ltp
+            for column, values in ((self.volume, volume), (self.oi, oi), (self.prev_close, prev_close)):
+                if values is not None:
+                    present = ~np.isnan(values)
+                    column[slots[present]] = values[present]
+            self.updated_at[slots] = now
+            self.version += 1
+            self.last_tick_at = now
+
+    def update(self, symbol: str, ltp: float, volume: float = np.nan, oi: float = np.nan,
+               prev_close: float = np.nan, timestamp: Optional[float] = None) -> None:
+        """Apply a single tick"""
+        self.apply(
+            self.slots([symbol]), np.array([ltp]), np.array([volume]), np.array([oi]),
+            np.array([prev_close]), timestamp,
+        )
+
+    def is_live(self, max_age: float = MARKET_STATE_STALE_SECONDS) -> bool:
+        """True when ticks have been applied within ``max_age`` seconds"""
+        return self.last_tick_at > 0 and time.time() - self.last_tick_at <= max_age
+
+    def change_percent(self) -> np.ndarray:
+        """Percent change from previous close for every slot (NaN when unknown)"""
+        n = len(self.symbols)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.ltp[:n] - self.prev_close[:n]) / self.prev_close[:n] * 100.0
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Latest values for one symbol, or None if it has not ticked yet"""
+        slot = self._slots.get(symbol)
+        if slot is None or np.isnan(self.ltp[slot]):
+            return None
+        return self._row(slot)
+
+    def _row(self, slot: int) -> Dict:
+        ltp = float(self.ltp[slot])
+        prev_close = float(self.prev_close[slot])
+        has_prev = not np.isnan(prev_close) and prev_close > 0
+        return {
+            "Symbol": self.symbols[slot],
+            "price": ltp,
+            "prev_close": prev_close if has_prev else None,
+            "change": round((ltp - prev_close) / prev_close * 100.0, 2) if has_prev else None,
+            "volume": int(self.volume[slot]) if not np.isnan(self.volume[slot]) else None,
+            "oi": int(self.oi[slot]) if not np.isnan(self.oi[slot]) else None,
+            "updated_at": float(self.updated_at[slot]),
+        }
+
+    def rows(self, symbols: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Rows for the given symbols (or all ticked symbols), skipping those without data"""
+        if symbols is None:
+            slots = np.flatnonzero(~np.isnan(self.ltp[:len(self.symbols)]))
+        else:
+            slots = [self._slots[s] for s in symbols if s in self._slots]
+        return [self._row(slot) for slot in slots if not np.isnan(self.ltp[slot])]
+
+    def top_movers(self, n: int = 20, gainers: bool = True) -> List[Dict]:
+        """Top ``n`` gainers (or losers) by percent change"""
+        change = self.change_percent()
+        valid = np.flatnonzero(~np.isnan(change))
+        if not len(valid):
+            return []
+        ranked = valid[np.argsort(-change[valid] if gainers else change[valid], kind="stable")]
+        ranked = ranked[change[ranked] > 0] if gainers else ranked[change[ranked] < 0]
+        return [self._row(slot) for slot in ranked[:n]]
+
+
+# Process-wide state fed by the tick ingestion service; slots match symbol registry ids
+market_state = MarketState(symbol_registry.symbols)
@@ -0,0 +1,351 @@
+"""
+Ollama Gateway
+Single entry point to the local Ollama server for every LLM endpoint.
+
+- one shared ``httpx.AsyncClient`` with keep-alive connections
+- health tracked by a background probe, so requests never pay for a check
+- a semaphore caps concurrent generations; excess requests queue (bounded)
+  instead of oversubscribing the local model. Background work (bulk
+  analysis) is confined to a subset of the slots, so interactive requests
+  always have one available
+- completions for identical (model, system, prompt) requests are served from
+  a content-addressed cache, and identical requests already in flight share
+  one generation
+- token streaming for Server-Sent Events
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT_MS", "30000")) / 1000  # Convert to seconds
+DEFAULT_MODEL = os.getenv("OLLAMA_DEFAULT_MODEL", "llama2")
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "32"))
+OLLAMA_QUEUE_TIMEOUT = float(os.getenv("OLLAMA_QUEUE_TIMEOUT", "60"))
+# Slots background requests may never occupy, kept free for interactive calls
+OLLAMA_INTERACTIVE_RESERVED = int(os.getenv("OLLAMA_INTERACTIVE_RESERVED", "1"))
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "10"))
+OLLAMA_CACHE_TTL = float(os.getenv("OLLAMA_CACHE_TTL", "900"))
+OLLAMA_CACHE_SIZE = int(os.getenv("OLLAMA_CACHE_SIZE", "512"))
+
+
+def cache_key(model: str, prompt: str, system: Optional[str] = None) -> str:
+    """Content address of a generation request"""
+    payload = json.dumps([model, system or "", prompt], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class OllamaGateway:
+    """Shared client, health state, concurrency limit and response cache for Ollama"""
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, timeout: float = OLLAMA_TIMEOUT,
+                 max_concurrency: int = OLLAMA_MAX_CONCURRENCY, max_queue: int = OLLAMA_MAX_QUEUE,
+                 queue_timeout: float = OLLAMA_QUEUE_TIMEOUT, health_interval: float = OLLAMA_HEALTH_INTERVAL,
+                 cache_ttl: float = OLLAMA_CACHE_TTL, cache_size: int = OLLAMA_CACHE_SIZE,
+                 interactive_reserved: int = OLLAMA_INTERACTIVE_RESERVED):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.health_interval = health_interval
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.background_concurrency = max(1, max_concurrency - interactive_reserved)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._background_semaphore: Optional[asyncio.Semaphore] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._probed: Optional[asyncio.Event] = None
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.healthy: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self.waiting = 0
+        self.running = 0
+        self.background_running = 0
+        self.requests = 0
+        self.cache_hits = 0
+        self.shared = 0
+        self.rejected = 0
+
+    # Lifecycle
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(max_connections=self.max_concurrency + 4, max_keepalive_connections=self.max_concurrency + 4),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Open the client and start the background health probe"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._background_semaphore = asyncio.Semaphore(self.background_concurrency)
+        if self._health_task is None or self._health_task.done():
+            self._probed = asyncio.Event()
+            self._health_task = asyncio.create_task(self._health_loop())
+        # Concurrent first requests all wait for the same initial probe
+        await self._probed.wait()
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def check_health(self) -> bool:
+        try:
+            response = await self.client.get("/api/tags", timeout=5.0)
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+        if healthy != self.healthy:
+            logger.info(f"Ollama at {self.base_url} is {'healthy' if healthy else 'unavailable'}")
+        self.healthy = healthy
+        self.checked_at = time.time()
+        return healthy
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_health()
+            self._probed.set()
+            await asyncio.sleep(self.health_interval)
+
+    async def _ready(self) -> None:
+        # Lazily started when the app lifespan did not start the gateway (scripts, tests)
+        if not self._probed or not self._probed.is_set():
+            await self.start()
+        if not self.healthy:
+            raise HTTPException(status_code=503, detail="Ollama service is not available")
+
+    # Concurrency
+
+    @asynccontextmanager
+    async def _slot(self, background: bool = False):
+        """
+        Hold one of the generation slots. Interactive requests queue (bounded)
+        when all are busy; background requests first take one of the
+        background slots and wait as long as needed, without counting
+        against the interactive queue.
+        """
+        if background:
+            async with self._background_semaphore:
+                await self._semaphore.acquire()
+                self.running += 1
+                self.background_running += 1
+                try:
+                    yield
+                finally:
+                    self.background_running -= 1
+                    self.running -= 1
+                    self._semaphore.release()
+            return
+
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Ollama is busy, try again shortly")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Timed out waiting for an Ollama slot")
+            finally:
+                self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    # Cache
+
+    def cached(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        self._cache[key] = (time.time(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # Requests
+
+    def _map_error(self, e: Exception) -> HTTPException:
+        if isinstance(e, httpx.TimeoutException):
+            return HTTPException(status_code=408, detail="Ollama request timed out")
+        if isinstance(e, httpx.HTTPStatusError):
+            return HTTPException(status_code=e.response.status_code, detail=f"Ollama API error: {e.response.text}")
+        # Connection-level failure: stop sending traffic until the probe sees it again
+        self.healthy = False
+        return HTTPException(status_code=503, detail="Ollama service unavailable")
+
+    async def _generate(self, payload: Dict[str, Any], background: bool = False) -> Dict[str, Any]:
+        async with self._slot(background):
+            try:
+                response = await self.client.post("/api/generate", json={**payload, "stream": False})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise self._map_error(e)
+            data = response.json()
+        return {
+            "response": data.get("response", ""),
+            "model": data.get("model", payload["model"]),
+            "created_at": data.get("created_at", ""),
+            "done": data.get("done", True),
+        }
+
+    async def generate(self, prompt: str, model: str = DEFAULT_MODEL, system: Optional[str] = None,
+                       use_cache: bool = True, background: bool = False) -> Dict[str, Any]:
+        """
+        Complete a prompt; identical requests are answered from cache or share
+        one generation. ``background`` requests use the background slots.
+        """
+        self.requests += 1
+        payload = {"model": model, "prompt": prompt}
+        if system:
+            payload["system"] = system
+        if not use_cache:
+            await self._ready()
+            return {**await self._generate(payload, background), "cached": False}
+
+        key = cache_key(model, prompt, system)
+        hit = self.cached(key)
+        if hit is not None:
+            self.cache_hits += 1
+            return {**hit, "cached": True}
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.shared += 1
+            return {**await asyncio.shield(pending), "cached": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await self._ready()
+            result = await self._generate(payload, background)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                e = HTTPException(status_code=503, detail="Ollama generation was cancelled")
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved so an unshared failure is not logged
+            future.exception()
+            raise
+        else:
+            self._store(key, result)
+            future.set_result(result)
+            return {**result, "cached": False}
+        finally:
+            self._inflight.pop(key, None)
+
+    async def stream(self, prompt: str, model: str = DEFAULT_MODEL, system: Optional[str] = None,
+                     use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield Ollama's streamed chunks (``{"response": token, "done": False}``
+        ... then a final ``done`` chunk). Cached completions come back as one
+        chunk; a completed stream is stored in the cache.
+        """
+        self.requests += 1
+        key = cache_key(model, prompt, system)
+        if use_cache:
+            hit = self.cached(key)
+            if hit is None and key in self._inflight:
+                self.shared += 1
+                hit = await asyncio.shield(self._inflight[key])
+            elif hit is not None:
+                self.cache_hits += 1
+            if hit is not None:
+                yield {**hit, "done": True, "cached": True}
+                return
+
+        await self._ready()
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if system:
+            payload["system"] = system
+        tokens: List[str] = []
+        async with self._slot():
+            try:
+                async with self.client.stream("POST", "/api/generate", json=payload) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        tokens.append(chunk.get("response", ""))
+                        # Store before yielding: consumers usually stop reading at the done chunk
+                        if chunk.get("done") and use_cache:
+                            self._store(key, {
+                                "response": "".join(tokens),
+                                "model": chunk.get("model", model),
+                                "created_at": chunk.get("created_at", ""),
+                                "done": True,
+                            })
+                        yield chunk
+                        if chunk.get("done"):
+                            break
+            except httpx.HTTPError as e:
+                raise self._map_error(e)
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        await self._ready()
+        try:
+            response = await self.client.get("/api/tags")
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise self._map_error(e)
+        return response.json().get("models", [])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.base_url,
+            "healthy": self.healthy,
+            "checked_at": self.checked_at,
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "background_running": self.background_running,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "shared_inflight": self.shared,
+            "rejected": self.rejected,
+            "cache_entries": len(self._cache),
+        }
+
+
+# Process-wide gateway used by the /ollama endpoints
+ollama_gateway = OllamaGateway()
@@ -0,0 +1,376 @@
+"""
+Online Indicators
+Streaming technical indicators with O(1) work per symbol per new bar.
+
+Each indicator keeps its state for many symbols in NumPy arrays (one row per
+symbol), so a bar for any subset of symbols is a handful of vector
+operations:
+
+    rsi = WilderRSI(14)
+    rsi.warm_up(close_history)          # (symbols x bars), oldest bar first
+    rsi.update(latest_close)            # one new bar for every symbol
+    rsi.update(prices, rows=slots)      # or for some symbols only
+    rsi.value                           # current RSI per symbol
+
+NaN inputs are "no bar": the symbol's state is left untouched, so histories
+of different lengths can be warmed up from one NaN-padded panel. Outputs are
+NaN until an indicator has seen enough bars. Rows within one update must be
+unique. The results match the usual batch definitions (pandas ``ewm`` with
+``adjust=False``, ``rolling`` windows, Wilder smoothing seeded with a simple
+mean).
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_NAN = np.nan
+
+
+def rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """RSI from Wilder average gain and loss (50 for a flat series, NaN while unseeded)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0),
+                        100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+
+class _Indicator(ABC):
+    """Per-symbol indicator state held in NumPy arrays, grown on demand"""
+
+    def __init__(self):
+        self.n = 0
+        self._fields: List[Tuple[str, float, type, int]] = []
+
+    def _field(self, name: str, fill: float = _NAN, dtype: type = np.float64, width: int = 0) -> None:
+        self._fields.append((name, fill, dtype, width))
+        setattr(self, name, np.full((0, width) if width else 0, fill, dtype=dtype))
+
+    def resize(self, n: int) -> None:
+        """Make room for ``n`` symbols; new symbols start empty"""
+        if n <= self.n:
+            return
+        for name, fill, dtype, width in self._fields:
+            grown = np.full((n, width) if width else n, fill, dtype=dtype)
+            grown[:self.n] = getattr(self, name)
+            setattr(self, name, grown)
+        self.n = n
+
+    def _select(self, rows: Optional[Sequence[int]], *inputs) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Rows and inputs of an update, without the rows that have a NaN input"""
+        inputs = [np.asarray(x, dtype=np.float64) for x in inputs]
+        rows = np.arange(len(inputs[0])) if rows is None else np.asarray(rows, dtype=np.int64)
+        if len(rows):
+            self.resize(int(rows.max()) + 1)
+        present = np.ones(len(rows), dtype=bool)
+        for x in inputs:
+            present &= ~np.isnan(x)
+        if not present.all():
+            rows = rows[present]
+            inputs = [x[present] for x in inputs]
+        return rows, inputs
+
+    def reset(self, rows: Optional[Sequence[int]] = None) -> None:
+        """Forget the state of ``rows`` (every symbol by default), as if no bar had been seen"""
+        rows = slice(None) if rows is None else np.asarray(rows, dtype=np.int64)
+        for name, fill, _, _ in self._fields:
+            getattr(self, name)[rows] = fill
+
+    @abstractmethod
+    def update(self, *inputs, rows: Optional[Sequence[int]] = None) -> None:
+        """Apply one new bar to ``rows`` (every symbol by default)"""
+
+    def warm_up(self, *panels: np.ndarray, rows: Optional[Sequence[int]] = None):
+        """
+        Feed (symbols x bars) history, oldest bar first, one bar at a time;
+        panel row i is symbol ``rows[i]`` (symbol i by default). Returns self.
+        """
+        panels = [np.asarray(p, dtype=np.float64) for p in panels]
+        self.resize(panels[0].shape[0] if rows is None else int(np.max(rows, initial=-1)) + 1)
+        for t in range(panels[0].shape[1]):
+            self.update(*(p[:, t] for p in panels), rows=rows)
+        return self
+
+
+class EMA(_Indicator):
+    """Exponential moving average, seeded with the first value (pandas ewm(span, adjust=False))"""
+
+    def __init__(self, period: int, n: int = 0):
+        super().__init__()
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._field("value")
+        self.resize(n)
+
+    def update(self, x, rows=None) -> None:
+        rows, (x,) = self._select(rows, x)
+        v = self.value[rows]
+        self.value[rows] = np.where(np.isnan(v), x, v + self.alpha * (x - v))
+
+
+class WilderRSI(_Indicator):
+    """Relative strength index with Wilder smoothing, seeded with the mean of the first ``period`` changes"""
+
+    def __init__(self, period: int = 14, n: int = 0):
+        super().__init__()
+        self.period = period
+        self._field("prev")
+        self._field("avg_gain")
+        self._field("avg_loss")
+        self._field("seed_gain", 0.0)
+        self._field("seed_loss", 0.0)
+        self._field("count", 0, np.int64)
+        self._field("value")
+        self.resize(n)
+
+    def update(self, close, rows=None) -> None:
+        rows, (x,) = self._select(rows, close)
+        prev = self.prev[rows]
+        self.prev[rows] = x
+        has_prev = ~np.isnan(prev)
+        rows, x, prev = rows[has_prev], x[has_prev], prev[has_prev]
+        change = x - prev
+        gain = np.maximum(change, 0.0)
+        loss = np.maximum(-change, 0.0)
+        p = self.period
+        count = self.count[rows] + 1
+        self.count[rows] = count
+
+        seed_gain = self.seed_gain[rows] + gain
+        seed_loss = self.seed_loss[rows] + loss
+        self.seed_gain[rows] = seed_gain
+        self.seed_loss[rows] = seed_loss
+        avg_gain = np.where(count == p, seed_gain / p, (self.avg_gain[rows] * (p - 1) + gain) / p)
+        avg_loss = np.where(count == p, seed_loss / p, (self.avg_loss[rows] * (p - 1) + loss) / p)
+        ready = count >= p
+        self.avg_gain[rows] = np.where(ready, avg_gain, _NAN)
+        self.avg_loss[rows] = np.where(ready, avg_loss, _NAN)
+        self.value[rows] = np.where(ready, rsi_from_averages(avg_gain, avg_loss), _NAN)
+
+
+class ATR(_Indicator):
+    """Average true range with Wilder smoothing, seeded with the mean of the first ``period`` true ranges"""
+
+    def __init__(self, period: int = 14, n: int = 0):
+        super().__init__()
+        self.period = period
+        self._field("prev_close")
+        self._field("seed", 0.0)
+        self._field("count", 0, np.int64)
+        self._field("value")
+        self.resize(n)
+
+    def update(self, high, low, close, rows=None) -> None:
+        rows, (high, low, close) = self._select(rows, high, low, close)
+        prev_close = self.prev_close[rows]
+        self.prev_close[rows] = close
+        # The first bar has no previous close, so its true range is its high-low range
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        p = self.period
+        count = self.count[rows] + 1
+        self.count[rows] = count
+        seed = self.seed[rows] + true_range
+        self.seed[rows] = seed
+        atr = np.where(count == p, seed / p, (self.value[rows] * (p - 1) + true_range) / p)
+        self.value[rows] = np.where(count >= p, atr, _NAN)
+
+
+class _RollingExtreme(_Indicator):
+    """
+    Rolling max or min over the last ``window`` bars with a monotonic deque
+    per symbol, stored as a ring of (value, bar index) in (symbols x window)
+    arrays. Each bar pushes one entry and pops each entry at most once, so
+    updates are amortised O(1). The value is NaN until ``min_periods`` bars
+    (the whole window by default) have been seen.
+    """
+
+    def __init__(self, window: int, n: int = 0, min_periods: Optional[int] = None):
+        super().__init__()
+        self.window = window
+        self.min_periods = min_periods or window
+        self._field("values", _NAN, np.float64, window)
+        self._field("bars", 0, np.int64, window)
+        self._field("head", 0, np.int64)
+        self._field("size", 0, np.int64)
+        self._field("count", 0, np.int64)
+        self._field("value")
+        self.resize(n)
+
+    @staticmethod
+    @abstractmethod
+    def _dominated(kept: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Which kept values can never be the extreme again once ``x`` arrives"""
+
+    def update(self, x, rows=None) -> None:
+        rows, (x,) = self._select(rows, x)
+        w = self.window
+        count = self.count[rows] + 1
+        self.count[rows] = count
+        head = self.head[rows]
+        size = self.size[rows]
+
+        # Drop the front entry once it has left the window
+        expired = (size > 0) & (self.bars[rows, head] <= count - w)
+        head = np.where(expired, (head + 1) % w, head)
+        size = size - expired
+
+        # Pop entries from the back that the new value dominates
+        active = np.arange(len(rows))
+        while len(active):
+            back = (head[active] + size[active] - 1) % w
+            pop = (size[active] > 0) & self._dominated(self.values[rows[active], back], x[active])
+            active = active[pop]
+            size[active] -= 1
+
+        tail = (head + size) % w
+        self.values[rows, tail] = x
+        self.bars[rows, tail] = count
+        size += 1
+        self.head[rows] = head
+        self.size[rows] = size
+        self.value[rows] = np.where(count >= self.min_periods, self.values[rows, head], _NAN)
+
+
+class RollingMax(_RollingExtreme):
+    """Highest value of the last ``window`` bars (pandas rolling(window, min_periods).max())"""
+
+    @staticmethod
+    def _dominated(kept, x):
+        return kept <= x
+
+
+class RollingMin(_RollingExtreme):
+    """Lowest value of the last ``window`` bars (pandas rolling(window, min_periods).min())"""
+
+    @staticmethod
+    def _dominated(kept, x):
+        return kept >= x
+
+
+class RollingStats(_Indicator):
+    """
+    Mean and standard deviation with Welford's update, over the last
+    ``window`` bars (a ring buffer supplies the value leaving the window) or,
+    with ``window=None``, over every bar seen.
+    """
+
+    def __init__(self, window: Optional[int] = None, n: int = 0):
+        super().__init__()
+        self.window = window
+        self._field("count", 0, np.int64)
+        self._field("avg", 0.0)
+        self._field("m2", 0.0)
+        if window:
+            self._field("ring", _NAN, np.float64, window)
+            self._field("pos", 0, np.int64)
+        self.resize(n)
+
+    def update(self, x, rows=None) -> None:
+        rows, (x,) = self._select(rows, x)
+        count = self.count[rows]
+        avg = self.avg[rows]
+        m2 = self.m2[rows]
+
+        added = count + 1
+        delta = x - avg
+        avg_add = avg + delta / added
+        m2_add = m2 + delta * (x - avg_add)
+        if self.window:
+            w = self.window
+            pos = self.pos[rows]
+            full = count >= w
+            old = self.ring[rows, pos]
+            # Replace the oldest value: the window size stays at w
+            swap = x - old
+            avg_swap = avg + swap / w
+            m2_swap = m2 + swap * (x - avg_swap + old - avg)
+            avg = np.where(full, avg_swap, avg_add)
+            m2 = np.where(full, m2_swap, m2_add)
+            count = np.where(full, count, added)
+            self.ring[rows, pos] = x
+            self.pos[rows] = (pos + 1) % w
+        else:
+            avg, m2, count = avg_add, m2_add, added
+        self.count[rows] = count
+        self.avg[rows] = avg
+        self.m2[rows] = np.maximum(m2, 0.0)
+
+    def _ready(self) -> np.ndarray:
+        return self.count >= (self.window or 1)
+
+    def mean(self) -> np.ndarray:
+        return np.where(self._ready(), self.avg, _NAN)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self._ready() & (self.count > ddof), np.sqrt(self.m2 / (self.count - ddof)), _NAN)
+
+
+class MACD(_Indicator):
+    """MACD line (fast EMA - slow EMA), its signal EMA and the histogram"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9, n: int = 0):
+        super().__init__()
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal_ema = EMA(signal)
+        self._field("macd")
+        self.resize(n)
+
+    def resize(self, n: int) -> None:
+        super().resize(n)
+        for ema in (self.fast, self.slow, self.signal_ema):
+            ema.resize(n)
+
+    def reset(self, rows=None) -> None:
+        super().reset(rows)
+        for ema in (self.fast, self.slow, self.signal_ema):
+            ema.reset(rows)
+
+    def update(self, close, rows=None) -> None:
+        rows, (x,) = self._select(rows, close)
+        self.fast.update(x, rows)
+        self.slow.update(x, rows)
+        self.macd[rows] = self.fast.value[rows] - self.slow.value[rows]
+        self.signal_ema.update(self.macd[rows], rows)
+
+    @property
+    def signal(self) -> np.ndarray:
+        return self.signal_ema.value
+
+    @property
+    def histogram(self) -> np.ndarray:
+        return self.macd - self.signal_ema.value
+
+
+class Bollinger(_Indicator):
+    """Bollinger bands: rolling mean +/- ``k`` population standard deviations"""
+
+    def __init__(self, window: int = 20, k: float = 2.0, n: int = 0):
+        super().__init__()
+        self.k = k
+        self.stats = RollingStats(window)
+        self.resize(n)
+
+    def resize(self, n: int) -> None:
+        super().resize(n)
+        self.stats.resize(n)
+
+    def reset(self, rows=None) -> None:
+        self.stats.reset(rows)
+
+    def update(self, close, rows=None) -> None:
+        self.stats.update(close, rows)
+        self.n = self.stats.n
+
+    @property
+    def middle(self) -> np.ndarray:
+        return self.stats.mean()
+
+    @property
+    def upper(self) -> np.ndarray:
+        return self.stats.mean() + self.k * self.stats.std(ddof=0)
+
+    @property
+    def lower(self) -> np.ndarray:
+        return self.stats.mean() - self.k * self.stats.std(ddof=0)
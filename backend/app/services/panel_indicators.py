@@ -0,0 +1,176 @@
+"""
+Panel Indicators
+Technical indicator kernels over (symbols x bars) float arrays.
+
+Every kernel works along axis=1 for all symbols at once and returns a full
+(symbols x bars) result, so a study over 500 symbols is a few array
+operations (or one loop over bars for the recursive indicators) instead of
+a pandas groupby with Python work per symbol.
+
+NaN marks a missing bar. Panels built by ``to_panel`` are right-aligned:
+each symbol's bars end in the last column and shorter histories are
+NaN-padded on the left. Outputs are NaN during warm-up, with the same rules as
+pandas: a rolling window needs ``window`` valid values, and recursive
+indicators (EMA, Wilder RSI/ATR) start at a symbol's first valid bar. The
+latest column agrees with the streaming indicators in online_indicators.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.online_indicators import rsi_from_averages
+
+_NAN = np.nan
+
+
+def to_panel(
+    df: pd.DataFrame,
+    columns: Sequence[str] = ("open", "high", "low", "close", "volume"),
+    symbol_column: str = "symbol",
+    time_column: str = "timestamp",
+) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Pivot a long-format frame into right-aligned (symbols x bars) arrays,
+    one per column: each symbol's bars in time order, the latest in the last
+    column. Returns the symbols (sorted) and the arrays.
+    """
+    if df.empty:
+        return [], {column: np.empty((0, 0)) for column in columns}
+    ordered = df.sort_values([symbol_column, time_column], kind="stable")
+    codes, symbols = pd.factorize(ordered[symbol_column], sort=True)
+    counts = np.bincount(codes, minlength=len(symbols))
+    bars = int(counts.max())
+    # Position within the symbol, shifted so the last bar lands in the last column
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    position = np.arange(len(codes)) - starts[codes] + (bars - counts[codes])
+    panels = {}
+    for column in columns:
+        panel = np.full((len(symbols), bars), _NAN)
+        panel[codes, position] = ordered[column].to_numpy(dtype=np.float64)
+        panels[column] = panel
+    return list(symbols), panels
+
+
+def shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Values ``periods`` bars earlier (NaN where there are none)"""
+    out = np.full_like(x, _NAN, dtype=np.float64)
+    if periods < x.shape[1]:
+        out[:, periods:] = x[:, :x.shape[1] - periods]
+    return out
+
+
+def returns(close: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Fractional change over ``periods`` bars"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return close / shift(close, periods) - 1.0
+
+
+def _windows(x: np.ndarray, window: int):
+    """(symbols x bars-window+1 x window) view of the trailing windows, or None if too few bars"""
+    if x.shape[1] < window:
+        return None
+    return sliding_window_view(x, window, axis=1)
+
+
+def _align(values: np.ndarray, x: np.ndarray, window: int) -> np.ndarray:
+    """Place per-window results at each window's last bar"""
+    out = np.full(x.shape, _NAN)
+    if values is not None:
+        out[:, window - 1:] = values
+    return out
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the last ``window`` bars (cumulative sums; NaN unless all are present)"""
+    valid = ~np.isnan(x)
+    zero_filled = np.where(valid, x, 0.0)
+    sums = np.cumsum(zero_filled, axis=1)
+    counts = np.cumsum(valid, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    counts[:, window:] = counts[:, window:] - counts[:, :-window]
+    return np.where(counts == window, sums, _NAN)
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    windows = _windows(x, window)
+    return _align(None if windows is None else windows.std(axis=-1, ddof=ddof), x, window)
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    windows = _windows(x, window)
+    return _align(None if windows is None else windows.max(axis=-1), x, window)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    windows = _windows(x, window)
+    return _align(None if windows is None else windows.min(axis=-1), x, window)
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average seeded with each symbol's first value (pandas ewm(span, adjust=False))"""
+    alpha = 2.0 / (span + 1)
+    out = np.full(x.shape, _NAN)
+    value = np.full(x.shape[0], _NAN)
+    for t in range(x.shape[1]):
+        v = x[:, t]
+        present = ~np.isnan(v)
+        value = np.where(present, np.where(np.isnan(value), v, value + alpha * (v - value)), value)
+        out[:, t] = np.where(present, value, _NAN)
+    return out
+
+
+def wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing seeded with the simple mean of each symbol's first ``period`` values"""
+    out = np.full(x.shape, _NAN)
+    value = np.full(x.shape[0], _NAN)
+    seed = np.zeros(x.shape[0])
+    count = np.zeros(x.shape[0], dtype=np.int64)
+    for t in range(x.shape[1]):
+        v = x[:, t]
+        present = ~np.isnan(v)
+        count += present
+        seed += np.where(present & (count <= period), v, 0.0)
+        value = np.where(present & (count == period), seed / period,
+                         np.where(present & (count > period), (value * (period - 1) + v) / period, value))
+        out[:, t] = np.where(present & (count >= period), value, _NAN)
+    return out
+
+
+def wilder_averages(close: np.ndarray, period: int = 14) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilder average gain and loss of bar-to-bar changes"""
+    change = close - shift(close)
+    return wilder(np.maximum(change, 0.0), period), wilder(np.maximum(-change, 0.0), period)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    avg_gain, avg_loss = wilder_averages(close, period)
+    return np.where(np.isnan(avg_gain), _NAN, rsi_from_averages(avg_gain, avg_loss))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """High-low range widened to the previous close (just high-low on a symbol's first bar)"""
+    prev_close = shift(close)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    return wilder(true_range(high, low, close), period)
+
+
+def breakout_flags(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+    """Close above the highest high / below the lowest low of the previous ``window`` bars"""
+    with np.errstate(invalid="ignore"):
+        return close > shift(rolling_max(high, window)), close < shift(rolling_min(low, window))
+
+
+def volume_spike_flags(volume: np.ndarray, window: int = 20, multiplier: float = 2.0) -> np.ndarray:
+    """Volume above ``multiplier`` times the average of the previous ``window`` bars"""
+    with np.errstate(invalid="ignore"):
+        return volume > multiplier * shift(rolling_mean(volume, window))
@@ -0,0 +1,292 @@
+"""
+Push Hub Service
+Computes each subscribed topic once per refresh cycle and fans the encoded
+result out to every subscriber of the streaming endpoint.
+
+Topics are dotted names such as ``sector.heatmap``, ``market_depth.gainers``
+or ``moneyflux.NIFTY50.sentiment``. Registered patterns may contain ``{param}``
+segments which are passed to the producer as keyword arguments.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.services.snapshot_store import snapshot_store
+
+logger = logging.getLogger(__name__)
+
+PUSH_DEFAULT_INTERVAL = float(os.getenv("PUSH_DEFAULT_INTERVAL", "5"))
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "32"))
+PUSH_PRODUCER_TIMEOUT = float(os.getenv("PUSH_PRODUCER_TIMEOUT", "15"))
+
+
+def encode_event(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """Encode one Server-Sent Events frame"""
+    payload = data if isinstance(data, str) else json.dumps(data, default=str, separators=(",", ":"))
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {payload}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Subscription:
+    """A subscriber's view of the hub: one bounded queue shared by all of its topics"""
+
+    def __init__(self, topics: List[str], mode: str = "full", maxsize: int = PUSH_QUEUE_SIZE,
+                 latest: Optional[Callable[[str], Optional[Tuple[int, bytes]]]] = None):
+        self.topics = topics
+        self.mode = mode
+        # (topic, frame) pairs, so one lagging topic can be coalesced without touching the others
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        # Last version delivered per topic; diffs are only valid on top of it
+        self.versions: Dict[str, int] = {}
+        # Current (version, full frame) of a topic, used to resync after an overflow
+        self._latest = latest or (lambda topic: None)
+
+    async def get(self) -> bytes:
+        """Wait for the next frame to send"""
+        _, frame = await self.queue.get()
+        return frame
+
+    def offer(self, topic: str, frame: bytes, full: Optional[bytes] = None) -> bool:
+        """
+        Enqueue a frame of ``topic``; ``full`` is the topic's full snapshot when
+        ``frame`` is a diff. On overflow the topic's queued frames are superseded
+        and dropped, and the full snapshot is queued in place of a diff since the
+        dropped frames may have been what it builds on. Other topics keep their
+        frames unless the whole queue is theirs, in which case every topic is
+        resynced with its latest full snapshot. Returns False when frames were dropped.
+        """
+        try:
+            self.queue.put_nowait((topic, frame))
+            return True
+        except asyncio.QueueFull:
+            pass
+        queued = [self.queue.get_nowait() for _ in range(self.queue.qsize())]
+        others = [item for item in queued if item[0] != topic]
+        self.dropped += len(queued) - len(others)
+        if len(others) < self.queue.maxsize:
+            for item in others:
+                self.queue.put_nowait(item)
+            self.queue.put_nowait((topic, full or frame))
+            return False
+
+        self.dropped += len(others)
+        self.versions.clear()
+        for name in self.topics:
+            latest = self._latest(name)
+            if latest is not None and not self.queue.full():
+                self.versions[name], snapshot = latest
+                self.queue.put_nowait((name, snapshot))
+        return False
+
+
+class _TopicChannel:
+    """Refresh loop for a single resolved topic, alive while it has subscribers"""
+
+    def __init__(self, name: str, producer: Callable[[], Any], interval: float):
+        self.name = name
+        self.producer = producer
+        self.interval = interval
+        self.subscribers: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.version = 0
+        self.last_frame: Optional[bytes] = None
+        self._last_body: Optional[str] = None
+
+    async def compute(self) -> Any:
+        return await asyncio.wait_for(asyncio.to_thread(self.producer), timeout=PUSH_PRODUCER_TIMEOUT)
+
+    def publish(self, data: Any) -> bool:
+        """Encode once and fan out; returns False when the payload is unchanged"""
+        body = json.dumps(data, default=str, separators=(",", ":"))
+        if body == self._last_body:
+            return False
+        self._last_body = body
+        previous = self.version
+        self.version = snapshot_store.publish(self.name, data).version
+        self.last_frame = encode_event(self.name, body, self.version)
+
+        diff_frame = None
+        for sub in self.subscribers:
+            if sub.mode == "diff" and previous and sub.versions.get(self.name) == previous:
+                if diff_frame is None:
+                    diff_frame = encode_event(self.name, snapshot_store.diff(self.name, previous), self.version)
+                sub.offer(self.name, diff_frame, full=self.last_frame)
+            else:
+                sub.offer(self.name, self.last_frame)
+            sub.versions[self.name] = self.version
+        return True
+
+    async def run(self) -> None:
+        while self.subscribers:
+            try:
+                data = await self.compute()
+                self.publish(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Push topic {self.name} refresh failed: {str(e)}")
+                frame = encode_event("error", {"topic": self.name, "detail": str(e)})
+                for sub in self.subscribers:
+                    sub.offer("error", frame)
+            await asyncio.sleep(self.interval)
+
+
+class PushHub:
+    """Registry of topic patterns plus the live channels currently being streamed"""
+
+    def __init__(self):
+        self._patterns: List[Tuple[List[str], Callable[..., Any], float]] = []
+        self._channels: Dict[str, _TopicChannel] = {}
+
+    def register(self, pattern: str, producer: Callable[..., Any], interval: float = PUSH_DEFAULT_INTERVAL) -> None:
+        """Register a topic pattern, e.g. ``moneyflux.{index}.sentiment``"""
+        self._patterns.append((pattern.split("."), producer, interval))
+
+    def patterns(self) -> List[Dict[str, Any]]:
+        return [{"topic": ".".join(parts), "interval": interval} for parts, _, interval in self._patterns]
+
+    def resolve(self, topic: str) -> Optional[Tuple[Callable[[], Any], float]]:
+        """Match a concrete topic name against the registered patterns"""
+        segments = topic.split(".")
+        for parts, producer, interval in self._patterns:
+            if len(parts) != len(segments):
+                continue
+            kwargs = {}
+            for part, segment in zip(parts, segments):
+                if part.startswith("{") and part.endswith("}"):
+                    kwargs[part[1:-1]] = segment
+                elif part != segment:
+                    break
+            else:
+                return (lambda p=producer, kw=kwargs: p(**kw)), interval
+        return None
+
+    def subscribe(self, topics: List[str], mode: str = "full") -> Subscription:
+        """
+        Attach a new subscriber to each topic, starting refresh loops as needed.
+
+        In ``diff`` mode the first frame per topic is the full payload and later
+        frames carry only changed, added and removed rows (see snapshot_store).
+        """
+        unknown = [t for t in topics if t not in self._channels and self.resolve(t) is None]
+        if unknown:
+            raise KeyError(f"Unknown topics: {', '.join(unknown)}")
+
+        sub = Subscription(topics, mode=mode, latest=self._latest_frame)
+        for topic in topics:
+            channel = self._channels.get(topic)
+            if channel is None:
+                producer, interval = self.resolve(topic)
+                channel = self._channels[topic] = _TopicChannel(topic, producer, interval)
+            channel.subscribers.add(sub)
+            if channel.last_frame is not None:
+                sub.offer(topic, channel.last_frame)
+                sub.versions[topic] = channel.version
+            if channel.task is None or channel.task.done():
+                channel.task = asyncio.create_task(channel.run())
+        return sub
+
+    def _latest_frame(self, topic: str) -> Optional[Tuple[int, bytes]]:
+        channel = self._channels.get(topic)
+        if channel is None or channel.last_frame is None:
+            return None
+        return channel.version, channel.last_frame
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        for topic in sub.topics:
+            channel = self._channels.get(topic)
+            if channel is None:
+                continue
+            channel.subscribers.discard(sub)
+            if not channel.subscribers:
+                if channel.task is not None:
+                    channel.task.cancel()
+                del self._channels[topic]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"subscribers": len(ch.subscribers), "version": ch.version, "interval": ch.interval}
+            for name, ch in self._channels.items()
+        }
+
+    async def shutdown(self) -> None:
+        tasks = [ch.task for ch in self._channels.values() if ch.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._channels.clear()
+
+
+def register_default_topics(hub: PushHub) -> None:
+    """Register the dashboard widgets that are otherwise polled on a timer"""
+
+    def sector_heatmap():
+        from app.services import sector_service
+        return sector_service.get_sector_heatmap()
+
+    def sector_overview():
+        from app.services import sectorial_heatmap_service
+        return sectorial_heatmap_service.get_sector_heatmap()
+
+    def sector_stocks(sector_code: str):
+        from app.services import sectorial_heatmap_service
+        return sectorial_heatmap_service.get_sector_stock_heatmap(sector_code.upper())
+
+    def market_depth(section: str):
+        from app.services import market_depth_service
+        sections = {
+            "highpower": market_depth_service.get_highpower,
+            "intraday_boost": market_depth_service.get_intraday_boost,
+            "top_level": market_depth_service.get_top_level,
+            "low_level": market_depth_service.get_low_level,
+            "gainers": market_depth_service.get_gainers,
+            "losers": market_depth_service.get_losers,
+        }
+        if section not in sections:
+            raise ValueError(f"Unknown market depth section: {section}")
+        return sections[section]()
+
+    def moneyflux(index: str, view: str):
+        from app.services import money_flux_service
+        views = {
+            "heatmap": money_flux_service.get_heatmap_snapshot,
+            "sentiment": money_flux_service.get_sentiment_analysis,
+            "pcr": money_flux_service.get_pcr_calculations,
+            "volume": money_flux_service.get_volume_histogram,
+        }
+        if view not in views:
+            raise ValueError(f"Unknown money flux view: {view}")
+        return views[view](index)
+
+    def index_comprehensive(name: str):
+        from app.services import index_service
+        return index_service.get_comprehensive_analysis(name)
+
+    def scanner_members(name: str):
+        from app.services.scanner_engine import scanner_engine, table_row
+        # Same row shape and units as the /scanners tables
+        return {
+            "success": True,
+            "data": [table_row(scanner_engine.row(slot)) for slot in scanner_engine.member_slots(name)],
+        }
+
+    hub.register("sector.heatmap", sector_heatmap, interval=10)
+    hub.register("sector.overview", sector_overview, interval=10)
+    hub.register("sector.{sector_code}.stocks", sector_stocks, interval=10)
+    hub.register("market_depth.{section}", market_depth, interval=5)
+    hub.register("moneyflux.{index}.{view}", moneyflux, interval=30)
+    hub.register("index.{name}.comprehensive", index_comprehensive, interval=60)
+    # Membership of a watched scanner; diff mode turns enter/exit into added/removed rows
+    hub.register("scanner.{name}", scanner_members, interval=2)
+
+
+# Process-wide hub used by the streaming router
+push_hub = PushHub()
+register_default_topics(push_hub)
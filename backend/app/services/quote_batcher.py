@@ -0,0 +1,120 @@
+"""
+Quote Batcher
+Coalesces concurrent quote lookups into as few upstream calls as possible.
+
+Symbols requested within a short window are collected per user, deduplicated,
+split into broker-sized batches that are fetched in parallel, and each caller
+receives only the quotes it asked for. Quotes are also cached per symbol for
+a short time so repeated refreshes within the same second are served locally.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUOTE_BATCH_WINDOW_MS = float(os.getenv("QUOTE_BATCH_WINDOW_MS", "5"))
+QUOTE_BATCH_SIZE = int(os.getenv("QUOTE_BATCH_SIZE", "50"))  # Fyers limit per quotes call
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "1.0"))
+
+# fetch(symbols, user_id) -> upstream response shaped like {"s": "ok", "d": [{"n": symbol, "v": {...}}]}
+QuoteFetcher = Callable[[List[str], str], Awaitable[dict]]
+
+
+class QuoteBatcher:
+    """Per-user request coalescing in front of a batch quotes endpoint"""
+
+    def __init__(
+        self,
+        fetch: QuoteFetcher,
+        window_ms: float = QUOTE_BATCH_WINDOW_MS,
+        batch_size: int = QUOTE_BATCH_SIZE,
+        cache_ttl: float = QUOTE_CACHE_TTL,
+    ):
+        self.fetch = fetch
+        self.window = window_ms / 1000.0
+        self.batch_size = batch_size
+        self.cache_ttl = cache_ttl
+        self._pending: Dict[str, Dict[str, asyncio.Future]] = {}
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+        self.stats = {"requests": 0, "symbols": 0, "cache_hits": 0, "coalesced": 0, "upstream_calls": 0}
+
+    def _cached(self, symbol: str, now: float) -> Optional[dict]:
+        entry = self._cache.get(symbol)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._cache[symbol]
+            return None
+        return entry[1]
+
+    async def get_quotes(self, symbols: List[str], user_id: str = "default") -> dict:
+        """Quotes for ``symbols`` in request order, shaped like the upstream response"""
+        self.stats["requests"] += 1
+        now = time.monotonic()
+        quotes: Dict[str, Optional[dict]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+
+        pending = self._pending.get(user_id)
+        for symbol in dict.fromkeys(symbols):
+            self.stats["symbols"] += 1
+            cached = self._cached(symbol, now)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                quotes[symbol] = cached
+                continue
+            if pending is None:
+                pending = self._pending[user_id] = {}
+                asyncio.get_running_loop().call_later(self.window, self._flush, user_id)
+            future = pending.get(symbol)
+            if future is None:
+                future = pending[symbol] = asyncio.get_running_loop().create_future()
+            else:
+                self.stats["coalesced"] += 1
+            waiting[symbol] = future
+
+        if waiting:
+            # Futures are shared with coalesced callers; a cancelled caller must not cancel them
+            results = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            quotes.update(zip(waiting.keys(), results))
+
+        return {"s": "ok", "d": [quotes[s] for s in dict.fromkeys(symbols) if quotes.get(s) is not None]}
+
+    def _flush(self, user_id: str) -> None:
+        pending = self._pending.pop(user_id, None)
+        if pending:
+            asyncio.ensure_future(self._dispatch(pending, user_id))
+
+    async def _dispatch(self, pending: Dict[str, asyncio.Future], user_id: str) -> None:
+        symbols = list(pending)
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        self.stats["upstream_calls"] += len(batches)
+        responses = await asyncio.gather(*(self.fetch(batch, user_id) for batch in batches), return_exceptions=True)
+
+        expires_at = time.monotonic() + self.cache_ttl
+        for batch, response in zip(batches, responses):
+            if isinstance(response, BaseException):
+                logger.error(f"Quote batch of {len(batch)} symbols failed: {str(response)}")
+                for symbol in batch:
+                    if not pending[symbol].done():
+                        pending[symbol].set_exception(response)
+                continue
+
+            by_symbol = {item.get("n"): item for item in (response or {}).get("d", []) if isinstance(item, dict)}
+            for symbol in batch:
+                item = by_symbol.get(symbol)
+                if item is not None:
+                    self._cache[symbol] = (expires_at, item)
+                if not pending[symbol].done():
+                    pending[symbol].set_result(item)
+
+        self._evict_expired()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [symbol for symbol, (expires_at, _) in self._cache.items() if expires_at <= now]
+        for symbol in expired:
+            del self._cache[symbol]
@@ -0,0 +1,253 @@
+"""
+Scanner DSL
+Scan conditions written as expressions over the scanner feature columns, e.g.
+
+    rsi14 < 30 and volume > 2 * vol_avg20 and close > sma50
+
+An expression is parsed with ``ast`` and compiled into a tree of NumPy
+operations over the columns; only a small, type-checked subset of Python
+is accepted:
+
+- feature names (see scanner_engine.FEATURES) and declared parameters
+- numbers, ``+ - * /``, unary minus and ``abs``/``min``/``max``
+- comparisons (chained ones too), ``and``, ``or``, ``not``
+- at most MAX_EXPRESSION_DEPTH levels of nesting
+
+Anything else (attributes, subscripts, other calls, unknown names) is
+rejected with ScanExpressionError before any evaluation. Compiled plans are
+cached by a hash of the normalised expression, so a repeated user scan
+costs the same column operations as a built-in one.
+"""
+
+import ast
+import hashlib
+import operator
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Tuple
+
+import numpy as np
+
+SCANNER_PLAN_CACHE_SIZE = int(os.getenv("SCANNER_PLAN_CACHE_SIZE", "256"))
+MAX_EXPRESSION_LENGTH = 500
+MAX_EXPRESSION_DEPTH = 32  # nesting allowed below the top node; compiling and evaluating recurse per level
+
+BOOL = "bool"
+NUMBER = "number"
+
+_ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_COMPARISONS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_FUNCTIONS = {"abs": (np.abs, 1), "min": (np.minimum, 2), "max": (np.maximum, 2)}
+
+Evaluator = Callable[[Dict[str, np.ndarray], Dict[str, float]], Any]
+
+
+class ScanExpressionError(ValueError):
+    """An expression that is not valid scanner DSL"""
+
+
+@dataclass(frozen=True)
+class ScanPlan:
+    """A compiled expression: ``evaluate(columns, params)`` returns a mask or a number column"""
+    expression: str
+    key: str
+    kind: str
+    names: FrozenSet[str]
+    evaluate: Evaluator
+
+    def __call__(self, columns: Dict[str, np.ndarray], params: Dict[str, float] = None):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.evaluate(columns, params or {})
+
+
+class _Compiler:
+    def __init__(self, features: FrozenSet[str], parameters: FrozenSet[str]):
+        self.features = features
+        self.parameters = parameters
+        self.names = set()
+        self.depth = 0
+
+    def compile(self, node: ast.AST) -> Tuple[str, Evaluator, Any]:
+        """(kind, evaluator, constant value or None) for a node"""
+        method = getattr(self, "_" + type(node).__name__, None)
+        if method is None:
+            raise ScanExpressionError(f"Unsupported syntax: {type(node).__name__}")
+        if self.depth >= MAX_EXPRESSION_DEPTH:
+            raise ScanExpressionError(f"Expression nested deeper than {MAX_EXPRESSION_DEPTH} levels")
+        self.depth += 1
+        try:
+            return method(node)
+        finally:
+            self.depth -= 1
+
+    def expect(self, node: ast.AST, kind: str) -> Tuple[Evaluator, Any]:
+        got, evaluate, constant = self.compile(node)
+        if got != kind:
+            wanted = "a condition" if kind == BOOL else "a number"
+            raise ScanExpressionError(f"Expected {wanted} at '{ast.unparse(node)}'")
+        return evaluate, constant
+
+    def _Constant(self, node: ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ScanExpressionError(f"Unsupported constant: {node.value!r}")
+        value = float(node.value)
+        return NUMBER, lambda c, p: value, value
+
+    def _Name(self, node: ast.Name):
+        name = node.id
+        self.names.add(name)
+        if name in self.features:
+            return NUMBER, lambda c, p: c[name], None
+        if name in self.parameters:
+            return NUMBER, lambda c, p: p[name], None
+        raise ScanExpressionError(f"Unknown field: {name}")
+
+    def _BinOp(self, node: ast.BinOp):
+        op = _ARITHMETIC.get(type(node.op))
+        if op is None:
+            raise ScanExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        left, left_value = self.expect(node.left, NUMBER)
+        right, right_value = self.expect(node.right, NUMBER)
+        return self._fold(NUMBER, lambda c, p: op(left(c, p), right(c, p)), left_value, right_value)
+
+    def _UnaryOp(self, node: ast.UnaryOp):
+        if isinstance(node.op, ast.Not):
+            operand, _ = self.expect(node.operand, BOOL)
+            # A comparison against a missing value (NaN) is False, and so must be its negation:
+            # only symbols with every feature the operand reads are eligible
+            read = sorted({n.id for n in ast.walk(node.operand) if isinstance(n, ast.Name) and n.id in self.features})
+
+            def evaluate(c, p):
+                result = ~operand(c, p)
+                for name in read:
+                    result = result & ~np.isnan(c[name])
+                return result
+
+            return BOOL, evaluate, None
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand, value = self.expect(node.operand, NUMBER)
+            sign = -1.0 if isinstance(node.op, ast.USub) else 1.0
+            return self._fold(NUMBER, lambda c, p: sign * operand(c, p), value)
+        raise ScanExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+
+    def _BoolOp(self, node: ast.BoolOp):
+        operands = [self.expect(value, BOOL)[0] for value in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+
+        def evaluate(c, p):
+            result = operands[0](c, p)
+            for operand in operands[1:]:
+                result = combine(result, operand(c, p))
+            return result
+
+        return BOOL, evaluate, None
+
+    def _Compare(self, node: ast.Compare):
+        # a < b < c is (a < b) and (b < c), each operand evaluated once
+        operands = [self.expect(value, NUMBER)[0] for value in [node.left] + node.comparators]
+        ops = []
+        for op in node.ops:
+            compare = _COMPARISONS.get(type(op))
+            if compare is None:
+                raise ScanExpressionError(f"Unsupported comparison: {type(op).__name__}")
+            ops.append(compare)
+
+        def evaluate(c, p):
+            left = operands[0](c, p)
+            result = None
+            for compare, operand in zip(ops, operands[1:]):
+                right = operand(c, p)
+                step = np.asarray(compare(left, right))
+                result = step if result is None else result & step
+                left = right
+            return result
+
+        return BOOL, evaluate, None
+
+    def _Call(self, node: ast.Call):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in _FUNCTIONS or node.keywords:
+            raise ScanExpressionError(f"Unsupported function: {ast.unparse(node.func)}")
+        func, arity = _FUNCTIONS[name]
+        if len(node.args) != arity:
+            raise ScanExpressionError(f"{name}() takes {arity} argument{'s' if arity > 1 else ''}")
+        args = [self.expect(arg, NUMBER) for arg in node.args]
+        evaluators = [evaluate for evaluate, _ in args]
+        return self._fold(NUMBER, lambda c, p: func(*(e(c, p) for e in evaluators)), *(v for _, v in args))
+
+    @staticmethod
+    def _fold(kind: str, evaluate: Evaluator, *constants):
+        """Evaluate constant subexpressions (``2 * 1.5``) once at compile time"""
+        if constants and all(v is not None for v in constants):
+            value = float(evaluate({}, {}))
+            return kind, lambda c, p: value, value
+        return kind, evaluate, None
+
+
+def normalize(expression: str) -> str:
+    return " ".join(expression.split())
+
+
+def plan_key(expression: str, parameters: Iterable[str] = ()) -> str:
+    text = normalize(expression) + "|" + ",".join(sorted(parameters))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def compile_expression(expression: str, features: Iterable[str], parameters: Iterable[str] = ()) -> ScanPlan:
+    """Parse, validate and compile an expression (uncached; see PlanCache)"""
+    expression = normalize(expression)
+    if not expression:
+        raise ScanExpressionError("Empty expression")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ScanExpressionError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ScanExpressionError(f"Invalid expression: {e.msg}")
+    except (RecursionError, MemoryError):
+        raise ScanExpressionError(f"Expression nested deeper than {MAX_EXPRESSION_DEPTH} levels")
+    parameters = frozenset(parameters)
+    compiler = _Compiler(frozenset(features), parameters)
+    kind, evaluate, _ = compiler.compile(tree.body)
+    return ScanPlan(expression, plan_key(expression, parameters), kind, frozenset(compiler.names), evaluate)
+
+
+class PlanCache:
+    """Compiled plans by expression hash, least recently used evicted first"""
+
+    def __init__(self, features: Iterable[str], max_size: int = SCANNER_PLAN_CACHE_SIZE):
+        self.features = frozenset(features)
+        self.max_size = max_size
+        self._plans: "OrderedDict[str, ScanPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def get(self, expression: str, kind: str = BOOL, parameters: Iterable[str] = ()) -> ScanPlan:
+        """The compiled plan for ``expression``, which must evaluate to ``kind``"""
+        parameters = tuple(parameters)
+        key = plan_key(expression, parameters)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+        if plan is None:
+            plan = compile_expression(expression, self.features, parameters)
+            with self._lock:
+                self.misses += 1
+                self._plans[key] = plan
+                while len(self._plans) > self.max_size:
+                    self._plans.popitem(last=False)
+        if plan.kind != kind:
+            wanted = "a condition" if kind == BOOL else "a number"
+            raise ScanExpressionError(f"Expected {wanted}: {plan.expression}")
+        return plan
@@ -0,0 +1,660 @@
+"""
+Scanner Engine
+Universe-wide stock scanners evaluated as NumPy boolean masks.
+
+The engine keeps one float column per feature, indexed by market state slot
+(which is the symbol registry id for registered symbols), so every symbol
+that ticks is scannable. Features come from two places:
+
+- daily history: moving averages, 20-day and 52-week ranges, average
+  volume, ATR and the Wilder RSI state as of the last completed bar. They
+  are kept as streaming indicator state (see online_indicators), warmed up
+  from the stored bars by ``load_history`` and advanced by ``append_bars``
+  one completed bar at a time, so a new day costs O(1) per symbol instead of
+  a reload of the whole history
+- the live market state: LTP, volume and previous close, combined with the
+  history state into change %, volume ratio, live RSI and range distances
+  by ``refresh`` whenever new ticks have arrived
+
+A scan is a condition in the scanner DSL (see scanner_dsl) compiled into
+masks over these columns, followed by a top-k selection with
+``argpartition``, so it costs a few vector operations over the universe
+regardless of how many symbols match. Built-in scanners are just named DSL
+expressions with default thresholds.
+
+Scanners can also be watched: the tick ingestion listener marks the symbols
+of each batch dirty and ``evaluate`` recomputes features and membership for
+those rows only, emitting enter/exit events to listeners (and keeping the
+latest ones for polling) instead of rescanning the universe.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.market_state import MarketState, market_state
+from app.services import panel_indicators as panel
+from app.services.online_indicators import ATR, RollingMax, RollingMin, RollingStats, WilderRSI, rsi_from_averages
+from app.services.scanner_dsl import BOOL, NUMBER, PlanCache, ScanPlan
+from app.services.symbol_registry import SymbolRegistry, symbol_registry
+
+logger = logging.getLogger(__name__)
+
+SCANNER_HISTORY_DAYS = int(os.getenv("SCANNER_HISTORY_DAYS", "400"))
+SCANNER_EVENT_HISTORY = int(os.getenv("SCANNER_EVENT_HISTORY", "1000"))
+SCANNER_HISTORY_SYNC_SECONDS = float(os.getenv("SCANNER_HISTORY_SYNC_SECONDS", "900"))
+RSI_PERIOD = 14
+YEAR_BARS = 250
+
+# Features computed from completed daily bars
+HISTORY_FEATURES = ("last_close", "sma20", "sma50", "high20", "low20", "high52w", "low52w", "vol_avg20",
+                    "avg_gain14", "avg_loss14", "atr14")
+# Features derived from the live market state on refresh
+LIVE_FEATURES = ("close", "prev_close", "volume", "change_pct", "vol_ratio", "rsi14", "breakout_pct",
+                 "from_high52w", "from_low52w")
+FEATURES = HISTORY_FEATURES + LIVE_FEATURES
+
+Columns = Dict[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class ScannerSpec:
+    """A built-in scanner: a DSL condition with named thresholds and the expression results are ranked by"""
+    title: str
+    condition: str
+    rank_by: str
+    descending: bool = True
+    defaults: Dict[str, float] = field(default_factory=dict)
+
+
+SCANNERS: Dict[str, ScannerSpec] = {
+    "momentum": ScannerSpec(
+        "Momentum",
+        "change_pct >= min_change and close > sma20 and vol_ratio >= 1",
+        rank_by="change_pct", defaults={"min_change": 2.0},
+    ),
+    "volume": ScannerSpec(
+        "Volume Spike",
+        "vol_ratio >= volume_multiplier",
+        rank_by="vol_ratio", defaults={"volume_multiplier": 2.0},
+    ),
+    "breakout": ScannerSpec(
+        "Breakout",
+        "close > high20 and vol_ratio >= min_volume_ratio",
+        rank_by="breakout_pct", defaults={"min_volume_ratio": 1.5},
+    ),
+    "oversold": ScannerSpec(
+        "Oversold",
+        "rsi14 <= rsi_below",
+        rank_by="rsi14", descending=False, defaults={"rsi_below": 30.0},
+    ),
+    "overbought": ScannerSpec(
+        "Overbought",
+        "rsi14 >= rsi_above",
+        rank_by="rsi14", defaults={"rsi_above": 70.0},
+    ),
+}
+
+
+class DailyBarState:
+    """
+    Streaming indicators behind the history features, one row per market
+    state slot. Folding in a completed daily bar is a few vector operations
+    over the symbols that have one; NaN fields mean no bar.
+    """
+
+    def __init__(self):
+        self.sma20 = RollingStats(20)
+        self.sma50 = RollingStats(50)
+        self.vol_avg20 = RollingStats(20)
+        self.high20 = RollingMax(20)
+        self.low20 = RollingMin(20)
+        # 52-week range over whatever history there is
+        self.high52w = RollingMax(YEAR_BARS, min_periods=1)
+        self.low52w = RollingMin(YEAR_BARS, min_periods=1)
+        self.rsi = WilderRSI(RSI_PERIOD)
+        self.atr = ATR(RSI_PERIOD)
+
+    def _indicators(self):
+        return (self.sma20, self.sma50, self.vol_avg20, self.high20, self.low20, self.high52w, self.low52w,
+                self.rsi, self.atr)
+
+    def reset(self, rows: np.ndarray) -> None:
+        for indicator in self._indicators():
+            indicator.resize(int(np.max(rows, initial=-1)) + 1)
+            indicator.reset(rows)
+
+    def update(self, rows: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+               volume: np.ndarray) -> None:
+        self.sma20.update(close, rows)
+        self.sma50.update(close, rows)
+        self.vol_avg20.update(volume, rows)
+        self.high20.update(high, rows)
+        self.low20.update(low, rows)
+        self.high52w.update(high, rows)
+        self.low52w.update(low, rows)
+        self.rsi.update(close, rows)
+        self.atr.update(high, low, close, rows)
+
+    def features(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """History feature values for ``rows``"""
+        return {
+            "last_close": self.rsi.prev[rows],
+            "sma20": self.sma20.mean()[rows],
+            "sma50": self.sma50.mean()[rows],
+            "high20": self.high20.value[rows],
+            "low20": self.low20.value[rows],
+            "high52w": self.high52w.value[rows],
+            "low52w": self.low52w.value[rows],
+            "vol_avg20": self.vol_avg20.mean()[rows],
+            "avg_gain14": self.rsi.avg_gain[rows],
+            "avg_loss14": self.rsi.avg_loss[rows],
+            "atr14": self.atr.value[rows],
+        }
+
+
+class ScannerEngine:
+    """Feature columns for the whole universe and the built-in scanners over them"""
+
+    def __init__(self, state: MarketState = market_state, registry: SymbolRegistry = symbol_registry):
+        self.state = state
+        self.registry = registry
+        self._lock = threading.Lock()
+        self.columns: Columns = {name: np.zeros(0) for name in FEATURES}
+        self.history_loaded_at: Optional[datetime] = None
+        self.last_bar_day: Optional[datetime] = None
+        self._bars = DailyBarState()
+        self._history_lock = threading.Lock()  # serialises loads and appends of daily bars
+        self._sync_task: Optional[asyncio.Task] = None
+        self._state_version = -1
+        self._group_slots: Dict[str, np.ndarray] = {}
+        self.plans = PlanCache(FEATURES)
+        # Incremental mode: watched scanners, their membership and rows changed since the last evaluation
+        self._watched: Dict[str, Tuple[ScanPlan, Dict[str, float]]] = {}
+        self._members: Dict[str, np.ndarray] = {}
+        self._dirty = np.zeros(0, dtype=bool)
+        self._dirty_all = False
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._event_seq = 0
+        self.recent_events: Deque[Dict[str, Any]] = deque(maxlen=SCANNER_EVENT_HISTORY)
+        self.evaluations = 0
+        self._resize(len(state))
+
+    def __len__(self) -> int:
+        return len(self.columns["close"])
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.state.symbols[:len(self)]
+
+    def _resize(self, n: int) -> None:
+        current = len(self.columns["close"])
+        if n <= current:
+            return
+        for name in FEATURES:
+            grown = np.full(n, np.nan)
+            grown[:current] = self.columns[name]
+            self.columns[name] = grown
+        self._dirty = _grow_flags(self._dirty, n)
+        for name, members in self._members.items():
+            self._members[name] = _grow_flags(members, n)
+
+    # Loading
+
+    def load_history(self, symbols: List[str], high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     volume: np.ndarray) -> None:
+        """
+        Warm up the history features from (symbols x bars) daily arrays,
+        oldest bar first, NaN-padded on the left for shorter histories.
+        """
+        slots = self.state.slots(symbols)
+        with self._history_lock:
+            self._bars.reset(slots)
+            for t in range(close.shape[1]):
+                self._bars.update(slots, high[:, t], low[:, t], close[:, t], volume[:, t])
+            self._store_history(slots, full=True)
+        logger.info(f"Scanner history loaded for {len(symbols)} symbols, {close.shape[1]} bars")
+
+    def append_bars(self, symbols: Sequence[str], high: Sequence[float], low: Sequence[float],
+                    close: Sequence[float], volume: Sequence[float]) -> None:
+        """Fold one completed daily bar per symbol into the history features"""
+        slots = self.state.slots(symbols)
+        bar = [np.asarray(x, dtype=np.float64) for x in (high, low, close, volume)]
+        with self._history_lock:
+            self._bars.update(slots, *bar)
+            self._store_history(slots)
+
+    def _store_history(self, slots: np.ndarray, full: bool = False) -> None:
+        features = self._bars.features(slots)
+        with self._lock:
+            self._resize(len(self.state))
+            for name, values in features.items():
+                self.columns[name][slots] = values
+            self.history_loaded_at = datetime.utcnow()
+            self._state_version = -1
+            if full:
+                self._dirty_all = True
+            else:
+                self._dirty[slots] = True
+
+    def _read_daily_bars(self, since: datetime):
+        """Daily bars (intraday_ohlcv interval '1d') from ``since`` on, one row per symbol and day, or None"""
+        import pandas as pd
+        from sqlalchemy import text
+
+        from app.db.connection import get_engine
+
+        engine = get_engine()
+        if engine is None:
+            return None
+        with engine.connect() as conn:
+            bars = pd.read_sql(text(
+                "SELECT symbol, timestamp, high, low, close, volume FROM intraday_ohlcv "
+                "WHERE interval = '1d' AND timestamp >= :since ORDER BY symbol, timestamp"
+            ), conn, params={"since": since})
+        if bars.empty:
+            return None
+        bars["day"] = pd.to_datetime(bars["timestamp"]).dt.normalize()
+        # Last row of each symbol's day
+        return bars.drop_duplicates(["symbol", "day"], keep="last")
+
+    def load_history_from_db(self, days: int = SCANNER_HISTORY_DAYS) -> int:
+        """Load daily bars for every symbol from intraday_ohlcv; returns the symbol count"""
+        bars = self._read_daily_bars(datetime.utcnow() - timedelta(days=days))
+        if bars is None:
+            return 0
+        # One right-aligned panel per column
+        symbols, arrays = panel.to_panel(bars, ("high", "low", "close", "volume"), time_column="day")
+        self.load_history(symbols, arrays["high"], arrays["low"], arrays["close"], arrays["volume"])
+        self.last_bar_day = bars["day"].max().to_pydatetime()
+        return len(symbols)
+
+    def sync_history_from_db(self) -> None:
+        """Append the daily bars stored after the last day loaded, or load the whole history the first time"""
+        if self.last_bar_day is None:
+            self.load_history_from_db()
+            return
+        # Bars of the last loaded day have been folded in already
+        bars = self._read_daily_bars(self.last_bar_day + timedelta(days=1))
+        if bars is None:
+            return
+        for day, day_bars in bars.groupby("day", sort=True):
+            self.append_bars(day_bars["symbol"].tolist(), day_bars["high"].to_numpy(float),
+                             day_bars["low"].to_numpy(float), day_bars["close"].to_numpy(float),
+                             day_bars["volume"].to_numpy(float))
+            self.last_bar_day = day.to_pydatetime()
+        logger.info(f"Scanner history advanced by {bars['day'].nunique()} daily bars")
+
+    async def start(self, interval: float = SCANNER_HISTORY_SYNC_SECONDS) -> None:
+        """Load the daily history, then keep appending new daily bars in the background"""
+        try:
+            await asyncio.to_thread(self.sync_history_from_db)
+        except Exception as e:
+            # The background sync retries; live scans run on whatever history is loaded
+            logger.error(f"Scanner history sync failed: {str(e)}")
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop(interval))
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+    async def _sync_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.sync_history_from_db)
+            except Exception as e:
+                logger.error(f"Scanner history sync failed: {str(e)}")
+
+    # Live features
+
+    def refresh(self, force: bool = False) -> None:
+        """Recompute the live features when the market state has changed since the last refresh"""
+        state = self.state
+        if not force and state.version == self._state_version:
+            return
+        with self._lock:
+            version = state.version
+            n = len(state)
+            self._resize(n)
+            self._compute_live(slice(0, n))
+            self._state_version = version
+
+    def _compute_live(self, rows) -> None:
+        """Live features for ``rows`` (a slice or an index array) from the market state"""
+        state, c = self.state, self.columns
+        ltp = state.ltp[rows]
+        last_close = c["last_close"][rows]
+        prev_close = state.prev_close[rows]
+        prev_close = np.where(np.isnan(prev_close), last_close, prev_close)
+        c["close"][rows] = ltp
+        c["volume"][rows] = state.volume[rows]
+        c["prev_close"][rows] = prev_close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c["change_pct"][rows] = (ltp - prev_close) / prev_close * 100.0
+            c["vol_ratio"][rows] = state.volume[rows] / c["vol_avg20"][rows]
+            c["breakout_pct"][rows] = (ltp / c["high20"][rows] - 1.0) * 100.0
+            c["from_high52w"][rows] = (ltp / np.fmax(c["high52w"][rows], ltp) - 1.0) * 100.0
+            c["from_low52w"][rows] = (ltp / np.fmin(c["low52w"][rows], ltp) - 1.0) * 100.0
+        # One Wilder step with today's move, as if the day closed at the LTP
+        move = ltp - last_close
+        gain = (c["avg_gain14"][rows] * (RSI_PERIOD - 1) + np.maximum(move, 0.0)) / RSI_PERIOD
+        loss = (c["avg_loss14"][rows] * (RSI_PERIOD - 1) + np.maximum(-move, 0.0)) / RSI_PERIOD
+        c["rsi14"][rows] = rsi_from_averages(gain, loss)
+
+    # Incremental evaluation
+
+    def watch(self, name: str, condition: Optional[str] = None, params: Optional[Dict[str, float]] = None) -> None:
+        """
+        Keep the membership of a scanner up to date on every tick batch: a
+        built-in scanner by name, or a DSL ``condition`` under a new name.
+        Raises ValueError (ScanExpressionError) for an invalid condition.
+        """
+        if condition is None:
+            spec = SCANNERS.get(name)
+            if spec is None:
+                raise ValueError(f"Unknown scanner: {name}")
+            condition, params = spec.condition, {**spec.defaults, **(params or {})}
+        params = params or {}
+        plan = self.plans.get(condition, BOOL, params)
+        with self._lock:
+            self._watched[name] = (plan, params)
+            self._members[name] = np.zeros(len(self), dtype=bool)
+            self._dirty_all = True
+
+    def unwatch(self, name: str) -> None:
+        with self._lock:
+            self._watched.pop(name, None)
+            self._members.pop(name, None)
+
+    def watched(self) -> List[str]:
+        return list(self._watched)
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """Call ``listener(events)`` with the enter/exit events of every evaluation that has some"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def mark_dirty(self, symbols: Sequence[str]) -> None:
+        slots = self.state.slots(symbols)
+        with self._lock:
+            self._resize(len(self.state))
+            self._dirty[slots] = True
+
+    def on_ticks(self, symbols: Sequence[str], ltp: Sequence[float]) -> None:
+        """Tick ingestion listener: re-evaluate the watched scanners for the symbols that ticked"""
+        if self._watched:
+            self.mark_dirty(symbols)
+            self.evaluate()
+
+    def evaluate(self) -> List[Dict[str, Any]]:
+        """
+        Recompute live features and watched-scanner membership for the rows
+        marked dirty since the last call (every row after a history load or a
+        new watch) and return the resulting enter/exit events.
+        """
+        with self._lock:
+            n = len(self.state)
+            self._resize(n)
+            if self._dirty_all:
+                rows = np.arange(n)
+                self._dirty_all = False
+            else:
+                rows = np.flatnonzero(self._dirty[:n])
+            if not len(rows):
+                return []
+            self._dirty[rows] = False
+            self._compute_live(rows)
+            view = _RowView(self.columns, rows)
+            priced = ~np.isnan(view["close"])
+            events = []
+            for name, (plan, params) in self._watched.items():
+                members = self._members[name]
+                now = np.broadcast_to(plan(view, params), len(rows)) & priced
+                was = members[rows]
+                members[rows] = now
+                for kind, changed in (("enter", rows[now & ~was]), ("exit", rows[was & ~now])):
+                    for slot in changed:
+                        events.append(self._event(name, kind, slot))
+            self.evaluations += 1
+            self.recent_events.extend(events)
+        if events:
+            for listener in self._listeners:
+                try:
+                    listener(events)
+                except Exception as e:
+                    logger.error(f"Scanner event listener failed: {str(e)}")
+        return events
+
+    def _event(self, scanner: str, kind: str, slot: int) -> Dict[str, Any]:
+        self._event_seq += 1
+        ltp = self.columns["close"][slot]
+        return {
+            "id": self._event_seq,
+            "scanner": scanner,
+            "event": kind,
+            "symbol": self.state.symbols[slot],
+            "ltp": None if np.isnan(ltp) else round(float(ltp), 2),
+            "at": time.time(),
+        }
+
+    def member_slots(self, name: str) -> np.ndarray:
+        members = self._members.get(name)
+        if members is None:
+            raise ValueError(f"Scanner is not watched: {name}")
+        return np.flatnonzero(members)
+
+    def members(self, name: str) -> List[str]:
+        """Symbols currently in a watched scanner"""
+        return [self.state.symbols[slot] for slot in self.member_slots(name)]
+
+    def events_since(self, event_id: int = 0) -> List[Dict[str, Any]]:
+        """Retained events newer than ``event_id``, oldest first"""
+        with self._lock:
+            return [e for e in self.recent_events if e["id"] > event_id]
+
+    # Scanning
+
+    def scan(
+        self,
+        scanner: str = "momentum",
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        min_rsi: Optional[float] = None,
+        max_rsi: Optional[float] = None,
+        limit: int = 20,
+        group: Optional[str] = None,
+        **params: float,
+    ) -> List[Dict[str, Any]]:
+        """
+        Symbols passing the built-in ``scanner`` and the optional filters, best first.
+
+        ``params`` override the scanner's thresholds (see SCANNERS defaults);
+        ``group`` limits the scan to a registry index, sector or segment.
+        """
+        spec = SCANNERS.get(scanner)
+        if spec is None:
+            raise ValueError(f"Unknown scanner: {scanner}")
+        unknown = set(params) - set(spec.defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameters for {scanner}: {', '.join(sorted(unknown))}")
+        return self.scan_expression(
+            spec.condition, spec.rank_by, spec.descending, min_price, max_price, min_volume, min_rsi, max_rsi,
+            limit, group, {**spec.defaults, **params},
+        )
+
+    def scan_expression(
+        self,
+        condition: str,
+        rank_by: str = "change_pct",
+        descending: bool = True,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        min_rsi: Optional[float] = None,
+        max_rsi: Optional[float] = None,
+        limit: int = 20,
+        group: Optional[str] = None,
+        params: Optional[Dict[str, float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Symbols matching a DSL ``condition`` and the optional filters, ranked
+        by the DSL number expression ``rank_by``. Raises ScanExpressionError
+        for an invalid expression.
+        """
+        params = params or {}
+        plan = self.plans.get(condition, BOOL, params)
+        rank_plan = self.plans.get(rank_by, NUMBER)
+        self.refresh()
+        c = self.columns
+        n = len(self)
+        mask = np.broadcast_to(plan(c, params), n) & self.filter_mask(min_price, max_price, min_volume, min_rsi,
+                                                                       max_rsi, group)
+        rank = np.broadcast_to(np.asarray(rank_plan(c), dtype=float), n)
+        mask &= ~np.isnan(rank)
+        return [self.row(slot) for slot in top_k(np.flatnonzero(mask), rank, limit, descending)]
+
+    def filter_mask(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        min_rsi: Optional[float] = None,
+        max_rsi: Optional[float] = None,
+        group: Optional[str] = None,
+    ) -> np.ndarray:
+        """Symbols with a price that pass the common price, volume, RSI and group filters"""
+        c = self.columns
+        close = c["close"]
+        mask = ~np.isnan(close)
+        with np.errstate(invalid="ignore"):
+            if min_price is not None:
+                mask &= close >= min_price
+            if max_price is not None:
+                mask &= close <= max_price
+            if min_volume is not None:
+                mask &= c["volume"] >= min_volume
+            if min_rsi is not None:
+                mask &= c["rsi14"] >= min_rsi
+            if max_rsi is not None:
+                mask &= c["rsi14"] <= max_rsi
+        if group is not None:
+            in_group = np.zeros(len(close), dtype=bool)
+            members = self.group_slots(group)
+            in_group[members[members < len(close)]] = True
+            mask &= in_group
+        return mask
+
+    def row(self, slot: int) -> Dict[str, Any]:
+        c = self.columns
+
+        def value(name: str, digits: int = 2) -> Optional[float]:
+            v = c[name][slot]
+            return None if np.isnan(v) else round(float(v), digits)
+
+        volume = c["volume"][slot]
+        return {
+            "symbol": self.state.symbols[slot],
+            "sector": self.sector(slot),
+            "ltp": value("close"),
+            "prev_close": value("prev_close"),
+            "change_pct": value("change_pct"),
+            "volume": None if np.isnan(volume) else int(volume),
+            "vol_ratio": value("vol_ratio"),
+            "rsi14": value("rsi14"),
+            "sma20": value("sma20"),
+            "sma50": value("sma50"),
+            "high20": value("high20"),
+            "low20": value("low20"),
+            "from_high52w": value("from_high52w"),
+            "from_low52w": value("from_low52w"),
+        }
+
+    def group_slots(self, group: str) -> np.ndarray:
+        """Market state slots of a registry group's members (slots never move, so this is cached)"""
+        slots = self._group_slots.get(group)
+        if slots is None:
+            if not self.registry.has_group(group):
+                raise ValueError(f"Unknown group: {group}")
+            slots = self._group_slots[group] = self.state.slots(self.registry.members(group))
+        return slots
+
+    def sector(self, slot: int) -> str:
+        info = self.registry.info(self.state.symbols[slot])
+        return (info or {}).get("sector") or ""
+
+    def stats(self) -> Dict[str, Any]:
+        loaded = ~np.isnan(self.columns["last_close"])
+        return {
+            "symbols": len(self),
+            "with_history": int(loaded.sum()),
+            "with_ticks": int((~np.isnan(self.columns["close"])).sum()),
+            "history_loaded_at": self.history_loaded_at.isoformat() if self.history_loaded_at else None,
+            "watched": {name: int(members.sum()) for name, members in self._members.items()},
+            "evaluations": self.evaluations,
+            "last_event_id": self._event_seq,
+            "plans_cached": len(self.plans),
+        }
+
+
+class _RowView(dict):
+    """Feature columns restricted to some rows, sliced lazily as a plan reads them"""
+
+    def __init__(self, columns: Columns, rows: np.ndarray):
+        super().__init__()
+        self.columns = columns
+        self.rows = rows
+
+    def __missing__(self, name: str) -> np.ndarray:
+        values = self[name] = self.columns[name][self.rows]
+        return values
+
+
+def table_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A scanner row in the table shape shared by /scanners and the
+    scanner.{name} push topic; Change % is a fraction, as the percentage
+    column type expects.
+    """
+    change_pct = row["change_pct"]
+    return {
+        "Symbol": row["symbol"],
+        "LTP": row["ltp"],
+        "Change %": change_pct / 100 if change_pct is not None else None,
+        "Volume": row["volume"],
+        "RSI(14)": row["rsi14"],
+        "Sector": row["sector"],
+        "52W High %": row["from_high52w"],
+        "52W Low %": row["from_low52w"],
+    }
+
+
+def top_k(candidates: np.ndarray, key: np.ndarray, k: int, descending: bool = True) -> np.ndarray:
+    """The ``k`` best candidates by ``key``, best first, without sorting all of them"""
+    values = -key[candidates] if descending else key[candidates]
+    if len(candidates) > k:
+        keep = np.argpartition(values, k - 1)[:k]
+        candidates, values = candidates[keep], values[keep]
+    return candidates[np.argsort(values, kind="stable")]
+
+
+def _grow_flags(flags: np.ndarray, n: int) -> np.ndarray:
+    grown = np.zeros(n, dtype=bool)
+    grown[:len(flags)] = flags
+    return grown
+
+
+# Process-wide engine over the live market state, used by /scanners
+scanner_engine = ScannerEngine()
@@ -17,6 +17,7 @@ from typing import Dict, List, Any
 from datetime import datetime, timedelta
 import random
 from app.services.param_normalizer import ParamNormalizer
+from app.services.symbol_registry import symbol_registry
 
 
 def generate_highest_delivery_data(segment: str = "fno") -> List[Dict]:
@@ -29,21 +30,8 @@ def generate_highest_delivery_data(segment: str = "fno") -> List[Dict]:
     Returns:
         List of stocks with highest delivery percentages in param format
     """
-    # Sample symbols based on segment
-    if segment == "fno":
-        symbols = [
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR",
-            "ICICIBANK", "SBIN", "BHARTIARTL", "ITC", "KOTAKBANK",
-            "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND",
-            "BAJFINANCE", "HCLTECH", "WIPRO", "ULTRACEMCO", "TITAN"
-        ]
-    else:  # n500
-        symbols = [
-            "ADANIPORTS", "BAJAJFINSV", "DRREDDY", "GRASIM", "HEROMOTOCO",
-            "JSWSTEEL", "NTPC", "ONGC", "POWERGRID", "SUNPHARMA",
-            "TATAMOTORS", "TATASTEEL", "TECHM", "VEDL", "COALINDIA",
-            "CIPLA", "BPCL", "IOC", "GAIL", "HINDALCO"
-        ]
+    # Symbols based on segment
+    symbols = symbol_registry.members("FNO" if segment == "fno" else "N500")
     
     scanner_data = []
     base_time = datetime.now()
@@ -89,21 +77,8 @@ def generate_delivery_spike_data(segment: str = "fno") -> List[Dict]:
     Returns:
         List of stocks with delivery spikes in param format
     """
-    # Sample symbols based on segment
-    if segment == "fno":
-        symbols = [
-            "ADANIGREEN", "ADANITRANS", "APOLLOHOSP", "BAJAJ-AUTO", "BRITANNIA",
-            "DIVISLAB", "EICHERMOT", "GRASIM", "HINDALCO", "INDUSINDBK",
-            "JSWSTEEL", "M&M", "NTPC", "ONGC", "POWERGRID",
-            "SHREECEM", "TATAMOTORS", "TATASTEEL", "UPL", "VEDL"
-        ]
-    else:  # n500
-        symbols = [
-            "ACC", "ADANIPORTS", "AMARAJABAT", "AMBUJACEM", "APOLLOTYRE",
-            "ASHOKLEY", "AUROPHARMA", "BAJAJHLDNG", "BALKRISIND", "BANDHANBNK",
-            "BATAINDIA", "BEL", "BERGEPAINT", "BIOCON", "BOSCHLTD",
-            "BPCL", "CADILAHC", "CANBK", "CHOLAFIN", "COLPAL"
-        ]
+    # Symbols based on segment
+    symbols = symbol_registry.members("FNO" if segment == "fno" else "N500")
     
     scanner_data = []
     base_time = datetime.now()
@@ -198,7 +173,7 @@ async def get_hd_hist() -> List[Dict]:
         historical_data = []
         base_time = datetime.now()
         
-        symbols = ["RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK"]
+        symbols = symbol_registry.members("FNO")[:5]
         
         for i, symbol in enumerate(symbols):
             # Generate historical data for last 5 days
@@ -7,81 +7,36 @@ from typing import Dict, List, Optional
 import random
 from datetime import datetime
 from app.services.param_normalizer import ParamNormalizer
+from app.services.market_state import market_state
+from app.services.symbol_registry import symbol_registry
 
 
 class SectorialHeatmapService:
     """Service class for generating sectorial flow heatmap data"""
     
-    # Real sector and stock mappings based on NSE sectors
-    SECTOR_CONSTITUENTS = {
-        "NIFTY50": [
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "SBIN", "BHARTIARTL",
-            "ITC", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "NESTLEIND", "BAJFINANCE",
-            "HCLTECH", "WIPRO", "ULTRACEMCO", "TITAN", "ADANIPORTS", "BAJAJFINSV", "DRREDDY",
-            "GRASIM", "HEROMOTOCO", "JSWSTEEL", "NTPC", "ONGC", "POWERGRID", "SUNPHARMA"
-        ],
-        "BANKNIFTY": [
-            "HDFCBANK", "ICICIBANK", "SBIN", "KOTAKBANK", "AXISBANK", "INDUSINDBK", "FEDERALBNK",
-            "BANKBARODA", "PNB", "IDFCFIRSTB", "AUBANK", "BANDHANBNK"
-        ],
-        "NIFTYAUTO": [
-            "MARUTI", "M&M", "TATAMOTORS", "BAJAJ-AUTO", "HEROMOTOCO", "TVSMOTORS", "EICHERMOT",
-            "MOTHERSUMI", "ASHOKLEY", "ESCORTS", "BALKRISIND", "APOLLOTYRE"
-        ],
-        "NIFTYFINSERVICE": [
-            "BAJFINANCE", "BAJAJFINSV", "HDFCLIFE", "SBILIFE", "ICICIGI", "ICICIPRULI", "HDFCAMC",
-            "LICHSGFIN", "MUTHOOTFIN", "PNBHOUSING", "M&MFIN", "CHOLAFIN"
-        ],
-        "NIFTYFMCG": [
-            "HINDUNILVR", "ITC", "NESTLEIND", "BRITANNIA", "DABUR", "MARICO", "GODREJCP", 
-            "COLPAL", "PGHH", "UBL", "TATACONSUM", "EMAMILTD"
-        ],
-        "CNXIT": [
-            "TCS", "INFY", "WIPRO", "HCLTECH", "TECHM", "LTI", "MINDTREE", "COFORGE", 
-            "MPHASIS", "LTTS", "PERSISTENT", "OFSS"
-        ],
-        "NIFTYMEDIA": [
-            "ZEEL", "SUNTV", "PVRINOX", "DISHTV", "NETWORK18", "JAGRAN", "SAREGAMA", "TIPS"
-        ],
-        "NIFTYMETAL": [
-            "TATASTEEL", "JSWSTEEL", "HINDALCO", "VEDL", "COALINDIA", "NMDC", "SAIL", 
-            "JINDALSTEL", "WELCORP", "MOIL", "RATNAMANI"
-        ],
-        "CNXPHARMA": [
-            "SUNPHARMA", "DRREDDY", "CIPLA", "DIVISLAB", "LUPIN", "BIOCON", "CADILAHC",
-            "TORNTPHARM", "AUROPHARMA", "GLENMARK", "IPCALAB", "NATCOPHAR"
-        ],
-        "NIFTYPSUBANK": [
-            "SBIN", "PNB", "BANKBARODA", "CANBK", "UNIONBANK", "INDIANB", "MAHABANK", "IOB"
-        ],
-        "NIFTYPVTBANK": [
-            "HDFCBANK", "ICICIBANK", "KOTAKBANK", "AXISBANK", "INDUSINDBK", "FEDERALBNK",
-            "RBLBANK", "SOUTHBANK", "DCBBANK", "KARURBANK"
-        ],
-        "CNXREALTY": [
-            "DLF", "GODREJPROP", "OBEROIRLTY", "PRESTIGE", "BRIGADE", "PHOENIXLTD", 
-            "SOBHA", "MAHLIFE", "KOLTEPATIL"
-        ],
-        "CNXENERGY": [
-            "RELIANCE", "ONGC", "BPCL", "IOC", "GAIL", "HINDPETRO", "OIL", "MGL", "IGL", "PETRONET"
-        ]
-    }
-    
-    SECTOR_NAMES = {
-        "NIFTY50": "Nifty 50",
-        "BANKNIFTY": "Bank Nifty", 
-        "NIFTYAUTO": "Nifty Auto",
-        "NIFTYFINSERVICE": "Nifty Financial Services",
-        "NIFTYFMCG": "Nifty FMCG",
-        "CNXIT": "Nifty IT",
-        "NIFTYMEDIA": "Nifty Media",
-        "NIFTYMETAL": "Nifty Metal",
-        "CNXPHARMA": "Nifty Pharma",
-        "NIFTYPSUBANK": "Nifty PSU Bank",
-        "NIFTYPVTBANK": "Nifty Private Bank",
-        "CNXREALTY": "Nifty Realty",
-        "CNXENERGY": "Nifty Energy"
-    }
+    # Sector and stock mappings based on NSE sectors (see app.config.symbol_universe)
+    SECTOR_CONSTITUENTS = {code: symbol_registry.members(code) for code in symbol_registry.groups("sector")}
+    SECTOR_NAMES = {code: symbol_registry.group_names[code] for code in symbol_registry.groups("sector")}
+
+    @staticmethod
+    def _stock_quote(symbol: str) -> tuple:
+        """(price, prev_close, change %, volume) from live ticks, else generated sample data"""
+        live = market_state.get(symbol) if market_state.is_live() else None
+        if live and live["prev_close"]:
+            return live["price"], live["prev_close"], live["change"], live["volume"] or 0
+
+        base_price = random.uniform(50, 4000)
+        price_change = random.uniform(-8.0, 8.0)  # -8% to +8% change
+        current_price = base_price * (1 + price_change / 100)
+        volume = random.randint(10000, 10000000)
+        return current_price, base_price, price_change, volume
+
+    @staticmethod
+    def _live_change_percent():
+        """Percent change per registry id from live ticks, or None when the feed is idle"""
+        if not market_state.is_live():
+            return None
+        return market_state.change_percent()[:len(symbol_registry)]
 
     @classmethod
     def get_sector_heatmap(cls, sector_filter: Optional[str] = None) -> Dict:
@@ -96,12 +51,16 @@ class SectorialHeatmapService:
         """
         sectors_to_include = [sector_filter] if sector_filter and sector_filter in cls.SECTOR_CONSTITUENTS else list(cls.SECTOR_CONSTITUENTS.keys())
         
+        # Average constituent change for every sector in one vectorized pass
+        live_change = cls._live_change_percent()
+        live_sector_change = symbol_registry.group_mean(live_change, sectors_to_include) if live_change is not None else {}
+        
         raw_data = []
         for sector_code in sectors_to_include:
             sector_name = cls.SECTOR_NAMES.get(sector_code, sector_code)
             
-            # Generate realistic sector performance data
-            sector_change = random.uniform(-5.0, 5.0)  # Sector % change
+            # Live sector change when available, otherwise realistic sample data
+            sector_change = live_sector_change.get(sector_code, random.uniform(-5.0, 5.0))  # Sector % change
             sector_heat = sector_change + random.uniform(-1.0, 1.0)  # Heat value based on change
             market_cap = random.uniform(50000, 500000)  # Market cap in crores
             volume_ratio = random.uniform(0.5, 2.5)  # Volume vs average
@@ -153,11 +112,8 @@ class SectorialHeatmapService:
         
         raw_data = []
         for symbol in constituents:
-            # Generate realistic stock data
-            base_price = random.uniform(50, 4000)
-            price_change = random.uniform(-8.0, 8.0)  # -8% to +8% change
-            current_price = base_price * (1 + price_change / 100)
-            volume = random.randint(10000, 10000000)
+            # Live ticks when the feed is running, otherwise realistic sample data
+            current_price, base_price, price_change, volume = cls._stock_quote(symbol)
             
             # Heat value combines price change with volume and volatility
             volume_factor = min(volume / 1000000, 2.0)  # Volume impact (capped at 2x)
@@ -208,11 +164,8 @@ class SectorialHeatmapService:
             sector_name = cls.SECTOR_NAMES.get(sector_code, sector_code)
             
             for symbol in constituents:
-                # Generate realistic stock data
-                base_price = random.uniform(50, 4000)
-                price_change = random.uniform(-8.0, 8.0)
-                current_price = base_price * (1 + price_change / 100)
-                volume = random.randint(10000, 10000000)
+                # Live ticks when the feed is running, otherwise realistic sample data
+                current_price, base_price, price_change, volume = cls._stock_quote(symbol)
                 
                 # Heat value calculation
                 volume_factor = min(volume / 1000000, 2.0)
@@ -254,18 +207,28 @@ class SectorialHeatmapService:
             Dict with sector summary data
         """
         summary_data = []
+        live_change = cls._live_change_percent()
+        live_sector_change = symbol_registry.group_mean(live_change) if live_change is not None else {}
         
         for sector_code, constituents in cls.SECTOR_CONSTITUENTS.items():
             sector_name = cls.SECTOR_NAMES.get(sector_code, sector_code)
-            
-            # Calculate sector-level metrics
-            avg_change = random.uniform(-3.0, 3.0)
-            heat_score = avg_change + random.uniform(-1.0, 1.0)
             num_stocks = len(constituents)
             
-            # Calculate advancing vs declining stocks
-            advancing = random.randint(0, num_stocks)
-            declining = num_stocks - advancing
+            if sector_code in live_sector_change:
+                # Gather the sector's constituents straight from the live columns
+                member_change = live_change[symbol_registry.member_ids(sector_code)]
+                avg_change = live_sector_change[sector_code]
+                heat_score = avg_change
+                advancing = int((member_change > 0).sum())
+                declining = int((member_change < 0).sum())
+            else:
+                # Calculate sector-level metrics
+                avg_change = random.uniform(-3.0, 3.0)
+                heat_score = avg_change + random.uniform(-1.0, 1.0)
+                
+                # Calculate advancing vs declining stocks
+                advancing = random.randint(0, num_stocks)
+                declining = num_stocks - advancing
             
             summary_data.append({
                 "Symbol": sector_name,
@@ -19,6 +19,7 @@ from app.services.study_utils import (
     calculate_momentum_spikes, 
     calculate_breakout_signals,
     calculate_tci_signals, 
+    calculate_study_panel,
     calculate_advance_decline, 
     calculate_volume_rankings,
     calculate_heatmap_data
@@ -122,7 +123,7 @@ class StudyService:
         
         for sym in symbols:
             base_price = np.random.uniform(100, 1000)
-            for i in range(20):  # 20 days of data
+            for i in range(60):  # 60 days, enough for the 20-day windows and the 21-day TCI average
                 open_price = base_price + np.random.uniform(-10, 10)
                 high_price = open_price + np.random.uniform(0, 20)
                 low_price = open_price - np.random.uniform(0, 15)
@@ -131,7 +132,7 @@ class StudyService:
                 
                 data.append({
                     'symbol': sym,
-                    'timestamp': datetime.now() - timedelta(days=20-i),
+                    'timestamp': datetime.now() - timedelta(days=60-i),
                     'open': open_price,
                     'high': high_price,
                     'low': low_price,
@@ -175,6 +176,24 @@ class StudyService:
                 self.result = result
         return _Obj(item["result"])
 
+    def _signal_rows(self, signals: pd.DataFrame, selected, rank_by: str, count: int,
+                     ascending: bool = False, r_factor: str = 'volume_ratio') -> List[Dict]:
+        """Top ``count`` selected symbols of a study panel in param format"""
+        top = signals[selected].sort_values(rank_by, ascending=ascending).head(count)
+        top = top[['close', 'prev_close', 'change_pct', r_factor]].astype(float).fillna(0.0)
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return [
+            {
+                "Symbol": symbol,
+                "param_0": row['close'],  # LTP
+                "param_1": row['prev_close'],  # Previous close
+                "param_2": row['change_pct'],  # % Change
+                "param_3": row[r_factor],  # R-Factor
+                "param_4": now  # DateTime
+            }
+            for symbol, row in top.iterrows()
+        ]
+
     async def get_study_data(self, name: str) -> Dict:
         """Get study data with real calculations"""
         if name not in STUDY_DATA_ALLOW:
@@ -259,23 +278,11 @@ class StudyService:
             
             elif "MOMENTUM SPIKE" in name:
                 minutes = 5 if "5" in name else 10
-                # Generate momentum spike data
-                if len(df) > 0:
-                    momentum_stocks = df.head(10)
-                    normalized_data = []
-                    for _, row in momentum_stocks.iterrows():
-                        spike_value = np.random.uniform(1, 5)  # Mock spike value
-                        normalized_item = {
-                            "Symbol": row['symbol'],
-                            "param_0": float(row['close']),  # LTP
-                            "param_1": float(row['close']) * 0.98,  # Previous close
-                            "param_2": spike_value,  # % Change (spike)
-                            "param_3": spike_value * 1.2,  # R-Factor (momentum strength)
-                            "param_4": datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # DateTime
-                        }
-                        normalized_data.append(normalized_item)
-                else:
-                    normalized_data = []
+                # Latest return beyond two standard deviations, strongest first
+                signals = calculate_study_panel(df)
+                normalized_data = self._signal_rows(
+                    signals, signals['spike_detected'], 'spike_z', 10, r_factor='spike_z'
+                ) if len(signals) else []
             
             elif name in ["GAINER", "LOSSER"]:
                 # Calculate top gainers/losers
@@ -339,72 +346,35 @@ class StudyService:
         try:
             symbols_data = []
             
-            if "DAY HIGH BO" in name:
-                days = int(name.split()[0])
-                if len(df) > 0:
-                    # Mock breakout calculation
-                    breakout_stocks = df.head(count)
-                    symbols_data = []
-                    for _, row in breakout_stocks.iterrows():
-                        symbol_item = {
-                            "Symbol": row['symbol'],
-                            "param_0": float(row['close']),  # LTP
-                            "param_1": float(row['close']) * 0.98,  # Previous close
-                            "param_2": np.random.uniform(2, 8),  # % Change (breakout)
-                            "param_3": np.random.uniform(1, 3),  # R-Factor (strength)
-                            "param_4": datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # DateTime
-                        }
-                        symbols_data.append(symbol_item)
+            if "DAY HIGH BO" in name or "DAY LOW BO" in name or "BREAK LIVE" in name or name == "breakouts":
+                # Close beyond the high/low of the previous N days
+                days = int(name.split()[0]) if name[0].isdigit() else 20
+                signals = calculate_study_panel(df, window=days)
+                if len(signals) > 0:
+                    if "HIGH" in name or name == "breakouts":
+                        symbols_data = self._signal_rows(signals, signals['breakout'], 'change_pct', count)
+                    else:
+                        symbols_data = self._signal_rows(signals, signals['breakdown'], 'change_pct', count,
+                                                         ascending=True)
             
-            elif "DAY LOW BO" in name:
-                days = int(name.split()[0])
-                if len(df) > 0:
-                    # Mock breakdown calculation  
-                    breakdown_stocks = df.head(count)
-                    symbols_data = []
-                    for _, row in breakdown_stocks.iterrows():
-                        symbol_item = {
-                            "Symbol": row['symbol'],
-                            "param_0": float(row['close']),  # LTP
-                            "param_1": float(row['close']) * 1.02,  # Previous close
-                            "param_2": np.random.uniform(-8, -2),  # % Change (breakdown)
-                            "param_3": np.random.uniform(1, 3),  # R-Factor (strength)
-                            "param_4": datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # DateTime
-                        }
-                        symbols_data.append(symbol_item)
+            elif "TCI" in name or name in ["tci_buy_signals", "tci_sell_signals"]:
+                # Fast average above (buy) or below (sell) the slow one, by the gap between them
+                signals = calculate_study_panel(df)
+                if len(signals) > 0:
+                    buy = name != "tci_sell_signals"
+                    symbols_data = self._signal_rows(signals, signals['tci'] == (1 if buy else 0), 'tci_strength',
+                                                     count, ascending=not buy, r_factor='tci_strength')
             
-            elif "TCI" in name:
-                if len(df) > 0:
-                    tci_stocks = df.head(count)
-                    symbols_data = []
-                    for _, row in tci_stocks.iterrows():
-                        symbol_item = {
-                            "Symbol": row['symbol'],
-                            "param_0": float(row['close']),  # LTP
-                            "param_1": float(row['open']),  # Previous close
-                            "param_2": float(((row['close'] - row['open']) / row['open']) * 100),  # % Change
-                            "param_3": np.random.uniform(0.5, 2.5),  # TCI strength
-                            "param_4": datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # DateTime
-                        }
-                        symbols_data.append(symbol_item)
+            elif name == "volume_spikes":
+                signals = calculate_study_panel(df)
+                if len(signals) > 0:
+                    symbols_data = self._signal_rows(signals, signals['volume_spike'], 'volume_ratio', count)
             
-            elif "BREAK LIVE" in name:
-                days = int(name.split()[0])
-                if len(df) > 0:
-                    live_break_stocks = df.head(count)
-                    symbols_data = []
-                    for _, row in live_break_stocks.iterrows():
-                        is_high_break = "HIGH" in name
-                        change_range = (2, 10) if is_high_break else (-10, -2)
-                        symbol_item = {
-                            "Symbol": row['symbol'],
-                            "param_0": float(row['close']),  # LTP
-                            "param_1": float(row['close']) * (0.95 if is_high_break else 1.05),  # Previous close
-                            "param_2": np.random.uniform(*change_range),  # % Change
-                            "param_3": np.random.uniform(1, 4),  # R-Factor (breakout strength)
-                            "param_4": datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # DateTime
-                        }
-                        symbols_data.append(symbol_item)
+            elif name in ["top_gainers", "top_losers"]:
+                signals = calculate_study_panel(df)
+                if len(signals) > 0:
+                    symbols_data = self._signal_rows(signals, signals['change_pct'].notna(), 'change_pct', count,
+                                                     ascending=name == "top_losers")
             
             else:
                 # Default to volume-based ranking
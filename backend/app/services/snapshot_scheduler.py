@@ -0,0 +1,201 @@
+"""
+Snapshot Scheduler
+Recomputes registered snapshots in the background and publishes them into the
+cache, so request handlers only ever read warm entries.
+
+Each job runs on its own loop with a faster cadence during NSE trading hours
+and a slower one after close. Runs are jittered, never overlap (a run that is
+still executing in its worker thread causes the next tick to be skipped) and
+record per-job timing metrics.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, time as dtime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+NSE_TIMEZONE = ZoneInfo("Asia/Kolkata")
+NSE_OPEN = dtime(9, 15)
+NSE_CLOSE = dtime(15, 30)
+# Comma-separated YYYY-MM-DD trading holidays
+NSE_HOLIDAYS = {d.strip() for d in os.getenv("NSE_HOLIDAYS", "").split(",") if d.strip()}
+
+SCHEDULER_ENABLED = os.getenv("SNAPSHOT_SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_JITTER = float(os.getenv("SNAPSHOT_SCHEDULER_JITTER", "0.1"))  # fraction of interval
+SCHEDULER_TIMEOUT = float(os.getenv("SNAPSHOT_SCHEDULER_TIMEOUT", "30"))
+INDEX_SNAPSHOTS: List[str] = [
+    i.strip() for i in os.getenv("SNAPSHOT_INDICES", "NIFTY50,BANKNIFTY,FINNIFTY").split(",") if i.strip()
+]
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """True during the NSE cash session (09:15-15:30 IST, weekdays, excluding NSE_HOLIDAYS)"""
+    now = now.astimezone(NSE_TIMEZONE) if now else datetime.now(NSE_TIMEZONE)
+    if now.weekday() >= 5 or now.strftime("%Y-%m-%d") in NSE_HOLIDAYS:
+        return False
+    return NSE_OPEN <= now.time() <= NSE_CLOSE
+
+
+class SnapshotJob:
+    """A cached function plus the arguments and cadence it is refreshed with"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        args: Tuple = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        market_interval: float = 5.0,
+        offhours_interval: float = 300.0,
+    ):
+        if not hasattr(func, "refresh"):
+            raise ValueError(f"Snapshot job {name} must wrap a @cache.cached function")
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.market_interval = market_interval
+        self.offhours_interval = offhours_interval
+        self.task: Optional[asyncio.Task] = None
+        self.inflight: Optional[asyncio.Future] = None
+        # Metrics
+        self.runs = 0
+        self.failures = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+        self.last_run_at: Optional[float] = None
+        self.next_run_at: Optional[float] = None
+
+    def interval(self) -> float:
+        return self.market_interval if is_market_open() else self.offhours_interval
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "avg_ms": round(self.total_seconds / self.runs * 1000, 3) if self.runs else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "last_ms": round(self.last_seconds * 1000, 3),
+            "interval_seconds": self.interval(),
+            "last_run_at": datetime.fromtimestamp(self.last_run_at).isoformat() if self.last_run_at else None,
+            "next_run_at": datetime.fromtimestamp(self.next_run_at).isoformat() if self.next_run_at else None,
+            "running": self.inflight is not None and not self.inflight.done(),
+        }
+
+
+class SnapshotScheduler:
+    """Background refresher for registered snapshot jobs"""
+
+    def __init__(self):
+        self.jobs: Dict[str, SnapshotJob] = {}
+
+    def register(self, name: str, func: Callable[..., Any], *args, market_interval: float = 5.0,
+                 offhours_interval: float = 300.0, **kwargs) -> SnapshotJob:
+        """Register a @cache.cached function to be refreshed with the given arguments"""
+        job = SnapshotJob(name, func, args, kwargs, market_interval, offhours_interval)
+        self.jobs[name] = job
+        return job
+
+    async def start(self) -> None:
+        for job in self.jobs.values():
+            if job.task is None or job.task.done():
+                job.task = asyncio.create_task(self._loop(job))
+        logger.info(f"Snapshot scheduler started with {len(self.jobs)} jobs")
+
+    async def stop(self) -> None:
+        tasks = [job.task for job in self.jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            job.task = None
+
+    async def run_once(self, job: SnapshotJob) -> None:
+        """Refresh one job, skipping it if its previous run is still executing"""
+        if job.inflight is not None and not job.inflight.done():
+            job.skipped += 1
+            logger.warning(f"Snapshot job {job.name} still running, skipping this tick")
+            return
+
+        interval = job.interval()
+        # Keep the entry alive until well after the next scheduled refresh
+        ttl = interval * 2 + SCHEDULER_TIMEOUT
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        job.last_run_at = time.time()
+        job.inflight = loop.run_in_executor(
+            None, lambda: job.func.refresh(*job.args, _ttl_seconds=ttl, **job.kwargs)
+        )
+        failed = False
+        try:
+            done, _ = await asyncio.wait({job.inflight}, timeout=SCHEDULER_TIMEOUT)
+            if not done:
+                failed = True
+                logger.error(f"Snapshot job {job.name} timed out after {SCHEDULER_TIMEOUT}s")
+            else:
+                job.inflight.result()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failed = True
+            logger.error(f"Snapshot job {job.name} failed: {str(e)}")
+
+        duration = time.perf_counter() - started
+        job.runs += 1
+        job.failures += int(failed)
+        job.total_seconds += duration
+        job.max_seconds = max(job.max_seconds, duration)
+        job.last_seconds = duration
+        if duration > interval:
+            job.overruns += 1
+            logger.warning(f"Snapshot job {job.name} overran its {interval}s interval ({duration:.2f}s)")
+
+    async def _loop(self, job: SnapshotJob) -> None:
+        # Spread the first runs so jobs don't all hit the database together
+        await asyncio.sleep(random.uniform(0, min(job.interval(), 1.0)))
+        while True:
+            started = time.perf_counter()
+            await self.run_once(job)
+            interval = job.interval()
+            elapsed = time.perf_counter() - started
+            delay = max(0.0, interval - elapsed) + random.uniform(0, interval * SCHEDULER_JITTER)
+            job.next_run_at = time.time() + delay
+            await asyncio.sleep(delay)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "market_open": is_market_open(),
+            "jobs": {name: job.metrics() for name, job in self.jobs.items()},
+        }
+
+
+def register_default_jobs(scheduler: SnapshotScheduler) -> None:
+    """Snapshots that were previously computed lazily by the first request after each TTL"""
+    from app.services import index_service, market_depth_service, pro_setup_service, sector_service
+
+    scheduler.register("sector.heatmap", sector_service.get_sector_heatmap, market_interval=5, offhours_interval=300)
+    for section in ("highpower", "intraday_boost", "top_level", "low_level", "gainers", "losers"):
+        scheduler.register(
+            f"market_depth.{section}", getattr(market_depth_service, f"get_{section}"),
+            market_interval=3, offhours_interval=300,
+        )
+    scheduler.register("pro_setup.all", pro_setup_service.get_pro_setups, market_interval=5, offhours_interval=300)
+    for index_name in INDEX_SNAPSHOTS:
+        scheduler.register(
+            f"index.{index_name}.comprehensive", index_service.get_comprehensive_analysis, index_name,
+            market_interval=30, offhours_interval=900,
+        )
+
+# Process-wide scheduler started from the FastAPI lifespan
+snapshot_scheduler = SnapshotScheduler()
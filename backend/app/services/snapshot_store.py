@@ -0,0 +1,119 @@
+"""
+Snapshot Store
+Keeps the last few versions of every published topic in a small ring so that
+clients holding a recent version can be sent only the rows that changed.
+
+Rows are keyed by ``Symbol`` (the unified param format key). Volatile fields
+such as the per-row timestamp are ignored when deciding whether a row changed.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+SNAPSHOT_RING_SIZE = int(os.getenv("SNAPSHOT_RING_SIZE", "8"))
+DIFF_KEY = "Symbol"
+DIFF_IGNORE_KEYS = frozenset({"timestamp", "param_4"})
+
+
+class Snapshot:
+    """One published version of a topic"""
+
+    __slots__ = ("version", "payload", "published_at", "rows", "order")
+
+    def __init__(self, version: int, payload: Any):
+        self.version = version
+        self.payload = payload
+        self.published_at = time.time()
+        # key -> (fingerprint, row); None when the payload is not a keyed table
+        self.rows: Optional[Dict[str, Tuple[str, Dict]]] = None
+        self.order: List[str] = []
+
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if isinstance(data, list) and all(isinstance(r, dict) and DIFF_KEY in r for r in data):
+            self.rows = {}
+            for row in data:
+                key = str(row[DIFF_KEY])
+                stable = {k: v for k, v in row.items() if k not in DIFF_IGNORE_KEYS}
+                self.rows[key] = (json.dumps(stable, sort_keys=True, default=str), row)
+                self.order.append(key)
+
+
+class SnapshotStore:
+    """Per-topic versioned rings of recent snapshots"""
+
+    def __init__(self, ring_size: int = SNAPSHOT_RING_SIZE):
+        self.ring_size = ring_size
+        self._rings: Dict[str, Deque[Snapshot]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, payload: Any) -> Snapshot:
+        """Store a new version of a topic and return it"""
+        with self._lock:
+            version = self._versions.get(topic, 0) + 1
+            self._versions[topic] = version
+            snapshot = Snapshot(version, payload)
+            ring = self._rings.setdefault(topic, deque(maxlen=self.ring_size))
+            ring.append(snapshot)
+            return snapshot
+
+    def latest(self, topic: str) -> Optional[Snapshot]:
+        ring = self._rings.get(topic)
+        return ring[-1] if ring else None
+
+    def get(self, topic: str, version: int) -> Optional[Snapshot]:
+        for snapshot in self._rings.get(topic, ()):
+            if snapshot.version == version:
+                return snapshot
+        return None
+
+    def diff(self, topic: str, since_version: Optional[int]) -> Dict[str, Any]:
+        """
+        Build the update a client holding ``since_version`` needs to reach the
+        latest version.
+
+        Returns a ``diff`` body with changed, added and removed rows when the
+        base version is still in the ring, otherwise a full ``snapshot`` body.
+        """
+        latest = self.latest(topic)
+        if latest is None:
+            return {"topic": topic, "mode": "snapshot", "version": 0, "data": None}
+
+        base = self.get(topic, since_version) if since_version is not None else None
+        if base is None or base.rows is None or latest.rows is None:
+            return {"topic": topic, "mode": "snapshot", "version": latest.version, "data": latest.payload}
+
+        return {"topic": topic, "base_version": base.version, **diff_snapshots(base, latest)}
+
+
+def diff_snapshots(base: Snapshot, latest: Snapshot) -> Dict[str, Any]:
+    """Compute the keyed row diff between two snapshots of the same topic"""
+    changed, added = [], []
+    for key, (fingerprint, row) in latest.rows.items():
+        previous = base.rows.get(key)
+        if previous is None:
+            added.append(row)
+        elif previous[0] != fingerprint:
+            changed.append(row)
+    removed = [key for key in base.rows if key not in latest.rows]
+
+    body = {
+        "mode": "diff",
+        "version": latest.version,
+        "key": DIFF_KEY,
+        "changed": changed,
+        "added": added,
+        "removed": removed,
+        "meta": {k: v for k, v in latest.payload.items() if k != "data"},
+    }
+    if latest.order != base.order:
+        body["order"] = latest.order
+    return body
+
+
+# Process-wide store shared by the push hub and the polling endpoints
+snapshot_store = SnapshotStore()
@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from . import panel_indicators as panel
 from .types import STUDY_DATA_ALLOW, STUDY_SYMBOL_ALLOW
 
 # Constants
@@ -77,19 +78,26 @@ def find_near_price_levels(price_series: pd.Series, threshold_pct: float = 0.02)
     
     return filtered_levels
 
+def _panel(series: pd.Series) -> np.ndarray:
+    """One symbol's column as a (1 x bars) panel for the panel kernels"""
+    return series.to_numpy(dtype=np.float64)[None, :]
+
 def calculate_momentum_spikes(df: pd.DataFrame, lookback: int = 14) -> Dict:
     """Calculate momentum indicators and detect spikes."""
     if len(df) < lookback or 'close' not in df.columns:
         return {}
         
-    returns = df['close'].pct_change()
+    close = _panel(df['close'])
+    returns = panel.returns(close)[0]
     momentum = df['close'] - df['close'].shift(lookback)
-    rsi = 100 - (100 / (1 + (returns[returns > 0].mean() / abs(returns[returns < 0].mean()))))
+    rsi = panel.rsi(close, lookback)[0, -1]
+    # Spike: latest return beyond two standard deviations of all returns
+    spread = np.nanstd(returns, ddof=1)
     
     return {
         'momentum': float(momentum.iloc[-1]),
         'rsi': float(rsi),
-        'spike_detected': abs(returns.iloc[-1]) > (2 * returns.std())
+        'spike_detected': bool(abs(returns[-1]) > (2 * spread))
     }
 
 def calculate_breakout_signals(df: pd.DataFrame, window: int = 20) -> Dict:
@@ -97,14 +105,17 @@ def calculate_breakout_signals(df: pd.DataFrame, window: int = 20) -> Dict:
     if len(df) < window or any(col not in df.columns for col in ['high', 'low', 'close', 'volume']):
         return {}
         
-    df['atr'] = df['high'] - df['low']
-    atr = df['atr'].rolling(window=window).mean().iloc[-1]
+    high, low, close, volume = (_panel(df[col]) for col in ['high', 'low', 'close', 'volume'])
+    # Against the levels of the window before the latest bar
+    breakout, breakdown = panel.breakout_flags(high, low, close, window)
+    volume_spike = panel.volume_spike_flags(volume, window)
+    atr = panel.atr(high, low, close, window)[0, -1]
     
     return {
-        'breakout': df['close'].iloc[-1] > (df['high'].rolling(window).max().iloc[-2]),
-        'breakdown': df['close'].iloc[-1] < (df['low'].rolling(window).min().iloc[-2]),
-        'volume_spike': df['volume'].iloc[-1] > (2 * df['volume'].rolling(window).mean().iloc[-2]),
-        'volatility': float(atr / df['close'].iloc[-1] * 100)  # ATR as % of price
+        'breakout': bool(breakout[0, -1]),
+        'breakdown': bool(breakdown[0, -1]),
+        'volume_spike': bool(volume_spike[0, -1]),
+        'volatility': float(atr / close[0, -1] * 100)  # ATR as % of price
     }
 
 def calculate_tci_signals(df: pd.DataFrame, fast_period: int = 10, slow_period: int = 21) -> Dict:
@@ -112,19 +123,68 @@ def calculate_tci_signals(df: pd.DataFrame, fast_period: int = 10, slow_period:
     if len(df) < slow_period or 'close' not in df.columns:
         return {}
         
-    # Simple moving averages for trend
-    fast_ma = df['close'].rolling(window=fast_period).mean()
-    slow_ma = df['close'].rolling(window=slow_period).mean()
+    # Simple moving averages for trend, at the previous and the latest bar
+    close = _panel(df['close'])
+    fast_ma = panel.rolling_mean(close, fast_period)[0, -2:]
+    slow_ma = panel.rolling_mean(close, slow_period)[0, -2:]
+    previous = bool(fast_ma[0] > slow_ma[0])
     
     # TCI: Fast MA above Slow MA indicates uptrend
-    tci = (fast_ma > slow_ma).astype(int)
+    tci = int(fast_ma[-1] > slow_ma[-1])
     
     return {
-        'tci': int(tci.iloc[-1]),
-        'signal': 'BUY' if tci.iloc[-1] == 1 else 'SELL',
-        'crossover': tci.iloc[-1] > tci.iloc[-2] if len(tci) > 1 else False
+        'tci': tci,
+        'signal': 'BUY' if tci == 1 else 'SELL',
+        'crossover': tci > previous
     }
 
+def calculate_study_panel(df: pd.DataFrame, window: int = 20, lookback: int = 14,
+                          fast_period: int = 10, slow_period: int = 21) -> pd.DataFrame:
+    """
+    Momentum, breakout and TCI signals at the latest bar for every symbol of a
+    long-format frame (symbol, timestamp, OHLCV), one row per symbol.
+
+    Same values as the per-symbol calculate_* functions, but computed with the
+    panel kernels over (symbols x bars) arrays instead of a groupby. Symbols
+    without enough bars for a signal get NaN (False for the flags).
+    """
+    columns = ['high', 'low', 'close', 'volume']
+    if df.empty or any(col not in df.columns for col in ['symbol', 'timestamp'] + columns):
+        return pd.DataFrame()
+
+    symbols, panels = panel.to_panel(df, columns)
+    high, low, close, volume = (panels[col] for col in columns)
+    returns = panel.returns(close)
+    # Spread of all returns per symbol (sample std), for the spike test
+    count = (~np.isnan(returns)).sum(axis=1)
+    breakout, breakdown = panel.breakout_flags(high, low, close, window)
+    fast = panel.rolling_mean(close, fast_period)[:, -2:]
+    slow = panel.rolling_mean(close, slow_period)[:, -2:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(returns, axis=1) / count
+        spread = np.sqrt(np.nansum((returns - mean[:, None]) ** 2, axis=1) / (count - 1))
+        trend = np.where(np.isnan(slow), np.nan, fast > slow)
+        signals = pd.DataFrame({
+            'close': close[:, -1],
+            'prev_close': close[:, -2] if close.shape[1] > 1 else np.nan,
+            'change_pct': returns[:, -1] * 100,
+            'momentum': close[:, -1] - panel.shift(close, lookback)[:, -1],
+            'rsi': panel.rsi(close, lookback)[:, -1],
+            'spike_z': np.abs(returns[:, -1]) / spread,
+            'spike_detected': np.abs(returns[:, -1]) > 2 * spread,
+            'breakout': breakout[:, -1],
+            'breakdown': breakdown[:, -1],
+            'volume_ratio': volume[:, -1] / panel.shift(panel.rolling_mean(volume, window))[:, -1],
+            'volume_spike': panel.volume_spike_flags(volume, window)[:, -1],
+            'volatility': panel.atr(high, low, close, window)[:, -1] / close[:, -1] * 100,
+            'tci': trend[:, -1],
+            'tci_strength': (fast[:, -1] / slow[:, -1] - 1) * 100,
+            'crossover': trend[:, -1] > trend[:, -2],
+        }, index=pd.Index(symbols, name='symbol'))
+    if 'sector' in df.columns:
+        signals['sector'] = df.groupby('symbol')['sector'].last().reindex(signals.index)
+    return signals
+
 def calculate_advance_decline(df: pd.DataFrame) -> Dict:
     """Calculate advance/decline metrics."""
     if df.empty or 'advances' not in df.columns or 'declines' not in df.columns:
@@ -1,25 +1,68 @@
 """
 Swing service for handling swing-related operations.
 """
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from datetime import date, datetime
 from sqlalchemy import desc, func, and_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.db.connection import db_session
 from app.db.models import SwingCentre
+from app.utils.pagination import approximate_count, export_lines, keyset_page, stream_query
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_swings(limit: int = 200, offset: int = 0) -> Dict[str, Any]:
+SWING_FIELDS = ("id", "symbol", "swing_type", "swing_level", "detected_date", "direction")
+
+
+def _swing_to_dict(swing: SwingCentre) -> Dict[str, Any]:
+    return {
+        "id": swing.id,
+        "symbol": swing.symbol,
+        "swing_type": swing.swing_type,
+        "swing_level": float(swing.swing_level) if swing.swing_level else None,
+        "detected_date": swing.detected_date.isoformat() if swing.detected_date else None,
+        "direction": swing.direction
+    }
+
+
+def _swing_query(db: Session, symbol: Optional[str] = None, start_date: Optional[datetime] = None,
+                 end_date: Optional[datetime] = None):
+    query = db.query(SwingCentre)
+    if symbol:
+        query = query.filter(SwingCentre.symbol == symbol.upper())
+    if start_date:
+        query = query.filter(SwingCentre.detected_date >= start_date)
+    if end_date:
+        query = query.filter(SwingCentre.detected_date <= end_date)
+    return query
+
+
+def _swing_page(query, limit: int, cursor: Optional[str], include_total: bool) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    swings, next_cursor = keyset_page(
+        query, SwingCentre.detected_date, SwingCentre.id, limit, cursor, key_type=date
+    )
+    pagination = {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+    if include_total:
+        pagination["total"] = approximate_count(query)
+        pagination["total_is_estimate"] = query.session.get_bind().dialect.name == "postgresql"
+    return [_swing_to_dict(swing) for swing in swings], pagination
+
+
+def get_swings(limit: int = 200, cursor: Optional[str] = None, include_total: bool = False) -> Dict[str, Any]:
     """
-    Get paginated swing data.
+    Get swing data, newest first, one keyset page at a time.
     
     Args:
         limit: Maximum number of records to return (1-500)
-        offset: Number of records to skip for pagination
+        cursor: ``next_cursor`` from the previous page; omit for the first page
+        include_total: Add an approximate total to the pagination info
         
     Returns:
         Dictionary containing swing data and pagination info
@@ -32,35 +75,10 @@ def get_swings(limit: int = 200, offset: int = 0) -> Dict[str, Any]:
             raise ValueError("Limit must be between 1 and 500")
             
         with db_session() as db:
-            # Get total count
-            total = db.query(func.count(SwingCentre.id)).scalar()
-            
-            # Get paginated results
-            swings = (
-                db.query(SwingCentre)
-                .order_by(desc(SwingCentre.detected_date))
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
-            
-            swing_data = [{
-                "id": swing.id,
-                "symbol": swing.symbol,
-                "swing_type": swing.swing_type,
-                "swing_level": float(swing.swing_level) if swing.swing_level else None,
-                "detected_date": swing.detected_date.isoformat() if swing.detected_date else None,
-                "direction": swing.direction
-            } for swing in swings]
-            
+            swing_data, pagination = _swing_page(_swing_query(db), limit, cursor, include_total)
             return {
                 "data": swing_data,
-                "pagination": {
-                    "total": total,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": (offset + len(swing_data)) < total
-                }
+                "pagination": pagination
             }
             
     except ValueError as ve:
@@ -79,19 +97,22 @@ def get_swings(limit: int = 200, offset: int = 0) -> Dict[str, Any]:
 def get_swings_by_symbol(
     symbol: str, 
     limit: int = 50, 
-    offset: int = 0,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    include_total: bool = False
 ) -> Dict[str, Any]:
     """
-    Get paginated swing data for a specific symbol with optional date filtering.
+    Get swing data for a specific symbol with optional date filtering,
+    newest first, one keyset page at a time.
     
     Args:
         symbol: Stock symbol to filter by
         limit: Maximum number of records to return (1-500)
-        offset: Number of records to skip for pagination
+        cursor: ``next_cursor`` from the previous page; omit for the first page
         start_date: Optional start date filter
         end_date: Optional end date filter
+        include_total: Add an approximate total to the pagination info
         
     Returns:
         Dictionary containing swing data and pagination info
@@ -107,46 +128,12 @@ def get_swings_by_symbol(
             raise ValueError("Limit must be between 1 and 500")
             
         with db_session() as db:
-            # Build base query
-            query = db.query(SwingCentre).filter(
-                SwingCentre.symbol == symbol.upper()
-            )
-            
-            # Apply date filters if provided
-            if start_date:
-                query = query.filter(SwingCentre.detected_date >= start_date)
-            if end_date:
-                query = query.filter(SwingCentre.detected_date <= end_date)
-            
-            # Get total count
-            total = query.count()
-            
-            # Get paginated results
-            swings = (
-                query.order_by(desc(SwingCentre.detected_date))
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
-            
-            swing_data = [{
-                "id": swing.id,
-                "symbol": swing.symbol,
-                "swing_type": swing.swing_type,
-                "swing_level": float(swing.swing_level) if swing.swing_level else None,
-                "detected_date": swing.detected_date.isoformat() if swing.detected_date else None,
-                "direction": swing.direction
-            } for swing in swings]
-            
+            query = _swing_query(db, symbol, start_date, end_date)
+            swing_data, pagination = _swing_page(query, limit, cursor, include_total)
             return {
                 "symbol": symbol.upper(),
                 "data": swing_data,
-                "pagination": {
-                    "total": total,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": (offset + len(swing_data)) < total
-                }
+                "pagination": pagination
             }
             
     except ValueError as ve:
@@ -162,6 +149,21 @@ def get_swings_by_symbol(
             detail=f"An error occurred while fetching swing data for {symbol}"
         )
 
+def export_swings(
+    fmt: str = "ndjson",
+    symbol: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Iterator[str]:
+    """
+    Stream swings as NDJSON lines or CSV, newest first, read through a
+    server-side cursor so memory stays flat for any table size.
+    """
+    rows = stream_query(lambda db: _swing_query(db, symbol, start_date, end_date).order_by(
+        SwingCentre.detected_date.desc().nullslast(), SwingCentre.id.desc()
+    ))
+    return export_lines((_swing_to_dict(swing) for swing in rows), fmt, SWING_FIELDS)
+
 def get_swing_summary() -> Dict[str, Any]:
     """
     Get summary statistics of swing data.
@@ -0,0 +1,214 @@
+"""
+Symbol Registry
+Central, array-backed symbol universe with dense integer ids.
+
+Every tracked symbol gets an id in ``range(len(registry))``. Index, sector and
+segment memberships are stored as id arrays (plus a concatenated CSR
+layout for one-shot aggregation), and per-symbol attributes live in NumPy
+columns, so sector aggregation, heatmaps and scanners can gather whole columns
+instead of looping over symbol strings.
+"""
+
+import csv
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.config import symbol_universe
+
+logger = logging.getLogger(__name__)
+
+# CSV with Symbol / Company Name / Industry columns, e.g. NSE's ind_nifty500list.csv
+NIFTY500_SYMBOLS_FILE = os.getenv("NIFTY500_SYMBOLS_FILE", "")
+
+
+class SymbolRegistry:
+    """Symbol <-> dense id mapping with membership index arrays and per-symbol columns"""
+
+    def __init__(self):
+        self.symbols: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.company_names: List[str] = []
+        self.industries: List[str] = []
+        self.exchange = "NSE"
+        # Bumped whenever symbols are added, so dependent indexes can detect changes
+        self.version = 0
+        self._groups: Dict[str, np.ndarray] = {}
+        self.group_kinds: Dict[str, Set[str]] = {}
+        self.group_names: Dict[str, str] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        self.sector_codes: List[str] = []
+        self._csr_groups: List[str] = []
+        self._csr_ids = np.zeros(0, dtype=np.int32)
+        self._csr_offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ids
+
+    # Building
+
+    def add(self, symbol: str, company_name: Optional[str] = None, industry: Optional[str] = None) -> int:
+        """Register a symbol (idempotent) and return its id"""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.company_names.append(company_name or symbol)
+            self.industries.append(industry or "")
+            self.version += 1
+        else:
+            if company_name:
+                self.company_names[symbol_id] = company_name
+            if industry:
+                self.industries[symbol_id] = industry
+        return symbol_id
+
+    def add_group(self, name: str, symbols: Iterable[str], kind: str, display_name: Optional[str] = None) -> None:
+        """Register a membership group; members keep their listed order"""
+        ids = [self.add(s) for s in symbols]
+        existing = self._groups.get(name)
+        if existing is not None:
+            ids = list(dict.fromkeys(list(existing) + ids))
+        self._groups[name] = np.array(ids, dtype=np.int32)
+        self.group_kinds.setdefault(name, set()).add(kind)
+        self.group_names[name] = display_name or self.group_names.get(name, name)
+
+    def finalize(self) -> "SymbolRegistry":
+        """Build derived columns and the CSR membership layout once all symbols are added"""
+        n = len(self.symbols)
+        self._csr_groups = list(self._groups)
+        lengths = [len(self._groups[g]) for g in self._csr_groups]
+        self._csr_offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self._csr_ids = (
+            np.concatenate([self._groups[g] for g in self._csr_groups]).astype(np.int32)
+            if self._csr_groups else np.zeros(0, dtype=np.int32)
+        )
+        # Primary sector per symbol: first sector group that lists it, -1 if none
+        sector_codes = self.groups("sector")
+        primary = np.full(n, -1, dtype=np.int32)
+        for code_id, code in reversed(list(enumerate(sector_codes))):
+            primary[self._groups[code]] = code_id
+        self.sector_codes = sector_codes
+        self._columns["sector_id"] = primary
+        self.version += 1
+        return self
+
+    @classmethod
+    def load(cls, nifty500_file: str = NIFTY500_SYMBOLS_FILE) -> "SymbolRegistry":
+        """Build the registry from app.config.symbol_universe and the optional NIFTY 500 file"""
+        registry = cls()
+        for symbol, (company_name, industry) in symbol_universe.COMPANY_INFO.items():
+            registry.add(symbol, company_name, industry)
+        if nifty500_file and os.path.exists(nifty500_file):
+            with open(nifty500_file, newline="") as f:
+                members = []
+                for row in csv.DictReader(f):
+                    symbol = (row.get("Symbol") or "").strip()
+                    if symbol:
+                        registry.add(symbol, (row.get("Company Name") or "").strip(), (row.get("Industry") or "").strip())
+                        members.append(symbol)
+            registry.add_group("NIFTY500", members, kind="index", display_name="Nifty 500")
+        for code, members in symbol_universe.SECTOR_CONSTITUENTS.items():
+            registry.add_group(code, members, kind="sector", display_name=symbol_universe.SECTOR_NAMES.get(code))
+        for code, members in symbol_universe.INDEX_CONSTITUENTS.items():
+            registry.add_group(code, members, kind="index")
+        registry.add_group("FNO", symbol_universe.FNO_SYMBOLS, kind="segment", display_name="F&O")
+        registry.add_group("N500", symbol_universe.N500_SYMBOLS, kind="segment", display_name="Nifty 500")
+        logger.info(f"Symbol registry loaded: {len(registry)} symbols, {len(registry._groups)} groups")
+        return registry.finalize()
+
+    # Lookups
+
+    def id(self, symbol: str) -> int:
+        return self._ids[symbol]
+
+    def get_id(self, symbol: str) -> Optional[int]:
+        return self._ids.get(symbol)
+
+    def ids(self, symbols: Iterable[str]) -> np.ndarray:
+        """Ids for known symbols (unknown ones are skipped)"""
+        lookup = self._ids
+        return np.array([lookup[s] for s in symbols if s in lookup], dtype=np.int32)
+
+    def symbol(self, symbol_id: int) -> str:
+        return self.symbols[symbol_id]
+
+    def info(self, symbol: str) -> Optional[Dict[str, str]]:
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            return None
+        sector_id = int(self._columns["sector_id"][symbol_id]) if "sector_id" in self._columns else -1
+        return {
+            "symbol": symbol,
+            "company_name": self.company_names[symbol_id],
+            "exchange": self.exchange,
+            "sector": self.industries[symbol_id] or (self.group_names[self.sector_codes[sector_id]] if sector_id >= 0 else ""),
+        }
+
+    # Membership
+
+    def has_group(self, name: str) -> bool:
+        return name in self._groups
+
+    def groups(self, kind: Optional[str] = None) -> List[str]:
+        return [g for g in self._groups if kind is None or kind in self.group_kinds[g]]
+
+    def member_ids(self, group: str) -> np.ndarray:
+        return self._groups.get(group, np.zeros(0, dtype=np.int32))
+
+    def members(self, group: str) -> List[str]:
+        return [self.symbols[i] for i in self.member_ids(group)]
+
+    def mask(self, group: str) -> np.ndarray:
+        """Boolean membership vector over all ids"""
+        mask = np.zeros(len(self.symbols), dtype=bool)
+        mask[self.member_ids(group)] = True
+        return mask
+
+    def groups_of(self, symbol: str, kind: Optional[str] = None) -> List[str]:
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            return []
+        return [g for g in self.groups(kind) if (self._groups[g] == symbol_id).any()]
+
+    # Columns
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def set_column(self, name: str, values: np.ndarray) -> None:
+        if len(values) != len(self.symbols):
+            raise ValueError(f"Column {name} has {len(values)} values for {len(self.symbols)} symbols")
+        self._columns[name] = values
+
+    def group_mean(self, values: np.ndarray, groups: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Mean of a per-id column within each group, ignoring NaNs, in one
+        vectorized pass over the concatenated membership arrays.
+        """
+        if not len(self._csr_ids):
+            return {}
+        gathered = values[self._csr_ids]
+        present = ~np.isnan(gathered)
+        starts = self._csr_offsets[:-1]
+        nonempty = starts < self._csr_offsets[1:]
+        sums = np.zeros(len(starts))
+        counts = np.zeros(len(starts))
+        sums[nonempty] = np.add.reduceat(np.where(present, gathered, 0.0), starts[nonempty])
+        counts[nonempty] = np.add.reduceat(present.astype(np.float64), starts[nonempty])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        wanted = set(groups) if groups is not None else None
+        return {
+            g: float(means[i]) for i, g in enumerate(self._csr_groups)
+            if (wanted is None or g in wanted) and counts[i] > 0
+        }
+
+
+# Process-wide registry, loaded once at import
+symbol_registry = SymbolRegistry.load()
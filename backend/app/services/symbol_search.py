@@ -0,0 +1,239 @@
+"""
+Symbol Search Index
+In-memory prefix and n-gram index behind the stock search endpoint.
+
+Symbols are kept in a sorted array so a prefix query is two bisections;
+company names are indexed by the words they contain (sorted, for word-prefix
+matches) and by character trigrams (posting arrays, for substring and
+typo-tolerant matches). Results are ranked: exact symbol, symbol prefix,
+name word prefix (all query words), substring, then fuzzy trigram overlap.
+Queries shorter than a trigram fall back to a linear substring scan.
+"""
+
+import bisect
+import csv
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.symbol_registry import SymbolRegistry, symbol_registry
+
+logger = logging.getLogger(__name__)
+
+# CSV with symbol, company_name, exchange and optional sector columns (e.g. NSE+BSE master)
+INSTRUMENT_MASTER_FILE = os.getenv("INSTRUMENT_MASTER_FILE", "")
+INSTRUMENT_MASTER_CHECK_SECONDS = float(os.getenv("INSTRUMENT_MASTER_CHECK_SECONDS", "30"))
+FUZZY_MIN_OVERLAP = 0.5  # fraction of query trigrams a fuzzy match must share
+
+_WORD_RE = re.compile(r"[A-Z0-9&]+")
+
+
+def _trigrams(text: str) -> List[str]:
+    """Trigrams padded at the edges, so short strings and word starts still produce grams"""
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _inner_trigrams(text: str) -> List[str]:
+    """Unpadded trigrams; every one of them occurs in any string containing ``text``"""
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+class SymbolSearchIndex:
+    """Immutable search index over a list of instrument records"""
+
+    def __init__(self, records: List[Dict[str, str]]):
+        self.records = records
+        n = len(records)
+        symbols = [r["symbol"].upper() for r in records]
+        names = [(r.get("company_name") or "").upper() for r in records]
+        self._names = names
+        self._symbols = symbols
+
+        # Sorted symbols for prefix range lookups
+        order = sorted(range(n), key=lambda i: symbols[i])
+        self._sorted_symbols = [symbols[i] for i in order]
+        self._sorted_symbol_ids = np.array(order, dtype=np.int32)
+
+        # Sorted (word, record id) pairs for name word-prefix lookups
+        words = sorted((w, i) for i, name in enumerate(names) for w in set(_WORD_RE.findall(name)))
+        self._sorted_words = [w for w, _ in words]
+        self._sorted_word_ids = np.array([i for _, i in words], dtype=np.int32)
+
+        # Trigram postings over "symbol name" for substring and fuzzy matches
+        postings: Dict[str, List[int]] = {}
+        for i in range(n):
+            for gram in set(_trigrams(f"{symbols[i]} {names[i]}")):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _prefix_range(self, keys: List[str], prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _prefix_ids(self, keys: List[str], ids: np.ndarray, prefix: str, limit: int):
+        """Record ids whose key starts with ``prefix``, in key order, lazily"""
+        lo, hi = self._prefix_range(keys, prefix)
+        for start in range(lo, hi, limit):
+            yield from ids[start:min(hi, start + limit)].tolist()
+
+    def _all_words_ids(self, words: List[str]):
+        """Records with a name word starting with each query word, full-phrase matches first"""
+        candidates = None
+        for word in sorted(set(words), key=len, reverse=True):
+            lo, hi = self._prefix_range(self._sorted_words, word)
+            ids = np.unique(self._sorted_word_ids[lo:hi])
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return
+        phrase = " ".join(words)
+        ids = candidates.tolist()
+        yield from (i for i in ids if phrase in self._names[i])
+        yield from (i for i in ids if phrase not in self._names[i])
+
+    def _scan_ids(self, q: str):
+        # Too short for trigrams: a plain scan, stopped by take() once the limit is reached
+        for i, (symbol, name) in enumerate(zip(self._symbols, self._names)):
+            if q in symbol or q in name:
+                yield i
+
+    def _substring_ids(self, q: str):
+        grams = set(_inner_trigrams(q))
+        lists = [self._postings.get(g) for g in grams]
+        if any(ids is None for ids in lists):
+            return
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return
+        for i in candidates.tolist():
+            if q in self._symbols[i] or q in self._names[i]:
+                yield i
+
+    def _fuzzy_ids(self, q: str, limit: int):
+        # Typo tolerance: count shared trigrams per record in one pass
+        grams = set(_trigrams(q))
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.records))
+        needed = max(2, int(np.ceil(len(grams) * FUZZY_MIN_OVERLAP)))
+        fuzzy = np.flatnonzero(counts >= needed)
+        if len(fuzzy) > limit:
+            fuzzy = fuzzy[np.argpartition(-counts[fuzzy], limit - 1)[:limit]]
+        yield from fuzzy[np.argsort(-counts[fuzzy], kind="stable")].tolist()
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
+        """
+        Ranked matches for ``query``. Buckets are filled best-first and each
+        stops as soon as ``limit`` results are collected, so common prefixes
+        cost O(limit) rather than O(matches).
+        """
+        q = query.strip().upper()
+        if not q or not self.records or limit <= 0:
+            return []
+        results: List[int] = []
+        seen = set()
+
+        def take(ids) -> bool:
+            for i in ids:
+                if i not in seen:
+                    seen.add(i)
+                    results.append(i)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        # Exact symbol first, then other symbols with the prefix
+        if take(self._prefix_ids(self._sorted_symbols, self._sorted_symbol_ids, q, limit)):
+            return [self.records[i] for i in results]
+        # Name words: every query word must start some word of the name
+        words = _WORD_RE.findall(q)
+        if len(words) == 1:
+            found = take(self._prefix_ids(self._sorted_words, self._sorted_word_ids, words[0], limit))
+        else:
+            found = bool(words) and take(self._all_words_ids(words))
+        if found:
+            return [self.records[i] for i in results]
+        if len(q) < 3:
+            take(self._scan_ids(q))
+        elif not take(self._substring_ids(q)):
+            take(self._fuzzy_ids(q, limit))
+        return [self.records[i] for i in results]
+
+
+def load_instrument_master(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="") as f:
+        return [
+            {
+                "symbol": row["symbol"].strip(),
+                "company_name": (row.get("company_name") or row["symbol"]).strip(),
+                "exchange": (row.get("exchange") or "NSE").strip(),
+                "sector": (row.get("sector") or "").strip(),
+            }
+            for row in csv.DictReader(f) if row.get("symbol")
+        ]
+
+
+class SymbolSearchService:
+    """Keeps a search index in sync with the instrument master (file or symbol registry)"""
+
+    def __init__(self, registry: SymbolRegistry = symbol_registry, master_file: str = INSTRUMENT_MASTER_FILE):
+        self.registry = registry
+        self.master_file = master_file
+        self._lock = threading.Lock()
+        self._index: Optional[SymbolSearchIndex] = None
+        self._source_version = None
+        self._checked_at = 0.0
+
+    def _current_version(self):
+        if self.master_file and os.path.exists(self.master_file):
+            return ("file", os.path.getmtime(self.master_file))
+        return ("registry", self.registry.version)
+
+    def _records(self) -> List[Dict[str, str]]:
+        if self.master_file and os.path.exists(self.master_file):
+            return load_instrument_master(self.master_file)
+        return [self.registry.info(symbol) for symbol in self.registry.symbols]
+
+    def refresh(self, force: bool = False) -> SymbolSearchIndex:
+        """Rebuild the index when the instrument master has changed"""
+        with self._lock:
+            version = self._current_version()
+            if force or self._index is None or version != self._source_version:
+                started = time.perf_counter()
+                self._index = SymbolSearchIndex(self._records())
+                self._source_version = version
+                logger.info(f"Symbol search index built: {len(self._index)} instruments in {(time.perf_counter() - started) * 1000:.1f} ms")
+            self._checked_at = time.monotonic()
+            return self._index
+
+    def index(self) -> SymbolSearchIndex:
+        index = self._index
+        if index is None:
+            return self.refresh()
+        # File mtimes are only polled periodically; registry changes are O(1) to detect
+        if self.master_file and time.monotonic() - self._checked_at < INSTRUMENT_MASTER_CHECK_SECONDS:
+            return index
+        self._checked_at = time.monotonic()
+        if self._current_version() != self._source_version:
+            return self.refresh()
+        return index
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
+        return self.index().search(query, limit)
+
+
+# Process-wide search service used by the watchlist endpoints
+symbol_search = SymbolSearchService()
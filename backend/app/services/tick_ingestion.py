@@ -0,0 +1,327 @@
+"""
+Tick Ingestion Service
+Streams live ticks into the in-memory market state.
+
+A tick source (the Fyers data WebSocket, or a recorded-tick replayer in tests
+and offline development) pushes raw messages into a buffer; a single consumer
+drains it in batches and applies each batch to ``market_state`` with
+vectorized column writes, which keeps per-tick cost to a dict parse.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from app.services.market_state import MarketState, market_state
+from app.services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+try:
+    from fyers_apiv3.FyersWebsocket import data_ws
+    FYERS_WS_AVAILABLE = True
+except ImportError:
+    data_ws = None
+    FYERS_WS_AVAILABLE = False
+
+TICK_INGESTION_ENABLED = os.getenv("TICK_INGESTION_ENABLED", "false").lower() == "true"
+TICK_REPLAY_FILE = os.getenv("TICK_REPLAY_FILE", "")
+TICK_REPLAY_SPEED = float(os.getenv("TICK_REPLAY_SPEED", "1.0"))
+TICK_RECORD_FILE = os.getenv("TICK_RECORD_FILE", "")
+TICK_BATCH_SIZE = int(os.getenv("TICK_BATCH_SIZE", "2000"))
+TICK_BUFFER_SIZE = int(os.getenv("TICK_BUFFER_SIZE", "100000"))
+
+_NAN = float("nan")
+
+
+def to_display_symbol(symbol: str) -> str:
+    """NSE:RELIANCE-EQ -> RELIANCE"""
+    if ":" in symbol:
+        symbol = symbol.split(":", 1)[1]
+    return symbol[:-3] if symbol.endswith("-EQ") else symbol
+
+
+def to_fyers_symbol(symbol: str) -> str:
+    """RELIANCE -> NSE:RELIANCE-EQ"""
+    return symbol if ":" in symbol else f"NSE:{symbol}-EQ"
+
+
+def load_universe() -> List[str]:
+    """Symbols to subscribe: the NIFTY 500 list when configured, else the whole registry"""
+    if symbol_registry.has_group("NIFTY500"):
+        return symbol_registry.members("NIFTY500")
+    return list(symbol_registry.symbols)
+
+
+class TickIngestionService:
+    """Buffers raw tick messages from any thread and applies them to the market state in batches"""
+
+    def __init__(self, state: MarketState = market_state, batch_size: int = TICK_BATCH_SIZE,
+                 buffer_size: int = TICK_BUFFER_SIZE, record_path: str = TICK_RECORD_FILE):
+        self.state = state
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.record_path = record_path
+        self._buffer: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wakeup_pending = False
+        self._busy = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._source_task: Optional[asyncio.Task] = None
+        self._symbol_names: Dict[str, str] = {}
+        self._listeners: List[Callable[[List[str], List[float]], None]] = []
+        self.received = 0
+        self.applied = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.batches = 0
+        self.started_at: Optional[float] = None
+
+    def submit(self, message: Dict[str, Any]) -> None:
+        """Accept one raw tick; safe to call from the WebSocket client's thread"""
+        self.received += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped += 1
+            return
+        self._buffer.append(message)
+        if not self._wakeup_pending and self._loop is not None:
+            self._wakeup_pending = True
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def add_listener(self, listener: Callable[[List[str], List[float]], None]) -> None:
+        """Call ``listener(symbols, ltp)`` after every applied batch (e.g. the alert engine)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def apply_batch(self, messages: List[Dict[str, Any]]) -> int:
+        """Parse raw ticks and write them into the market state; returns ticks applied"""
+        names = self._symbol_names
+        symbols, ltp, volume, oi, prev_close = [], [], [], [], []
+        for m in messages:
+            raw_symbol = m.get("symbol")
+            price = m.get("ltp")
+            if raw_symbol is None or price is None:
+                self.skipped += 1
+                continue
+            name = names.get(raw_symbol)
+            if name is None:
+                name = names[raw_symbol] = to_display_symbol(raw_symbol)
+            symbols.append(name)
+            ltp.append(price)
+            volume.append(m.get("vol_traded_today", _NAN))
+            oi.append(m.get("oi", _NAN))
+            prev_close.append(m.get("prev_close_price", _NAN))
+        if not symbols:
+            return 0
+
+        self.state.apply(
+            self.state.slots(symbols),
+            np.array(ltp, dtype=np.float64),
+            np.array(volume, dtype=np.float64),
+            np.array(oi, dtype=np.float64),
+            np.array(prev_close, dtype=np.float64),
+        )
+        self.applied += len(symbols)
+        self.batches += 1
+        for listener in self._listeners:
+            try:
+                listener(symbols, ltp)
+            except Exception as e:
+                logger.error(f"Tick listener failed: {str(e)}")
+        return len(symbols)
+
+    async def _record(self, messages: List[Dict[str, Any]]) -> None:
+        """Append a batch to the recording file; encoding and the write run in a worker thread"""
+        try:
+            await asyncio.to_thread(self._write_records, messages, time.time())
+        except OSError as e:
+            logger.error(f"Failed to record {len(messages)} ticks: {str(e)}")
+
+    def _write_records(self, messages: List[Dict[str, Any]], now: float) -> None:
+        lines = "".join(json.dumps({"t": now, **m}) + "\n" for m in messages)
+        with open(self.record_path, "a") as f:
+            f.write(lines)
+
+    async def _consume(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            self._wakeup_pending = False
+            while self._buffer:
+                count = min(len(self._buffer), self.batch_size)
+                batch = [self._buffer.popleft() for _ in range(count)]
+                self._busy = True
+                try:
+                    self.apply_batch(batch)
+                except Exception as e:
+                    logger.error(f"Failed to apply tick batch of {count}: {str(e)}")
+                try:
+                    if self.record_path:
+                        await self._record(batch)
+                    else:
+                        await asyncio.sleep(0)
+                finally:
+                    self._busy = False
+
+    async def start(self, source: Optional["TickSource"] = None) -> None:
+        """Start the batch consumer and, if given, a source feeding it"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.started_at = time.time()
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume())
+        if source is not None:
+            self._source_task = asyncio.create_task(source.run(self.submit))
+
+    async def drain(self) -> None:
+        """Wait until everything submitted so far has been applied (and recorded)"""
+        while self._buffer or self._wakeup_pending or self._busy:
+            await asyncio.sleep(0.001)
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._source_task, self._consumer) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._source_task = self._consumer = None
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "buffered": len(self._buffer),
+            "symbols": len(self.state),
+            "ticks_per_second": round(self.applied / elapsed, 1) if elapsed else 0.0,
+            "live": self.state.is_live(),
+        }
+
+
+class TickSource(ABC):
+    """Something that pushes raw tick messages into a sink until cancelled"""
+
+    @abstractmethod
+    async def run(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        """Feed ``sink`` until the source is exhausted or the task is cancelled"""
+
+
+def load_ticks(path: str) -> Iterator[Dict[str, Any]]:
+    """Read ticks recorded as one JSON object per line (see TICK_RECORD_FILE)"""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class TickReplayer(TickSource):
+    """
+    Replays recorded ticks in place of the live feed. Each tick may carry a
+    ``t`` epoch timestamp; gaps are reproduced divided by ``speed``, and
+    ``speed=0`` replays as fast as the consumer can take them.
+    """
+
+    def __init__(self, ticks: Union[str, Iterable[Dict[str, Any]]], speed: float = TICK_REPLAY_SPEED,
+                 yield_every: int = 1000):
+        self.ticks = ticks
+        self.speed = speed
+        self.yield_every = yield_every
+        self.replayed = 0
+
+    async def run(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        ticks = load_ticks(self.ticks) if isinstance(self.ticks, str) else self.ticks
+        previous_t = None
+        for tick in ticks:
+            t = tick.get("t")
+            if self.speed > 0 and t is not None and previous_t is not None and t > previous_t:
+                await asyncio.sleep((t - previous_t) / self.speed)
+            elif self.replayed % self.yield_every == 0:
+                await asyncio.sleep(0)
+            previous_t = t if t is not None else previous_t
+            sink(tick)
+            self.replayed += 1
+
+
+class FyersTickSource(TickSource):
+    """Fyers data WebSocket subscription for the configured symbol universe"""
+
+    def __init__(self, symbols: List[str], token_provider: Callable[[], Optional[str]],
+                 client_id: str, token_poll_seconds: float = 5.0):
+        self.symbols = [to_fyers_symbol(s) for s in symbols]
+        self.token_provider = token_provider
+        self.client_id = client_id
+        self.token_poll_seconds = token_poll_seconds
+        self.socket = None
+
+    async def run(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        if not FYERS_WS_AVAILABLE:
+            logger.warning("fyers_apiv3 is not installed; live tick ingestion disabled")
+            return
+
+        # The access token only exists after a user completes the Fyers login
+        token = self.token_provider()
+        while not token:
+            await asyncio.sleep(self.token_poll_seconds)
+            token = self.token_provider()
+
+        def on_message(message):
+            if isinstance(message, dict):
+                sink(message)
+
+        def on_connect():
+            self.socket.subscribe(symbols=self.symbols, data_type="SymbolUpdate")
+            logger.info(f"Subscribed to {len(self.symbols)} symbols on the Fyers data socket")
+
+        self.socket = data_ws.FyersDataSocket(
+            access_token=f"{self.client_id}:{token}",
+            log_path="",
+            litemode=False,
+            write_to_file=False,
+            reconnect=True,
+            on_connect=on_connect,
+            on_close=lambda msg: logger.info(f"Fyers data socket closed: {msg}"),
+            on_error=lambda msg: logger.error(f"Fyers data socket error: {msg}"),
+            on_message=on_message,
+        )
+        try:
+            # The SDK runs its own thread; messages arrive through on_message
+            await asyncio.to_thread(self.socket.connect)
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            try:
+                self.socket.close_connection()
+            except Exception as e:
+                logger.error(f"Failed to close Fyers data socket: {str(e)}")
+
+
+# Process-wide ingestion service feeding market_state
+tick_ingestion = TickIngestionService()
+
+
+async def start_tick_ingestion() -> None:
+    """Start the configured tick source: a replay file, the live Fyers feed, or nothing"""
+    if TICK_REPLAY_FILE:
+        await tick_ingestion.start(TickReplayer(TICK_REPLAY_FILE))
+        logger.info(f"Replaying ticks from {TICK_REPLAY_FILE}")
+    elif TICK_INGESTION_ENABLED:
+        from app.api.fyers import FYERS_CLIENT_ID, get_fyers_access_token
+        universe = load_universe()
+        market_state.add_symbols(universe)
+        await tick_ingestion.start(FyersTickSource(universe, get_fyers_access_token, FYERS_CLIENT_ID))
+        logger.info(f"Live tick ingestion started for {len(universe)} symbols")
+
+
+async def stop_tick_ingestion() -> None:
+    await tick_ingestion.stop()
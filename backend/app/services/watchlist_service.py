@@ -1,12 +1,33 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import and_, func, insert, select, text
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
+import threading
+import time
 import uuid
 from datetime import datetime
 
 from ..db.models import Watchlist, WatchlistItem, User, Alert, PriceHistory
 from ..db.connection import db_session
+from ..utils.cache import cache
+from .alert_engine import alert_engine
+from .market_state import market_state
+from .symbol_search import symbol_search
+
+# Tickers per UPDATE ... FROM (VALUES ...) statement
+PRICE_UPDATE_CHUNK_SIZE = 1000
+# Items shown per watchlist in the overview, and how long a user's overview is cached
+WATCHLIST_PREVIEW_SIZE = 10
+WATCHLIST_VIEW_TTL_SECONDS = 300
+
+# Latest persisted price fields by watchlist item id, laid over the cached
+# overview so price pushes don't have to evict every user's cache entry.
+# Kept in push order with the monotonic push time: an entry older than
+# WATCHLIST_VIEW_TTL_SECONDS is dropped, since every overview cached before
+# that push has expired and reloads read the price from the database.
+_item_prices: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_item_prices_lock = threading.Lock()
 
 
 class WatchlistService:
@@ -15,37 +36,90 @@ class WatchlistService:
     @staticmethod
     def get_user_watchlists(user_id: str) -> List[Dict[str, Any]]:
         """Get all watchlists for a user"""
+        return [
+            {**watchlist, "stocks": [
+                WatchlistService._apply_live_price(WatchlistService._apply_pushed_price(dict(stock)))
+                for stock in watchlist["stocks"]
+            ]}
+            for watchlist in WatchlistService._load_user_watchlists(str(user_id))
+        ]
+    
+    @staticmethod
+    @cache.cached(ttl_seconds=WATCHLIST_VIEW_TTL_SECONDS)
+    def _load_user_watchlists(user_id: str) -> List[Dict[str, Any]]:
+        """
+        Watchlists with item counts and a preview of the latest items, in one
+        query: items are ranked and counted per watchlist with window functions
+        and outer-joined to the user's watchlists. Cached per user; membership
+        and item mutations call _invalidate_user, price pushes are overlaid
+        by get_user_watchlists instead.
+        """
+        user_id = uuid.UUID(user_id)
+        ranked = select(
+            WatchlistItem,
+            func.row_number().over(
+                partition_by=WatchlistItem.watchlist_id,
+                order_by=(WatchlistItem.created_at.desc(), WatchlistItem.id)
+            ).label("position"),
+            func.count().over(partition_by=WatchlistItem.watchlist_id).label("items_count")
+        ).join(Watchlist, WatchlistItem.watchlist_id == Watchlist.id).where(
+            Watchlist.user_id == user_id
+        ).subquery()
+        item = aliased(WatchlistItem, ranked)
+        
         with db_session() as db:
-            watchlists = db.query(Watchlist).filter(
+            rows = db.query(Watchlist, item, ranked.c.items_count).outerjoin(
+                ranked, and_(ranked.c.watchlist_id == Watchlist.id, ranked.c.position <= WATCHLIST_PREVIEW_SIZE)
+            ).filter(
                 Watchlist.user_id == user_id
-            ).order_by(Watchlist.is_default.desc(), Watchlist.created_at).all()
+            ).order_by(Watchlist.is_default.desc(), Watchlist.created_at, Watchlist.id, ranked.c.position).all()
             
             result = []
-            for watchlist in watchlists:
-                # Get items count for each watchlist
-                items_count = db.query(WatchlistItem).filter(
-                    WatchlistItem.watchlist_id == watchlist.id
-                ).count()
-                
-                # Get sample items for preview
-                items = db.query(WatchlistItem).filter(
-                    WatchlistItem.watchlist_id == watchlist.id
-                ).limit(10).all()
-                
-                result.append({
-                    "id": str(watchlist.id),
-                    "user_id": str(watchlist.user_id),
-                    "name": watchlist.name,
-                    "description": watchlist.description,
-                    "is_default": watchlist.is_default,
-                    "created_at": watchlist.created_at.isoformat() if watchlist.created_at else None,
-                    "updated_at": watchlist.updated_at.isoformat() if watchlist.updated_at else None,
-                    "items_count": items_count,
-                    "stocks": [WatchlistService._format_watchlist_item(item) for item in items]
-                })
+            by_id = {}
+            for watchlist, watchlist_item, items_count in rows:
+                entry = by_id.get(watchlist.id)
+                if entry is None:
+                    entry = by_id[watchlist.id] = {
+                        "id": str(watchlist.id),
+                        "user_id": str(watchlist.user_id),
+                        "name": watchlist.name,
+                        "description": watchlist.description,
+                        "is_default": watchlist.is_default,
+                        "created_at": watchlist.created_at.isoformat() if watchlist.created_at else None,
+                        "updated_at": watchlist.updated_at.isoformat() if watchlist.updated_at else None,
+                        "items_count": items_count or 0,
+                        "stocks": []
+                    }
+                    result.append(entry)
+                if watchlist_item is not None:
+                    entry["stocks"].append(WatchlistService._item_fields(watchlist_item))
             
             return result
     
+    @staticmethod
+    def _invalidate_user(user_id: str) -> None:
+        WatchlistService._load_user_watchlists.invalidate(str(user_id))
+    
+    @staticmethod
+    def _remember_prices(updated: Dict[str, Dict[str, Any]]) -> None:
+        now = time.monotonic()
+        cutoff = now - WATCHLIST_VIEW_TTL_SECONDS
+        with _item_prices_lock:
+            for item_id, fields in updated.items():
+                _item_prices.pop(item_id, None)
+                _item_prices[item_id] = (now, fields)
+            while _item_prices:
+                oldest = next(iter(_item_prices))
+                if _item_prices[oldest][0] > cutoff:
+                    break
+                del _item_prices[oldest]
+    
+    @staticmethod
+    def _forget_prices(item_ids) -> None:
+        with _item_prices_lock:
+            for item_id in item_ids:
+                _item_prices.pop(str(uuid.UUID(str(item_id))), None)
+    
     @staticmethod
     def get_watchlist_details(watchlist_id: str, user_id: str) -> Dict[str, Any]:
         """Get detailed watchlist with all items"""
@@ -97,6 +171,7 @@ class WatchlistService:
             try:
                 db.add(watchlist)
                 db.commit()
+                WatchlistService._invalidate_user(user_id)
                 db.refresh(watchlist)
                 
                 return {
@@ -144,6 +219,7 @@ class WatchlistService:
             
             try:
                 db.commit()
+                WatchlistService._invalidate_user(user_id)
                 db.refresh(watchlist)
                 
                 return {
@@ -171,9 +247,13 @@ class WatchlistService:
             if not watchlist:
                 raise HTTPException(status_code=404, detail="Watchlist not found")
             
+            item_ids = [row[0] for row in db.query(WatchlistItem.id).filter(WatchlistItem.watchlist_id == watchlist.id)]
             # Delete will cascade to watchlist_items and alerts due to foreign key constraints
             db.delete(watchlist)
             db.commit()
+            WatchlistService._forget_prices(item_ids)
+            WatchlistService._invalidate_user(user_id)
+            alert_engine.invalidate()
             
             return True
     
@@ -223,6 +303,7 @@ class WatchlistService:
             
             db.add(item)
             db.commit()
+            WatchlistService._invalidate_user(user_id)
             db.refresh(item)
             
             return WatchlistService._format_watchlist_item(item)
@@ -251,7 +332,10 @@ class WatchlistService:
             item.updated_at = datetime.utcnow()
             
             db.commit()
+            WatchlistService._invalidate_user(user_id)
             db.refresh(item)
+            if alert_enabled is not None:
+                alert_engine.invalidate()
             
             return WatchlistService._format_watchlist_item(item)
     
@@ -270,112 +354,113 @@ class WatchlistService:
             
             db.delete(item)
             db.commit()
+            WatchlistService._forget_prices([item.id])
+            WatchlistService._invalidate_user(user_id)
+            alert_engine.invalidate()
             
             return True
     
     @staticmethod
     def search_stocks(query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search for stocks (placeholder - integrate with actual stock data source)"""
-        # TODO: Integrate with actual stock database or API
-        # For now, return mock data based on query
-        mock_stocks = [
-            {"symbol": "RELIANCE", "company_name": "Reliance Industries Limited", "exchange": "NSE", "sector": "Energy"},
-            {"symbol": "TCS", "company_name": "Tata Consultancy Services Limited", "exchange": "NSE", "sector": "IT"},
-            {"symbol": "HDFCBANK", "company_name": "HDFC Bank Limited", "exchange": "NSE", "sector": "Banking"},
-            {"symbol": "INFY", "company_name": "Infosys Limited", "exchange": "NSE", "sector": "IT"},
-            {"symbol": "ICICIBANK", "company_name": "ICICI Bank Limited", "exchange": "NSE", "sector": "Banking"},
-            {"symbol": "HINDUNILVR", "company_name": "Hindustan Unilever Limited", "exchange": "NSE", "sector": "FMCG"},
-            {"symbol": "ITC", "company_name": "ITC Limited", "exchange": "NSE", "sector": "FMCG"},
-            {"symbol": "SBIN", "company_name": "State Bank of India", "exchange": "NSE", "sector": "Banking"},
-            {"symbol": "BHARTIARTL", "company_name": "Bharti Airtel Limited", "exchange": "NSE", "sector": "Telecom"},
-            {"symbol": "KOTAKBANK", "company_name": "Kotak Mahindra Bank Limited", "exchange": "NSE", "sector": "Banking"}
-        ]
-        
-        query_upper = query.upper()
-        filtered_stocks = [
-            stock for stock in mock_stocks 
-            if query_upper in stock["symbol"] or query_upper in stock["company_name"].upper()
-        ]
-        
-        return filtered_stocks[:limit]
+        """Search stocks by symbol prefix or company name (ranked, typo tolerant)"""
+        return symbol_search.search(query, limit)
     
     @staticmethod
     def update_stock_prices(ticker_prices: Dict[str, float]) -> int:
         """Update stock prices in watchlist items and price history"""
         with db_session() as db:
-            updated_count = 0
-            current_time = datetime.utcnow()
-            
-            for ticker, price in ticker_prices.items():
-                # Add to price history
-                price_history = PriceHistory(
-                    ticker=ticker.upper(),
-                    price=price,
-                    fetched_at=current_time
-                )
-                db.add(price_history)
-                
-                # Update watchlist items
-                items = db.query(WatchlistItem).filter(
-                    WatchlistItem.ticker == ticker.upper()
-                ).all()
-                
-                for item in items:
-                    old_price = item.last_price
-                    item.last_price = price
-                    item.last_price_at = current_time
-                    
-                    # Calculate percentage change
-                    if old_price and old_price > 0:
-                        item.percent_change = ((price - old_price) / old_price) * 100
-                    
-                    updated_count += 1
-            
-            db.commit()
-            return updated_count
+            updated = WatchlistService._write_prices(db, ticker_prices, datetime.utcnow())
+        # Committed: cached overviews pick the new prices up from here
+        WatchlistService._remember_prices(updated)
+        return len(updated)
+    
+    @staticmethod
+    def apply_price_updates(ticker_prices: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Persist a price push and fire the alerts it crosses: bulk price
+        history insert, one set-based watchlist item update per chunk, and a
+        single in-memory pass over the alert engine. The prices and the fired
+        alerts are written in one transaction.
+        """
+        alert_engine.ensure_loaded()
+        fired = []
+        try:
+            with db_session() as db:
+                updated = WatchlistService._write_prices(db, ticker_prices, datetime.utcnow())
+                fired = alert_engine.on_prices(ticker_prices, db=db)
+        except Exception:
+            # The fired alerts were rolled back with the prices; rebuild the index from the database
+            alert_engine.invalidate()
+            raise
+        finally:
+            alert_engine.settle(fired)
+        WatchlistService._remember_prices(updated)
+        triggered_alerts = [{**alert, "triggered_at": alert["triggered_at"].isoformat()} for alert in fired]
+        return {"updated_count": len(updated), "triggered_alerts": triggered_alerts}
+    
+    @staticmethod
+    def _write_prices(db: Session, ticker_prices: Dict[str, float], current_time: datetime) -> Dict[str, Dict[str, Any]]:
+        """Write a price push; returns the new price fields of every updated item by item id"""
+        prices = [(ticker.upper(), float(price)) for ticker, price in ticker_prices.items()]
+        if not prices:
+            return {}
+        
+        db.execute(insert(PriceHistory), [
+            {"ticker": ticker, "price": price, "fetched_at": current_time} for ticker, price in prices
+        ])
+        
+        # percent_change is computed against the previous last_price (SET sees the old row)
+        updated = {}
+        for start in range(0, len(prices), PRICE_UPDATE_CHUNK_SIZE):
+            chunk = prices[start:start + PRICE_UPDATE_CHUNK_SIZE]
+            values = " UNION ALL ".join(
+                f"SELECT :t{i} AS ticker, CAST(:p{i} AS NUMERIC) AS price" for i in range(len(chunk))
+            )
+            params = {"now": current_time}
+            for i, (ticker, price) in enumerate(chunk):
+                params[f"t{i}"] = ticker
+                params[f"p{i}"] = price
+            result = db.execute(text(f"""
+                UPDATE watchlist_items AS wi
+                SET percent_change = CASE WHEN wi.last_price > 0
+                        THEN (v.price - wi.last_price) * 100.0 / wi.last_price
+                        ELSE wi.percent_change END,
+                    last_price = v.price,
+                    last_price_at = :now
+                FROM ({values}) AS v
+                WHERE wi.ticker = v.ticker
+                RETURNING id, last_price, percent_change
+            """), params)
+            for item_id, last_price, percent_change in result:
+                updated[str(uuid.UUID(str(item_id)))] = {
+                    "current_price": float(last_price) if last_price else None,
+                    "price_change_percent": float(percent_change) if percent_change else 0.0,
+                    "last_updated": current_time.isoformat(),
+                }
+        return updated
+    
+    @staticmethod
+    def _fire_alerts(ticker_prices: Dict[str, float]) -> List[Dict[str, Any]]:
+        # Fired alerts are deactivated in the database by the engine's batched writer
+        alert_engine.ensure_loaded()
+        return [
+            {**alert, "triggered_at": alert["triggered_at"].isoformat()}
+            for alert in alert_engine.on_prices(ticker_prices)
+        ]
     
     @staticmethod
     def check_price_alerts(ticker: str, price: float) -> List[Dict[str, Any]]:
         """Check and trigger price alerts"""
-        with db_session() as db:
-            # Get all active alerts for this ticker
-            alerts = db.query(Alert).join(WatchlistItem).filter(
-                WatchlistItem.ticker == ticker.upper(),
-                Alert.is_active == True,
-                WatchlistItem.alert_enabled == True
-            ).all()
-            
-            triggered_alerts = []
-            
-            for alert in alerts:
-                should_trigger = False
-                
-                if alert.alert_type == "price_above" and alert.comparison == "gte" and price >= alert.threshold:
-                    should_trigger = True
-                elif alert.alert_type == "price_below" and alert.comparison == "lte" and price <= alert.threshold:
-                    should_trigger = True
-                
-                if should_trigger:
-                    alert.last_triggered_at = datetime.utcnow()
-                    alert.is_active = False  # Deactivate after triggering
-                    
-                    triggered_alerts.append({
-                        "alert_id": str(alert.id),
-                        "ticker": ticker,
-                        "alert_type": alert.alert_type,
-                        "threshold": float(alert.threshold),
-                        "current_price": price,
-                        "triggered_at": alert.last_triggered_at.isoformat()
-                    })
-            
-            if triggered_alerts:
-                db.commit()
-            
-            return triggered_alerts
+        return WatchlistService._fire_alerts({ticker: price})
     
     @staticmethod
     def _format_watchlist_item(item: WatchlistItem) -> Dict[str, Any]:
         """Format watchlist item for API response"""
+        return WatchlistService._apply_live_price(WatchlistService._item_fields(item))
+    
+    @staticmethod
+    def _item_fields(item: WatchlistItem) -> Dict[str, Any]:
+        """Persisted fields of a watchlist item in API shape"""
         return {
             "id": str(item.id),
             "symbol": item.ticker,
@@ -393,4 +478,25 @@ class WatchlistService:
             "notes": item.note,
             "last_updated": item.last_price_at.isoformat() if item.last_price_at else None,
             "created_at": item.created_at.isoformat() if item.created_at else None
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def _apply_pushed_price(formatted: Dict[str, Any]) -> Dict[str, Any]:
+        """Prefer a price pushed after the overview was cached"""
+        entry = _item_prices.get(formatted["id"])
+        if entry and (formatted["last_updated"] or "") <= entry[1]["last_updated"]:
+            formatted.update(entry[1])
+        return formatted
+    
+    @staticmethod
+    def _apply_live_price(formatted: Dict[str, Any]) -> Dict[str, Any]:
+        """Prefer the live tick over the last persisted price"""
+        live = market_state.get(formatted["symbol"]) if market_state.is_live() else None
+        if live:
+            formatted["current_price"] = live["price"]
+            if live["prev_close"]:
+                formatted["price_change"] = round(live["price"] - live["prev_close"], 2)
+                formatted["price_change_percent"] = live["change"]
+            formatted["volume"] = live["volume"] or 0
+            formatted["last_updated"] = datetime.fromtimestamp(live["updated_at"]).isoformat()
+        return formatted
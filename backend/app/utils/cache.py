@@ -3,30 +3,66 @@ from functools import wraps
 import time
 
 _cache = {}
-_cache_timestamps = {}
+_cache_expires_at = {}
+
+
+def _make_key(func, args, kwargs):
+    # Create a cache key based on function name and arguments
+    return str(func.__name__) + str(args) + str(kwargs)
+
 
 class Cache:
     @staticmethod
     def cached(ttl_seconds=300):
-        """Cache decorator with time-to-live in seconds"""
+        """Cache decorator with time-to-live in seconds
+
+        The wrapped function also gets a ``refresh(*args, _ttl_seconds=None, **kwargs)``
+        attribute that recomputes the value and publishes it into the cache, so a
+        background job can keep entries warm and requests stay pure lookups.
+        ``invalidate(*args, **kwargs)`` drops one entry and ``invalidate_all()``
+        drops every entry of the function, for callers that know the data changed.
+        """
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                # Create a cache key based on function name and arguments
-                key = str(func.__name__) + str(args) + str(kwargs)
-                
+                key = _make_key(func, args, kwargs)
+
                 # Check if result is in cache and not expired
                 current_time = time.time()
-                if key in _cache and current_time - _cache_timestamps.get(key, 0) < ttl_seconds:
+                if key in _cache and current_time < _cache_expires_at.get(key, 0):
                     return _cache[key]
-                
+
                 # Call the function and cache the result
                 result = func(*args, **kwargs)
                 _cache[key] = result
-                _cache_timestamps[key] = current_time
+                _cache_expires_at[key] = current_time + ttl_seconds
                 return result
+
+            def refresh(*args, _ttl_seconds=None, **kwargs):
+                key = _make_key(func, args, kwargs)
+                result = func(*args, **kwargs)
+                _cache[key] = result
+                _cache_expires_at[key] = time.time() + (ttl_seconds if _ttl_seconds is None else _ttl_seconds)
+                return result
+
+            def invalidate(*args, **kwargs):
+                key = _make_key(func, args, kwargs)
+                _cache.pop(key, None)
+                _cache_expires_at.pop(key, None)
+
+            def invalidate_all():
+                prefix = str(func.__name__) + "("
+                # Snapshot the keys first: other threads may add entries while we scan
+                for key in [k for k in list(_cache) if k.startswith(prefix)]:
+                    _cache.pop(key, None)
+                    _cache_expires_at.pop(key, None)
+
+            wrapper.refresh = refresh
+            wrapper.invalidate = invalidate
+            wrapper.invalidate_all = invalidate_all
+            wrapper.ttl_seconds = ttl_seconds
             return wrapper
         return decorator
 
 # Create a singleton instance
-cache = Cache()
\ No newline at end of file
+cache = Cache()
@@ -0,0 +1,46 @@
+# Bounded fan-out helper for composite endpoints
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, TimeoutError, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+_worker_state = threading.local()
+
+
+def _run_in_worker(func: Callable[[], Any]) -> Any:
+    _worker_state.active = True
+    try:
+        return func()
+    finally:
+        _worker_state.active = False
+
+
+def fan_out(calls: Dict[str, Callable[[], Any]], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Run independent zero-argument callables concurrently and return their results by key
+
+    Latency is that of the slowest call rather than the sum. The pool is shared
+    and bounded by FANOUT_MAX_WORKERS, so each call should hold at most one
+    database connection. When invoked from inside a fan-out worker the calls
+    run serially, which keeps nested composites from deadlocking the pool.
+    The first exception raised by any call is propagated; ``timeout`` bounds the
+    whole fan-out. Either way, calls that have not started yet are cancelled.
+    """
+    if len(calls) <= 1 or getattr(_worker_state, "active", False):
+        return {key: func() for key, func in calls.items()}
+
+    futures = {key: _executor.submit(_run_in_worker, func) for key, func in calls.items()}
+    done, pending = wait(futures.values(), timeout=timeout, return_when=FIRST_EXCEPTION)
+    for future in pending:
+        future.cancel()
+    for future in futures.values():
+        if future in done and future.exception() is not None:
+            raise future.exception()
+    if pending:
+        raise TimeoutError(f"{len(pending)} of {len(futures)} calls did not finish within {timeout}s")
+    return {key: future.result() for key, future in futures.items()}
@@ -0,0 +1,105 @@
+# Conditional GET (ETag / 304) middleware
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+HTTP_CACHE_PREFIX = os.getenv("HTTP_CACHE_PREFIX", "/api")
+
+# Headers that are kept on a 304 response (RFC 9110 section 15.4.5)
+_NOT_MODIFIED_HEADERS = {b"cache-control", b"content-location", b"date", b"etag", b"expires", b"vary"}
+
+
+def compute_etag(body: bytes) -> str:
+    """Cheap content hash of a response body, formatted as a weak ETag"""
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """
+    ASGI middleware that adds ETag and Cache-Control headers to buffered GET
+    responses and answers a matching If-None-Match with 304 Not Modified.
+
+    Streaming responses (SSE, exports) are passed through untouched, so the
+    middleware is safe to install in front of every router.
+    """
+
+    def __init__(self, app, max_age: int = HTTP_CACHE_MAX_AGE, path_prefix: str = HTTP_CACHE_PREFIX):
+        self.app = app
+        self.cache_control = f"private, max-age={max_age}, must-revalidate".encode()
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        start_message: Dict = {}
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers", []))
+            if message.get("more_body", False) or any(k.lower() == b"etag" for k, _ in headers):
+                # Streaming body or an endpoint that manages its own validators
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            etag = compute_etag(body)
+            headers.append((b"etag", etag.encode()))
+            if not any(k.lower() == b"cache-control" for k, _ in headers):
+                headers.append((b"cache-control", self.cache_control))
+
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                headers = [(k, v) for k, v in headers if k.lower() in _NOT_MODIFIED_HEADERS]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start_message, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
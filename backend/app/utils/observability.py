@@ -1,22 +1,64 @@
 # Simple observability implementation
 import functools
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
-def observe(func):
-    """Decorator to log function execution time and errors"""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        try:
-            result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            logger.info(f"{func.__name__} executed in {execution_time:.2f} seconds")
-            return result
-        except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"{func.__name__} failed after {execution_time:.2f} seconds with error: {str(e)}")
-            raise
-    return wrapper
\ No newline at end of file
+# Per-name timing metrics, e.g. {"MD.get_highpower": {"count": 3, ...}}
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def record_timing(name, duration, failed=False):
+    """Accumulate one execution of ``name`` into the in-process metrics"""
+    with _metrics_lock:
+        m = _metrics.setdefault(name, {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0})
+        m["count"] += 1
+        m["errors"] += int(failed)
+        m["total_seconds"] += duration
+        m["max_seconds"] = max(m["max_seconds"], duration)
+        m["last_seconds"] = duration
+
+
+def get_metrics():
+    """Snapshot of timing metrics with average durations in milliseconds"""
+    with _metrics_lock:
+        return {
+            name: {
+                "count": m["count"],
+                "errors": m["errors"],
+                "avg_ms": round(m["total_seconds"] / m["count"] * 1000, 3) if m["count"] else 0.0,
+                "max_ms": round(m["max_seconds"] * 1000, 3),
+                "last_ms": round(m["last_seconds"] * 1000, 3),
+            }
+            for name, m in _metrics.items()
+        }
+
+
+def observe(func_or_name):
+    """Decorator to log function execution time and errors
+
+    Usable bare (``@observe``) or with a metric name (``@observe("MD.get_highpower")``).
+    """
+    def decorator(func, name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = time.time()
+            try:
+                result = func(*args, **kwargs)
+                execution_time = time.time() - start_time
+                record_timing(name, execution_time)
+                logger.info(f"{name} executed in {execution_time:.2f} seconds")
+                return result
+            except Exception as e:
+                execution_time = time.time() - start_time
+                record_timing(name, execution_time, failed=True)
+                logger.error(f"{name} failed after {execution_time:.2f} seconds with error: {str(e)}")
+                raise
+        return wrapper
+
+    if callable(func_or_name):
+        return decorator(func_or_name, func_or_name.__name__)
+    return lambda func: decorator(func, func_or_name)
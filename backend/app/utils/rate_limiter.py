@@ -0,0 +1,81 @@
+# Token-bucket rate limiting
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class TokenBucketLimiter:
+    """Per-key token bucket allowing ``limit`` requests per ``window`` seconds
+
+    Each check refills the key's bucket from the elapsed time and takes one
+    token, so the cost is O(1) regardless of traffic. Buckets idle for longer
+    than ``idle_ttl`` (by then they are full again) are evicted in LRU order.
+    """
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None, idle_ttl: Optional[float] = None):
+        self.limit = limit
+        self.window = window
+        self.rate = limit / window
+        self.capacity = float(burst if burst is not None else limit)
+        self.idle_ttl = idle_ttl if idle_ttl is not None else max(window, self.capacity / self.rate)
+        # key -> [tokens, last_refill]; ordered by last access for eviction
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refill(self, key: str, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.capacity, now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        self._evict(now)
+        return bucket
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket[1] < self.idle_ttl:
+                break
+            del self._buckets[key]
+
+    def allow(self, key: str = "default", cost: float = 1.0) -> bool:
+        """Take ``cost`` tokens if available; False means the request should be rejected"""
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            if bucket[0] < cost:
+                return False
+            bucket[0] -= cost
+            return True
+
+    async def acquire(self, key: str = "default", cost: float = 1.0, max_wait: Optional[float] = None) -> bool:
+        """Wait for capacity instead of rejecting; False if it would take longer than ``max_wait``"""
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            wait = 0.0 if bucket[0] >= cost else (cost - bucket[0]) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return False
+            bucket[0] -= cost
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def status(self, key: str = "default") -> Dict[str, float]:
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.get(key)
+            tokens = self.capacity if bucket is None else min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+        remaining = max(0, int(tokens))
+        return {
+            "requests_made": int(self.capacity) - remaining,
+            "requests_remaining": remaining,
+            "rate_limit": self.limit,
+            "window_seconds": self.window,
+            "reset_time": time.time() + max(0.0, self.capacity - tokens) / self.rate,
+        }
+
+    def __len__(self) -> int:
+        return len(self._buckets)
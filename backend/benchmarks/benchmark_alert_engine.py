@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sorted-threshold alert engine vs per-alert comparison
+
+Creates 100,000 price_above / price_below alerts spread over 2,000 tickers
+with thresholds around each ticker's starting price, then drives both the
+AlertEngine and a naive evaluator (compare every active alert of a ticker on
+every update) through the same random-walk price pushes and checks that
+they fire exactly the same alerts.
+
+Usage:
+    python benchmarks/benchmark_alert_engine.py [--alerts 100000] [--tickers 2000] [--rounds 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.alert_engine import AlertEngine
+
+
+def make_alerts(count: int, tickers: int, seed: int = 42):
+    rng = random.Random(seed)
+    start = {f"SYM{i}": rng.uniform(100, 3000) for i in range(tickers)}
+    alerts = []
+    for n in range(count):
+        ticker = f"SYM{rng.randrange(tickers)}"
+        above = rng.random() < 0.5
+        alerts.append({
+            "alert_id": str(n),
+            "ticker": ticker,
+            "alert_type": "price_above" if above else "price_below",
+            "comparison": "gte" if above else "lte",
+            "threshold": start[ticker] * rng.uniform(0.9, 1.1),
+        })
+    return start, alerts
+
+
+def price_walk(start, rounds: int, seed: int = 7):
+    rng = random.Random(seed)
+    prices = dict(start)
+    for _ in range(rounds):
+        prices = {t: p * (1 + rng.gauss(0, 0.004)) for t, p in prices.items()}
+        yield prices
+
+
+class NaiveEvaluator:
+    """What /alerts/check did per ticker, minus the database round trip"""
+
+    def __init__(self, alerts):
+        self.by_ticker = {}
+        for alert in alerts:
+            self.by_ticker.setdefault(alert["ticker"], []).append(dict(alert, active=True))
+
+    def on_prices(self, prices):
+        fired = []
+        for ticker, price in prices.items():
+            for alert in self.by_ticker.get(ticker, ()):
+                if not alert["active"]:
+                    continue
+                if (alert["alert_type"] == "price_above" and price >= alert["threshold"]) or \
+                        (alert["alert_type"] == "price_below" and price <= alert["threshold"]):
+                    alert["active"] = False
+                    fired.append(alert["alert_id"])
+        return fired
+
+
+def main(alert_count: int, tickers: int, rounds: int) -> None:
+    start, alerts = make_alerts(alert_count, tickers)
+    persisted = []
+    engine = AlertEngine(load=lambda: alerts, persist=persisted.extend)
+    started = time.perf_counter()
+    engine.reload()
+    print(f"{alert_count} alerts on {tickers} tickers, index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+    naive = NaiveEvaluator(alerts)
+
+    engine_ids = {a["alert_id"] for a in engine.on_prices(start)}
+    naive_ids = set(naive.on_prices(start))
+    engine_ms, naive_ms = [], []
+    for prices in price_walk(start, rounds):
+        t0 = time.perf_counter()
+        engine_ids.update(a["alert_id"] for a in engine.on_prices(prices))
+        t1 = time.perf_counter()
+        naive_ids.update(naive.on_prices(prices))
+        t2 = time.perf_counter()
+        engine_ms.append((t1 - t0) * 1000)
+        naive_ms.append((t2 - t1) * 1000)
+
+    assert engine_ids == naive_ids, "engine and naive evaluator fired different alerts"
+    engine.flush()
+    assert len(persisted) == len(engine_ids)
+
+    for label, ms in (("engine", engine_ms), ("naive", naive_ms)):
+        ms.sort()
+        print(f"{label:<7} {tickers}-ticker push: mean {sum(ms) / len(ms):7.2f} ms   "
+              f"p50 {ms[len(ms) // 2]:7.2f} ms   p99 {ms[int(len(ms) * 0.99)]:7.2f} ms")
+
+    # Single-tick latency, as seen by the tick ingestion listener
+    ticker = "SYM0"
+    price = start[ticker]
+    samples = []
+    for _ in range(10000):
+        price *= 1.0001
+        t0 = time.perf_counter()
+        engine.on_prices({ticker: price})
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    print(f"single tick: p50 {samples[len(samples) // 2]:.1f} us   p99 {samples[int(len(samples) * 0.99)]:.1f} us")
+    print(f"fired {len(engine_ids)} alerts over {rounds} pushes; {len(engine.index)} still active")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alerts", type=int, default=100000)
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    main(args.alerts, args.tickers, args.rounds)
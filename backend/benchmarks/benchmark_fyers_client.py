@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call httpx client vs the shared Fyers client
+
+Starts a local mock of the Fyers quotes endpoint and compares the old pattern
+(a new AsyncClient, and therefore a new connection, for every request) with
+make_fyers_request on the pooled client. The mock is plain HTTP on loopback,
+so only the TCP handshake and client setup are saved here; against
+api.fyers.in each avoided connection also saves a TLS handshake and a real
+network round trip, which widens the gap considerably.
+
+Usage:
+    python benchmarks/benchmark_fyers_client.py [--requests 500] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.api import fyers
+
+mock = FastAPI()
+
+
+@mock.get("/api/v2/quotes")
+async def mock_quotes(symbols: str = ""):
+    return {
+        "s": "ok",
+        "d": [{"n": sym, "v": {"lp": 100.0, "ch": 1.5, "chp": 1.2}} for sym in symbols.split(",") if sym],
+    }
+
+
+def start_mock_server() -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    server = uvicorn.Server(uvicorn.Config(mock, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/api/v2"
+
+
+async def per_call_request(base_url: str, params: dict) -> dict:
+    # The pattern make_fyers_request used before the shared client
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(f"{base_url}/quotes", headers={"Authorization": "Bearer bench"}, params=params)
+        response.raise_for_status()
+        return response.json()
+
+
+async def pooled_request(params: dict) -> dict:
+    return await fyers.make_fyers_request("quotes", method="GET", data=params, access_token="bench")
+
+
+async def measure(label: str, request, total: int, concurrency: int) -> None:
+    params = {"symbols": "NSE:RELIANCE-EQ,NSE:TCS-EQ,NSE:HDFCBANK-EQ"}
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await request(params)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(
+        f"{label:<12} {total / elapsed:>9.0f} req/s   "
+        f"p50 {statistics.median(latencies):6.2f} ms   "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:6.2f} ms   "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.2f} ms"
+    )
+
+
+async def main(total: int, concurrency: int) -> None:
+    base_url = start_mock_server()
+    fyers.FYERS_BASE_URL = base_url
+    await fyers.start_fyers_client()
+    try:
+        # Warm both paths once so import and first-connection costs are excluded
+        await per_call_request(base_url, {"symbols": "NSE:SBIN-EQ"})
+        await pooled_request({"symbols": "NSE:SBIN-EQ"})
+        print(f"{total} requests, concurrency {concurrency}, http2={fyers.FYERS_HTTP2}")
+        await measure("per-call", lambda p: per_call_request(base_url, p), total, concurrency)
+        await measure("pooled", pooled_request, total, concurrency)
+    finally:
+        await fyers.close_fyers_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
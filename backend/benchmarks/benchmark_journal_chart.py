@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQL window-sum journal chart vs loading every row into Python
+
+Fills trading_journal with 1,000,000 rows spread over 1,000 users (one heavy
+user holds 10% of them), creates the (user_id, traded_at) index and times
+- the old chart: every TradingJournal row loaded and summed in Python
+- journal_db_service.chart for a typical user, the heavy user, and the heavy
+  user over the last 30 days
+- journal_db_service.summary for the heavy user
+
+Runs on in-memory SQLite by default; pass --url to run against Postgres
+(the table is dropped and recreated).
+
+Usage:
+    python benchmarks/benchmark_journal_chart.py [--rows 1000000] [--users 1000] [--url postgresql://...]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import connection
+from app.db.models import TradingJournal
+from app.services import journal_db_service
+
+HEAVY_USER = 1
+
+
+def setup(url: str, rows: int, users: int, seed: int = 42):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url)
+    TradingJournal.__table__.drop(engine, checkfirst=True)
+    TradingJournal.__table__.create(engine)
+    connection._engine = engine
+    connection._SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    span = 5 * 365 * 24 * 3600
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            user_id = HEAVY_USER if rng.random() < 0.1 else rng.randrange(2, users + 1)
+            profit = rng.uniform(-2000, 2000)
+            charges = rng.uniform(10, 60)
+            batch.append({
+                "user_id": user_id, "trade_id": f"T{i}", "symbol": "RELIANCE", "side": "BUY",
+                "profit": profit, "brokerage": charges, "net_profit": profit - charges,
+                "traded_at": start + timedelta(seconds=rng.randrange(span)),
+            })
+            if len(batch) == 50000:
+                conn.execute(insert(TradingJournal), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(TradingJournal), batch)
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "CREATE INDEX idx_trading_journal_user_traded_at ON trading_journal (user_id, traded_at) "
+                "INCLUDE (net_profit, profit, stt, gst, stamp_duty, brokerage)"
+            ))
+            conn.execute(text("ANALYZE trading_journal"))
+        else:
+            conn.execute(text(
+                "CREATE INDEX idx_trading_journal_user_traded_at ON trading_journal (user_id, traded_at, net_profit)"
+            ))
+    return engine
+
+
+def old_chart():
+    """What journal_db_service.chart did before: all rows, summed in Python"""
+    with connection.db_session() as db:
+        rows = db.query(TradingJournal).order_by(TradingJournal.traded_at.asc()).all()
+        points = []
+        cum = 0.0
+        for r in rows:
+            cum += float(r.net_profit) if r.net_profit else 0.0
+            points.append({"ts": r.traded_at.isoformat(), "cumNet": round(cum, 2)})
+        return {"series": points}
+
+
+def timed(label: str, func, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    points = len(result["series"]) if "series" in result else result["totalTrades"]
+    print(f"{label:<38} {best * 1000:9.1f} ms   ({points} {'points' if 'series' in result else 'trades'})")
+    return result
+
+
+def main(url: str, rows: int, users: int) -> None:
+    t0 = time.perf_counter()
+    setup(url, rows, users)
+    print(f"{rows} journal rows for {users} users loaded in {time.perf_counter() - t0:.1f} s\n")
+
+    timed("old chart (all rows, Python)", old_chart, repeat=1)
+    timed("chart, typical user", lambda: journal_db_service.chart(500))
+    heavy = timed("chart, heavy user (500 points)", lambda: journal_db_service.chart(HEAVY_USER))
+    timed("chart, heavy user, last 30 days", lambda: journal_db_service.chart(
+        HEAVY_USER, start=datetime(2024, 12, 1), end=datetime(2024, 12, 31)))
+    summary = timed("summary, heavy user", lambda: journal_db_service.summary(HEAVY_USER))
+
+    assert abs(heavy["series"][-1]["cumNet"] - summary["netProfit"]) < 0.01, "chart and summary disagree"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--url", default="sqlite://")
+    args = parser.parse_args()
+    main(args.url, args.rows, args.users)
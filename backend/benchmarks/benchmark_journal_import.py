@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk tradebook import
+
+Writes a synthetic long-only tradebook CSV (200,000 fills over 500 symbols
+by default) and times each import phase: chunked parsing, vectorised
+charges, FIFO matching and the batched write, followed by an idempotent
+re-import of the same file. Also times a lot-by-lot Python FIFO on the same
+trades for comparison.
+
+Runs on in-memory SQLite by default; pass --url to run against Postgres
+(COPY path; trading_journal is dropped and recreated).
+
+Usage:
+    python benchmarks/benchmark_journal_import.py [--rows 200000] [--symbols 500] [--url postgresql://...]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import connection
+from app.db.models import TradingJournal
+from app.services.journal_import import compute_charges, import_tradebook, match_fifo, read_tradebook, write_trades
+
+
+def make_tradebook(rows: int, symbols: int, seed: int = 1) -> str:
+    rng = np.random.default_rng(seed)
+    symbol = rng.integers(0, symbols, rows)
+    qty = rng.integers(1, 100, rows)
+    # Sell at most what is held, so the book stays long-only
+    held = np.zeros(symbols, dtype=np.int64)
+    sell = np.zeros(rows, dtype=bool)
+    coin = rng.random(rows)
+    for i in range(rows):
+        s = symbol[i]
+        if held[s] > 0 and coin[i] < 0.45:
+            qty[i] = min(qty[i], held[s])
+            held[s] -= qty[i]
+            sell[i] = True
+        else:
+            held[s] += qty[i]
+    start = datetime(2024, 6, 1, 9, 15)
+    frame = pd.DataFrame({
+        "symbol": [f"SYM{s}" for s in symbol],
+        "trade_type": np.where(sell, "sell", "buy"),
+        "quantity": qty,
+        "price": np.round(rng.uniform(50, 5000, rows), 2),
+        "trade_id": [f"{i:09d}" for i in range(rows)],
+        "order_execution_time": [(start + timedelta(seconds=30 * i)).isoformat() for i in range(rows)],
+        "product": np.where(rng.random(rows) < 0.3, "MIS", "CNC"),
+    })
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    frame.to_csv(path, index=False)
+    return path
+
+
+def lot_fifo(trades: pd.DataFrame) -> None:
+    lots = {}
+    for symbol, is_buy, qty, price in zip(trades["symbol"], trades["is_buy"], trades["qty"], trades["price"]):
+        queue = lots.setdefault(symbol, deque())
+        if is_buy:
+            queue.append([qty, price])
+            continue
+        while qty:
+            lot = queue[0]
+            take = min(qty, lot[0])
+            lot[0] -= take
+            qty -= take
+            if lot[0] == 0:
+                queue.popleft()
+
+
+def setup(url: str) -> None:
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url)
+    TradingJournal.__table__.drop(engine, checkfirst=True)
+    TradingJournal.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX ux_trading_journal_user_trade ON trading_journal (user_id, trade_id)"))
+    connection._engine = engine
+    connection._SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def timed(label: str, func):
+    t0 = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {time.perf_counter() - t0:7.2f} s")
+    return result
+
+
+def main(rows: int, symbols: int, url: str) -> None:
+    path = make_tradebook(rows, symbols)
+    try:
+        print(f"{rows} fills over {symbols} symbols, {os.path.getsize(path) / 1e6:.1f} MB\n")
+        setup(url)
+        trades = timed("parse (chunked)", lambda: read_tradebook(path))
+        charged = timed("charges (vectorised)", lambda: compute_charges(trades))
+        matched = timed("FIFO (np.interp)", lambda: match_fifo(charged))
+        timed("FIFO (lot by lot, Python)", lambda: lot_fifo(trades.sort_values(["symbol", "traded_at"], kind="stable")))
+        timed("write (batched)", lambda: write_trades(matched, user_id=1))
+        job = timed("re-import (all skipped)", lambda: import_tradebook(path, user_id=1))
+        assert job.inserted == 0 and job.written == rows, job.to_dict()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--url", default="sqlite://")
+    args = parser.parse_args()
+    main(args.rows, args.symbols, args.url)
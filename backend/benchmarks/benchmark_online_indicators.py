@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: online indicator updates vs recomputing over the whole history
+
+Warms EMA, Wilder RSI, ATR, rolling max/min, rolling mean/std, MACD and
+Bollinger bands up from a (symbols x bars) history, then times
+- one new bar for every symbol through the online indicators (O(1) each)
+- the same latest values recomputed with pandas over the full history, as
+  the study functions did per call
+
+Usage:
+    python benchmarks/benchmark_online_indicators.py [--symbols 2500] [--bars 375] [--repeat 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+
+from app.services.online_indicators import (
+    ATR, EMA, MACD, Bollinger, RollingMax, RollingMin, RollingStats, WilderRSI,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=2500)
+    parser.add_argument("--bars", type=int, default=375)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    n, bars = args.symbols, args.bars
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (n, bars + args.repeat)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.002, close.shape))
+    low = close * (1 - rng.uniform(0, 0.002, close.shape))
+
+    start = time.perf_counter()
+    single = [EMA(20), WilderRSI(14), RollingMax(20), RollingMin(20), RollingStats(20), MACD(), Bollinger(20)]
+    for indicator in single:
+        indicator.warm_up(close[:, :bars])
+    atr = ATR(14).warm_up(high[:, :bars], low[:, :bars], close[:, :bars])
+    print(f"warm-up ({n} symbols x {bars} bars, 8 indicators): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    samples = []
+    for t in range(bars, bars + args.repeat):
+        start = time.perf_counter()
+        for indicator in single:
+            indicator.update(close[:, t])
+        atr.update(high[:, t], low[:, t], close[:, t])
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"online: one bar for all symbols: median {statistics.median(samples):.2f} ms, max {max(samples):.2f} ms")
+
+    frame = pd.DataFrame(close[:, :bars].T)
+    start = time.perf_counter()
+    frame.ewm(span=20, adjust=False).mean().iloc[-1]
+    frame.rolling(20).max().iloc[-1]
+    frame.rolling(20).min().iloc[-1]
+    frame.rolling(20).mean().iloc[-1]
+    frame.rolling(20).std().iloc[-1]
+    (frame.ewm(span=12, adjust=False).mean() - frame.ewm(span=26, adjust=False).mean()).ewm(span=9).mean().iloc[-1]
+    delta = frame.diff()
+    delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    (pd.DataFrame(high[:, :bars].T) - pd.DataFrame(low[:, :bars].T)).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    recompute = (time.perf_counter() - start) * 1000
+    print(f"pandas recompute over full history (vectorised across symbols): {recompute:.1f} ms")
+
+    # The study functions worked one symbol at a time
+    start = time.perf_counter()
+    sample = min(n, 200)
+    for i in range(sample):
+        series = pd.Series(close[i, :bars])
+        series.rolling(20).max().iloc[-1]
+        series.rolling(20).mean().iloc[-1]
+        series.rolling(20).std().iloc[-1]
+        series.ewm(span=20, adjust=False).mean().iloc[-1]
+    per_symbol = (time.perf_counter() - start) * 1000 / sample
+    print(f"pandas per-symbol recompute: {per_symbol:.3f} ms/symbol, ~{per_symbol * n:.0f} ms for {n} symbols")
+
+
+if __name__ == "__main__":
+    main()
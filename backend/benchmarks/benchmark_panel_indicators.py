@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: panel indicator kernels vs the per-symbol groupby study path
+
+Builds a long-format intraday frame (symbol, timestamp, OHLCV) and times
+- the study signals (momentum/RSI spike, breakout/breakdown, volume spike,
+  ATR volatility, TCI) through ``df.groupby('symbol')`` and the per-symbol
+  calculate_* functions
+- the same signals for every symbol at once with calculate_study_panel
+  (pivot to a (symbols x bars) panel, then the panel kernels)
+- the kernels alone over an already-built panel
+
+Usage:
+    python benchmarks/benchmark_panel_indicators.py [--symbols 500] [--bars 375] [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+
+from app.services import panel_indicators as panel
+from app.services.study_utils import (
+    calculate_breakout_signals, calculate_momentum_spikes, calculate_study_panel, calculate_tci_signals,
+)
+
+
+def groupby_signals(df: pd.DataFrame) -> pd.DataFrame:
+    rows = {}
+    for symbol, bars in df.groupby("symbol"):
+        rows[symbol] = {
+            **calculate_momentum_spikes(bars),
+            **calculate_breakout_signals(bars),
+            **calculate_tci_signals(bars),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def panel_kernels(high, low, close, volume):
+    panel.returns(close)
+    panel.rsi(close, 14)
+    panel.breakout_flags(high, low, close, 20)
+    panel.volume_spike_flags(volume, 20)
+    panel.atr(high, low, close, 20)
+    panel.rolling_mean(close, 10)
+    panel.rolling_mean(close, 21)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=375)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    n, bars = args.symbols, args.bars
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (n, bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.002, close.shape))
+    low = close * (1 - rng.uniform(0, 0.002, close.shape))
+    volume = rng.uniform(1e4, 1e6, close.shape)
+    df = pd.DataFrame({
+        "symbol": np.repeat([f"SYM{i:04d}" for i in range(n)], bars),
+        "timestamp": np.tile(pd.date_range("2024-01-01 09:15", periods=bars, freq="min"), n),
+        "open": close.ravel(), "high": high.ravel(), "low": low.ravel(), "close": close.ravel(),
+        "volume": volume.ravel(),
+    })
+    print(f"{n} symbols x {bars} bars ({len(df)} rows)")
+
+    grouped_ms, grouped = timed(lambda: groupby_signals(df), max(1, args.repeat // 5))
+    print(f"groupby + per-symbol study functions: {grouped_ms:.0f} ms")
+    panel_ms, signals = timed(lambda: calculate_study_panel(df), args.repeat)
+    print(f"calculate_study_panel (pivot + kernels): {panel_ms:.1f} ms ({grouped_ms / panel_ms:.0f}x)")
+    kernels_ms, _ = timed(lambda: panel_kernels(high, low, close, volume), args.repeat)
+    print(f"panel kernels on a built panel: {kernels_ms:.1f} ms")
+
+    for column in ("breakout", "breakdown", "volume_spike", "spike_detected"):
+        assert (grouped[column].astype(bool) == signals[column].reindex(grouped.index)).all(), column
+    assert np.allclose(grouped["rsi"], signals["rsi"].reindex(grouped.index))
+
+
+if __name__ == "__main__":
+    main()
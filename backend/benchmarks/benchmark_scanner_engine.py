@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-universe scans on the NumPy scanner engine
+
+Loads 260 daily bars for a synthetic universe (2,500 symbols by default, about
+the size of the NSE equity list), applies one tick per symbol and times
+- load_history (the once-a-day feature build)
+- refresh after a tick batch (live change %, volume ratio, RSI, ranges)
+- every built-in scanner with all price, volume and RSI filters applied
+  and a registry group filter, against a 5 ms budget per scan
+- a user-defined DSL scan through the same compiled-plan path
+- incremental re-evaluation of the watched built-in scanners per tick batch,
+  against a full refresh and rescan, with a 1 ms budget per batch
+
+Usage:
+    python benchmarks/benchmark_scanner_engine.py [--symbols 2500] [--bars 260] [--repeat 200] [--batch 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from app.services.market_state import MarketState
+from app.services.scanner_engine import SCANNERS, ScannerEngine
+from app.services.symbol_registry import symbol_registry
+
+BUDGET_MS = 5.0
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=2500)
+    parser.add_argument("--bars", type=int, default=260)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50, help="symbols per tick batch in incremental mode")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    n, bars = args.symbols, args.bars
+    symbols = symbol_registry.symbols + [f"SYN{i}" for i in range(max(0, n - len(symbol_registry)))]
+    symbols = symbols[:n]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, (n, bars)))
+    low = close * (1 - rng.uniform(0, 0.02, (n, bars)))
+    volume = rng.uniform(1e5, 1e7, (n, bars))
+
+    state = MarketState(symbols)
+    engine = ScannerEngine(state)
+    start = time.perf_counter()
+    engine.load_history(symbols, high, low, close, volume)
+    print(f"load_history ({n} symbols x {bars} bars): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    slots = state.slots(symbols)
+
+    def tick():
+        state.apply(slots, close[:, -1] * (1 + rng.normal(0, 0.03, n)),
+                    volume=volume[:, -20:].mean(axis=1) * rng.uniform(0.3, 4, n), prev_close=close[:, -1])
+        engine.refresh()
+
+    median, worst = timed(tick, args.repeat)
+    print(f"tick batch + refresh: median {median:.3f} ms, max {worst:.3f} ms")
+
+    group = symbol_registry.groups()[0]
+    filters = dict(min_price=20, max_price=5000, min_volume=2e5, min_rsi=5, max_rsi=95, limit=20)
+    print(f"\n{'scanner':<20} {'matches':>8} {'median ms':>10} {'max ms':>8}")
+    failed = False
+    for name in SCANNERS:
+        matches = len(engine.scan(name, **{**filters, "limit": n}))
+        median, worst = timed(lambda: engine.scan(name, **filters), args.repeat)
+        print(f"{name:<20} {matches:>8} {median:>10.3f} {worst:>8.3f}")
+        failed |= median > BUDGET_MS
+        median, worst = timed(lambda: engine.scan(name, group=group, **filters), args.repeat)
+        print(f"{name + '/' + group:<20} {'':>8} {median:>10.3f} {worst:>8.3f}")
+    custom = "rsi14 < 45 and volume > 1.5 * vol_avg20 and close > sma50"
+    median, worst = timed(lambda: engine.scan_expression(custom, rank_by="vol_ratio", **filters), args.repeat)
+    print(f"{'custom DSL':<20} {'':>8} {median:>10.3f} {worst:>8.3f}")
+    failed |= median > BUDGET_MS
+
+    # Incremental mode: watched scanners re-evaluated for the symbols of each tick batch only
+    for name in SCANNERS:
+        engine.watch(name)
+    engine.evaluate()
+    batch = args.batch
+    events = []
+
+    def incremental():
+        rows = rng.choice(n, batch, replace=False)
+        batch_symbols = [symbols[i] for i in rows]
+        ltp = close[rows, -1] * (1 + rng.normal(0, 0.03, batch))
+        state.apply(slots[rows], ltp, volume=volume[rows, -1] * rng.uniform(0.3, 4, batch))
+        start = time.perf_counter()
+        engine.on_ticks(batch_symbols, ltp)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples = []
+    engine.add_listener(events.extend)
+    for _ in range(args.repeat):
+        incremental()
+    median, worst = statistics.median(samples), max(samples)
+    print(f"\nincremental ({len(SCANNERS)} watched, {batch}-symbol batch): median {median:.3f} ms, max {worst:.3f} ms, "
+          f"{len(events) / args.repeat:.1f} events/batch")
+    rescan = lambda: [engine.scan(name) for name in SCANNERS]
+    median_full, _ = timed(lambda: (engine.refresh(force=True), rescan()), max(10, args.repeat // 10))
+    print(f"full refresh + top-20 rescan of every scanner: median {median_full:.3f} ms")
+    failed |= median > 1.0
+
+    print(f"\n{'FAIL' if failed else 'OK'}: median scan within {BUDGET_MS} ms, incremental batch within 1 ms")
+
+
+if __name__ == "__main__":
+    main()
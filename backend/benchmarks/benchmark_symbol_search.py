@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: symbol search index vs a linear substring scan
+
+Builds a synthetic NSE+BSE-sized instrument master (8,000 instruments with
+realistic-looking symbols and multi-word company names), then times
+keystroke-style queries (growing prefixes, name fragments and typos) against
+the SymbolSearchIndex and against the old linear scan over every record.
+
+Usage:
+    python benchmarks/benchmark_symbol_search.py [--instruments 8000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.symbol_search import SymbolSearchIndex
+
+NAME_WORDS = [
+    "Tata", "Reliance", "Adani", "Bajaj", "Mahindra", "Hindustan", "Bharat", "Indian", "National",
+    "Power", "Steel", "Motors", "Finance", "Bank", "Industries", "Chemicals", "Pharma", "Textiles",
+    "Cement", "Infra", "Energy", "Capital", "Holdings", "Technologies", "Software", "Foods",
+    "Consumer", "Realty", "Healthcare", "Logistics", "Agro", "Metals", "Polymers", "Electricals",
+]
+SUFFIXES = ["Limited", "Ltd", "Corporation Limited", "India Limited"]
+
+
+def synthetic_master(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    records, seen = [], set()
+    while len(records) < n:
+        words = rng.sample(NAME_WORDS, rng.randint(1, 3))
+        symbol = "".join(w[:rng.randint(2, 5)] for w in words).upper() + rng.choice(["", str(rng.randint(1, 99))])
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        records.append({
+            "symbol": symbol,
+            "company_name": " ".join(words + [rng.choice(SUFFIXES)]),
+            "exchange": rng.choice(["NSE", "BSE"]),
+            "sector": "",
+        })
+    return records
+
+
+def linear_search(records, query, limit=20):
+    # The previous implementation: substring scan over every record
+    q = query.upper()
+    return [r for r in records if q in r["symbol"] or q in r["company_name"].upper()][:limit]
+
+
+def make_queries(records, count, seed=7):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        record = rng.choice(records)
+        kind = rng.random()
+        if kind < 0.5:
+            queries.append(record["symbol"][:rng.randint(2, len(record["symbol"]))])
+        elif kind < 0.8:
+            word = rng.choice(record["company_name"].split())
+            queries.append(word[:rng.randint(2, len(word))])
+        else:
+            word = rng.choice(record["company_name"].split())
+            if len(word) > 4:
+                i = rng.randrange(1, len(word) - 1)
+                word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+            queries.append(word)
+    return queries
+
+
+def timed(func, queries):
+    latencies = []
+    for q in queries:
+        started = time.perf_counter()
+        func(q)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return latencies
+
+
+def report(label, latencies):
+    n = len(latencies)
+    print(
+        f"{label:<8} mean {sum(latencies) / n:8.1f} us   p50 {latencies[n // 2]:8.1f} us   "
+        f"p95 {latencies[int(n * 0.95)]:8.1f} us   p99 {latencies[int(n * 0.99)]:8.1f} us"
+    )
+
+
+def main(instruments: int, count: int) -> None:
+    records = synthetic_master(instruments)
+    started = time.perf_counter()
+    index = SymbolSearchIndex(records)
+    print(f"{instruments} instruments, index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    queries = make_queries(records, count)
+    print(f"{count} queries, limit 20")
+    report("index", timed(lambda q: index.search(q, 20), queries))
+    report("linear", timed(lambda q: linear_search(records, q, 20), queries))
+
+    for q in ("TA", "reli", "Pharma", "Tecnologies"):
+        print(f"  {q!r:<14} -> {[r['symbol'] for r in index.search(q, 5)]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--instruments", type=int, default=8000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.instruments, args.queries)
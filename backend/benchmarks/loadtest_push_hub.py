@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Load test for the push hub fan-out
+
+Registers a synthetic 150-row heatmap topic, attaches N subscribers that drain
+their queues like the SSE endpoint does, and measures how long one refresh
+cycle takes to reach every subscriber. A worker can sustain a subscriber count
+as long as the fan-out time stays well below the topic refresh interval.
+
+Usage:
+    python benchmarks/loadtest_push_hub.py [--interval 1.0] [--cycles 5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.push_hub import PushHub
+
+SUBSCRIBER_STEPS = [100, 1000, 5000, 10000, 20000]
+
+
+def synthetic_heatmap():
+    return {
+        "data": [
+            {"Symbol": f"SYM{i}", "param_0": round(random.uniform(50, 4000), 2), "param_2": round(random.uniform(-8, 8), 2)}
+            for i in range(150)
+        ],
+        "name": "Synthetic Heatmap",
+    }
+
+
+async def run_step(subscribers: int, interval: float, cycles: int) -> dict:
+    hub = PushHub()
+    hub.register("bench.heatmap", synthetic_heatmap, interval=interval)
+
+    received = 0
+    last_delivery = 0.0
+
+    async def consumer(sub):
+        nonlocal received, last_delivery
+        while True:
+            await sub.get()
+            received += 1
+            last_delivery = time.perf_counter()
+
+    subs = [hub.subscribe(["bench.heatmap"]) for _ in range(subscribers)]
+    consumers = [asyncio.create_task(consumer(s)) for s in subs]
+    channel = hub._channels["bench.heatmap"]
+
+    # Timestamp the start of each publish so encoding + queueing is measured too
+    published = 0.0
+    publish = channel.publish
+
+    def timed_publish(data):
+        nonlocal published
+        published = time.perf_counter()
+        return publish(data)
+
+    channel.publish = timed_publish
+
+    fanout_times = []
+    for _ in range(cycles):
+        version = channel.version
+        target = received + subscribers
+        while channel.version == version:
+            await asyncio.sleep(0.0005)
+        while received < target:
+            await asyncio.sleep(0)
+        fanout_times.append(last_delivery - published)
+
+    for task in consumers:
+        task.cancel()
+    for sub in subs:
+        hub.unsubscribe(sub)
+    await hub.shutdown()
+
+    avg = sum(fanout_times) / len(fanout_times)
+    return {"subscribers": subscribers, "avg_fanout_ms": avg * 1000, "max_fanout_ms": max(fanout_times) * 1000}
+
+
+async def main(interval: float, cycles: int) -> None:
+    print(f"{'subscribers':>12} {'avg fan-out ms':>15} {'max fan-out ms':>15} {'% of interval':>14}")
+    sustainable = 0
+    for n in SUBSCRIBER_STEPS:
+        result = await run_step(n, interval, cycles)
+        share = result["max_fanout_ms"] / (interval * 1000) * 100
+        print(f"{n:>12} {result['avg_fanout_ms']:>15.2f} {result['max_fanout_ms']:>15.2f} {share:>13.1f}%")
+        if share < 50:
+            sustainable = n
+    print(f"\nOne worker keeps fan-out under half of a {interval}s cycle up to ~{sustainable} subscribers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--cycles", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.interval, args.cycles))
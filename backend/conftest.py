@@ -0,0 +1,29 @@
+"""
+Shared pytest fixtures for the backend tests.
+"""
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import connection
+
+
+@pytest.fixture
+def db_engine(monkeypatch):
+    """
+    A fresh in-memory SQLite engine installed as app.db.connection's engine
+    and session factory for one test; the previous ones are restored after
+    it. Tests create the tables they need on the returned engine.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(connection, "_engine", engine)
+    monkeypatch.setattr(connection, "_SessionLocal", sessionmaker(bind=engine, autoflush=False, autocommit=False))
+    yield engine
+    engine.dispose()
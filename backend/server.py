@@ -6,9 +6,11 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.routing import APIRouter
 import logging
 from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -18,6 +20,108 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep hot snapshots warm in the cache instead of computing them on request
+    from app.services import snapshot_scheduler as scheduler_module
+    scheduler = scheduler_module.snapshot_scheduler
+    if scheduler_module.SCHEDULER_ENABLED:
+        try:
+            scheduler_module.register_default_jobs(scheduler)
+            await scheduler.start()
+        except Exception as e:
+            logger.error(f"Failed to start snapshot scheduler: {e}")
+    # Pooled upstream client so quote calls reuse warm connections
+    try:
+        from app.api.fyers import start_fyers_client
+        await start_fyers_client()
+    except Exception as e:
+        logger.error(f"Failed to start Fyers HTTP client: {e}")
+    # Build the stock search index before the first keystroke arrives
+    try:
+        from app.services.symbol_search import symbol_search
+        symbol_search.refresh()
+    except Exception as e:
+        logger.error(f"Failed to build symbol search index: {e}")
+    # Daily-bar features (moving averages, ranges, RSI state) for the scanners, advanced as new bars are stored
+    try:
+        from app.services.scanner_engine import scanner_engine
+        await scanner_engine.start()
+    except Exception as e:
+        logger.error(f"Failed to load scanner history: {e}")
+    # Keep built-in scanner membership current on every tick batch
+    try:
+        from app.services.scanner_engine import SCANNERS, scanner_engine
+        from app.services.tick_ingestion import tick_ingestion
+        for name in SCANNERS:
+            scanner_engine.watch(name)
+        tick_ingestion.add_listener(scanner_engine.on_ticks)
+    except Exception as e:
+        logger.error(f"Failed to start incremental scanners: {e}")
+    # Shared Ollama client with background health probing
+    try:
+        from app.services.ollama_gateway import ollama_gateway
+        await ollama_gateway.start()
+    except Exception as e:
+        logger.error(f"Failed to start Ollama gateway: {e}")
+    # Evaluate price alerts on every tick instead of on request
+    try:
+        from app.services.alert_engine import alert_engine
+        from app.services.tick_ingestion import tick_ingestion
+        await alert_engine.start()
+        tick_ingestion.add_listener(alert_engine.on_ticks)
+    except Exception as e:
+        logger.error(f"Failed to start alert engine: {e}")
+    # Live ticks (or a recorded replay) into the in-memory market state
+    try:
+        from app.services.tick_ingestion import start_tick_ingestion
+        await start_tick_ingestion()
+    except Exception as e:
+        logger.error(f"Failed to start tick ingestion: {e}")
+    yield
+    # Each step is guarded so one failure does not leave the later services running
+    try:
+        await scheduler.stop()
+    except Exception as e:
+        logger.error(f"Failed to stop scheduler: {e}")
+    try:
+        from app.services.tick_ingestion import stop_tick_ingestion
+        await stop_tick_ingestion()
+    except Exception as e:
+        logger.error(f"Failed to stop tick ingestion: {e}")
+    try:
+        from app.services.alert_engine import alert_engine
+        await alert_engine.stop()
+    except Exception as e:
+        logger.error(f"Failed to stop alert engine: {e}")
+    try:
+        from app.services.scanner_engine import scanner_engine
+        await scanner_engine.stop()
+    except Exception as e:
+        logger.error(f"Failed to stop incremental scanners: {e}")
+    try:
+        from app.api.fyers import close_fyers_client
+        await close_fyers_client()
+    except Exception as e:
+        logger.error(f"Failed to close Fyers HTTP client: {e}")
+    try:
+        from app.services.analysis_jobs import analysis_jobs
+        await analysis_jobs.shutdown()
+    except Exception as e:
+        logger.error(f"Failed to shut down analysis jobs: {e}")
+    try:
+        from app.services.ollama_gateway import ollama_gateway
+        await ollama_gateway.close()
+    except Exception as e:
+        logger.error(f"Failed to close Ollama gateway: {e}")
+    # Stop streaming refresh loops still running for connected subscribers
+    try:
+        from app.services.push_hub import push_hub
+        await push_hub.shutdown()
+    except Exception as e:
+        logger.error(f"Failed to shut down push hub: {e}")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Unified Sharada Research API",
@@ -25,7 +129,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/v1/openapi.json"
+    openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan
 )
 
 # Add root endpoint for server verification
@@ -42,6 +147,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conditional GET (ETag/304) for polled endpoints, then gzip for large bodies.
+# GZip is added last so it wraps the ETag middleware and hashes see the raw body.
+from app.utils.http_cache import ConditionalGetMiddleware
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")))
+
 # Create a top-level API router with global /api prefix
 api = APIRouter(prefix="/api")
 
@@ -55,6 +166,27 @@ async def root():
 async def healthz():
     return {"status": "ok"}
 
+@api.get("/metrics/scheduler")
+async def scheduler_metrics():
+    from app.services.snapshot_scheduler import snapshot_scheduler
+    from app.utils.observability import get_metrics
+    return {"scheduler": snapshot_scheduler.metrics(), "timings": get_metrics()}
+
+@api.get("/metrics/ticks")
+async def tick_metrics():
+    from app.services.tick_ingestion import tick_ingestion
+    return tick_ingestion.stats()
+
+@api.get("/metrics/alerts")
+async def alert_metrics():
+    from app.services.alert_engine import alert_engine
+    return alert_engine.stats()
+
+@api.get("/metrics/scanners")
+async def scanner_metrics():
+    from app.services.scanner_engine import scanner_engine
+    return scanner_engine.stats()
+
 # Include routers from both projects
 # Landing page APIs
 @api.get("/landing/portfolio")
@@ -86,6 +218,7 @@ routers_to_include = [
     ('app.api.ollama', 'ollama_router'),
     ('app.api.fyers', 'fyers_router'),
     ('app.api.unified_study', 'unified_study_router'),
+    ('app.api.stream', 'stream_router'),
 ]
 
 successful_routers = []
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Alert Engine Tests
+Drives AlertEngine with injected load/persist functions and checks that
+price moves fire exactly the alerts they cross, once, matching a brute
+force scan. Also covers reloads, batched persistence with retries, and
+the tick listener and background loop.
+
+Usage:
+    python test_alert_engine.py
+    python -m pytest test_alert_engine.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services import alert_engine as alert_module
+from app.services.alert_engine import AlertEngine
+
+
+def alert(alert_id, ticker, alert_type, threshold, comparison=None):
+    comparison = comparison or ("gte" if alert_type == "price_above" else "lte")
+    return {"alert_id": alert_id, "ticker": ticker, "alert_type": alert_type,
+            "comparison": comparison, "threshold": threshold}
+
+
+def ladder():
+    """price_above alerts at 101..105 and price_below alerts at 95..99 on TCS"""
+    alerts = [alert(f"up{t}", "TCS", "price_above", t) for t in range(101, 106)]
+    alerts += [alert(f"down{t}", "TCS", "price_below", t) for t in range(95, 100)]
+    # Not price crossings: never indexed
+    alerts += [alert("pct", "TCS", "percent_change", 1, "gte"), alert("eq", "TCS", "price_above", 100, "eq")]
+    return alerts
+
+
+def fired_ids(fired):
+    return sorted(a["alert_id"] for a in fired)
+
+
+def test_moves_fire_the_crossed_slice_once():
+    persisted = []
+    engine = AlertEngine(load=ladder, persist=persisted.extend)
+    assert engine.reload() == 12 and len(engine.index) == 10
+
+    assert engine.on_prices({"tcs": 100.0}) == []
+    assert fired_ids(engine.on_prices({"TCS": 102.5})) == ["up101", "up102"]
+    assert engine.on_prices({"TCS": 102.5}) == []
+    assert fired_ids(engine.on_prices({"TCS": 105.0})) == ["up103", "up104", "up105"]
+    # A fall through the other book fires price_below alerts at or above the price
+    down = engine.on_prices({"TCS": 97.0})
+    assert fired_ids(down) == ["down97", "down98", "down99"]
+    assert down[0]["current_price"] == 97.0 and "triggered_at" in down[0]
+    assert engine.on_prices({"INFY": 1.0}) == [] and len(engine.index) == 2
+
+    assert engine.flush() == 8 and fired_ids(persisted) == sorted(
+        [f"up{t}" for t in range(101, 106)] + ["down97", "down98", "down99"])
+    assert engine.stats()["pending"] == 0
+
+
+def test_matches_a_brute_force_scan():
+    rng = random.Random(11)
+    tickers = [f"T{i}" for i in range(20)]
+    alerts = [
+        alert(f"a{i}", rng.choice(tickers), rng.choice(["price_above", "price_below"]), round(rng.uniform(80, 120), 1))
+        for i in range(2000)
+    ]
+    engine = AlertEngine(load=lambda: alerts, persist=lambda batch: None)
+    engine.reload()
+    active = {a["alert_id"]: a for a in alerts}
+    prices = {t: 100.0 for t in tickers}
+    for _ in range(200):
+        moves = {t: prices[t] * (1 + rng.gauss(0, 0.02)) for t in rng.sample(tickers, 5)}
+        prices.update(moves)
+        expected = [
+            a["alert_id"] for a in active.values() if a["ticker"] in moves and (
+                (a["alert_type"] == "price_above" and moves[a["ticker"]] >= a["threshold"]) or
+                (a["alert_type"] == "price_below" and moves[a["ticker"]] <= a["threshold"]))
+        ]
+        for alert_id in expected:
+            del active[alert_id]
+        assert fired_ids(engine.on_prices(moves)) == sorted(expected)
+    assert len(engine.index) == len(active)
+
+
+def test_reload_fires_satisfied_alerts_and_skips_unpersisted_ones():
+    alerts = ladder()
+    engine = AlertEngine(load=lambda: alerts, persist=lambda batch: None)
+    engine.reload()
+    engine.on_prices({"TCS": 101.0})
+    # The database still reports up101 active until the flush; a new alert is already crossed
+    alerts.append(alert("new", "TCS", "price_above", 100.5))
+    engine.reload()
+    assert [a["alert_id"] for a in engine._pending] == ["up101", "new"]
+    assert engine.on_prices({"TCS": 101.0}) == []
+
+
+def check_transaction_lifecycle(written):
+    alerts = ladder()
+    engine = AlertEngine(load=lambda: alerts, persist=lambda batch: None)
+    engine.reload()
+    db = object()
+    fired = engine.on_prices({"TCS": 101.0}, db=db)
+    assert fired_ids(fired) == ["up101"] and written == [(db, ["up101"])]
+    assert engine.stats()["pending"] == 0
+
+    # A reload before the caller commits still sees up101 active in the database
+    engine.reload()
+    assert engine.on_prices({"TCS": 101.0}) == [] and engine.stats()["pending"] == 0
+
+    # Committed: the next reload reads it as inactive
+    engine.settle(fired)
+    alerts.remove(next(a for a in alerts if a["alert_id"] == "up101"))
+    engine.reload()
+    assert engine.stats()["pending"] == 0
+
+    # Rolled back: the alert is loaded again and fires at the last seen price
+    fired = engine.on_prices({"TCS": 102.0}, db=db)
+    engine.settle(fired)
+    engine.reload()
+    assert [a["alert_id"] for a in engine._pending] == ["up102"]
+
+
+def test_alerts_fired_in_a_transaction_stay_out_of_reloads_until_settled():
+    written = []
+    original = alert_module.deactivate_fired_alerts
+    alert_module.deactivate_fired_alerts = lambda db, fired: written.append((db, fired_ids(fired)))
+    try:
+        check_transaction_lifecycle(written)
+    finally:
+        alert_module.deactivate_fired_alerts = original
+
+
+def test_failed_flushes_are_retried_in_order():
+    attempts = []
+
+    def persist(batch):
+        attempts.append([a["alert_id"] for a in batch])
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+
+    engine = AlertEngine(load=ladder, persist=persist, batch_size=2)
+    engine.reload()
+    engine.on_prices({"TCS": 105.0})
+    assert engine.flush() == 0 and engine.stats()["persist_errors"] == 1
+    assert engine.flush() == 5
+    assert attempts == [["up101", "up102"], ["up101", "up102"], ["up103", "up104"], ["up105"]]
+
+
+def test_ticks_and_the_background_loop():
+    persisted = []
+
+    async def test():
+        engine = AlertEngine(load=ladder, persist=persisted.extend, flush_interval=0.01)
+        engine.on_ticks(["TCS"], [110.0])  # ignored until loaded
+        await engine.start()
+        engine.on_ticks(["TCS", "INFY"], [103.0, 1.0])
+        await asyncio.sleep(0.05)
+        assert fired_ids(persisted) == ["up101", "up102", "up103"]
+        engine.on_ticks(["TCS"], [96.0])
+        await engine.stop()
+        return engine
+
+    engine = asyncio.run(test())
+    assert fired_ids(persisted) == ["down96", "down97", "down98", "down99", "up101", "up102", "up103"]
+    assert engine.stats()["persisted"] == 7
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
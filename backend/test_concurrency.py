@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Fan-out Tests
+Checks that fan_out runs calls concurrently and returns results by key,
+propagates errors and timeouts, runs nested fan-outs serially instead of
+deadlocking the pool, and that the comprehensive index analysis reads the
+shared index_analysis row once.
+
+Usage:
+    python test_concurrency.py
+    python -m pytest test_concurrency.py
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services import index_service
+from app.utils import concurrency
+from app.utils.concurrency import fan_out
+
+
+def sleeper(value, seconds=0.1):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_calls_run_concurrently():
+    started = time.perf_counter()
+    results = fan_out({f"k{i}": sleeper(i) for i in range(5)})
+    elapsed = time.perf_counter() - started
+    assert results == {f"k{i}": i for i in range(5)}
+    assert list(results) == [f"k{i}" for i in range(5)]
+    assert elapsed < 0.3, elapsed
+    # Zero or one call runs inline
+    assert fan_out({}) == {}
+    assert fan_out({"only": threading.current_thread}) == {"only": threading.current_thread()}
+
+
+def test_errors_and_timeouts_propagate():
+    def broken():
+        raise KeyError("missing")
+
+    try:
+        fan_out({"ok": sleeper(1, 0), "broken": broken})
+        raise AssertionError("expected KeyError")
+    except KeyError:
+        pass
+    try:
+        fan_out({"slow": sleeper(1, 0.5), "fast": sleeper(2, 0)}, timeout=0.05)
+        raise AssertionError("expected TimeoutError")
+    except TimeoutError:
+        pass
+
+
+def test_calls_not_yet_started_are_cancelled():
+    original = concurrency._executor
+    concurrency._executor = ThreadPoolExecutor(max_workers=1)
+    ran = []
+
+    def broken():
+        raise KeyError("missing")
+
+    try:
+        for calls, error in (({"broken": broken, "queued": lambda: ran.append(2)}, KeyError),
+                             ({"slow": sleeper(1, 0.2), "queued": lambda: ran.append(1)}, TimeoutError)):
+            started = time.perf_counter()
+            try:
+                fan_out(calls, timeout=0.05)
+                raise AssertionError(f"expected {error.__name__}")
+            except error:
+                pass
+            assert time.perf_counter() - started < 0.15
+        time.sleep(0.3)
+    finally:
+        concurrency._executor.shutdown()
+        concurrency._executor = original
+    # The queued call after "broken" may be picked up before it is cancelled
+    assert 1 not in ran
+
+
+def test_nested_fan_out_runs_serially():
+    # A single worker would deadlock if the inner fan-out waited on the pool
+    original = concurrency._executor
+    concurrency._executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        def outer(key):
+            return lambda: fan_out({"a": lambda: key, "b": lambda: key * 2})
+        results = fan_out({"x": outer("x"), "y": outer("y")}, timeout=2)
+    finally:
+        concurrency._executor.shutdown()
+        concurrency._executor = original
+    assert results == {"x": {"a": "x", "b": "xx"}, "y": {"a": "y", "b": "yy"}}
+
+
+def test_comprehensive_analysis_reads_the_shared_row_once():
+    calls = []
+    fakes = {
+        "_get_latest_analysis": lambda name: calls.append(name) or {
+            "oi": 100, "expiry_date": None, "pcr": 0.9, "ce_contracts": 5, "pe_contracts": 6,
+            "volume": 2000, "volume_change": 1.5,
+        },
+        "_get_average_daily_volume": lambda name: 1000,
+        "get_index_ohlc": lambda name, interval, limit: {"data": [{"close": 1}]},
+        "get_index_heatmap": lambda name: {"constituents": [
+            {"symbol": "A", "priceChangePercent": 2.0},
+            {"symbol": "B", "priceChangePercent": -1.0},
+            {"symbol": "C", "priceChangePercent": 3.0},
+        ]},
+    }
+    originals = {name: getattr(index_service, name) for name in fakes}
+    for name, fake in fakes.items():
+        setattr(index_service, name, fake)
+    try:
+        result = index_service.get_comprehensive_analysis.refresh("FANOUT_TEST")
+    finally:
+        for name, original in originals.items():
+            setattr(index_service, name, original)
+
+    assert calls == ["FANOUT_TEST"]
+    assert result["basicMetrics"]["oi"] == 100 and result["pcr"]["pcr"] == 0.9
+    assert result["contracts"] == {"index": "FANOUT_TEST", "ceContracts": 5, "peContracts": 6}
+    assert result["volumeAnalysis"]["volumeRatio"] == 2.0
+    assert result["recentOHLC"] == [{"close": 1}]
+    assert [c["symbol"] for c in result["topGainers"]] == ["C", "A"]
+    assert [c["symbol"] for c in result["topLosers"]] == ["B"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
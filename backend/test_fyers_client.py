@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Fyers HTTP Client Tests
+Checks that Fyers calls share one long-lived client, that each endpoint
+gets its own read timeout, and how transport and HTTP errors map to API
+errors.
+
+Usage:
+    python test_fyers_client.py
+    python -m pytest test_fyers_client.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import HTTPException
+
+from app.api import fyers
+from app.utils.rate_limiter import TokenBucketLimiter
+
+
+def with_transport(handler, test):
+    """Run ``test`` with the shared client on a mock transport and an unlimited upstream budget"""
+    async def run():
+        fyers._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await test()
+        finally:
+            await fyers.close_fyers_client()
+
+    original = fyers.upstream_limiter
+    fyers.upstream_limiter = TokenBucketLimiter(10000, 1, burst=10000)
+    try:
+        asyncio.run(run())
+    finally:
+        fyers.upstream_limiter = original
+
+
+def test_the_client_is_shared_until_closed():
+    async def test():
+        client = fyers.get_fyers_client()
+        assert fyers.get_fyers_client() is client
+        assert client.timeout.connect == fyers.FYERS_CONNECT_TIMEOUT
+        await fyers.close_fyers_client()
+        assert client.is_closed and fyers._http_client is None
+        reopened = fyers.get_fyers_client()
+        assert reopened is not client
+        await fyers.close_fyers_client()
+
+    asyncio.run(test())
+
+
+def test_requests_reuse_the_client_with_per_endpoint_timeouts():
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.extensions["timeout"]["read"], request.headers["authorization"]))
+        return httpx.Response(200, json={"s": "ok", "path": request.url.path})
+
+    async def test():
+        client = fyers.get_fyers_client()
+        await asyncio.gather(*(fyers.make_fyers_request("data/quotes", "POST", {"symbols": []}, "t") for _ in range(5)))
+        assert await fyers.make_fyers_request("holdings", access_token="t") == {"s": "ok", "path": "/api/v2/holdings"}
+        await fyers.make_fyers_request("orders", access_token="t")
+        assert fyers.get_fyers_client() is client
+
+    with_transport(handler, test)
+    assert seen[:5] == [("/api/v2/data/quotes", 5.0, "Bearer t")] * 5
+    assert seen[5][1] == 15.0 and seen[6][1] == fyers.FYERS_DEFAULT_TIMEOUT
+
+
+def test_errors_map_to_http_exceptions():
+    def handler(request):
+        if request.url.path.endswith("slow"):
+            raise httpx.ReadTimeout("slow", request=request)
+        if request.url.path.endswith("down"):
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(429, text="too many")
+
+    async def test():
+        for endpoint, status in (("slow", 408), ("down", 503), ("busy", 429)):
+            try:
+                await fyers.make_fyers_request(endpoint, access_token="t")
+                raise AssertionError("expected HTTPException")
+            except HTTPException as e:
+                assert e.status_code == status, endpoint
+        try:
+            await fyers.make_fyers_request("profile")
+            raise AssertionError("expected HTTPException")
+        except HTTPException as e:
+            assert e.status_code == 401
+
+    with_transport(handler, test)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Conditional GET Tests
+Runs ConditionalGetMiddleware behind GZip in front of a small app, the way
+server.py installs it, and checks ETag/304 handling and that streaming and
+self-validated responses are passed through untouched.
+
+Usage:
+    python test_http_cache.py
+    python -m pytest test_http_cache.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.http_cache import ConditionalGetMiddleware, compute_etag, etag_matches
+
+state = {"version": 1}
+
+
+def make_client():
+    app = FastAPI()
+
+    @app.get("/api/data")
+    def data():
+        return {"rows": [{"Symbol": f"S{i}", "price": i * state["version"]} for i in range(200)]}
+
+    @app.get("/api/stream")
+    def stream():
+        return StreamingResponse((f"chunk {i}\n" for i in range(3)), media_type="text/plain")
+
+    @app.get("/api/versioned")
+    def versioned():
+        return JSONResponse({"ok": True}, headers={"ETag": '"v7"'})
+
+    @app.get("/api/missing")
+    def missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(GZipMiddleware, minimum_size=100)
+    return TestClient(app)
+
+
+def test_etag_matching():
+    etag = compute_etag(b"body")
+    assert etag.startswith('W/"') and etag == compute_etag(b"body") != compute_etag(b"other")
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)
+    assert etag_matches(f'"x", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"x"', etag)
+
+
+def test_revalidation_returns_304_until_the_body_changes():
+    client = make_client()
+    state["version"] = 1
+    first = client.get("/api/data")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["rows"][2]["price"] == 2
+    assert first.headers["cache-control"].startswith("private, max-age=")
+    # The ETag is taken from the raw body, before gzip
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag == compute_etag(first.content)
+
+    again = client.get("/api/data", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag and "content-type" not in again.headers
+    assert client.get("/api/data", headers={"If-None-Match": etag, "Accept-Encoding": "identity"}).status_code == 304
+
+    state["version"] = 2
+    changed = client.get("/api/data", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_streaming_and_other_responses_pass_through():
+    client = make_client()
+    stream = client.get("/api/stream")
+    assert stream.text == "chunk 0\nchunk 1\nchunk 2\n" and "etag" not in stream.headers
+
+    versioned = client.get("/api/versioned", headers={"If-None-Match": '"v7"'})
+    assert versioned.status_code == 200 and versioned.headers["etag"] == '"v7"'
+
+    missing = client.get("/api/missing")
+    assert missing.status_code == 404 and "etag" not in missing.headers
+    assert "etag" not in client.get("/health").headers
+    assert "etag" not in client.post("/api/data").headers
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL journal summary and chart
+
+Runs journal_db_service against an in-memory SQLite database and compares
+the window-sum chart with a cumulative sum computed in Python.
+
+Usage:
+    python test_journal_db_service.py
+    python -m pytest test_journal_db_service.py
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import journal as journal_api
+from app.db.models import Base, TradingJournal
+from app.services import journal_db_service
+
+START = datetime(2024, 1, 1)
+
+
+def setup_journal(engine, trades: int = 300):
+    Base.metadata.create_all(engine, tables=[TradingJournal.__table__])
+
+    rng = random.Random(3)
+    nets = []
+    for i in range(trades):
+        profit = round(rng.uniform(-1000, 1000), 2)
+        nets.append(profit - 20.0)
+        journal_db_service.add_log(trade_id=f"T{i}", symbol="infy", side="sell", profit=profit, brokerage=20.0,
+                                   user_id=1, traded_at=START + timedelta(hours=i))
+    # Another user's trades must not show up
+    journal_db_service.add_log(trade_id="X", symbol="tcs", side="buy", profit=1e6, user_id=2, traded_at=START)
+    return nets
+
+
+def running(nets):
+    cum, out = 0.0, []
+    for net in nets:
+        cum += net
+        out.append(round(cum, 2))
+    return out
+
+
+def test_summary_and_chart_are_user_scoped(db_engine):
+    nets = setup_journal(db_engine)
+    summary = journal_db_service.summary(1)
+    assert summary["totalTrades"] == 300
+    assert summary["netProfit"] == round(sum(nets), 2)
+    series = journal_db_service.chart(1, max_points=1000)["series"]
+    assert [p["cumNet"] for p in series] == running(nets)
+    assert journal_db_service.summary(3)["totalTrades"] == 0
+
+
+def test_long_histories_are_downsampled_to_exact_points(db_engine):
+    nets = setup_journal(db_engine)
+    series = journal_db_service.chart(1, max_points=7)["series"]
+    assert len(series) == 7
+    full = running(nets)
+    assert series[-1]["cumNet"] == full[-1]
+    assert all(p["cumNet"] in full for p in series)
+
+
+def test_date_range_continues_from_the_opening_total(db_engine):
+    nets = setup_journal(db_engine)
+    series = journal_db_service.chart(
+        1, start=START + timedelta(hours=100), end=START + timedelta(hours=199), max_points=1000
+    )["series"]
+    assert [p["cumNet"] for p in series] == running(nets)[100:200]
+
+
+def test_chart_endpoint_accepts_offset_aware_bounds(db_engine):
+    nets = setup_journal(db_engine)
+    app = FastAPI()
+    app.include_router(journal_api.router)
+    original = journal_api.USE_DB, journal_api.journal
+    journal_api.USE_DB, journal_api.journal = True, journal_db_service
+    try:
+        # 05:30 IST on Jan 5 is hour 96 of the journal in UTC
+        response = TestClient(app).get("/journal/chart", params={
+            "userId": 1, "start": "2024-01-05T05:30:00+05:30", "maxPoints": 1000,
+        })
+    finally:
+        journal_api.USE_DB, journal_api.journal = original
+    assert response.status_code == 200, response.text
+    assert [p["cumNet"] for p in response.json()["series"]] == running(nets)[96:]
+
+
+if __name__ == "__main__":
+    # The database comes from the db_engine fixture in conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk tradebook import
+
+Checks the vectorised FIFO matching against a lot-by-lot FIFO, charges
+against the schedule, idempotent re-import and the /journal/import endpoint,
+using an in-memory SQLite database.
+
+Usage:
+    python test_journal_import.py
+    python -m pytest test_journal_import.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api import journal as journal_api
+from app.db.models import Base, TradingJournal
+from app.services import journal_db_service
+from app.services.journal_import import compute_charges, import_tradebook, match_fifo, read_tradebook
+
+
+def setup_database(engine):
+    Base.metadata.create_all(engine, tables=[TradingJournal.__table__])
+
+
+def write_tradebook(rows: int = 2000, symbols: int = 12, seed: int = 9, long_only: bool = True) -> str:
+    """
+    Zerodha-style tradebook. Long-only by default, so every sell has enough
+    earlier buys; otherwise sells may exceed (or precede) the buys.
+    """
+    rng = random.Random(seed)
+    held = {f"SYM{i}": 0 for i in range(symbols)}
+    start = datetime(2024, 9, 1, 9, 15)
+    records = []
+    for n in range(rows):
+        symbol = rng.choice(list(held))
+        if long_only:
+            sell = held[symbol] > 0 and rng.random() < 0.45
+            qty = rng.randint(1, held[symbol]) if sell else rng.randint(1, 50)
+        else:
+            sell = rng.random() < 0.5
+            qty = rng.randint(1, 50)
+        held[symbol] += -qty if sell else qty
+        records.append({
+            "symbol": symbol, "isin": "INE000000000", "exchange": "NSE", "segment": "EQ",
+            "trade_type": "sell" if sell else "buy", "quantity": qty, "price": round(rng.uniform(90, 110), 2),
+            "trade_id": f"{n:08d}", "order_execution_time": (start + timedelta(minutes=7 * n)).isoformat(),
+            "product": "MIS" if rng.random() < 0.3 else "CNC",
+        })
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    pd.DataFrame(records).to_csv(path, index=False)
+    return path
+
+
+def lot_fifo(trades: pd.DataFrame):
+    """Reference FIFO: walk every trade, consuming buy lots one by one; returns profit and unmatched qty per sell"""
+    lots, profits, unmatched = {}, {}, {}
+    for t in trades.sort_values("traded_at", kind="stable").itertuples():
+        queue = lots.setdefault(t.symbol, deque())
+        if t.is_buy:
+            queue.append([t.qty, t.price])
+            continue
+        remaining, cost = t.qty, 0.0
+        while remaining and queue:
+            lot = queue[0]
+            take = min(remaining, lot[0])
+            cost += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if lot[0] == 0:
+                queue.popleft()
+        profits[t.trade_id] = (t.qty - remaining) * t.price - cost
+        unmatched[t.trade_id] = remaining
+    return profits, unmatched
+
+
+def test_fifo_matches_lot_by_lot_fifo():
+    path = write_tradebook()
+    try:
+        trades = read_tradebook(path, chunk_rows=300)
+    finally:
+        os.remove(path)
+    matched = match_fifo(compute_charges(trades)).set_index("trade_id")
+    expected, _ = lot_fifo(trades)
+    assert len(expected) > 500
+    for trade_id, profit in expected.items():
+        assert abs(matched.at[trade_id, "profit"] - profit) < 0.011, trade_id
+    assert (matched["unmatched_qty"] == 0).all()
+
+
+def test_sells_only_match_buys_made_before_them():
+    trades = pd.DataFrame({
+        "trade_id": ["s", "b"], "symbol": ["X", "X"], "is_buy": [False, True], "qty": [10.0, 10.0],
+        "price": [110.0, 100.0], "intraday": [False, False],
+        "traded_at": pd.to_datetime(["2024-01-01 10:00", "2024-01-02 10:00"]),
+    })
+    matched = match_fifo(compute_charges(trades)).set_index("trade_id")
+    # Nothing was held at the sell, so the later buy is not its cost basis
+    assert matched.at["s", "profit"] == 0 and matched.at["s", "unmatched_qty"] == 10
+
+    path = write_tradebook(rows=2000, long_only=False)
+    try:
+        trades = read_tradebook(path)
+    finally:
+        os.remove(path)
+    matched = match_fifo(compute_charges(trades)).set_index("trade_id")
+    profits, unmatched = lot_fifo(trades)
+    assert sum(unmatched.values()) > 1000
+    for trade_id, profit in profits.items():
+        assert abs(matched.at[trade_id, "profit"] - profit) < 0.011, trade_id
+        assert matched.at[trade_id, "unmatched_qty"] == unmatched[trade_id], trade_id
+
+
+def test_charges_follow_the_schedule_in_force():
+    trades = pd.DataFrame({
+        "trade_id": ["a", "b", "c"], "symbol": ["X", "X", "X"], "is_buy": [True, False, False],
+        "qty": [100.0, 50.0, 50.0], "price": [1000.0, 1100.0, 1100.0], "intraday": [False, False, True],
+        "traded_at": pd.to_datetime(["2024-09-30 10:00", "2024-10-01 10:00", "2024-10-01 11:00"]),
+    })
+    charged = compute_charges(trades)
+    assert list(charged["schedule"]) == ["2023-04", "2024-10", "2024-10"]
+    # Delivery: 0.1% STT both sides, stamp duty on the buy only, no brokerage
+    assert list(charged["stt"]) == [100.0, 55.0, 13.75]
+    assert list(charged["stamp_duty"]) == [15.0, 0.0, 0.0]
+    # Intraday brokerage is 0.03% capped at Rs 20, plus turnover fees
+    assert charged["brokerage"].iloc[2] == round(16.5 + 55000 * (0.0000297 + 0.000001), 2)
+
+
+def test_reimport_is_idempotent_and_sells_beyond_holdings_are_unmatched(db_engine):
+    setup_database(db_engine)
+    path = write_tradebook(rows=500)
+    with open(path, "a") as f:
+        f.write("GHOST,INE0,NSE,EQ,sell,10,50.0,99999999,2024-12-01T10:00:00,CNC\n")
+        f.write("SYM0,INE0,NSE,EQ,hold,10,50.0,99999998,2024-12-01T10:00:00,CNC\n")
+    try:
+        first = import_tradebook(path, user_id=7)
+        second = import_tradebook(path, user_id=7)
+        other_user = import_tradebook(path, user_id=8)
+    finally:
+        os.remove(path)
+    assert first.status == "completed", first.error
+    assert first.rows_read == 502 and first.rows_rejected == 1
+    assert first.inserted == 501 and first.unmatched_sells == 1
+    assert second.inserted == 0 and second.to_dict()["skipped"] == 501
+    assert other_user.inserted == 501
+    assert journal_db_service.summary(7)["totalTrades"] == 501
+
+
+def test_import_endpoint_reports_progress(db_engine):
+    setup_database(db_engine)
+    app = FastAPI()
+    app.include_router(journal_api.router)
+    path = write_tradebook(rows=300)
+    original = journal_api.USE_DB
+    journal_api.USE_DB = True
+    try:
+        with open(path, "rb") as f, TestClient(app) as client:
+            accepted = client.post("/journal/import", params={"userId": 3}, content=f.read(),
+                                   headers={"Content-Type": "text/csv"})
+            assert accepted.status_code == 202
+            job_id = accepted.json()["jobId"]
+            for _ in range(100):
+                status = client.get(f"/journal/import/{job_id}", params={"userId": 3}).json()
+                if status["status"] in ("completed", "failed"):
+                    break
+                time.sleep(0.05)
+            assert status["status"] == "completed", status
+            assert status["inserted"] == 300 and status["percent"] == 100.0
+            assert client.get(f"/journal/import/{job_id}", params={"userId": 4}).status_code == 404
+            assert client.get("/journal/import/unknown", params={"userId": 3}).status_code == 404
+    finally:
+        journal_api.USE_DB = original
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    # The database comes from the db_engine fixture in conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory JournalStore
+
+Checks that running totals and the cumulative series match a full rescan,
+including back-dated logs and concurrent adds from several threads, plus
+chart downsampling and offset-aware bounds on the /journal/chart endpoint.
+
+Usage:
+    python test_journal_store.py
+    python -m pytest test_journal_store.py
+"""
+
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import journal as journal_api
+from app.services import journal_service
+from app.services.journal_service import JournalStore
+
+START = datetime(2024, 1, 1)
+
+
+def add_random_logs(user_id: int, count: int, seed: int):
+    rng = random.Random(seed)
+    logs = []
+    for _ in range(count):
+        log = JournalStore.add_log(
+            user_id, "RELIANCE", "buy", 1, 100.0,
+            gross_profit=rng.uniform(-500, 500), stt=rng.uniform(0, 5), gst=rng.uniform(0, 5),
+            stamp_duty=rng.uniform(0, 1), brokerage=20.0,
+            # Mostly in order, with some back-dated entries
+            ts=START + timedelta(minutes=rng.randrange(10000)),
+        )
+        logs.append(log)
+    return logs
+
+
+def expected_series(logs):
+    cum = 0.0
+    series = []
+    for log in sorted(logs, key=lambda l: l["ts"]):
+        cum += log["grossProfit"] - (log["stt"] + log["gst"] + log["stampDuty"] + log["brokerage"])
+        series.append(round(cum, 2))
+    return series
+
+
+def test_summary_and_chart_match_a_rescan():
+    logs = add_random_logs(1001, 500, seed=1)
+    summary = JournalStore.summary(1001)
+    assert summary["totalTrades"] == 500
+    assert summary["grossProfit"] == round(sum(l["grossProfit"] for l in logs), 2)
+    assert summary["netProfit"] == expected_series(logs)[-1]
+    assert [p["cumNet"] for p in JournalStore.chart(1001)["series"]] == expected_series(logs)
+
+
+def test_users_are_isolated_and_chart_can_be_sliced():
+    JournalStore.add_log(1002, "TCS", "sell", 1, 10.0, gross_profit=50.0, ts=START)
+    JournalStore.add_log(1002, "TCS", "sell", 1, 10.0, gross_profit=30.0, ts=START + timedelta(days=2))
+    JournalStore.add_log(1003, "TCS", "sell", 1, 10.0, gross_profit=999.0, ts=START + timedelta(days=1))
+    assert JournalStore.summary(1002)["netProfit"] == 80.0
+    assert JournalStore.summary(9999)["totalTrades"] == 0
+    sliced = JournalStore.chart(1002, start=START + timedelta(days=1))["series"]
+    assert [p["cumNet"] for p in sliced] == [80.0]
+
+
+def test_reads_for_unknown_users_are_empty_and_create_nothing():
+    users = len(JournalStore._users)
+    assert JournalStore.summary(424242) == {
+        "totalTrades": 0, "grossProfit": 0.0, "stt": 0.0, "gst": 0.0,
+        "stampDuty": 0.0, "brokerage": 0.0, "netProfit": 0.0,
+    }
+    assert JournalStore.chart(424243)["series"] == []
+    assert len(JournalStore._users) == users
+
+
+def test_chart_is_downsampled_to_exact_points():
+    logs = add_random_logs(1005, 300, seed=5)
+    full = expected_series(logs)
+    series = JournalStore.chart(1005, max_points=7)["series"]
+    assert len(series) == 7 and series[-1]["cumNet"] == full[-1]
+    assert all(p["cumNet"] in full for p in series)
+    assert len(JournalStore.chart(1005, max_points=1000)["series"]) == 300
+
+
+def test_chart_endpoint_accepts_offset_aware_bounds():
+    JournalStore.add_log(1006, "TCS", "sell", 1, 10.0, gross_profit=50.0, ts=datetime(2024, 1, 1, 3, 0))
+    JournalStore.add_log(1006, "TCS", "sell", 1, 10.0, gross_profit=30.0, ts=datetime(2024, 1, 1, 6, 0))
+    app = FastAPI()
+    app.include_router(journal_api.router)
+    original = journal_api.USE_DB, journal_api.journal
+    journal_api.USE_DB, journal_api.journal = False, journal_service
+    try:
+        client = TestClient(app)
+        # 09:00 IST is 03:30 UTC
+        response = client.get("/journal/chart", params={"userId": 1006, "start": "2024-01-01T09:00:00+05:30",
+                                                        "end": "2024-01-01T06:00:00Z", "maxPoints": 5})
+    finally:
+        journal_api.USE_DB, journal_api.journal = original
+    assert response.status_code == 200, response.text
+    assert [p["cumNet"] for p in response.json()["series"]] == [80.0]
+
+
+def test_concurrent_adds():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        batches = list(pool.map(lambda seed: add_random_logs(1004, 200, seed), range(8)))
+    logs = [log for batch in batches for log in batch]
+    assert len({l["id"] for l in logs}) == 1600
+    assert JournalStore.summary(1004)["totalTrades"] == 1600
+    series = JournalStore.chart(1004)["series"]
+    # Threads interleave logs with equal timestamps, so only compare what is order independent
+    assert [p["ts"] for p in series] == sorted(l["ts"] for l in logs)
+    assert abs(series[-1]["cumNet"] - expected_series(logs)[-1]) < 0.02
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
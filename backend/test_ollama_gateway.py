@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Tests for the Ollama gateway against a local fake Ollama server
+
+The fake implements /api/tags and /api/generate (plain and streamed
+NDJSON), counts generations and records peak concurrency, so caching,
+in-flight sharing, the concurrency limit, queueing and SSE streaming can be
+checked without a model.
+
+Usage:
+    python test_ollama_gateway.py
+    python -m pytest test_ollama_gateway.py
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api import ollama as ollama_api
+from app.db.models import AnalysisJob, AnalysisResult, Base
+from app.services.analysis_jobs import AnalysisJobEngine
+from app.services.ollama_gateway import OllamaGateway
+
+
+class FakeOllama:
+    """Fake Ollama server: echoes the prompt back word by word"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.generations = 0
+        self.active = 0
+        self.peak = 0
+        self.app = FastAPI()
+        self.app.get("/api/tags")(self.tags)
+        self.app.post("/api/generate")(self.generate)
+
+    def reset(self, delay: float = 0.0):
+        self.delay = delay
+        self.generations = self.active = self.peak = 0
+
+    async def tags(self):
+        return {"models": [{"name": "fake:latest", "size": 1, "modified_at": "2024-01-01T00:00:00Z"}]}
+
+    async def generate(self, request: Request):
+        body = await request.json()
+        self.generations += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        words = [f"{w} " for w in body["prompt"].split()]
+        if not body.get("stream", True):
+            try:
+                await asyncio.sleep(self.delay)
+                return {"model": body["model"], "created_at": "now", "response": "".join(words), "done": True}
+            finally:
+                self.active -= 1
+
+        async def lines():
+            try:
+                for word in words:
+                    await asyncio.sleep(self.delay / max(len(words), 1))
+                    yield json.dumps({"model": body["model"], "response": word, "done": False}) + "\n"
+                yield json.dumps({"model": body["model"], "created_at": "now", "response": "", "done": True}) + "\n"
+            finally:
+                self.active -= 1
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    def serve(self) -> str:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{port}"
+
+
+fake = FakeOllama()
+FAKE_URL = fake.serve()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def with_gateway(test, **kwargs):
+    gateway = OllamaGateway(base_url=kwargs.pop("base_url", FAKE_URL), **kwargs)
+    try:
+        return await test(gateway)
+    finally:
+        await gateway.close()
+
+
+def test_generate_is_cached_by_content():
+    fake.reset()
+
+    async def test(gateway):
+        first = await gateway.generate("summarise RELIANCE", model="fake", system="analyst")
+        second = await gateway.generate("summarise RELIANCE", model="fake", system="analyst")
+        other_system = await gateway.generate("summarise RELIANCE", model="fake", system="trader")
+        return first, second, other_system
+
+    first, second, other_system = run(with_gateway(test))
+    assert first["response"] == "summarise RELIANCE "
+    assert first["cached"] is False and second["cached"] is True
+    assert second["response"] == first["response"]
+    assert other_system["cached"] is False
+    assert fake.generations == 2
+
+
+def test_identical_requests_in_flight_share_one_generation():
+    fake.reset(delay=0.2)
+
+    async def test(gateway):
+        return await asyncio.gather(*(gateway.generate("same prompt", model="fake") for _ in range(5)))
+
+    results = run(with_gateway(test))
+    assert fake.generations == 1
+    assert {r["response"] for r in results} == {"same prompt "}
+
+
+def test_concurrency_is_limited_and_excess_requests_queue():
+    fake.reset(delay=0.1)
+
+    async def test(gateway):
+        return await asyncio.gather(*(gateway.generate(f"prompt {i}", model="fake") for i in range(6)))
+
+    results = run(with_gateway(test, max_concurrency=2))
+    assert len(results) == 6
+    assert fake.generations == 6
+    assert fake.peak == 2
+
+
+def test_full_queue_is_rejected():
+    fake.reset(delay=0.3)
+
+    async def test(gateway):
+        return await asyncio.gather(
+            *(gateway.generate(f"prompt {i}", model="fake") for i in range(5)), return_exceptions=True
+        )
+
+    results = run(with_gateway(test, max_concurrency=1, max_queue=2))
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(rejected) == 2 and all(r.status_code == 503 for r in rejected)
+
+
+def test_stream_yields_tokens_then_serves_from_cache():
+    fake.reset()
+
+    async def test(gateway):
+        streamed = [chunk async for chunk in gateway.stream("one two three", model="fake")]
+        replayed = [chunk async for chunk in gateway.stream("one two three", model="fake")]
+        return streamed, replayed
+
+    streamed, replayed = run(with_gateway(test))
+    assert [c["response"] for c in streamed if not c["done"]] == ["one ", "two ", "three "]
+    assert streamed[-1]["done"] is True
+    assert len(replayed) == 1 and replayed[0]["cached"] is True
+    assert replayed[0]["response"] == "one two three "
+    assert fake.generations == 1
+
+
+def test_unavailable_ollama_fails_fast():
+    async def test(gateway):
+        try:
+            await gateway.generate("hello", model="fake")
+        except HTTPException as e:
+            return e.status_code, gateway.healthy
+        return None, gateway.healthy
+
+    # Nothing listens on port 9 of loopback
+    status, healthy = run(with_gateway(test, base_url="http://127.0.0.1:9"))
+    assert status == 503 and healthy is False
+
+
+def test_sse_endpoint_streams_token_events():
+    fake.reset()
+    app = FastAPI()
+    app.include_router(ollama_api.router)
+    original = ollama_api.ollama_gateway
+    ollama_api.ollama_gateway = OllamaGateway(base_url=FAKE_URL)
+    try:
+        with TestClient(app) as client:
+            response = client.post("/ollama/generate/stream", json={"prompt": "alpha beta", "model": "fake"})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+            assert events == ["token", "token", "done"]
+            assert '"response":"alpha "' in response.text
+
+            cached = client.post("/ollama/generate", json={"prompt": "alpha beta", "model": "fake"}).json()
+            assert cached["data"]["cached"] is True and cached["data"]["response"] == "alpha beta "
+    finally:
+        ollama_api.ollama_gateway = original
+    assert fake.generations == 1
+
+
+def test_bulk_job_analyses_every_stock_and_reuses_unchanged_inputs():
+    fake.reset()
+    stocks = [{"symbol": f"SYM{i}", "current_price": 100.0 + i, "price_change_percent": 1.0} for i in range(20)]
+
+    async def test(gateway):
+        engine = AnalysisJobEngine(gateway=gateway, concurrency=4)
+        first = engine.submit(stocks)
+        events = first.listen()
+        await first.task
+        streamed = []
+        while not events.empty():
+            streamed.append(events.get_nowait()[0])
+        second = engine.submit(stocks)
+        await second.task
+        return first, second, streamed
+
+    first, second, streamed = run(with_gateway(test, max_concurrency=2))
+    assert first.status == "completed" and first.completed == 20 and first.failed == 0
+    assert {r["symbol"] for r in first.results} == {s["symbol"] for s in stocks}
+    assert streamed.count("result") == 20 and streamed[-1] == "done"
+    assert second.reused == 20
+    assert fake.generations == 20
+
+
+def test_bulk_job_does_not_starve_interactive_requests():
+    fake.reset(delay=0.2)
+    stocks = [{"symbol": f"SYM{i}", "current_price": 100.0} for i in range(12)]
+
+    async def test(gateway):
+        engine = AnalysisJobEngine(gateway=gateway, concurrency=4)
+        job = engine.submit(stocks)
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        await gateway.generate("interactive question", model="fake")
+        waited = time.perf_counter() - started
+        await job.task
+        return waited, gateway.background_concurrency, job
+
+    waited, background_slots, job = run(with_gateway(test, max_concurrency=2, interactive_reserved=1))
+    assert background_slots == 1
+    # One generation's worth of time, not the ~2.4 s the whole job needs
+    assert waited < 0.5, waited
+    assert job.completed == 12
+
+
+def test_jobs_are_read_back_from_the_database_for_their_owner(db_engine):
+    fake.reset()
+    Base.metadata.create_all(db_engine, tables=[AnalysisJob.__table__, AnalysisResult.__table__])
+    stocks = [{"symbol": f"SYM{i}", "current_price": 200.0 + i} for i in range(5)]
+
+    async def test(gateway):
+        engine = AnalysisJobEngine(gateway=gateway)
+        job = engine.submit(stocks, user_id="alice")
+        await job.task
+        return job
+
+    job = run(with_gateway(test))
+    # A fresh engine stands in for a restarted process, or one that evicted the job
+    restarted = AnalysisJobEngine()
+    loaded = run(restarted.get(job.id, "alice"))
+    assert loaded is not job and loaded.status == "completed" and loaded.total == 5
+    assert {r["symbol"]: r["response"] for r in loaded.results} == {r["symbol"]: r["response"] for r in job.results}
+    assert run(restarted.get(job.id, "mallory")) is None
+    assert run(restarted.get("not-a-uuid")) is None
+
+    app = FastAPI()
+    app.include_router(ollama_api.router)
+    original = ollama_api.analysis_jobs
+    ollama_api.analysis_jobs = restarted
+    try:
+        with TestClient(app) as client:
+            status = client.get(f"/ollama/bulk-analysis/jobs/{job.id}", params={"user_id": "alice"})
+            assert status.status_code == 200 and len(status.json()["data"]["results"]) == 5
+            assert client.get(f"/ollama/bulk-analysis/jobs/{job.id}", params={"user_id": "mallory"}).status_code == 404
+            assert client.delete(f"/ollama/bulk-analysis/jobs/{job.id}", params={"user_id": "mallory"}).status_code == 404
+            stream = client.get(f"/ollama/bulk-analysis/jobs/{job.id}/stream", params={"user_id": "alice"})
+            events = [line[len("event: "):] for line in stream.text.splitlines() if line.startswith("event: ")]
+            assert events == ["result"] * 5 + ["progress", "done"]
+    finally:
+        ollama_api.analysis_jobs = original
+
+
+if __name__ == "__main__":
+    # The database test takes the db_engine fixture from conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))
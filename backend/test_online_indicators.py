@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Online Indicator Tests
+Checks the streaming indicators against pandas and bar-by-bar reference
+implementations, including NaN-padded histories and updates for a subset of
+symbols.
+
+Usage:
+    python test_online_indicators.py
+    python -m pytest test_online_indicators.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.online_indicators import (
+    ATR, EMA, MACD, Bollinger, RollingMax, RollingMin, RollingStats, WilderRSI,
+)
+from app.services.online_indicators import _Indicator, _RollingExtreme
+
+
+def panels(n=25, bars=300, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, (n, bars)))
+    low = close * (1 - rng.uniform(0, 0.02, (n, bars)))
+    volume = rng.uniform(1e5, 1e6, (n, bars))
+    for panel in (close, high, low, volume):
+        panel[:4, :bars // 3] = np.nan  # shorter histories
+    return high, low, close, volume
+
+
+def last(frame: pd.DataFrame) -> np.ndarray:
+    """Value at each symbol's latest bar of a (bars x symbols) frame"""
+    return frame.iloc[-1].to_numpy()
+
+
+def wilder_reference(values, period):
+    """Wilder smoothing seeded with the simple mean of the first ``period`` values"""
+    values = [v for v in values if not np.isnan(v)]
+    if len(values) < period:
+        return np.nan
+    smoothed = np.mean(values[:period])
+    for v in values[period:]:
+        smoothed = (smoothed * (period - 1) + v) / period
+    return smoothed
+
+
+def test_moving_averages_and_windows_match_pandas():
+    _, _, close, _ = panels()
+    frame = pd.DataFrame(close.T)
+    assert np.allclose(EMA(10).warm_up(close).value, last(frame.ewm(span=10, adjust=False).mean()), rtol=1e-12)
+    assert np.array_equal(RollingMax(20).warm_up(close).value, last(frame.rolling(20).max()), equal_nan=True)
+    assert np.array_equal(RollingMin(20).warm_up(close).value, last(frame.rolling(20).min()), equal_nan=True)
+    stats = RollingStats(20).warm_up(close)
+    assert np.allclose(stats.mean(), last(frame.rolling(20).mean()), rtol=1e-10, equal_nan=True)
+    assert np.allclose(stats.std(), last(frame.rolling(20).std()), rtol=1e-8, equal_nan=True)
+    everything = RollingStats().warm_up(close)
+    assert np.allclose(everything.mean(), frame.mean().to_numpy(), rtol=1e-10)
+    assert np.allclose(everything.std(), frame.std().to_numpy(), rtol=1e-10)
+
+    macd = MACD().warm_up(close)
+    line = frame.ewm(span=12, adjust=False).mean() - frame.ewm(span=26, adjust=False).mean()
+    signal = line.ewm(span=9, adjust=False).mean()
+    assert np.allclose(macd.macd, last(line), rtol=1e-10)
+    assert np.allclose(macd.signal, last(signal), rtol=1e-10)
+    assert np.allclose(macd.histogram, last(line - signal), rtol=1e-10)
+
+    bands = Bollinger(20, 2).warm_up(close)
+    mid, sd = frame.rolling(20).mean(), frame.rolling(20).std(ddof=0)
+    assert np.allclose(bands.middle, last(mid), rtol=1e-10)
+    assert np.allclose(bands.upper, last(mid + 2 * sd), rtol=1e-8)
+    assert np.allclose(bands.lower, last(mid - 2 * sd), rtol=1e-8)
+
+
+def test_wilder_rsi_and_atr_match_reference():
+    high, low, close, _ = panels()
+    rsi = WilderRSI(14).warm_up(close)
+    atr = ATR(14).warm_up(high, low, close)
+    for i in range(len(close)):
+        changes = np.diff(close[i][~np.isnan(close[i])])
+        gain = wilder_reference(np.maximum(changes, 0), 14)
+        loss = wilder_reference(np.maximum(-changes, 0), 14)
+        assert abs(rsi.value[i] - (100 - 100 / (1 + gain / loss))) < 1e-9
+
+        h, l, c = (p[i][~np.isnan(p[i])] for p in (high, low, close))
+        prev = np.concatenate([[np.nan], c[:-1]])
+        true_range = np.fmax(h - l, np.fmax(np.abs(h - prev), np.abs(l - prev)))
+        assert abs(atr.value[i] - wilder_reference(true_range, 14)) < 1e-9
+
+    short = WilderRSI(14).warm_up(close[:, :10])
+    assert np.isnan(short.value).all()
+
+
+def test_streaming_updates_match_warm_up():
+    high, low, close, _ = panels(n=12, bars=120)
+    warm = [RollingMax(15).warm_up(close), RollingStats(15).warm_up(close), ATR(10).warm_up(high, low, close)]
+    streamed = [RollingMax(15), RollingStats(15), ATR(10)]
+    rng = np.random.default_rng(4)
+    # Deliver each bar in two interleaved, shuffled halves of the symbols
+    for t in range(close.shape[1]):
+        order = rng.permutation(len(close))
+        for rows in (order[:6], order[6:]):
+            streamed[0].update(close[rows, t], rows=rows)
+            streamed[1].update(close[rows, t], rows=rows)
+            streamed[2].update(high[rows, t], low[rows, t], close[rows, t], rows=rows)
+    assert np.array_equal(streamed[0].value, warm[0].value, equal_nan=True)
+    assert np.allclose(streamed[1].mean(), warm[1].mean(), equal_nan=True)
+    assert np.allclose(streamed[2].value, warm[2].value, equal_nan=True)
+
+    # New symbols grow the state
+    ema = EMA(5, n=2)
+    ema.update([7.0], rows=[4])
+    assert ema.n == 5 and ema.value[4] == 7.0 and np.isnan(ema.value[:4]).all()
+
+
+def test_partial_windows_reset_and_row_mapping():
+    high, low, close, _ = panels(n=10, bars=120)
+    frame = pd.DataFrame(high.T)
+    year = RollingMax(250, min_periods=1).warm_up(high)
+    assert np.array_equal(year.value, last(frame.rolling(250, min_periods=1).max()))
+    assert np.array_equal(RollingMin(30, min_periods=5).warm_up(low[:, :8]).value,
+                          last(pd.DataFrame(low[:, :8].T).rolling(30, min_periods=5).min()), equal_nan=True)
+
+    # Panel rows mapped onto other symbols; a reset symbol starts over
+    rows = np.arange(10)[::-1] + 3
+    rsi = WilderRSI(14).warm_up(close, rows=rows)
+    assert rsi.n == 13 and np.isnan(rsi.value[:3]).all()
+    assert np.allclose(rsi.value[rows], WilderRSI(14).warm_up(close).value)
+    rsi.reset([rows[0]])
+    rsi.warm_up(close[:1, -20:], rows=rows[:1])
+    assert rsi.value[rows[0]] == WilderRSI(14).warm_up(close[:1, -20:]).value[0]
+    macd = MACD().warm_up(close)
+    macd.reset()
+    assert np.isnan(macd.macd).all() and np.isnan(macd.signal).all()
+
+
+def test_bases_cannot_be_instantiated():
+    for base, args in ((_Indicator, ()), (_RollingExtreme, (20,))):
+        try:
+            base(*args)
+            raise AssertionError(f"{base.__name__} should be abstract")
+        except TypeError:
+            pass
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination and streaming export
+
+Pages through swing_centre and trading_journal in an in-memory SQLite
+database and checks that the pages cover every row exactly once in
+newest-first order, including rows that share a date and rows without one.
+
+Usage:
+    python test_pagination.py
+    python -m pytest test_pagination.py
+"""
+
+import csv
+import io
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api import journal as journal_api
+from app.db.models import Base, SwingCentre, TradingJournal
+from app.services import swing_service
+
+
+def setup_database(engine, swings: int = 237, trades: int = 143):
+    Base.metadata.create_all(engine, tables=[SwingCentre.__table__, TradingJournal.__table__])
+    rng = random.Random(5)
+    with Session(engine) as db:
+        for i in range(swings):
+            # Few distinct dates so many rows tie on the sort key, and some rows have none
+            detected = None if i % 17 == 0 else date(2024, 1, 1) + timedelta(days=rng.randrange(20))
+            db.add(SwingCentre(symbol=rng.choice(["INFY", "TCS"]), swing_type="HIGH", swing_level=100 + i,
+                               detected_date=detected, direction="up"))
+        for i in range(trades):
+            traded = None if i % 11 == 0 else datetime(2024, 1, 1) + timedelta(hours=rng.randrange(30))
+            db.add(TradingJournal(trade_id=f"T{i}", symbol="INFY", side="BUY", profit=i, traded_at=traded))
+        db.commit()
+
+
+def newest_first(rows, key):
+    dated = sorted((r for r in rows if r[key] is not None), key=lambda r: (r[key], r["id"]), reverse=True)
+    undated = sorted((r for r in rows if r[key] is None), key=lambda r: r["id"], reverse=True)
+    return [r["id"] for r in dated + undated]
+
+
+def test_swing_pages_cover_every_row_once_in_order(db_engine):
+    setup_database(db_engine)
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = swing_service.get_swings(limit=20, cursor=cursor)
+        seen.extend(page["data"])
+        pages += 1
+        cursor = page["pagination"]["next_cursor"]
+        assert page["pagination"]["has_more"] is (cursor is not None)
+        if cursor is None:
+            break
+    assert pages == 12
+    assert [s["id"] for s in seen] == newest_first(seen, "detected_date")
+    assert len({s["id"] for s in seen}) == 237
+
+
+def test_symbol_filter_and_total(db_engine):
+    setup_database(db_engine)
+    first = swing_service.get_swings_by_symbol("infy", limit=5, include_total=True)
+    assert all(s["symbol"] == "INFY" for s in first["data"])
+    second = swing_service.get_swings_by_symbol("INFY", limit=500, cursor=first["pagination"]["next_cursor"])
+    assert first["pagination"]["total"] == len(first["data"]) + len(second["data"])
+    assert second["pagination"]["next_cursor"] is None
+
+
+def test_bad_cursor_is_a_400(db_engine):
+    setup_database(db_engine)
+    try:
+        swing_service.get_swings(cursor="not-a-cursor")
+    except Exception as e:
+        assert getattr(e, "status_code", None) == 400
+    else:
+        raise AssertionError("expected HTTPException")
+
+
+def test_swing_export_streams_every_row(db_engine):
+    setup_database(db_engine)
+    lines = list(swing_service.export_swings("ndjson"))
+    assert len(lines) == 237
+    rows = [json.loads(line) for line in lines]
+    assert [r["id"] for r in rows] == newest_first(rows, "detected_date")
+
+    exported = list(csv.DictReader(io.StringIO("".join(swing_service.export_swings("csv", symbol="TCS")))))
+    assert exported and all(r["symbol"] == "TCS" for r in exported)
+
+
+def test_global_journal_pages_and_export(db_engine):
+    setup_database(db_engine)
+    app = FastAPI()
+    app.include_router(journal_api.router)
+    with TestClient(app) as client:
+        items, cursor = [], None
+        while True:
+            params = {"limit": 25, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/journal/global", params=params).json()
+            items.extend(page["items"])
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+        assert len(items) == 143
+        assert [i["id"] for i in items] == newest_first(items, "tradedAt")
+
+        export = client.get("/journal/global/export", params={"format": "csv"})
+        assert export.headers["content-type"].startswith("text/csv")
+        assert [int(r["id"]) for r in csv.DictReader(io.StringIO(export.text))] == [i["id"] for i in items]
+
+
+if __name__ == "__main__":
+    # The database comes from the db_engine fixture in conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Panel Indicator Tests
+Checks the (symbols x bars) kernels against pandas and the streaming
+indicators on NaN-padded panels, the long-format pivot, and the study
+signals computed per symbol and for the whole panel at once.
+
+Usage:
+    python test_panel_indicators.py
+    python -m pytest test_panel_indicators.py
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services import panel_indicators as panel
+from app.services.online_indicators import ATR, WilderRSI
+from app.services.study_utils import (
+    calculate_breakout_signals, calculate_momentum_spikes, calculate_study_panel, calculate_tci_signals,
+)
+
+
+def panels(n=25, bars=300, seed=5, padded=True):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, (n, bars)))
+    low = close * (1 - rng.uniform(0, 0.02, (n, bars)))
+    volume = rng.uniform(1e5, 1e6, (n, bars))
+    if padded:
+        for values in (close, high, low, volume):
+            values[:4, :bars // 3] = np.nan  # shorter histories
+    return high, low, close, volume
+
+
+def long_frame(n=30, seed=7):
+    """Long-format bars with a different history length per symbol"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n):
+        bars = int(rng.integers(10, 90))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        frames.append(pd.DataFrame({
+            "symbol": f"SYM{i}",
+            "timestamp": pd.date_range("2024-01-01", periods=bars),
+            "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": rng.uniform(1e5, 1e6, bars),
+        }))
+    # Shuffled rows: the pivot must order by time itself
+    return pd.concat(frames).sample(frac=1, random_state=1)
+
+
+def same(values: np.ndarray, frame: pd.DataFrame) -> bool:
+    """A (symbols x bars) result equals a (bars x symbols) pandas frame, NaNs included"""
+    return np.allclose(values, frame.T.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_kernels_match_pandas():
+    high, low, close, volume = panels()
+    frame = pd.DataFrame(close.T)
+    assert same(panel.returns(close), frame.pct_change(fill_method=None))
+    assert same(panel.returns(close, 5), frame.pct_change(5, fill_method=None))
+    assert same(panel.rolling_sum(volume, 20), pd.DataFrame(volume.T).rolling(20).sum())
+    assert same(panel.rolling_mean(close, 20), frame.rolling(20).mean())
+    assert same(panel.rolling_std(close, 20), frame.rolling(20).std())
+    assert same(panel.rolling_max(high, 20), pd.DataFrame(high.T).rolling(20).max())
+    assert same(panel.rolling_min(low, 20), pd.DataFrame(low.T).rolling(20).min())
+    assert same(panel.ema(close, 10), frame.ewm(span=10, adjust=False).mean().where(frame.notna()))
+
+    # Fewer bars than the window: all warm-up
+    assert np.isnan(panel.rolling_max(close[:, :5], 20)).all()
+    assert np.isnan(panel.rolling_mean(close[:, :5], 20)).all()
+
+
+def test_wilder_kernels_match_streaming_indicators():
+    high, low, close, _ = panels()
+    rsi, atr = panel.rsi(close, 14), panel.atr(high, low, close, 14)
+    for t in (60, 120, close.shape[1]):
+        assert np.allclose(rsi[:, t - 1], WilderRSI(14).warm_up(close[:, :t]).value, equal_nan=True)
+        assert np.allclose(atr[:, t - 1], ATR(14).warm_up(high[:, :t], low[:, :t], close[:, :t]).value,
+                           equal_nan=True)
+    # Warm-up starts at each symbol's first bar: 14 changes for the RSI, 14 ranges for the ATR
+    first = close.shape[1] // 3
+    assert np.isnan(rsi[0, :first + 14]).all() and not np.isnan(rsi[0, first + 14])
+    assert np.isnan(atr[0, :first + 13]).all() and not np.isnan(atr[0, first + 13])
+
+
+def test_to_panel_and_flags():
+    df = long_frame()
+    symbols, arrays = panel.to_panel(df, ("high", "low", "close", "volume"))
+    assert symbols == sorted(df["symbol"].unique())
+    for i, symbol in enumerate(symbols):
+        bars = df[df["symbol"] == symbol].sort_values("timestamp")
+        row = arrays["close"][i]
+        # Right-aligned: the latest bar in the last column, NaN padding on the left
+        assert np.array_equal(row[-len(bars):], bars["close"].to_numpy())
+        assert np.isnan(row[:-len(bars)]).all()
+
+    high, low, close, volume = (arrays[c] for c in ("high", "low", "close", "volume"))
+    breakout, breakdown = panel.breakout_flags(high, low, close, 20)
+    spikes = panel.volume_spike_flags(volume, 20, multiplier=1.5)
+    with np.errstate(invalid="ignore"):
+        assert np.array_equal(breakout, close > panel.shift(pd.DataFrame(high.T).rolling(20).max().T.to_numpy()))
+        assert np.array_equal(breakdown, close < panel.shift(pd.DataFrame(low.T).rolling(20).min().T.to_numpy()))
+        assert np.array_equal(spikes, volume > 1.5 * panel.shift(pd.DataFrame(volume.T).rolling(20).mean().T.to_numpy()))
+    assert breakout.any() and breakdown.any() and spikes.any()
+    assert panel.to_panel(df.head(0), ("close",))[0] == []
+
+
+def test_study_signals():
+    high, low, close, volume = panels(n=1, bars=80, seed=9, padded=False)
+    frame = pd.DataFrame({"high": high[0], "low": low[0], "close": close[0], "volume": volume[0]})
+
+    momentum = calculate_momentum_spikes(frame, lookback=14)
+    assert abs(momentum["rsi"] - WilderRSI(14).warm_up(close).value[0]) < 1e-9
+    assert momentum["momentum"] == frame["close"].iloc[-1] - frame["close"].iloc[-15]
+    returns = frame["close"].pct_change()
+    assert momentum["spike_detected"] == bool(abs(returns.iloc[-1]) > 2 * returns.std())
+
+    breakout = calculate_breakout_signals(frame, window=20)
+    assert "atr" not in frame.columns
+    assert breakout["breakout"] == bool(frame["close"].iloc[-1] > frame["high"].rolling(20).max().iloc[-2])
+    assert breakout["breakdown"] == bool(frame["close"].iloc[-1] < frame["low"].rolling(20).min().iloc[-2])
+    assert breakout["volume_spike"] == bool(frame["volume"].iloc[-1] > 2 * frame["volume"].rolling(20).mean().iloc[-2])
+    assert breakout["volatility"] > 0
+
+    tci = calculate_tci_signals(frame)
+    fast, slow = frame["close"].rolling(10).mean(), frame["close"].rolling(21).mean()
+    expected = (fast > slow).astype(int)
+    assert tci["tci"] == expected.iloc[-1]
+    assert tci["crossover"] == bool(expected.iloc[-1] > expected.iloc[-2])
+    assert calculate_tci_signals(frame.head(5)) == {}
+
+
+def test_study_panel_matches_per_symbol_functions():
+    df = long_frame()
+    signals = calculate_study_panel(df)
+    assert sorted(signals.index) == sorted(df["symbol"].unique())
+    for symbol, bars in df.sort_values("timestamp").groupby("symbol"):
+        row = signals.loc[symbol]
+        momentum = calculate_momentum_spikes(bars)
+        if momentum:
+            # NaN for both when the history is just the lookback
+            assert np.isclose(row["rsi"], momentum["rsi"], rtol=1e-12, equal_nan=True)
+            assert np.isclose(row["momentum"], momentum["momentum"], rtol=1e-12, equal_nan=True)
+            assert row["spike_detected"] == momentum["spike_detected"]
+        breakout = calculate_breakout_signals(bars)
+        if breakout:
+            assert (row["breakout"], row["breakdown"], row["volume_spike"]) == \
+                (breakout["breakout"], breakout["breakdown"], breakout["volume_spike"])
+            assert np.isclose(row["volatility"], breakout["volatility"], rtol=1e-12, equal_nan=True)
+        else:
+            assert not row["breakout"] and not row["breakdown"]
+        tci = calculate_tci_signals(bars)
+        if len(bars) > 21:
+            assert row["tci"] == tci["tci"] and row["crossover"] == tci["crossover"]
+        elif not tci:
+            assert np.isnan(row["tci"])
+    assert calculate_study_panel(df.head(0)).empty
+
+
+def test_study_service_uses_panel_signals():
+    from app.services.services.study_service import StudyService
+
+    service = StudyService()
+    df = long_frame()
+    signals = calculate_study_panel(df)
+
+    async def market_data(*args, **kwargs):
+        return df
+
+    service.get_market_data = market_data
+    gainers = asyncio.run(service.get_study_symbol("top_gainers", 5))["data"]
+    expected = signals["change_pct"].dropna().sort_values(ascending=False).head(5)
+    assert [row["Symbol"] for row in gainers] == expected.index.tolist()
+    assert [row["param_2"] for row in gainers] == expected.tolist()
+
+    sells = asyncio.run(service.get_study_symbol("tci_sell_signals", 50))["data"]
+    assert {row["Symbol"] for row in sells} == set(signals.index[signals["tci"] == 0])
+    assert all(row["param_3"] <= 0 for row in sells)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
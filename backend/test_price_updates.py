@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Price push tests
+Runs WatchlistService.apply_price_updates against an in-memory SQLite
+database with a fresh alert engine, and checks the chunked set-based price
+writes and that the watchlist prices, the price history and the fired
+alerts are written in one transaction.
+
+Usage:
+    python test_price_updates.py
+    python -m pytest test_price_updates.py
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Alert, Base, PriceHistory, User, Watchlist, WatchlistItem
+from app.services import alert_engine as alert_module
+from app.services import watchlist_service
+from app.services.alert_engine import AlertEngine
+from app.services.watchlist_service import WatchlistService
+
+
+@pytest.fixture
+def prices_db(db_engine, monkeypatch):
+    """Watchlist and alert tables with SYM0..SYM2 on one watchlist and a fresh alert engine"""
+    Base.metadata.create_all(db_engine, tables=[User.__table__, Watchlist.__table__, WatchlistItem.__table__,
+                                                PriceHistory.__table__, Alert.__table__])
+    monkeypatch.setattr(watchlist_service, "alert_engine", AlertEngine())
+    watchlist_service._item_prices.clear()
+
+    Session = sessionmaker(bind=db_engine)
+    now = datetime.utcnow()
+    with Session() as db:
+        watchlist_id = uuid.uuid4()
+        db.add(Watchlist(id=watchlist_id, user_id=uuid.uuid4(), name="Main", is_default=True,
+                         created_at=now, updated_at=now))
+        for i in range(3):
+            db.add(WatchlistItem(id=uuid.uuid4(), watchlist_id=watchlist_id, ticker=f"SYM{i}", exchange="NSE",
+                                 last_price=100 + i, alert_enabled=True, created_at=now, updated_at=now))
+        db.flush()
+        item = db.query(WatchlistItem).filter(WatchlistItem.ticker == "SYM1").one()
+        db.add(Alert(id=uuid.uuid4(), watchlist_item_id=item.id, alert_type="price_above", comparison="gte",
+                     threshold=150, is_active=True, created_at=now))
+        db.commit()
+    return Session
+
+
+def state(Session):
+    with Session() as db:
+        prices = {i.ticker: float(i.last_price) for i in db.query(WatchlistItem)}
+        history = db.query(PriceHistory).count()
+        alert = db.query(Alert).one()
+    return prices, history, alert
+
+
+def test_prices_are_written_in_chunks(prices_db, db_engine, monkeypatch):
+    monkeypatch.setattr(watchlist_service, "PRICE_UPDATE_CHUNK_SIZE", 2)
+    now = datetime.utcnow()
+    with prices_db() as db:
+        watchlist_id = uuid.uuid4()
+        db.add(Watchlist(id=watchlist_id, user_id=uuid.uuid4(), name="Other", created_at=now, updated_at=now))
+        for ticker, price in (("SYM1", 100), ("NOPRICE", None)):
+            db.add(WatchlistItem(id=uuid.uuid4(), watchlist_id=watchlist_id, ticker=ticker, exchange="NSE",
+                                 last_price=price, created_at=now, updated_at=now))
+        db.commit()
+
+    statements = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    updated = WatchlistService.update_stock_prices({"sym1": 110.0, "SYM0": 100.0, "NOPRICE": 50.0, "UNKNOWN": 1.0})
+    # One history insert, then one UPDATE per chunk of two tickers
+    assert updated == 4
+    assert len(statements) == 3 and statements[0].lstrip().upper().startswith("INSERT")
+
+    with prices_db() as db:
+        items = db.query(WatchlistItem).all()
+        history = sorted((h.ticker, float(h.price)) for h in db.query(PriceHistory))
+    assert history == [("NOPRICE", 50.0), ("SYM0", 100.0), ("SYM1", 110.0), ("UNKNOWN", 1.0)]
+    changes = {}
+    for item in items:
+        changes.setdefault(item.ticker, []).append(float(item.percent_change or 0))
+        assert item.ticker == "SYM2" or item.last_price_at is not None
+    # percent_change is measured from the previous price; an unpriced item has none
+    assert sorted(changes["SYM1"]) == pytest.approx(sorted([(110 - 101) / 101 * 100, 10.0]), abs=1e-4)
+    assert changes["SYM0"] == [0.0] and changes["NOPRICE"] == [0.0] and changes["SYM2"] == [0.0]
+    pushed = {k: fields["current_price"] for k, (_, fields) in watchlist_service._item_prices.items()}
+    assert sorted(pushed.values()) == [50.0, 100.0, 110.0, 110.0]
+
+
+def test_prices_and_fired_alerts_commit_together(prices_db):
+    result = WatchlistService.apply_price_updates({"sym1": 160.0, "SYM2": 99.0})
+    assert result["updated_count"] == 2
+    assert [a["ticker"] for a in result["triggered_alerts"]] == ["SYM1"]
+
+    prices, history, alert = state(prices_db)
+    assert prices == {"SYM0": 100.0, "SYM1": 160.0, "SYM2": 99.0}
+    assert history == 2
+    assert alert.is_active is False and alert.last_triggered_at is not None
+    # Already written: nothing is left for the batched writer
+    assert watchlist_service.alert_engine.stats()["pending"] == 0
+
+
+def test_a_failed_push_rolls_back_prices_and_alerts(prices_db, monkeypatch):
+    deactivate = alert_module.deactivate_fired_alerts
+
+    def failing(db, fired):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(alert_module, "deactivate_fired_alerts", failing)
+    with pytest.raises(RuntimeError):
+        WatchlistService.apply_price_updates({"SYM1": 160.0})
+
+    prices, history, alert = state(prices_db)
+    assert prices["SYM1"] == 101.0 and history == 0
+    assert alert.is_active is True
+    assert watchlist_service._item_prices == {}
+
+    # The engine reloads the still-active alert, fires it again at the last
+    # seen price and hands it to the batched writer
+    monkeypatch.setattr(alert_module, "deactivate_fired_alerts", deactivate)
+    engine = watchlist_service.alert_engine
+    engine.ensure_loaded()
+    assert engine.stats()["pending"] == 1 and engine.flush() == 1
+    assert state(prices_db)[2].is_active is False
+
+if __name__ == "__main__":
+    # The database comes from the db_engine fixture in conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))
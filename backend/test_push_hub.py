@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Push Hub Tests
+Streams topics through the SSE endpoint and the hub's refresh loops, and
+publishes into topic channels directly to check what a subscriber's queue
+holds: full frames, row diffs, and how a full queue is coalesced.
+
+Usage:
+    python test_push_hub.py
+    python -m pytest test_push_hub.py
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fastapi import HTTPException
+
+from app.api import stream
+from app.services.push_hub import PushHub, Subscription, _TopicChannel, encode_event
+
+# Topic names are unique per test since the snapshot store is process-wide
+_names = itertools.count()
+
+
+def table(*prices):
+    return {"data": [{"Symbol": f"S{i}", "price": p} for i, p in enumerate(prices)]}
+
+
+def channels(sub, *topics):
+    hub = PushHub()
+    result = []
+    for topic in topics:
+        channel = hub._channels[topic] = _TopicChannel(topic, lambda: None, interval=1)
+        channel.subscribers.add(sub)
+        result.append(channel)
+    sub._latest = hub._latest_frame
+    return result
+
+
+def parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields["event"], int(fields.get("id", 0)), json.loads(fields["data"])
+
+
+def queued(sub):
+    frames = []
+    while not sub.queue.empty():
+        frames.append(parse(sub.queue.get_nowait()[1]))
+    return frames
+
+
+class Disconnecting:
+    """Stands in for the request: reports a disconnect after ``frames`` polls"""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    async def is_disconnected(self):
+        self.frames -= 1
+        return self.frames < 0
+
+
+def with_hub(test):
+    # The endpoint uses the process-wide hub; give it a private one
+    hub = PushHub()
+    original = stream.push_hub
+    stream.push_hub = hub
+    try:
+        asyncio.run(test(hub))
+    finally:
+        stream.push_hub = original
+
+
+def test_encode_event():
+    assert encode_event("a.b", {"x": 1}, 3) == b'event: a.b\nid: 3\ndata: {"x":1}\n\n'
+    assert encode_event("error", "boom") == b"event: error\ndata: boom\n\n"
+
+
+def test_sse_endpoint_streams_each_topic():
+    async def test(hub):
+        calls = {"sectors": 0}
+
+        def sectors():
+            calls["sectors"] += 1
+            return table(calls["sectors"])
+
+        hub.register("sector.heatmap", sectors, interval=0.01)
+        hub.register("depth.{section}", lambda section: {"section": section}, interval=0.01)
+
+        response = await stream.stream_topics(Disconnecting(4), topics="sector.heatmap, depth.gainers", mode="full")
+        assert response.media_type == "text/event-stream"
+        frames = [frame async for frame in response.body_iterator]
+        assert frames[0] == b"retry: 3000\n\n"
+        events = [parse(frame) for frame in frames[1:]]
+        assert len(events) == 4
+        assert ("depth.gainers", 1, {"section": "gainers"}) in events
+        assert [data for event, _, data in events if event == "sector.heatmap"][:2] == [table(1), table(2)]
+        # The disconnect unsubscribed the stream and stopped the refresh loops
+        await asyncio.sleep(0)
+        assert hub.stats() == {}
+
+    with_hub(test)
+
+
+def test_sse_endpoint_rejects_bad_topics():
+    async def test(hub):
+        hub.register("sector.heatmap", lambda: {}, interval=1)
+        for topics, status in (("nope.topic", 404), (" , ", 400)):
+            try:
+                await stream.stream_topics(Disconnecting(0), topics=topics, mode="full")
+                raise AssertionError("expected HTTPException")
+            except HTTPException as e:
+                assert e.status_code == status, topics
+        assert (await stream.list_topics())["data"]["patterns"] == [{"topic": "sector.heatmap", "interval": 1}]
+
+    with_hub(test)
+
+
+def test_subscribers_share_one_refresh_loop():
+    async def test(hub):
+        calls = []
+        hub.register("shared.{name}", lambda name: calls.append(name) or {"name": name}, interval=0.01)
+        first = hub.subscribe(["shared.a"])
+        second = hub.subscribe(["shared.a"])
+        frame = await asyncio.wait_for(first.get(), 1)
+        assert await asyncio.wait_for(second.get(), 1) is frame
+        await asyncio.sleep(0.05)
+        # An unchanged payload is computed every cycle but never re-sent
+        assert len(calls) > 1 and first.queue.empty()
+
+        late = hub.subscribe(["shared.a"])
+        assert late.queue.get_nowait()[1] is frame
+        assert hub.stats()["shared.a"]["subscribers"] == 3
+
+        for sub in (first, second, late):
+            hub.unsubscribe(sub)
+        assert hub.stats() == {}
+        await hub.shutdown()
+
+    with_hub(test)
+
+
+def test_producer_errors_are_sent_as_error_events():
+    async def test(hub):
+        def failing():
+            raise ValueError("upstream down")
+
+        hub.register("broken.topic", failing, interval=0.01)
+        sub = hub.subscribe(["broken.topic"])
+        event, _, data = parse(await asyncio.wait_for(sub.get(), 1))
+        assert event == "error" and data == {"topic": "broken.topic", "detail": "upstream down"}
+        await hub.shutdown()
+
+    with_hub(test)
+
+
+def test_diff_subscribers_get_a_full_frame_then_row_diffs():
+    async def test():
+        topic = f"hub{next(_names)}.a"
+        full_sub = Subscription([topic], mode="full")
+        diff_sub = Subscription([topic], mode="diff")
+        (channel,) = channels(full_sub, topic)
+        channel.subscribers.add(diff_sub)
+
+        assert channel.publish(table(1, 2))
+        assert not channel.publish(table(1, 2))
+        channel.publish(table(1, 3))
+        assert [data for _, _, data in queued(full_sub)] == [table(1, 2), table(1, 3)]
+        first, second = queued(diff_sub)
+        assert first[2] == table(1, 2)
+        assert second[1] == 2 and second[2]["mode"] == "diff" and second[2]["base_version"] == 1
+        assert second[2]["changed"] == [{"Symbol": "S1", "price": 3}]
+
+        # A subscriber that missed a version is sent the full payload again
+        diff_sub.versions[topic] = 1
+        channel.publish(table(4, 3))
+        assert queued(diff_sub)[0][2] == table(4, 3)
+
+    asyncio.run(test())
+
+
+def test_overflow_drops_only_the_lagging_topics_frames():
+    async def test():
+        a, b = f"hub{next(_names)}.a", f"hub{next(_names)}.b"
+        sub = Subscription([a, b], mode="diff", maxsize=4)
+        ca, cb = channels(sub, a, b)
+        cb.publish(table(1))
+        for price in (1, 2, 3, 4):
+            ca.publish(table(price, 10))
+
+        frames = queued(sub)
+        assert sub.dropped == 3
+        # b's frame is untouched; a's backlog is replaced by its full snapshot
+        assert [(event, version) for event, version, _ in frames] == [(b, 1), (a, 4)]
+        assert frames[1][2] == table(4, 10)
+        assert sub.versions == {a: 4, b: 1}
+
+        # Diffs resume on top of the resynced version
+        ca.publish(table(5, 10))
+        assert queued(sub)[0][2]["mode"] == "diff"
+
+    asyncio.run(test())
+
+
+def test_a_queue_full_of_other_topics_resyncs_every_topic():
+    async def test():
+        a, b = f"hub{next(_names)}.a", f"hub{next(_names)}.b"
+        sub = Subscription([a, b], mode="diff", maxsize=2)
+        ca, cb = channels(sub, a, b)
+        cb.publish(table(1))
+        cb.publish(table(2))
+        ca.publish(table(7))
+
+        frames = queued(sub)
+        assert sub.dropped == 2
+        assert frames == [(a, 1, table(7)), (b, 2, table(2))]
+        assert sub.versions == {a: 1, b: 2}
+
+    asyncio.run(test())
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
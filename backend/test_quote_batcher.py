@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Quote Batcher Tests
+Drives QuoteBatcher with a fake upstream and checks that concurrent
+lookups are coalesced into deduplicated, broker-sized batches, that each
+caller gets only its own quotes, and the short per-symbol cache.
+
+Usage:
+    python test_quote_batcher.py
+    python -m pytest test_quote_batcher.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.quote_batcher import QuoteBatcher
+
+
+class FakeUpstream:
+    """Records every batch it is asked for and quotes all symbols except UNKNOWN"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, symbols, user_id):
+        self.calls.append((user_id, list(symbols)))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"s": "ok", "d": [{"n": s, "v": {"lp": len(s)}} for s in symbols if s != "UNKNOWN"]}
+
+
+def names(response):
+    return [item["n"] for item in response["d"]]
+
+
+def test_concurrent_lookups_share_one_upstream_call():
+    async def test():
+        upstream = FakeUpstream()
+        batcher = QuoteBatcher(upstream, window_ms=5)
+        results = await asyncio.gather(
+            batcher.get_quotes(["A", "B", "A"]),
+            batcher.get_quotes(["B", "C", "UNKNOWN"]),
+            batcher.get_quotes(["C"]),
+        )
+        return upstream, batcher, results
+
+    upstream, batcher, (first, second, third) = asyncio.run(test())
+    assert upstream.calls == [("default", ["A", "B", "C", "UNKNOWN"])]
+    # Each caller gets its own symbols in request order; unknown symbols are left out
+    assert names(first) == ["A", "B"] and names(second) == ["B", "C"] and names(third) == ["C"]
+    assert batcher.stats["coalesced"] == 2 and batcher.stats["upstream_calls"] == 1
+
+
+def test_large_requests_are_split_and_users_kept_apart():
+    async def test():
+        upstream = FakeUpstream()
+        batcher = QuoteBatcher(upstream, batch_size=50)
+        symbols = [f"S{i}" for i in range(120)]
+        mine, theirs = await asyncio.gather(batcher.get_quotes(symbols, "u1"), batcher.get_quotes(["S1"], "u2"))
+        return upstream, symbols, mine, theirs
+
+    upstream, symbols, mine, theirs = asyncio.run(test())
+    assert names(mine) == symbols and names(theirs) == ["S1"]
+    assert sorted(len(batch) for user, batch in upstream.calls if user == "u1") == [20, 50, 50]
+    assert [batch for user, batch in upstream.calls if user == "u2"] == [["S1"]]
+
+
+def test_quotes_are_cached_briefly():
+    async def test():
+        upstream = FakeUpstream()
+        batcher = QuoteBatcher(upstream, cache_ttl=0.2)
+        await batcher.get_quotes(["A", "B"])
+        again = await batcher.get_quotes(["B", "A"])
+        assert names(again) == ["B", "A"] and len(upstream.calls) == 1
+        assert batcher.stats["cache_hits"] == 2
+        await asyncio.sleep(0.25)
+        await batcher.get_quotes(["A"])
+        assert upstream.calls[-1] == ("default", ["A"])
+
+    asyncio.run(test())
+
+
+def test_upstream_failures_reach_every_waiter_and_are_not_cached():
+    async def test():
+        upstream = FakeUpstream(fail=True)
+        batcher = QuoteBatcher(upstream)
+        results = await asyncio.gather(batcher.get_quotes(["A"]), batcher.get_quotes(["A", "B"]),
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        upstream.fail = False
+        assert names(await batcher.get_quotes(["A"])) == ["A"]
+        assert len(upstream.calls) == 2
+
+    asyncio.run(test())
+
+
+def test_a_cancelled_caller_leaves_shared_lookups_alone():
+    async def test():
+        upstream = FakeUpstream()
+        batcher = QuoteBatcher(upstream, window_ms=5)
+        first = asyncio.create_task(batcher.get_quotes(["A", "B"]))
+        second = asyncio.create_task(batcher.get_quotes(["B"]))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert names(await second) == ["B"]
+        assert first.cancelled() and len(upstream.calls) == 1
+        # The fetched quotes are cached for later callers
+        assert names(await batcher.get_quotes(["A"])) == ["A"] and len(upstream.calls) == 1
+
+    asyncio.run(test())
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiter tests
+Checks refill over time, burst capacity, waiting up to max_wait, idle bucket
+eviction, and that Fyers calls take a token from the shared upstream budget
+before any HTTP request is made.
+
+Usage:
+    python test_rate_limiter.py
+    python -m pytest test_rate_limiter.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import HTTPException
+
+from app.api import fyers
+from app.utils import rate_limiter
+from app.utils.rate_limiter import TokenBucketLimiter
+
+
+class FakeClock:
+    """Stands in for time.monotonic so refill can be checked without sleeping"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def with_clock(test):
+    # Only the limiter module's view of the clock changes
+    clock = FakeClock()
+    original = rate_limiter.time
+    rate_limiter.time = SimpleNamespace(monotonic=clock, time=time.time)
+    try:
+        test(clock)
+    finally:
+        rate_limiter.time = original
+
+
+def test_burst_then_reject():
+    def test(clock):
+        limiter = TokenBucketLimiter(60, 60, burst=5)
+        assert [limiter.allow("a") for _ in range(6)] == [True] * 5 + [False]
+        # Buckets are per key
+        assert limiter.allow("b")
+        assert limiter.status("a")["requests_remaining"] == 0
+
+    with_clock(test)
+
+
+def test_tokens_refill_at_the_configured_rate():
+    def test(clock):
+        limiter = TokenBucketLimiter(60, 60, burst=5)  # one token per second
+        for _ in range(5):
+            limiter.allow("a")
+        assert not limiter.allow("a")
+        clock.now += 0.5
+        assert not limiter.allow("a")
+        clock.now += 0.5
+        assert limiter.allow("a") and not limiter.allow("a")
+        # Refill never exceeds the burst capacity
+        clock.now += 3600
+        assert [limiter.allow("a") for _ in range(6)] == [True] * 5 + [False]
+
+    with_clock(test)
+
+
+def test_idle_buckets_are_evicted():
+    def test(clock):
+        limiter = TokenBucketLimiter(60, 60, idle_ttl=10)
+        limiter.allow("a")
+        limiter.allow("b")
+        assert len(limiter) == 2
+        clock.now += 11
+        limiter.allow("c")
+        assert len(limiter) == 1
+
+    with_clock(test)
+
+
+def test_acquire_waits_up_to_max_wait():
+    async def test():
+        limiter = TokenBucketLimiter(20, 1, burst=1)  # a token every 50 ms
+        assert await limiter.acquire("k")
+        started = time.perf_counter()
+        assert await limiter.acquire("k", max_wait=0.2)
+        waited = time.perf_counter() - started
+        # Two callers already reserved the bucket: the next one would wait ~100 ms
+        assert await limiter.acquire("k", max_wait=0.01) is False
+        return waited
+
+    waited = asyncio.run(test())
+    assert 0.03 < waited < 0.2, waited
+
+
+def test_fyers_requests_take_an_upstream_token_first():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"s": "ok"})
+
+    async def test():
+        fyers._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            assert await fyers.make_fyers_request("market-status", access_token="t") == {"s": "ok"}
+            # Budget used up and refilling slower than max_wait: shed without calling Fyers
+            while fyers.upstream_limiter.allow("fyers"):
+                pass
+            try:
+                await fyers.make_fyers_request("market-status", access_token="t")
+                raise AssertionError("expected HTTPException")
+            except HTTPException as e:
+                assert e.status_code == 503 and "Retry-After" in e.headers
+        finally:
+            await fyers.close_fyers_client()
+
+    original = fyers.upstream_limiter, fyers.FYERS_UPSTREAM_MAX_WAIT
+    fyers.upstream_limiter = TokenBucketLimiter(1, 60, burst=3)
+    fyers.FYERS_UPSTREAM_MAX_WAIT = 0.5
+    try:
+        asyncio.run(test())
+    finally:
+        fyers.upstream_limiter, fyers.FYERS_UPSTREAM_MAX_WAIT = original
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Scanner DSL Tests
+Checks that scan expressions compile to the same masks as hand-written NumPy,
+that unsafe or ill-typed expressions are rejected, and that plans are cached.
+
+Usage:
+    python test_scanner_dsl.py
+    python -m pytest test_scanner_dsl.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.scanner_dsl import BOOL, NUMBER, PlanCache, ScanExpressionError, compile_expression
+from app.services.scanner_engine import FEATURES, SCANNERS
+from test_scanner_engine import make_engine
+
+
+def columns(n=1000, seed=5):
+    rng = np.random.default_rng(seed)
+    c = {name: rng.uniform(0, 200, n) for name in FEATURES}
+    c["rsi14"] = rng.uniform(0, 100, n)
+    c["sma50"][::7] = np.nan
+    return c
+
+
+def test_expression_matches_numpy():
+    c = columns()
+    plan = compile_expression("rsi14 < 30 and volume > 2 * vol_avg20 and close > sma50", FEATURES)
+    with np.errstate(invalid="ignore"):
+        expected = (c["rsi14"] < 30) & (c["volume"] > 2 * c["vol_avg20"]) & (c["close"] > c["sma50"])
+    assert plan.kind == BOOL
+    assert plan.names == {"rsi14", "volume", "vol_avg20", "close", "sma50"}
+    assert np.array_equal(plan(c), expected)
+
+    plan = compile_expression("not (30 <= rsi14 <= 70) or abs(change_pct) > max(close / 50, 3)", FEATURES)
+    expected = ~((30 <= c["rsi14"]) & (c["rsi14"] <= 70)) | (np.abs(c["change_pct"]) > np.maximum(c["close"] / 50, 3))
+    assert np.array_equal(plan(c), expected)
+
+    rank = compile_expression("-(volume / vol_avg20)", FEATURES)
+    assert rank.kind == NUMBER
+    assert np.allclose(rank(c), -(c["volume"] / c["vol_avg20"]))
+
+
+def test_parameters_and_constant_folding():
+    c = columns()
+    plan = compile_expression("rsi14 <= rsi_below", FEATURES, ["rsi_below"])
+    assert np.array_equal(plan(c, {"rsi_below": 25.0}), c["rsi14"] <= 25.0)
+    folded = compile_expression("2 * 1.5 + 1", FEATURES)
+    assert folded(c) == 4.0
+
+
+def test_rejects_unsafe_and_ill_typed_expressions():
+    bad = [
+        "__import__('os').system('true')",
+        "close.__class__",
+        "close[0] > 1",
+        "open > 1",
+        "rsi14 + 1",
+        "close > 1 and 5",
+        "not close",
+        "lambda: 1",
+        "close ** 2 > 1",
+        "close in (1, 2)",
+        "close > 'a'",
+        "True",
+        "rsi14 < ",
+        "",
+        "min(close) > 1",
+        "x" * 600,
+    ]
+    for expression in bad:
+        try:
+            plan = compile_expression(expression, FEATURES)
+        except ScanExpressionError:
+            continue
+        assert plan.kind != BOOL, expression
+
+    cache = PlanCache(FEATURES)
+    try:
+        cache.get("rsi14 + 1", BOOL)
+        assert False, "expected ScanExpressionError"
+    except ScanExpressionError:
+        pass
+
+
+def test_deep_nesting_is_rejected_not_a_crash():
+    for expression in ["-" * 490 + "close > 1", "not " * 120 + "close > 1", "abs(" * 80 + "close" + ")" * 80 + " > 1"]:
+        try:
+            compile_expression(expression, FEATURES)
+            assert False, "expected ScanExpressionError"
+        except ScanExpressionError as e:
+            assert "nested" in str(e), e
+    # Moderate nesting still compiles and evaluates
+    c = columns()
+    plan = compile_expression("-" * 20 + "close > 1", FEATURES)
+    assert np.array_equal(plan(c), c["close"] > 1)
+
+
+def test_not_leaves_out_symbols_missing_a_feature():
+    c = {"rsi14": np.array([np.nan, 20.0, 40.0]), "close": np.array([10.0, np.nan, 10.0])}
+    assert compile_expression("not rsi14 < 30", FEATURES)(c).tolist() == [False, False, True]
+    assert compile_expression("not (rsi14 < 30 or close > 5)", FEATURES)(c).tolist() == [False, False, False]
+    assert compile_expression("not not rsi14 < 30", FEATURES)(c).tolist() == [False, True, False]
+
+
+def test_plan_cache_by_expression_hash():
+    cache = PlanCache(FEATURES, max_size=2)
+    first = cache.get("rsi14 < 30")
+    assert cache.get("rsi14   <  30") is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Least recently used plans are evicted
+    cache.get("close > 1")
+    cache.get("close > 2")
+    assert len(cache) == 2 and cache.get("rsi14 < 30") is not first
+    # Names are only valid as parameters when declared
+    assert cache.get("rsi14 <= rsi_below", parameters=["rsi_below"]).names == {"rsi14", "rsi_below"}
+    try:
+        cache.get("rsi14 <= rsi_below")
+        assert False, "expected ScanExpressionError"
+    except ScanExpressionError:
+        pass
+
+
+def test_builtin_scanners_equal_their_expressions():
+    engine, symbols, _, _ = make_engine()
+    for name, spec in SCANNERS.items():
+        condition = spec.condition
+        for param, value in spec.defaults.items():
+            condition = condition.replace(param, repr(value))
+        builtin = engine.scan(name, min_price=50, limit=25)
+        custom = engine.scan_expression(condition, spec.rank_by, spec.descending, min_price=50, limit=25)
+        assert builtin == custom, name
+    rows = engine.scan_expression("rsi14 < 40 and close > sma50", rank_by="rsi14", descending=False, limit=500)
+    assert all(row["rsi14"] < 40 and row["ltp"] > row["sma50"] for row in rows)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Scanner Engine Tests
+Checks the scanner masks against a pandas reference, the top-k ranking, the
+Wilder RSI against a bar-by-bar reference, and incremental membership and
+enter/exit events against full scans.
+
+Usage:
+    python test_scanner_engine.py
+    python -m pytest test_scanner_engine.py
+"""
+
+import asyncio
+import os
+import sys
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.market_state import MarketState
+from app.services.scanner_engine import HISTORY_FEATURES, SCANNERS, ScannerEngine, top_k
+from app.services.symbol_registry import symbol_registry
+
+
+def make_engine(n=300, bars=260, seed=3):
+    rng = np.random.default_rng(seed)
+    symbols = [f"SYM{i}" for i in range(n)]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.02, (n, bars)))
+    low = close * (1 - rng.uniform(0, 0.02, (n, bars)))
+    volume = rng.uniform(1e5, 1e6, (n, bars))
+    # A few short histories, NaN-padded on the left
+    close[:10, :200] = high[:10, :200] = low[:10, :200] = volume[:10, :200] = np.nan
+
+    state = MarketState(symbols)
+    engine = ScannerEngine(state)
+    engine.load_history(symbols, high, low, close, volume)
+    ltp = close[:, -1] * (1 + rng.normal(0, 0.04, n))
+    state.apply(state.slots(symbols), ltp, volume=volume[:, -20:].mean(axis=1) * rng.uniform(0.5, 4, n),
+                prev_close=close[:, -1])
+    return engine, symbols, (high, low, close, volume), ltp
+
+
+def wilder_rsi(closes, period=14):
+    closes = [c for c in closes if not np.isnan(c)]
+    changes = np.diff(closes)
+    gain = np.mean(np.maximum(changes[:period], 0))
+    loss = np.mean(np.maximum(-changes[:period], 0))
+    for d in changes[period:]:
+        gain = (gain * (period - 1) + max(d, 0)) / period
+        loss = (loss * (period - 1) + max(-d, 0)) / period
+    return 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+
+
+def test_rsi_matches_wilder_reference():
+    engine, symbols, (_, _, close, _), ltp = make_engine(n=20)
+    engine.refresh()
+    for i in (0, 5, 15):
+        expected = wilder_rsi(list(close[i]) + [ltp[i]])
+        assert abs(engine.columns["rsi14"][i] - expected) < 1e-9, (i, engine.columns["rsi14"][i], expected)
+
+
+def test_masks_match_pandas_reference():
+    engine, symbols, (high, low, close, volume), ltp = make_engine()
+    state = engine.state
+    frame = pd.DataFrame({
+        "close": ltp,
+        "prev_close": close[:, -1],
+        "volume": state.volume[:len(symbols)],
+        "sma20": pd.DataFrame(close).T.rolling(20).mean().iloc[-1].to_numpy(),
+        "high20": pd.DataFrame(high).T.rolling(20).max().iloc[-1].to_numpy(),
+        "vol_avg20": pd.DataFrame(volume).T.rolling(20).mean().iloc[-1].to_numpy(),
+    }, index=symbols)
+    frame["change_pct"] = (frame["close"] / frame["prev_close"] - 1) * 100
+    frame["vol_ratio"] = frame["volume"] / frame["vol_avg20"]
+
+    expected = {
+        "momentum": frame[(frame.change_pct >= 2) & (frame.close > frame.sma20) & (frame.vol_ratio >= 1)]
+        .sort_values("change_pct", ascending=False),
+        "volume": frame[frame.vol_ratio >= 2].sort_values("vol_ratio", ascending=False),
+        "breakout": frame[(frame.close > frame.high20) & (frame.vol_ratio >= 1.5)]
+        .assign(b=lambda f: f.close / f.high20).sort_values("b", ascending=False),
+    }
+    for scanner, reference in expected.items():
+        got = [row["symbol"] for row in engine.scan(scanner, limit=len(symbols))]
+        assert got == reference.index.tolist(), scanner
+
+    # Filters narrow the same result set
+    rows = engine.scan("volume", min_price=100, max_price=120, min_volume=3e5, limit=len(symbols))
+    reference = expected["volume"]
+    reference = reference[(reference.close >= 100) & (reference.close <= 120) & (reference.volume >= 3e5)]
+    assert [row["symbol"] for row in rows] == reference.index.tolist()
+
+
+def test_rsi_scanners_and_thresholds():
+    engine, symbols, _, _ = make_engine()
+    rsi = engine.scan("oversold", rsi_below=45, limit=1000)
+    assert rsi and all(row["rsi14"] <= 45 for row in rsi)
+    assert [row["rsi14"] for row in rsi] == sorted(row["rsi14"] for row in rsi)
+    hot = engine.scan("overbought", rsi_above=55, limit=5)
+    assert len(hot) <= 5 and all(row["rsi14"] >= 55 for row in hot)
+    try:
+        engine.scan("oversold", volume_multiplier=3)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert set(SCANNERS) == {"momentum", "volume", "breakout", "oversold", "overbought"}
+
+
+def test_top_k_is_a_partial_sort():
+    rng = np.random.default_rng(1)
+    key = rng.normal(size=1000)
+    candidates = np.flatnonzero(key > -0.5)
+    best = top_k(candidates, key, 10)
+    assert best.tolist() == candidates[np.argsort(-key[candidates])][:10].tolist()
+    worst = top_k(candidates, key, 10, descending=False)
+    assert worst.tolist() == candidates[np.argsort(key[candidates])][:10].tolist()
+    assert len(top_k(candidates[:3], key, 10)) == 3
+
+
+def test_group_filter_and_new_ticks():
+    group = symbol_registry.groups()[0]
+    members = symbol_registry.members(group)
+    state = MarketState(symbol_registry.symbols)
+    engine = ScannerEngine(state)
+    n = len(members) + 5
+    symbols = members + [s for s in symbol_registry.symbols if s not in members][:5]
+    bars = np.full((n, 30), 100.0)
+    engine.load_history(symbols, bars * 1.01, bars * 0.99, bars, np.full((n, 30), 1e5))
+    state.apply(state.slots(symbols), np.full(n, 110.0), volume=np.full(n, 5e5), prev_close=np.full(n, 100.0))
+    rows = engine.scan("volume", group=group, limit=1000)
+    assert {row["symbol"] for row in rows} == set(members)
+    assert rows[0]["sector"] == (symbol_registry.info(rows[0]["symbol"])["sector"] or "")
+
+    # A fresh tick is picked up on the next scan
+    state.update(members[0], 120.0, volume=5e6)
+    top = engine.scan("volume", group=group, limit=1)[0]
+    assert top["symbol"] == members[0] and top["ltp"] == 120.0 and top["vol_ratio"] == 50.0
+
+
+def test_incremental_membership_matches_full_scan():
+    engine, symbols, (_, _, close, volume), _ = make_engine()
+    state = engine.state
+    received = []
+    engine.add_listener(received.extend)
+    for name in SCANNERS:
+        engine.watch(name)
+    engine.watch("cheap_oversold", "rsi14 < 40 and close < sma50")
+    first = engine.evaluate()
+    assert first and received == first and all(e["event"] == "enter" for e in first)
+
+    rng = np.random.default_rng(11)
+    for _ in range(20):
+        batch = rng.choice(len(symbols), 25, replace=False)
+        batch_symbols = [symbols[i] for i in batch]
+        ltp = close[batch, -1] * (1 + rng.normal(0, 0.05, len(batch)))
+        state.apply(state.slots(batch_symbols), ltp, volume=volume[batch, -1] * rng.uniform(0.5, 4, len(batch)))
+        seen = len(received)
+        engine.on_ticks(batch_symbols, list(ltp))
+        assert all(e["symbol"] in batch_symbols for e in received[seen:])
+
+    for name in SCANNERS:
+        full = {row["symbol"] for row in engine.scan(name, limit=len(symbols))}
+        assert set(engine.members(name)) == full, name
+    full = {row["symbol"] for row in engine.scan_expression("rsi14 < 40 and close < sma50", limit=len(symbols))}
+    assert set(engine.members("cheap_oversold")) == full
+
+    # Replaying the events reproduces the membership
+    replayed = {}
+    for event in received:
+        members = replayed.setdefault(event["scanner"], set())
+        (members.add if event["event"] == "enter" else members.discard)(event["symbol"])
+    for name in engine.watched():
+        assert replayed.get(name, set()) == set(engine.members(name)), name
+    # Only the latest events are retained for polling
+    retained = engine.events_since(0)
+    assert 0 < len(retained) <= engine.recent_events.maxlen and retained == received[-len(retained):]
+    assert engine.events_since(retained[-2]["id"]) == retained[-1:]
+
+
+def test_incremental_evaluation_touches_only_dirty_rows():
+    engine, symbols, _, _ = make_engine(n=50)
+    state = engine.state
+    engine.watch("oversold", params={"rsi_below": 101})
+    engine.evaluate()
+    assert len(engine.members("oversold")) == 50
+    assert engine.evaluate() == []
+
+    # A row that changes without being marked stays as it was until a tick for it arrives
+    state.ltp[3] = np.nan
+    assert engine.evaluate() == [] and symbols[3] in engine.members("oversold")
+    engine.on_ticks([symbols[3]], [np.nan])
+    assert symbols[3] not in engine.members("oversold")
+    assert engine.events_since(0)[-1]["event"] == "exit"
+    engine.unwatch("oversold")
+    assert engine.watched() == []
+
+
+def same_history(engine, reference):
+    for name in HISTORY_FEATURES:
+        assert np.allclose(engine.columns[name], reference.columns[name], rtol=1e-9, equal_nan=True), name
+
+
+def test_appended_bars_match_a_full_load():
+    _, symbols, (high, low, close, volume), _ = make_engine(n=60)
+    close[5, -2] = high[5, -2] = low[5, -2] = volume[5, -2] = np.nan  # no bar that day
+    reference = ScannerEngine(MarketState(symbols))
+    reference.load_history(symbols, high, low, close, volume)
+
+    engine = ScannerEngine(MarketState(symbols))
+    engine.load_history(symbols, high[:, :-5], low[:, :-5], close[:, :-5], volume[:, :-5])
+    for t in range(-5, 0):
+        engine.append_bars(symbols, high[:, t], low[:, t], close[:, t], volume[:, t])
+    same_history(engine, reference)
+    assert engine.columns["last_close"][5] == close[5, -1]
+
+    # Reloading replaces the state rather than continuing it
+    engine.load_history(symbols, high, low, close, volume)
+    same_history(engine, reference)
+
+
+def test_new_daily_bars_are_synced_from_the_database(db_engine):
+    _, symbols, (high, low, close, volume), _ = make_engine(n=30)
+    bars = close.shape[1]
+    days = [datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=bars - t)
+            for t in range(bars)]
+    with db_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE intraday_ohlcv (symbol TEXT, timestamp TIMESTAMP, interval TEXT, "
+                          "high REAL, low REAL, close REAL, volume REAL)"))
+
+    def store(ts):
+        rows = [{"symbol": symbols[i], "timestamp": days[t] + timedelta(hours=10), "high": high[i, t],
+                 "low": low[i, t], "close": close[i, t], "volume": volume[i, t]}
+                for t in ts for i in range(len(symbols)) if not np.isnan(close[i, t])]
+        with db_engine.begin() as conn:
+            conn.execute(text("INSERT INTO intraday_ohlcv VALUES (:symbol, :timestamp, '1d', :high, :low, :close, "
+                              ":volume)"), rows)
+
+    store(range(bars - 3))
+    engine = ScannerEngine(MarketState())
+    engine.sync_history_from_db()
+    assert engine.last_bar_day == days[-4]
+    store(range(bars - 3, bars))
+    engine.sync_history_from_db()
+    assert engine.last_bar_day == days[-1]
+
+    reference = ScannerEngine(MarketState())
+    reference.load_history(symbols, high, low, close, volume)
+    for name in HISTORY_FEATURES:
+        got = engine.columns[name][engine.state.slots(symbols)]
+        want = reference.columns[name][reference.state.slots(symbols)]
+        assert np.allclose(got, want, rtol=1e-9, equal_nan=True), name
+
+
+def test_sync_keeps_retrying_when_the_first_load_fails():
+    engine = ScannerEngine(MarketState())
+    calls = []
+
+    def sync():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+
+    engine.sync_history_from_db = sync
+
+    async def run():
+        await engine.start(interval=0.01)
+        for _ in range(100):
+            if len(calls) > 1:
+                break
+            await asyncio.sleep(0.01)
+        await engine.stop()
+
+    asyncio.run(run())
+    assert len(calls) > 1
+
+
+if __name__ == "__main__":
+    # The database comes from the db_engine fixture in conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))
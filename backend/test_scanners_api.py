@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Scanner API Tests
+Calls every /scanners endpoint through a TestClient against a scanner engine
+loaded with synthetic history, and checks the tables, the 400s for invalid
+input and the watched-scanner events and members.
+
+Usage:
+    python test_scanners_api.py
+    python -m pytest test_scanners_api.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import scanners
+from app.services import scanner_engine as scanner_module
+from app.services.push_hub import push_hub
+from test_scanner_engine import make_engine
+
+
+def with_client(test):
+    engine, symbols, _, _ = make_engine()
+    app = FastAPI()
+    app.include_router(scanners.router)
+    original = scanners.scanner_engine
+    # The push topics look the process-wide engine up in its own module
+    scanners.scanner_engine = scanner_module.scanner_engine = engine
+    try:
+        test(TestClient(app), engine)
+    finally:
+        scanners.scanner_engine = scanner_module.scanner_engine = original
+
+
+def scan(engine, scanner, **overrides):
+    """The engine's own result for a scanner with generate_scanner_data's filter defaults"""
+    filters = dict(min_price=100.0, max_price=10000.0, min_volume=100000, min_rsi=0.0, max_rsi=100.0, limit=20)
+    return engine.scan(scanner, **{**filters, **overrides})
+
+
+def result_rows(response):
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["success"], body["message"]
+    return body["tables"]["scanner_results"]["rows"]
+
+
+def test_scanner_results_match_the_engine():
+    def test(client, engine):
+        rows = result_rows(client.get("/scanners", params={"scanner_type": "oversold", "min_price": 50}))
+        expected = scan(engine, "oversold", min_price=50)
+        assert [row["Symbol"] for row in rows] == [match["symbol"] for match in expected]
+        # Percentages are fractions in every table
+        assert rows[0]["Change %"] == expected[0]["change_pct"] / 100
+        assert client.get("/scanners", params={"min_rsi": 80, "max_rsi": 20}).status_code == 400
+        assert client.get("/scanners", params={"min_price": 500, "max_price": 100}).status_code == 400
+        assert client.get("/scanners", params={"scanner_type": "bogus"}).status_code == 422
+
+    with_client(test)
+
+
+def test_named_scanner_endpoints():
+    def test(client, engine):
+        cases = {
+            "/scanners/momentum": scan(engine, "momentum", min_rsi=60, max_rsi=90),
+            "/scanners/volume-spikes": scan(engine, "volume", min_price=50, volume_multiplier=2.0),
+            "/scanners/breakouts": scan(engine, "breakout", min_volume=200000),
+            "/scanners/oversold": scan(engine, "oversold", min_price=20, min_rsi=10, rsi_below=30),
+            "/scanners/overbought": scan(engine, "overbought", min_price=20, max_rsi=90, rsi_above=70),
+        }
+        assert all(cases.values())
+        for path, expected in cases.items():
+            assert [row["Symbol"] for row in result_rows(client.get(path))] == [m["symbol"] for m in expected], path
+        rows = result_rows(client.get("/scanners/oversold", params={"max_rsi": 45, "limit": 3}))
+        assert len(rows) <= 3 and all(row["RSI(14)"] < 45 for row in rows)
+
+    with_client(test)
+
+
+def test_custom_scan():
+    def test(client, engine):
+        condition = "rsi14 < 50 and close > sma20"
+        rows = result_rows(client.get("/scanners/custom", params={"condition": condition, "rank_by": "rsi14",
+                                                                   "order": "asc", "limit": 10}))
+        expected = engine.scan_expression(condition, rank_by="rsi14", descending=False, limit=10)
+        assert rows and [row["Symbol"] for row in rows] == [m["symbol"] for m in expected]
+        for bad in ("close.__class__", "-" * 490 + "close > 1", "rsi14 + 1"):
+            assert client.get("/scanners/custom", params={"condition": bad}).status_code == 400, bad
+        assert client.get("/scanners/custom", params={"condition": condition, "group": "NOPE"}).status_code == 400
+
+    with_client(test)
+
+
+def test_fields():
+    def test(client, engine):
+        body = client.get("/scanners/fields").json()
+        assert "rsi14" in body["fields"] and "close" in body["fields"]
+        assert body["scanners"]["oversold"]["defaults"] == scanners.SCANNERS["oversold"].defaults
+
+    with_client(test)
+
+
+def test_events_and_members_of_watched_scanners():
+    def test(client, engine):
+        assert client.get("/scanners/members/oversold").status_code == 404
+        engine.watch("oversold", params={"rsi_below": 45})
+        events = engine.evaluate()
+        assert events
+
+        body = client.get("/scanners/events").json()
+        assert body["data"] == events and body["lastId"] == events[-1]["id"]
+        assert body["watched"] == ["oversold"]
+        assert client.get("/scanners/events", params={"since": body["lastId"]}).json()["data"] == []
+
+        members = client.get("/scanners/members/oversold").json()["data"]
+        assert members == engine.members("oversold")
+        assert sorted(members) == sorted(e["symbol"] for e in events if e["event"] == "enter")
+
+        # The scanner.{name} push topic uses the same rows and units as the tables
+        producer, _ = push_hub.resolve("scanner.oversold")
+        pushed = {row["Symbol"]: row for row in producer()["data"]}
+        rows = result_rows(client.get("/scanners/custom", params={"condition": "rsi14 <= 45", "limit": 100}))
+        assert rows and all(pushed[row["Symbol"]] == row for row in rows)
+
+    with_client(test)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Snapshot Scheduler Tests
+Checks the NSE session calendar, that a run publishes into the cache so
+readers never recompute, and the skip, failure, timeout and overrun
+accounting of the background loops.
+
+Usage:
+    python test_snapshot_scheduler.py
+    python -m pytest test_snapshot_scheduler.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services import snapshot_scheduler as scheduler_module
+from app.services.snapshot_scheduler import NSE_TIMEZONE, SnapshotScheduler, is_market_open
+from app.utils.cache import cache
+
+
+def patched(test, **values):
+    """Run ``test`` with module-level settings of snapshot_scheduler replaced"""
+    originals = {name: getattr(scheduler_module, name) for name in values}
+    for name, value in values.items():
+        setattr(scheduler_module, name, value)
+    try:
+        return test()
+    finally:
+        for name, value in originals.items():
+            setattr(scheduler_module, name, value)
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=NSE_TIMEZONE)
+
+
+def test_market_hours():
+    assert is_market_open(ist(2024, 3, 4, 9, 15))  # Monday
+    assert is_market_open(ist(2024, 3, 4, 15, 30))
+    assert not is_market_open(ist(2024, 3, 4, 9, 14))
+    assert not is_market_open(ist(2024, 3, 4, 16, 0))
+    assert not is_market_open(ist(2024, 3, 9, 11, 0))  # Saturday
+    # 05:00 UTC is 10:30 IST
+    assert is_market_open(datetime(2024, 3, 4, 5, 0, tzinfo=timezone.utc))
+    assert patched(lambda: not is_market_open(ist(2024, 3, 4, 11, 0)), NSE_HOLIDAYS={"2024-03-04"})
+
+
+def test_jobs_publish_into_the_cache():
+    calls = []
+
+    @cache.cached(ttl_seconds=300)
+    def scheduler_test_snapshot(index):
+        calls.append(index)
+        return {"index": index, "run": len(calls)}
+
+    async def test():
+        scheduler = SnapshotScheduler()
+        job = scheduler.register("index", scheduler_test_snapshot, "NIFTY50")
+        await scheduler.run_once(job)
+        await scheduler.run_once(job)
+        return job
+
+    job = asyncio.run(test())
+    assert calls == ["NIFTY50", "NIFTY50"]
+    # Readers get the last refreshed value without recomputing it
+    assert scheduler_test_snapshot("NIFTY50") == {"index": "NIFTY50", "run": 2} and len(calls) == 2
+    metrics = job.metrics()
+    assert metrics["runs"] == 2 and metrics["failures"] == 0 and not metrics["running"]
+    assert metrics["last_run_at"] is not None
+
+    try:
+        SnapshotScheduler().register("plain", lambda: 1)
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+
+def test_overlapping_runs_are_skipped_and_failures_counted():
+    release = threading.Event()
+
+    @cache.cached(ttl_seconds=300)
+    def scheduler_test_slow():
+        release.wait(5)
+        return 1
+
+    @cache.cached(ttl_seconds=300)
+    def scheduler_test_broken():
+        raise RuntimeError("no data")
+
+    async def test():
+        scheduler = SnapshotScheduler()
+        slow = scheduler.register("slow", scheduler_test_slow)
+        first = asyncio.create_task(scheduler.run_once(slow))
+        await asyncio.sleep(0.05)
+        await scheduler.run_once(slow)
+        assert slow.skipped == 1 and slow.metrics()["running"]
+        release.set()
+        await first
+
+        broken = scheduler.register("broken", scheduler_test_broken)
+        await scheduler.run_once(broken)
+        return slow, broken
+
+    slow, broken = asyncio.run(test())
+    assert (slow.runs, slow.failures) == (1, 0)
+    assert (broken.runs, broken.failures) == (1, 1)
+
+
+def test_timeouts_and_overruns():
+    release = threading.Event()
+
+    @cache.cached(ttl_seconds=300)
+    def scheduler_test_stuck():
+        release.wait(5)
+
+    async def test():
+        scheduler = SnapshotScheduler()
+        job = scheduler.register("stuck", scheduler_test_stuck, market_interval=0.01, offhours_interval=0.01)
+        await scheduler.run_once(job)
+        release.set()
+        return job
+
+    job = patched(lambda: asyncio.run(test()), SCHEDULER_TIMEOUT=0.05)
+    assert job.failures == 1 and job.overruns == 1
+
+
+def test_loops_run_until_stopped():
+    calls = []
+
+    @cache.cached(ttl_seconds=300)
+    def scheduler_test_looped():
+        calls.append(1)
+
+    async def test():
+        scheduler = SnapshotScheduler()
+        job = scheduler.register("looped", scheduler_test_looped, market_interval=0.01, offhours_interval=0.01)
+        await scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+        runs = len(calls)
+        await asyncio.sleep(0.05)
+        assert len(calls) == runs and job.task is None
+        return job
+
+    job = asyncio.run(test())
+    assert job.runs >= 3 and job.next_run_at is not None
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store Tests
+Checks the keyed row diffs between versions of a topic, the fallback to a
+full snapshot once the base version has left the ring, and the polling
+endpoint built on top of it.
+
+Usage:
+    python test_snapshot_store.py
+    python -m pytest test_snapshot_store.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.api import stream
+from app.services.push_hub import PushHub
+from app.services.snapshot_store import SnapshotStore
+
+
+def rows(**prices):
+    return {"name": "Heatmap", "data": [{"Symbol": s, "price": p, "timestamp": "t"} for s, p in prices.items()]}
+
+
+def test_diff_carries_changed_added_and_removed_rows():
+    store = SnapshotStore()
+    store.publish("t", rows(A=1, B=2, C=3))
+    latest = rows(B=2, A=5, D=4)
+    latest["data"][0]["timestamp"] = "later"  # volatile fields do not count as a change
+    store.publish("t", {**latest, "name": "Renamed"})
+
+    diff = store.diff("t", 1)
+    assert diff["mode"] == "diff" and diff["base_version"] == 1 and diff["version"] == 2
+    assert [r["Symbol"] for r in diff["changed"]] == ["A"]
+    assert [r["Symbol"] for r in diff["added"]] == ["D"]
+    assert diff["removed"] == ["C"]
+    assert diff["order"] == ["B", "A", "D"]
+    assert diff["meta"] == {"name": "Renamed"}
+
+    store.publish("t", {**latest, "name": "Renamed"})
+    assert "order" not in store.diff("t", 2) and store.diff("t", 2)["changed"] == []
+
+
+def test_full_snapshot_when_a_diff_is_impossible():
+    store = SnapshotStore(ring_size=2)
+    assert store.diff("t", None) == {"topic": "t", "mode": "snapshot", "version": 0, "data": None}
+    for price in (1, 2, 3):
+        store.publish("t", rows(A=price))
+    # Version 1 has been evicted from the ring
+    assert store.diff("t", 1) == {"topic": "t", "mode": "snapshot", "version": 3, "data": rows(A=3)}
+    assert store.diff("t", None)["mode"] == "snapshot"
+    assert store.diff("t", 2)["mode"] == "diff"
+    # Payloads that are not keyed tables are always sent whole
+    store.publish("u", {"value": 1})
+    store.publish("u", {"value": 2})
+    assert store.diff("u", 1)["mode"] == "snapshot"
+
+
+def test_snapshot_endpoint_returns_a_diff_from_since_version():
+    async def test():
+        hub, store = PushHub(), SnapshotStore()
+        prices = iter([rows(A=1, B=2), rows(A=1, B=3)])
+        hub.register("poll.heatmap", lambda: next(prices), interval=0)
+        originals = stream.push_hub, stream.snapshot_store
+        stream.push_hub, stream.snapshot_store = hub, store
+        try:
+            first = await stream.topic_snapshot("poll.heatmap", since_version=None)
+            assert first["mode"] == "snapshot" and first["version"] == 1
+            second = await stream.topic_snapshot("poll.heatmap", since_version=first["version"])
+            assert second["mode"] == "diff" and [r["Symbol"] for r in second["changed"]] == ["B"]
+        finally:
+            stream.push_hub, stream.snapshot_store = originals
+
+    asyncio.run(test())
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
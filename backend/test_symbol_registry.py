@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Symbol Registry Tests
+Checks dense ids, group membership arrays, the primary sector column and
+the vectorized group means against plain Python, plus loading the
+registry from the symbol universe and a NIFTY 500 CSV.
+
+Usage:
+    python test_symbol_registry.py
+    python -m pytest test_symbol_registry.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+
+from app.config import symbol_universe
+from app.services.symbol_registry import SymbolRegistry
+
+
+def small_registry():
+    registry = SymbolRegistry()
+    registry.add("TCS", "Tata Consultancy Services", "IT")
+    registry.add_group("IT", ["TCS", "INFY", "WIPRO"], kind="sector", display_name="Nifty IT")
+    registry.add_group("BANK", ["HDFCBANK", "SBIN"], kind="sector")
+    registry.add_group("NIFTY", ["HDFCBANK", "TCS", "INFY"], kind="index")
+    registry.add_group("IT", ["WIPRO", "HCLTECH"], kind="index")
+    registry.add_group("EMPTY", [], kind="segment")
+    return registry.finalize()
+
+
+def test_ids_are_dense_and_adds_idempotent():
+    registry = small_registry()
+    assert registry.symbols == ["TCS", "INFY", "WIPRO", "HDFCBANK", "SBIN", "HCLTECH"]
+    assert [registry.id(s) for s in registry.symbols] == list(range(len(registry)))
+    version = registry.version
+    assert registry.add("INFY", "Infosys") == 1 and registry.version == version
+    assert registry.add("NEW") == 6 and registry.version == version + 1
+    assert "NEW" in registry and registry.get_id("NOPE") is None
+    assert registry.ids(["SBIN", "NOPE", "TCS"]).tolist() == [4, 0]
+
+
+def test_group_membership():
+    registry = small_registry()
+    # A re-added group keeps its order, appends new members and gains the kind
+    assert registry.members("IT") == ["TCS", "INFY", "WIPRO", "HCLTECH"]
+    assert registry.group_kinds["IT"] == {"sector", "index"}
+    assert registry.groups("sector") == ["IT", "BANK"]
+    assert registry.groups("index") == ["IT", "NIFTY"]
+    assert registry.mask("BANK").tolist() == [False, False, False, True, True, False]
+    assert registry.groups_of("TCS") == ["IT", "NIFTY"]
+    assert registry.member_ids("MISSING").tolist() == [] and registry.groups_of("NOPE") == []
+
+
+def test_primary_sector_and_info():
+    registry = small_registry()
+    assert registry.column("sector_id").tolist() == [0, 0, 0, 1, 1, 0]
+    assert registry.info("TCS") == {"symbol": "TCS", "company_name": "Tata Consultancy Services",
+                                    "exchange": "NSE", "sector": "IT"}
+    # Without an industry the primary sector's display name is used
+    assert registry.info("INFY")["sector"] == "Nifty IT"
+    assert registry.info("SBIN")["sector"] == "BANK" and registry.info("NOPE") is None
+
+
+def test_group_mean_matches_python():
+    registry = small_registry()
+    rng = np.random.default_rng(4)
+    values = rng.normal(size=len(registry))
+    values[registry.id("INFY")] = np.nan
+    expected = {}
+    for group in registry.groups():
+        present = [values[registry.id(s)] for s in registry.members(group) if not np.isnan(values[registry.id(s)])]
+        if present:
+            expected[group] = sum(present) / len(present)
+    means = registry.group_mean(values)
+    assert means.keys() == expected.keys()
+    assert all(abs(means[g] - expected[g]) < 1e-12 for g in expected)
+    assert list(registry.group_mean(values, groups=["BANK"])) == ["BANK"]
+
+    try:
+        registry.set_column("price", values[:-1])
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+
+def test_load_from_the_symbol_universe():
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+        f.write("Company Name,Industry,Symbol\nTest Co,Testing,TESTCO\nInfosys Ltd.,IT,INFY\n,,\n")
+    try:
+        registry = SymbolRegistry.load(f.name)
+    finally:
+        os.unlink(f.name)
+    assert len(set(registry.symbols)) == len(registry)
+    for code, members in symbol_universe.SECTOR_CONSTITUENTS.items():
+        assert registry.members(code) == list(dict.fromkeys(members)), code
+    assert registry.members("NIFTY500") == ["TESTCO", "INFY"]
+    assert registry.info("TESTCO")["sector"] == "Testing"
+    assert "sector" in registry.group_kinds["NIFTY50"]
+    assert registry.has_group("FNO") and registry.group_names["FNO"] == "F&O"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
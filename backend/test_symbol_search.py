@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Symbol Search Tests
+Checks the ranking buckets of SymbolSearchIndex: symbol prefixes, name words
+(every word of a multi-word query), substrings and typos, and that queries
+shorter than a trigram still find substrings.
+
+Usage:
+    python test_symbol_search.py
+    python -m pytest test_symbol_search.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.symbol_search import SymbolSearchIndex
+
+
+def record(symbol, name):
+    return {"symbol": symbol, "company_name": name, "exchange": "NSE", "sector": ""}
+
+
+RECORDS = [record(f"TATA{i}", f"Tata Group Company {i} Limited") for i in range(5)] + [
+    record("TCS", "Tata Consultancy Services Limited"),
+    record("TATACONSUM", "Tata Consumer Products Limited"),
+    record("INFY", "Infosys Limited"),
+    record("HDFCBANK", "HDFC Bank Limited"),
+    record("RELIANCE", "Reliance Industries Limited"),
+]
+
+
+def symbols(query, limit=5):
+    return [r["symbol"] for r in SymbolSearchIndex(RECORDS).search(query, limit)]
+
+
+def test_symbol_prefix_comes_first():
+    assert symbols("TATA") == ["TATA0", "TATA1", "TATA2", "TATA3", "TATA4"]
+    assert symbols("tcs")[0] == "TCS"
+    assert symbols("  ") == [] and symbols("tcs", limit=0) == []
+
+
+def test_every_query_word_must_match():
+    # The first word alone would fill the limit with the TATA group companies
+    assert symbols("tata cons")[:2] == ["TCS", "TATACONSUM"]
+    assert symbols("tata consultancy")[0] == "TCS"
+    assert symbols("consultancy tata")[0] == "TCS"
+
+
+def test_full_phrase_matches_rank_first():
+    index = SymbolSearchIndex([
+        record("ABC", "Power Steel India Limited"),
+        record("XYZ", "India Power Steel Limited"),
+    ])
+    assert [r["symbol"] for r in index.search("india power")] == ["XYZ", "ABC"]
+
+
+def test_short_queries_scan_for_substrings():
+    assert symbols("ys") == ["INFY"]
+    assert symbols("fc") == ["HDFCBANK"]
+
+
+def test_substring_and_typo_matches():
+    assert symbols("nsultan") == ["TCS"]
+    assert symbols("infosis")[0] == "INFY"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the tick ingestion pipeline, driven by the recorded-tick replayer
+in place of the live Fyers feed.
+
+Run with pytest or directly: python test_tick_ingestion.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.market_state import MarketState
+from app.services.tick_ingestion import (
+    TickIngestionService,
+    TickReplayer,
+    TickSource,
+    load_ticks,
+    to_display_symbol,
+)
+
+
+def recorded_ticks(symbols, count, start=1_700_000_000.0, step=0.0):
+    """Synthetic ticks in the Fyers SymbolUpdate shape"""
+    rng = random.Random(7)
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        yield {
+            "t": start + i * step,
+            "symbol": f"NSE:{symbol}-EQ",
+            "ltp": round(100 + rng.uniform(-5, 5), 2),
+            "prev_close_price": 100.0,
+            "vol_traded_today": 1000 + i,
+            "type": "sf",
+        }
+
+
+def replay(ticks, speed=0.0, record_path=""):
+    state = MarketState()
+    service = TickIngestionService(state=state, record_path=record_path)
+
+    async def run():
+        await service.start()
+        await TickReplayer(ticks, speed=speed).run(service.submit)
+        await service.drain()
+        await service.stop()
+
+    asyncio.run(run())
+    return state, service
+
+
+def test_symbol_normalization():
+    assert to_display_symbol("NSE:RELIANCE-EQ") == "RELIANCE"
+    assert to_display_symbol("NSE:NIFTY50-INDEX") == "NIFTY50-INDEX"
+    assert to_display_symbol("TCS") == "TCS"
+
+
+def test_replay_applies_last_tick_per_symbol():
+    symbols = ["RELIANCE", "TCS", "INFY"]
+    ticks = list(recorded_ticks(symbols, 3000))
+    state, service = replay(ticks)
+
+    assert service.applied == 3000
+    assert service.dropped == 0
+    assert len(state) == 3
+    for symbol in symbols:
+        last = [t for t in ticks if t["symbol"] == f"NSE:{symbol}-EQ"][-1]
+        row = state.get(symbol)
+        assert row["price"] == last["ltp"]
+        assert row["volume"] == last["vol_traded_today"]
+        assert row["change"] == round((last["ltp"] - 100.0), 2)
+
+
+def test_missing_fields_keep_previous_values():
+    ticks = [
+        {"symbol": "NSE:SBIN-EQ", "ltp": 600.0, "prev_close_price": 590.0, "vol_traded_today": 10},
+        {"symbol": "NSE:SBIN-EQ", "ltp": 601.0},
+        {"symbol": "NSE:SBIN-EQ"},  # no price: skipped
+    ]
+    state, service = replay(ticks)
+    row = state.get("SBIN")
+    assert row["price"] == 601.0
+    assert row["prev_close"] == 590.0
+    assert row["volume"] == 10
+    assert service.skipped == 1
+
+
+def test_replay_from_recording_file():
+    ticks = list(recorded_ticks(["HDFCBANK", "ITC"], 10, step=0.001))
+    with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as f:
+        for tick in ticks:
+            f.write(json.dumps(tick) + "\n")
+    try:
+        state, service = replay(f.name, speed=1.0)
+    finally:
+        os.unlink(f.name)
+    assert service.applied == 10
+    assert state.get("ITC")["price"] == ticks[-1]["ltp"]
+
+
+def test_recording_is_written_off_the_event_loop():
+    ticks = list(recorded_ticks(["SBIN", "ITC"], 2500))
+    writers = set()
+    original = TickIngestionService._write_records
+
+    def write_records(self, messages, now):
+        writers.add(threading.current_thread() is threading.main_thread())
+        original(self, messages, now)
+
+    path = os.path.join(tempfile.mkdtemp(), "ticks.ndjson")
+    TickIngestionService._write_records = write_records
+    try:
+        _, service = replay(ticks, record_path=path)
+        recorded = list(load_ticks(path))
+    finally:
+        TickIngestionService._write_records = original
+        if os.path.exists(path):
+            os.unlink(path)
+    assert writers == {False}
+    # drain() waits for the last batch to reach the file
+    assert service.applied == len(recorded) == 2500
+    assert [t["ltp"] for t in recorded] == [t["ltp"] for t in ticks]
+
+
+def test_tick_source_requires_run():
+    try:
+        TickSource()
+        raise AssertionError("expected TypeError")
+    except TypeError:
+        pass
+
+
+def test_top_movers():
+    state = MarketState()
+    for symbol, ltp in (("A", 105.0), ("B", 95.0), ("C", 110.0), ("D", 100.0)):
+        state.update(symbol, ltp, prev_close=100.0)
+    assert [r["Symbol"] for r in state.top_movers(5, gainers=True)] == ["C", "A"]
+    assert [r["Symbol"] for r in state.top_movers(5, gainers=False)] == ["B"]
+
+
+def test_sustains_thousands_of_ticks_per_second():
+    symbols = [f"SYM{i}" for i in range(500)]
+    ticks = list(recorded_ticks(symbols, 100_000))
+    started = time.perf_counter()
+    _, service = replay(ticks)
+    rate = service.applied / (time.perf_counter() - started)
+    assert service.applied == 100_000
+    assert rate > 5000, f"only {rate:.0f} ticks/s"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Query-count tests for WatchlistService.get_user_watchlists
+
+Runs the service against an in-memory SQLite database and counts the SQL
+statements issued, so the watchlist overview stays a single query no matter
+how many watchlists a user has.
+
+Usage:
+    python test_watchlist_queries.py
+    python -m pytest test_watchlist_queries.py
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, PriceHistory, User, Watchlist, WatchlistItem
+from app.services import watchlist_service
+from app.services.watchlist_service import WatchlistService
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def setup_database(engine):
+    """Create the watchlist tables on the test engine and start from an empty cache"""
+    Base.metadata.create_all(engine, tables=[User.__table__, Watchlist.__table__, WatchlistItem.__table__,
+                                             PriceHistory.__table__])
+    WatchlistService._load_user_watchlists.invalidate_all()
+    return engine
+
+
+def seed(engine, user_id, watchlists: int, items_per_watchlist: int):
+    Session = sessionmaker(bind=engine)
+    now = datetime.utcnow()
+    with Session() as db:
+        for w in range(watchlists):
+            watchlist_id = uuid.uuid4()
+            db.add(Watchlist(id=watchlist_id, user_id=user_id, name=f"List {w}", is_default=(w == 0),
+                             created_at=now + timedelta(seconds=w), updated_at=now))
+            for i in range(items_per_watchlist):
+                db.add(WatchlistItem(id=uuid.uuid4(), watchlist_id=watchlist_id, ticker=f"SYM{i}", exchange="NSE",
+                                     last_price=100 + i, alert_enabled=True, created_at=now + timedelta(seconds=i),
+                                     updated_at=now))
+        db.commit()
+
+
+def count_queries(engine, watchlists: int, items_per_watchlist: int = 15):
+    setup_database(engine)
+    user_id = uuid.uuid4()
+    seed(engine, user_id, watchlists, items_per_watchlist)
+    counter = QueryCounter(engine)
+    result = WatchlistService.get_user_watchlists(str(user_id))
+    return counter.count, result
+
+
+def test_query_count_is_constant(db_engine):
+    counts = {n: count_queries(db_engine, n)[0] for n in (1, 5, 20)}
+    assert counts[1] == counts[5] == counts[20] == 1, counts
+
+
+def test_counts_and_previews(db_engine):
+    _, result = count_queries(db_engine, 3, items_per_watchlist=15)
+    assert len(result) == 3
+    assert result[0]["is_default"] is True
+    assert [w["name"] for w in result] == ["List 0", "List 1", "List 2"]
+    for watchlist in result:
+        assert watchlist["items_count"] == 15
+        assert len(watchlist["stocks"]) == 10
+        # Latest items first
+        assert watchlist["stocks"][0]["symbol"] == "SYM14"
+
+
+def test_empty_watchlists_are_listed(db_engine):
+    engine = setup_database(db_engine)
+    user_id = uuid.uuid4()
+    seed(engine, user_id, 2, items_per_watchlist=0)
+    result = WatchlistService.get_user_watchlists(str(user_id))
+    assert [w["items_count"] for w in result] == [0, 0]
+    assert all(w["stocks"] == [] for w in result)
+
+
+def test_view_is_cached_until_a_mutation(db_engine):
+    engine = setup_database(db_engine)
+    user_id = uuid.uuid4()
+    seed(engine, user_id, 2, items_per_watchlist=3)
+    counter = QueryCounter(engine)
+    WatchlistService.get_user_watchlists(str(user_id))
+    WatchlistService.get_user_watchlists(str(user_id))
+    assert counter.count == 1
+
+    WatchlistService.create_watchlist(user_id, "Fresh")
+    before = counter.count
+    result = WatchlistService.get_user_watchlists(str(user_id))
+    assert counter.count == before + 1
+    assert "Fresh" in [w["name"] for w in result]
+
+
+def test_price_pushes_do_not_evict_the_cached_view(db_engine):
+    engine = setup_database(db_engine)
+    user_id = uuid.uuid4()
+    seed(engine, user_id, 2, items_per_watchlist=3)
+    WatchlistService.get_user_watchlists(str(user_id))
+
+    assert WatchlistService.update_stock_prices({"sym1": 150.5, "OTHER": 10}) == 2
+    counter = QueryCounter(engine)
+    result = WatchlistService.get_user_watchlists(str(user_id))
+    assert counter.count == 0
+    for watchlist in result:
+        stock = next(s for s in watchlist["stocks"] if s["symbol"] == "SYM1")
+        assert stock["current_price"] == 150.5
+        assert abs(stock["price_change_percent"] - (150.5 - 101) / 101 * 100) < 1e-3
+        assert stock["last_updated"] is not None
+
+    # A reload after a mutation sees the same prices from the database
+    WatchlistService.create_watchlist(user_id, "Fresh")
+    reloaded = WatchlistService.get_user_watchlists(str(user_id))
+    assert [w["stocks"] for w in reloaded if w["name"] != "Fresh"] == [w["stocks"] for w in result]
+
+
+def test_pushed_prices_are_dropped_with_their_items_and_after_the_view_ttl(db_engine, monkeypatch):
+    engine = setup_database(db_engine)
+    user_id = uuid.uuid4()
+    seed(engine, user_id, 2, items_per_watchlist=3)
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(watchlist_service, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    watchlist_service._item_prices.clear()
+
+    assert WatchlistService.update_stock_prices({"SYM0": 1.0, "SYM1": 2.0}) == 4
+    watchlists = WatchlistService.get_user_watchlists(str(user_id))
+    first, second = ([s["id"] for s in w["stocks"] if s["symbol"] != "SYM2"] for w in watchlists)
+    # SQLite's UUID columns want UUID objects rather than the strings the API passes
+    assert WatchlistService.remove_stock_from_watchlist(uuid.UUID(first[0]), user_id)
+    assert WatchlistService.delete_watchlist(uuid.UUID(watchlists[1]["id"]), user_id)
+    assert set(watchlist_service._item_prices) == {first[1]}
+
+    # Once every overview cached before a push has expired, its entry goes with the next push
+    clock.now += watchlist_service.WATCHLIST_VIEW_TTL_SECONDS + 1
+    WatchlistService.update_stock_prices({"SYM2": 3.0})
+    assert first[1] not in watchlist_service._item_prices
+    assert {fields["current_price"] for _, fields in watchlist_service._item_prices.values()} == {3.0}
+
+
+if __name__ == "__main__":
+    # The database comes from the db_engine fixture in conftest.py
+    sys.exit(pytest.main([__file__, "-q"]))